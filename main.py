@@ -41,6 +41,8 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 from src.database.connection import init_db, get_db, close_db, test_connection
 from src.database.models import Agency, Form
 from src.scheduler.monitoring_scheduler import start_scheduler, stop_scheduler, get_scheduler
+from src.monitors.fetch_client import close_fetch_client
+from src.monitors.webdriver_pool import resolve_chromedriver_path
 from src.notifications.notifier import NotificationManager
 from src.utils.config_loader import (
     load_agency_config, get_all_forms, validate_environment_variables,
@@ -94,6 +96,7 @@ class PayrollMonitor:
         if self.scheduler:
             stop_scheduler()
         
+        close_fetch_client()
         close_db()
         logger.info("Shutdown complete")
     
@@ -255,10 +258,18 @@ class PayrollMonitor:
             logger.error(f"Failed to start dashboard: {e}", exc_info=True)
             return False
     
+    def resolve_webdriver(self) -> None:
+        """Resolve the chromedriver binary once up front so Selenium fetches never download it."""
+        try:
+            resolve_chromedriver_path(get_monitoring_settings().get('chromedriver_path'))
+        except Exception as e:
+            logger.warning(f"Could not resolve chromedriver, Selenium fetches will be unavailable: {e}")
+    
     def start_monitoring_scheduler(self) -> bool:
         """Start the monitoring scheduler."""
         try:
             logger.info("Starting monitoring scheduler...")
+            self.resolve_webdriver()
             start_scheduler()
             
             # Keep running
@@ -0,0 +1,8 @@
+-- Migration: Add conditional fetch validators to forms
+-- Date: 2026-10-16
+-- Description: Store ETag, Last-Modified and Content-Length per form so monitoring
+--              can send If-None-Match / If-Modified-Since and skip unchanged pages (HTTP 304)
+
+ALTER TABLE forms ADD COLUMN http_etag VARCHAR(255) NULL;
+ALTER TABLE forms ADD COLUMN http_last_modified VARCHAR(100) NULL;
+ALTER TABLE forms ADD COLUMN http_content_length INTEGER NULL;
@@ -0,0 +1,7 @@
+-- Migration: Add normalized content fingerprint to monitoring runs
+-- Date: 2026-10-16
+-- Description: Store a hash of the page's main-content text with scripts, navigation and
+--              dynamic values (tokens, session IDs, timestamps) removed, so only real
+--              content changes create change records and AI analysis
+
+ALTER TABLE monitoring_runs ADD COLUMN content_fingerprint VARCHAR(64) NULL;
@@ -0,0 +1,6 @@
+-- Migration: Add content snapshot hash to forms
+-- Date: 2026-10-16
+-- Description: Point each form at the content-addressed snapshot of its last fetched
+--              content, so AI change analysis has a baseline after a restart
+
+ALTER TABLE forms ADD COLUMN snapshot_hash VARCHAR(64) NULL;
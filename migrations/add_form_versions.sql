@@ -0,0 +1,20 @@
+-- Migration: Add form version history
+-- Date: 2026-10-16
+-- Description: Keep every captured version of a form's content as chunk lists (keyframes)
+--              or deltas against the previous version; chunk bodies live in the snapshot store
+
+CREATE TABLE IF NOT EXISTS form_versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    form_id INTEGER NOT NULL REFERENCES forms(id),
+    version INTEGER NOT NULL,
+    content_hash VARCHAR(64) NOT NULL,
+    captured_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    is_keyframe BOOLEAN DEFAULT 0,
+    base_version INTEGER NULL,
+    chain_depth INTEGER DEFAULT 0,
+    manifest JSON NOT NULL,
+    content_size INTEGER NULL,
+    CONSTRAINT uq_form_version UNIQUE (form_id, version)
+);
+
+CREATE INDEX IF NOT EXISTS idx_form_versions_form_id ON form_versions(form_id);
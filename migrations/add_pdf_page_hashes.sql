@@ -0,0 +1,6 @@
+-- Migration: Add PDF fingerprint and page hashes to monitoring runs
+-- Date: 2026-10-16
+-- Description: Store the PDF fingerprint (size, /ID, ModDate) and a text hash per page
+--              so PDF form changes can be pinned to specific pages
+
+ALTER TABLE monitoring_runs ADD COLUMN pdf_metadata JSON NULL;
@@ -0,0 +1,16 @@
+-- Migration: Add render mode decisions
+-- Date: 2026-10-16
+-- Description: Remember per URL whether headless Chrome is needed to see the page content,
+--              based on probing static fetches for JavaScript dependence
+
+CREATE TABLE IF NOT EXISTS render_mode_decisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url VARCHAR(500) NOT NULL UNIQUE,
+    mode VARCHAR(20) NOT NULL DEFAULT 'static',
+    reason VARCHAR(255) NULL,
+    static_text_length INTEGER NULL,
+    rendered_text_length INTEGER NULL,
+    decided_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_render_mode_decisions_url ON render_mode_decisions(url);
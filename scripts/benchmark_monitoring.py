@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Record live agency responses once, then benchmark monitoring against them.
+
+Both commands load the configured agencies into an in-memory database and
+keep snapshots, version history, host error state and the LLM cache in a
+scratch directory removed on exit, so neither touches the real monitoring
+history, trips real circuit breakers or fills the real caches.
+
+Usage:
+    python scripts/benchmark_monitoring.py record archives/fetch_replay
+    python scripts/benchmark_monitoring.py run archives/fetch_replay --iterations 3
+    python scripts/benchmark_monitoring.py run archives/fetch_replay --monitor ai --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+# Set before the monitor or any of its stores is created
+os.environ["USE_TEST_DB"] = "true"
+_scratch = tempfile.TemporaryDirectory(prefix="benchmark_monitoring_")
+os.environ["SNAPSHOT_STORE_PATH"] = os.path.join(_scratch.name, "snapshots")  # Also holds version history chunks
+os.environ["ERROR_STATE_DB"] = os.path.join(_scratch.name, "monitor_state.db")
+os.environ["LLM_CACHE_PATH"] = os.path.join(_scratch.name, "llm_cache.db")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import PayrollMonitor, setup_logging
+from src.monitors.benchmark import record_fetches, run_benchmark
+
+
+def prepare_database() -> None:
+    """Create the in-memory schema and load agencies and forms from configuration."""
+    app = PayrollMonitor()
+    if not app.init_database() or not app.load_agency_data():
+        raise SystemExit("Could not prepare the benchmark database")
+
+
+def print_results(results) -> None:
+    print(f"{'pass':>4} {'forms':>6} {'seconds':>8} {'forms/s':>8} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'peak MB':>8} {'rss MB':>8}")
+    for result in results:
+        print(f"{result.iteration:>4} {result.forms:>6} {result.duration_seconds:>8} "
+              f"{result.forms_per_second:>8} {result.p50_latency_ms:>8} {result.p95_latency_ms:>8} "
+              f"{result.peak_python_memory_mb:>8} {result.max_rss_mb:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record/replay monitoring benchmark")
+    parser.add_argument('command', choices=['record', 'run'], help='Record live responses or replay them')
+    parser.add_argument('archive', help='Archive directory')
+    parser.add_argument('--monitor', choices=['agency', 'ai'], default='agency', help='Monitor to exercise')
+    parser.add_argument('--iterations', type=int, default=2, help='Passes over all forms (run only)')
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help='Multiplier for recorded latencies, 0 disables waits (run only)')
+    parser.add_argument('--output', help='Write results as JSON to this file (run only)')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='WARNING')
+    args = parser.parse_args()
+
+    setup_logging(args.log_level)
+    prepare_database()
+
+    if args.command == 'record':
+        archive = asyncio.run(record_fetches(args.archive, args.monitor))
+        print(f"Recorded {len(archive)} responses to {args.archive}")
+        return
+
+    results = asyncio.run(run_benchmark(args.archive, args.monitor, args.iterations, args.latency_scale))
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([result.to_dict() for result in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
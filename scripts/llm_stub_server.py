@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Run the stub OpenAI server, or measure LLM classification throughput against it.
+
+Usage:
+    python scripts/llm_stub_server.py serve --port 8099 --rpm 60 --latency 0.5
+    python scripts/llm_stub_server.py bench --base-url http://localhost:8099/v1 --requests 200
+    python scripts/llm_stub_server.py bench --requests 200 --batched
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analysis.llm_stub import StubSettings, create_stub_app
+
+
+def serve(args) -> None:
+    import uvicorn
+
+    app = create_stub_app(StubSettings(
+        latency_seconds=args.latency,
+        latency_jitter_seconds=args.jitter,
+        requests_per_minute=args.rpm or None,
+        tokens_per_minute=args.tpm or None,
+        rate_limit_probability=args.reject
+    ))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+async def bench(args) -> None:
+    os.environ["OPENAI_BASE_URL"] = args.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    from src.analysis.llm_classifier import LLMClassifier, batched_llm_requests
+
+    classifier = LLMClassifier()
+    old_content = "Employees must report wages quarterly. " * 40
+    new_content = "Employees must report wages monthly. " * 40
+
+    start = time.monotonic()
+    with batched_llm_requests() if args.batched else nullcontext():
+        results = await asyncio.gather(*[
+            classifier.classify_with_llm(old_content, new_content, f"FORM-{i}", "Stub Agency")
+            for i in range(args.requests)
+        ])
+    duration = time.monotonic() - start
+
+    answered = sum(1 for _, analysis in results if analysis.model_used != "rule_based_fallback")
+    print(f"{answered}/{args.requests} answered by the stub in {duration:.1f}s "
+          f"({args.requests / duration:.2f} requests/s)")
+    print(f"limiter: {classifier.rate_limiter.get_stats()}")
+    print(f"batching: {classifier.batch_stats}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub OpenAI server for offline rate-limit testing")
+    parser.add_argument('command', choices=['serve', 'bench'], help='Run the server or a throughput test against it')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (serve)')
+    parser.add_argument('--port', type=int, default=8099, help='Port to listen on (serve)')
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds per completion (serve)')
+    parser.add_argument('--jitter', type=float, default=0.2, help='Random latency variation in seconds (serve)')
+    parser.add_argument('--rpm', type=int, default=60, help='Requests per minute before 429s, 0 for no limit (serve)')
+    parser.add_argument('--tpm', type=int, default=40000, help='Tokens per minute before 429s, 0 for no limit (serve)')
+    parser.add_argument('--reject', type=float, default=0.0, help='Fraction of requests rejected at random (serve)')
+    parser.add_argument('--base-url', default='http://localhost:8099/v1', help='Stub API base URL (bench)')
+    parser.add_argument('--requests', type=int, default=100, help='Classifications to send (bench)')
+    parser.add_argument('--batched', action='store_true', help='Pack classifications into shared requests (bench)')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args)
+    else:
+        asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Tiered Analysis Cascade
+
+Most monitored forms have not changed in a way anyone cares about, yet every
+change used to go through embeddings and often the LLM. The cascade runs the
+cheap checks first and stops at the first tier that reaches a confident
+verdict:
+
+1. hash: the documents are identical, or differ only in whitespace and case
+2. rules: rule-based false positive detection (EnhancedAnalysisService)
+3. lexical: almost all word pairs are unchanged and the only words added
+   or removed are filler words such as articles
+4. embeddings: semantic analysis is clear enough to classify without the LLM
+5. llm: everything else
+
+The first three tiers only ever conclude that nothing meaningful changed; a
+change they cannot rule out goes on to the next tier. The thresholds can be
+set per agency in agencies.yaml (analysis_thresholds), and the number of
+analyses each tier ends and the time spent in it are kept for the service
+stats.
+"""
+
+import logging
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .models import AnalysisRequest
+from ..utils.config_loader import get_analysis_thresholds, load_agency_config
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("hash", "rules", "lexical", "embeddings", "llm")
+
+# Tiers whose verdict is that nothing meaningful changed
+EARLY_EXIT_TIERS = ("hash", "rules", "lexical")
+
+# Words that can be added or removed without changing what a form requires.
+# Any other changed word - a number, a party, a frequency, a negation -
+# goes on to the semantic tiers however small the edit is.
+FILLER_WORDS = frozenset({
+    "a", "an", "the", "this", "that", "these", "those", "its", "their",
+    "is", "are", "be", "been", "of", "in", "on", "at", "as", "also"
+})
+
+_WORD = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class CascadeThresholds:
+    """Limits at which the cascade tiers stop for one agency."""
+    # Rules tier: false positive score needed; None uses the service's false_positive_threshold
+    false_positive_score: Optional[float] = None
+    # Lexical tier: share of unchanged word pairs needed
+    lexical_similarity: float = 0.995
+    # Embeddings tier: the LLM is asked when similarity falls in this range...
+    llm_similarity_low: int = 40
+    llm_similarity_high: int = 80
+    # ...or when semantic analysis finds more differences or indicators than these
+    llm_max_significant_differences: int = 3
+    llm_max_change_indicators: int = 2
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> "CascadeThresholds":
+        known = {field.name for field in fields(cls)}
+        unknown = set(values) - known
+        if unknown:
+            logger.warning(f"Ignoring unknown analysis thresholds: {sorted(unknown)}")
+        return cls(**{key: value for key, value in values.items() if key in known})
+
+
+class CascadeThresholdConfig:
+    """Default cascade thresholds plus per-agency overrides."""
+
+    def __init__(self,
+                 default: Optional[CascadeThresholds] = None,
+                 agencies: Optional[Dict[str, CascadeThresholds]] = None):
+        self.default = default or CascadeThresholds()
+        self.agencies = {name.lower(): thresholds for name, thresholds in (agencies or {}).items()}
+
+    def for_agency(self, agency_name: Optional[str]) -> CascadeThresholds:
+        if agency_name:
+            return self.agencies.get(agency_name.lower(), self.default)
+        return self.default
+
+
+def load_cascade_thresholds(config: Optional[Dict[str, Any]] = None) -> CascadeThresholdConfig:
+    """
+    Load cascade thresholds from agencies.yaml.
+
+    Args:
+        config: Agency configuration dictionary. Loaded from agencies.yaml if None.
+
+    Returns:
+        Threshold configuration; built-in defaults if the config cannot be read
+    """
+    try:
+        if config is None:
+            config = load_agency_config()
+        thresholds = get_analysis_thresholds(config)
+        return CascadeThresholdConfig(
+            CascadeThresholds.from_dict(thresholds['default']),
+            {name: CascadeThresholds.from_dict(values) for name, values in thresholds['agencies'].items()}
+        )
+    except Exception as e:
+        logger.warning(f"Could not load analysis thresholds, using defaults: {e}")
+        return CascadeThresholdConfig()
+
+
+@dataclass
+class CascadeVerdict:
+    """A tier's conclusion that the documents differ in no meaningful way."""
+    tier: str
+    reason: str
+    description: str
+    similarity_score: int
+    confidence: int
+
+
+def hash_verdict(request: AnalysisRequest) -> Optional[CascadeVerdict]:
+    """Identical documents, or documents equal once whitespace and case are normalized."""
+    if request.old_content_hash and request.new_content_hash:
+        identical = request.old_content_hash == request.new_content_hash
+    else:
+        identical = request.old_content == request.new_content
+    if identical:
+        return CascadeVerdict("hash", "identical_content", "Content unchanged", 100, 100)
+
+    if " ".join(request.old_content.split()).casefold() == " ".join(request.new_content.split()).casefold():
+        return CascadeVerdict("hash", "normalized_identical", "Only whitespace or letter case changed", 100, 98)
+    return None
+
+
+def _word_pairs(words: List[str]) -> Counter:
+    if len(words) < 2:
+        return Counter((word,) for word in words)
+    return Counter(zip(words, words[1:]))
+
+
+def lexical_similarity(old_content: str, new_content: str) -> Tuple[float, Set[str]]:
+    """
+    Compare the word pairs of two texts.
+
+    Pairs rather than single words make reordering count as a change.
+
+    Returns:
+        Share of word pairs the texts have in common (0-1) and the words
+        added or removed, i.e. whose number of occurrences differs
+    """
+    old_words = _WORD.findall(old_content.lower())
+    new_words = _WORD.findall(new_content.lower())
+    old_pairs = _word_pairs(old_words)
+    new_pairs = _word_pairs(new_words)
+    total = sum(old_pairs.values()) + sum(new_pairs.values())
+    if total == 0:
+        return 1.0, set()
+
+    difference = (old_pairs - new_pairs) + (new_pairs - old_pairs)
+    old_counts, new_counts = Counter(old_words), Counter(new_words)
+    changed_words = set((old_counts - new_counts) + (new_counts - old_counts))
+    return 1 - sum(difference.values()) / total, changed_words
+
+
+def lexical_verdict(request: AnalysisRequest,
+                    thresholds: CascadeThresholds,
+                    details: Dict[str, Any]) -> Optional[CascadeVerdict]:
+    """Near-identical wording where only filler words were added or removed."""
+    similarity, changed_words = lexical_similarity(request.old_content, request.new_content)
+    details["lexical_similarity"] = round(similarity, 4)
+    if similarity < thresholds.lexical_similarity:
+        return None
+    if not changed_words.issubset(FILLER_WORDS):
+        return None
+    if not changed_words and similarity < 1:
+        # The same words in a different order
+        return None
+    return CascadeVerdict(
+        "lexical", "lexically_equivalent",
+        f"Wording {similarity:.1%} unchanged; only filler words or punctuation changed",
+        int(similarity * 100), 90
+    )
+
+
+class CascadeStats:
+    """Thread-safe counts of analyses reaching and ended by each tier, and time spent in it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers = {tier: {"runs": 0, "hits": 0, "time_ms": 0.0} for tier in TIERS}
+
+    def record(self, tier: str, seconds: float, hit: bool) -> None:
+        with self._lock:
+            stats = self._tiers[tier]
+            stats["runs"] += 1
+            stats["hits"] += int(hit)
+            stats["time_ms"] += seconds * 1000
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tiers = {tier: dict(stats) for tier, stats in self._tiers.items()}
+        analyses = tiers[TIERS[0]]["runs"]
+        for stats in tiers.values():
+            runs = stats["runs"]
+            stats["hit_rate"] = round(stats["hits"] / runs, 4) if runs else 0.0
+            stats["reached_percentage"] = round(runs / analyses * 100, 2) if analyses else 0.0
+            stats["avg_time_ms"] = round(stats["time_ms"] / runs, 2) if runs else 0.0
+            stats["time_ms"] = round(stats["time_ms"], 2)
+        return {"analyses": analyses, "tiers": tiers}
@@ -0,0 +1,223 @@
+"""
+Process Pool for CPU-Bound Change Analysis
+
+Semantic analysis (sentence embeddings, difflib, regex normalization,
+Levenshtein distance) holds the GIL for as long as it runs, so calling it
+from a coroutine stalls every other task on the event loop, including the
+API server and websocket broadcasts. The pool runs ChangeAnalyzer methods in
+worker processes that each load the embedding model once at start-up.
+
+Callers await results. The number of analyses submitted to the pool at
+once is limited to max_workers + queue_depth; further callers wait their
+turn without blocking the loop. A worker cannot be interrupted, so when a
+caller gives up on an analysis that is already running (for example through
+asyncio.wait_for) the pool's workers are terminated and replaced; analyses
+that shared the old pool are retried once on the new one.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from .change_analyzer import ChangeAnalyzer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ANALYSIS_WORKERS = 2
+DEFAULT_ANALYSIS_QUEUE_DEPTH = 16
+
+# ChangeAnalyzer methods that may run in a worker
+POOL_METHODS = {"analyze", "detect_significant_changes", "is_cosmetic_change", "generate_change_indicators"}
+
+# Analyzer owned by a worker process, created by the pool initializer
+_worker_analyzer: Optional[ChangeAnalyzer] = None
+
+
+def _init_worker(model_name: str, similarity_threshold: float) -> None:
+    global _worker_analyzer
+    _worker_analyzer = ChangeAnalyzer(model_name=model_name, similarity_threshold=similarity_threshold)
+
+
+def _run_in_worker(method: str, args: tuple) -> Any:
+    return getattr(_worker_analyzer, method)(*args)
+
+
+class AnalysisPool:
+    """Runs ChangeAnalyzer methods in worker processes with bounded queueing."""
+
+    def __init__(self,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 similarity_threshold: float = 0.85,
+                 max_workers: int = DEFAULT_ANALYSIS_WORKERS,
+                 queue_depth: int = DEFAULT_ANALYSIS_QUEUE_DEPTH):
+        """
+        Args:
+            model_name: Sentence transformer model each worker loads
+            similarity_threshold: Passed to each worker's ChangeAnalyzer
+            max_workers: Number of worker processes
+            queue_depth: Analyses allowed to wait in the pool beyond one per worker
+        """
+        self.model_name = model_name
+        self.similarity_threshold = similarity_threshold
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # Event loops cannot share an asyncio.Semaphore, so each gets its own
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._stats_lock = threading.Lock()
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "in_flight": 0, "waiting": 0, "pool_restarts": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the parent's threads, locks or connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.similarity_threshold)
+                )
+            return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._stats_lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = asyncio.Semaphore(self.max_workers + self.queue_depth)
+                self._slots[loop] = slots
+            return slots
+
+    def _count(self, **changes: int) -> None:
+        with self._stats_lock:
+            for key, change in changes.items():
+                self.stats[key] += change
+
+    async def run(self, method: str, *args: Any) -> Any:
+        """
+        Run a ChangeAnalyzer method in a worker process.
+
+        Args:
+            method: Name of the method, one of POOL_METHODS
+            *args: Arguments for the method; must be picklable
+
+        Returns:
+            The method's result
+        """
+        if method not in POOL_METHODS:
+            raise ValueError(f"{method} cannot run in the analysis pool")
+
+        self._count(waiting=1)
+        async with self._get_slots():
+            self._count(waiting=-1, submitted=1, in_flight=1)
+            try:
+                try:
+                    result = await self._submit(method, args)
+                except BrokenProcessPool:
+                    # A worker died (e.g. out of memory); start a fresh pool and retry once
+                    logger.warning(f"Analysis pool broke while running {method}, restarting workers")
+                    result = await self._submit(method, args)
+            except Exception:
+                self._count(failed=1)
+                raise
+            finally:
+                self._count(in_flight=-1)
+
+        self._count(completed=1)
+        return result
+
+    async def _submit(self, method: str, args: tuple) -> Any:
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_run_in_worker, method, args)
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+        except asyncio.CancelledError:
+            if future.cancelled() and not asyncio.current_task().cancelling():
+                # Nobody cancelled this caller: another caller's abandoned
+                # analysis restarted the pool before this one started, so
+                # report it like a broken pool and let run() retry it
+                raise BrokenProcessPool(f"{method} was cancelled by a pool restart")
+            # Cancelling the asyncio future cannot stop a call a worker has
+            # already picked up, so the worker would stay busy with an
+            # analysis nobody awaits; replace the pool to free it
+            if not future.cancel() and not future.done():
+                logger.warning(f"Abandoned {method} analysis still running, restarting workers")
+                self._restart(executor, terminate=True)
+            raise
+
+    def _restart(self, executor: Any, terminate: bool = False) -> None:
+        """
+        Replace a broken or stuck executor with a fresh one on next use.
+
+        Several callers may see the same executor fail; only the first
+        replaces it, so a pool started in the meantime is left alone.
+        """
+        with self._executor_lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        # shutdown() drops the executor's process table, so read it first
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        if terminate:
+            for process in processes:
+                process.terminate()
+        self._count(pool_restarts=1)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self.queue_depth,
+                "started": self._executor is not None,
+                **self.stats
+            }
+
+
+# Pools shared by all analysis services in this process, one per model
+_global_pools: Dict[tuple, AnalysisPool] = {}
+_global_lock = threading.Lock()
+
+
+def get_analysis_pool(model_name: str, similarity_threshold: float = 0.85) -> Optional[AnalysisPool]:
+    """
+    Get the process-wide analysis pool for a model.
+
+    Worker count and queue depth come from ANALYSIS_WORKERS and
+    ANALYSIS_QUEUE_DEPTH. Returns None when ANALYSIS_WORKERS is 0, in which
+    case callers run analysis in a thread instead.
+    """
+    workers = int(os.getenv("ANALYSIS_WORKERS", DEFAULT_ANALYSIS_WORKERS))
+    if workers <= 0:
+        return None
+
+    key = (model_name, similarity_threshold)
+    with _global_lock:
+        if key not in _global_pools:
+            _global_pools[key] = AnalysisPool(
+                model_name=model_name,
+                similarity_threshold=similarity_threshold,
+                max_workers=workers,
+                queue_depth=int(os.getenv("ANALYSIS_QUEUE_DEPTH", DEFAULT_ANALYSIS_QUEUE_DEPTH))
+            )
+        return _global_pools[key]
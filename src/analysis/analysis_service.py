@@ -7,6 +7,7 @@ comprehensive document change analysis with performance monitoring and audit tra
 
 import uuid
 import time
+import hashlib
 import logging
 import asyncio
 from datetime import datetime, timezone
@@ -19,10 +20,20 @@ from .models import (
     ChangeClassification, SemanticAnalysis, LLMAnalysis
 )
 from .change_analyzer import ChangeAnalyzer
-from .llm_classifier import LLMClassifier
+from .analysis_pool import get_analysis_pool
+from .analysis_cascade import (
+    CascadeStats, CascadeThresholdConfig, CascadeThresholds, CascadeVerdict,
+    hash_verdict, lexical_verdict, load_cascade_thresholds
+)
+from .llm_classifier import LLMClassifier, batched_llm_requests
+from ..utils.bounded_cache import BoundedCache
+from ..utils.diff_engine import LineDiff, compute_diff
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_CACHE_TTL_SECONDS = 24 * 60 * 60
+
 
 class AnalysisService:
     """
@@ -41,7 +52,10 @@ class AnalysisService:
                  llm_model: str = "gpt-3.5-turbo",
                  default_confidence_threshold: int = 70,
                  max_processing_time_seconds: int = 180,
-                 enable_caching: bool = True):
+                 enable_caching: bool = True,
+                 cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 cache_ttl_seconds: Optional[float] = DEFAULT_CACHE_TTL_SECONDS,
+                 analysis_thresholds: Optional[CascadeThresholdConfig] = None):
         """
         Initialize the AnalysisService.
         
@@ -51,8 +65,12 @@ class AnalysisService:
             default_confidence_threshold: Default threshold for analysis confidence
             max_processing_time_seconds: Maximum time allowed for analysis
             enable_caching: Whether to enable result caching
+            cache_max_bytes: Memory budget for cached analysis results
+            cache_ttl_seconds: Age after which cached results are recomputed
+            analysis_thresholds: Per-agency cascade thresholds; loaded from agencies.yaml if None
         """
         self.default_confidence_threshold = default_confidence_threshold
+        self.analysis_thresholds = analysis_thresholds or load_cascade_thresholds()
         self.max_processing_time_seconds = max_processing_time_seconds
         self.enable_caching = enable_caching
         
@@ -60,6 +78,8 @@ class AnalysisService:
         try:
             self.change_analyzer = ChangeAnalyzer(model_name=semantic_model)
             self.llm_classifier = LLMClassifier(model_name=llm_model)
+            # Worker processes for CPU-bound analysis; None runs it in a thread
+            self.analysis_pool = get_analysis_pool(semantic_model, self.change_analyzer.similarity_threshold)
             logger.info("AnalysisService initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize AnalysisService: {e}")
@@ -74,24 +94,59 @@ class AnalysisService:
             "cache_hits": 0,
             "llm_fallback_count": 0
         }
+        self.cascade_stats = CascadeStats()
         
-        # Simple in-memory cache (in production, use Redis or similar)
-        self.analysis_cache = {} if enable_caching else None
+        # Memory-bounded LRU of recent results
+        self.analysis_cache = BoundedCache(
+            max_bytes=cache_max_bytes, ttl_seconds=cache_ttl_seconds
+        ) if enable_caching else None
     
     def _generate_analysis_id(self) -> str:
         """Generate unique analysis ID."""
         return f"analysis_{uuid.uuid4().hex[:8]}_{int(time.time())}"
     
-    def _calculate_cache_key(self, old_content: str, new_content: str) -> str:
-        """Calculate cache key for content comparison."""
-        import hashlib
-        content_hash = hashlib.sha256(f"{old_content}|||{new_content}".encode()).hexdigest()
-        return f"analysis_{content_hash[:16]}"
+    async def _run_analyzer(self, method: str, *args: Any) -> Any:
+        """
+        Run a CPU-bound ChangeAnalyzer method without blocking the event loop.
+
+        Uses the process pool when one is configured, otherwise a worker
+        thread, and gives up after max_processing_time_seconds. The pool
+        replaces its workers when an analysis is abandoned this way; a
+        thread cannot be stopped and runs the analysis to completion.
+        """
+        if self.analysis_pool is not None:
+            call = self.analysis_pool.run(method, *args)
+        else:
+            call = asyncio.to_thread(getattr(self.change_analyzer, method), *args)
+        return await asyncio.wait_for(call, timeout=self.max_processing_time_seconds)
+    
+    def _calculate_cache_key(self,
+                             old_content: str,
+                             new_content: str,
+                             request: Optional[AnalysisRequest] = None) -> str:
+        """
+        Calculate cache key for content comparison.
+        
+        The key is built from the hashes of both documents, taken from the
+        request when the caller already has them, plus the request parameters
+        that shape the result.
+        """
+        old_hash = request.old_content_hash if request else None
+        new_hash = request.new_content_hash if request else None
+        key_parts = [
+            old_hash or hashlib.sha256(old_content.encode('utf-8')).hexdigest(),
+            new_hash or hashlib.sha256(new_content.encode('utf-8')).hexdigest()
+        ]
+        if request:
+            key_parts += [request.form_name or "", request.agency_name or "",
+                          str(request.confidence_threshold), str(request.use_llm_fallback)]
+        return f"analysis_{hashlib.sha256('|'.join(key_parts).encode('utf-8')).hexdigest()[:32]}"
     
     def _should_use_llm(self, 
                        semantic_analysis: SemanticAnalysis,
                        confidence_threshold: int,
-                       request: AnalysisRequest) -> bool:
+                       request: AnalysisRequest,
+                       thresholds: Optional[CascadeThresholds] = None) -> bool:
         """
         Determine if LLM analysis should be used based on confidence and request parameters.
         
@@ -99,28 +154,129 @@ class AnalysisService:
             semantic_analysis: Results from semantic analysis
             confidence_threshold: Confidence threshold
             request: Original analysis request
+            thresholds: Cascade thresholds for the request's agency
             
         Returns:
             True if LLM should be used, False otherwise
         """
-        # Always use LLM if explicitly requested
-        if request.use_llm_fallback:
-            return True
+        # The LLM is only a fallback for cases semantic analysis cannot settle
+        if not request.use_llm_fallback:
+            return False
+        
+        thresholds = thresholds or CascadeThresholds()
         
         # Use LLM if semantic analysis indicates significant changes
-        if len(semantic_analysis.significant_differences) > 3:
+        if len(semantic_analysis.significant_differences) > thresholds.llm_max_significant_differences:
             return True
         
-        # Use LLM if similarity is in the uncertain range (40-80%)
-        if 40 <= semantic_analysis.similarity_score <= 80:
+        # Use LLM if similarity is in the uncertain range
+        if thresholds.llm_similarity_low <= semantic_analysis.similarity_score <= thresholds.llm_similarity_high:
             return True
         
         # Use LLM if change indicators suggest complex changes
-        if len(semantic_analysis.change_indicators) > 2:
+        if len(semantic_analysis.change_indicators) > thresholds.llm_max_change_indicators:
             return True
         
         return False
     
+    def _check_rules(self,
+                     request: AnalysisRequest,
+                     thresholds: CascadeThresholds,
+                     details: Dict[str, Any],
+                     diff: LineDiff) -> Optional[CascadeVerdict]:
+        """
+        Rule-based tier of the cascade.
+        
+        The base service has no rules; EnhancedAnalysisService plugs in its
+        false positive detection here.
+        """
+        return None
+    
+    async def _run_early_tiers(self,
+                               request: AnalysisRequest,
+                               thresholds: CascadeThresholds,
+                               tier_times: Dict[str, float],
+                               details: Dict[str, Any]) -> Tuple[Optional[CascadeVerdict], Optional[LineDiff]]:
+        """
+        Run the hash, rules and lexical tiers until one finds nothing meaningful changed.
+        
+        Past the hash tier the documents are diffed once, and the diff is
+        returned for the later tiers to share. The diff and the rules and
+        lexical tiers scan whole documents, so they run in a worker thread.
+        
+        Returns:
+            The verdict that ended the analysis, if any, and the line diff
+        """
+        started = time.perf_counter()
+        verdict = hash_verdict(request)
+        self._end_tier("hash", started, verdict is not None, tier_times)
+        if verdict is not None:
+            return verdict, None
+        
+        started = time.perf_counter()
+        diff = await asyncio.to_thread(compute_diff, request.old_content, request.new_content)
+        details["diff_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        
+        tiers = [
+            ("rules", lambda: self._check_rules(request, thresholds, details, diff)),
+            ("lexical", lambda: lexical_verdict(request, thresholds, details))
+        ]
+        for tier, check in tiers:
+            started = time.perf_counter()
+            verdict = await asyncio.to_thread(check)
+            self._end_tier(tier, started, verdict is not None, tier_times)
+            if verdict is not None:
+                return verdict, diff
+        return None, diff
+    
+    def _end_tier(self, tier: str, started: float, hit: bool, tier_times: Dict[str, float]) -> float:
+        """Record the time spent in a cascade tier and whether it ended the analysis; returns the current time."""
+        now = time.perf_counter()
+        tier_times[tier] = round((now - started) * 1000, 2)
+        self.cascade_stats.record(tier, now - started, hit)
+        return now
+    
+    def _cascade_response(self,
+                          analysis_id: str,
+                          verdict: CascadeVerdict,
+                          processing_time_ms: int,
+                          cascade_summary: Dict[str, Any]) -> AnalysisResponse:
+        """Build the response for an analysis ended early by the cascade."""
+        return AnalysisResponse(
+            analysis_id=analysis_id,
+            timestamp=datetime.now(timezone.utc),
+            has_meaningful_changes=False,
+            classification=ChangeClassification(
+                category="cosmetic_change",
+                subcategory=verdict.reason,
+                severity="low",
+                priority_score=5,
+                is_cosmetic=True,
+                confidence=verdict.confidence
+            ),
+            semantic_analysis=SemanticAnalysis(
+                similarity_score=verdict.similarity_score,
+                significant_differences=[],
+                change_indicators=[verdict.description],
+                model_name=self.change_analyzer.model_name,
+                processing_time_ms=processing_time_ms
+            ),
+            llm_analysis=None,
+            processing_summary={
+                "processing_time_ms": processing_time_ms,
+                "semantic_model": self.change_analyzer.model_name,
+                "classification_method": "cascade",
+                "cascade": cascade_summary,
+                "cache_used": False,
+                "analysis_version": "1.0"
+            },
+            confidence_breakdown={
+                "semantic_similarity": verdict.similarity_score,
+                "classification_confidence": verdict.confidence,
+                "overall": verdict.confidence
+            }
+        )
+    
     def _combine_analysis_results(self,
                                  semantic_analysis: SemanticAnalysis,
                                  classification: ChangeClassification,
@@ -182,71 +338,100 @@ class AnalysisService:
         
         try:
             # Check cache if enabled
-            if self.analysis_cache:
-                cache_key = self._calculate_cache_key(request.old_content, request.new_content)
-                if cache_key in self.analysis_cache:
+            cache_key = None
+            if self.analysis_cache is not None:
+                cache_key = self._calculate_cache_key(request.old_content, request.new_content, request)
+                cached_result = self.analysis_cache.get(cache_key)
+                if cached_result is not None:
                     logger.info(f"Cache hit for analysis {analysis_id}")
                     self.analysis_stats["cache_hits"] += 1
-                    cached_result = self.analysis_cache[cache_key]
-                    cached_result.analysis_id = analysis_id  # Update ID for uniqueness
-                    return cached_result
+                    # Copy so the cached response keeps its own ID
+                    return cached_result.model_copy(update={"analysis_id": analysis_id})
             
-            # Step 1: Semantic Analysis
+            # Step 1: Cheap tiers of the cascade (hash, rules, lexical)
+            thresholds = self.analysis_thresholds.for_agency(request.agency_name)
+            tier_times: Dict[str, float] = {}
+            cascade_summary: Dict[str, Any] = {"tier_times_ms": tier_times}
+            verdict, diff = await self._run_early_tiers(request, thresholds, tier_times, cascade_summary)
+            
+            if verdict is not None:
+                logger.info(f"Analysis {analysis_id} ended at the {verdict.tier} tier: {verdict.description}")
+                cascade_summary["tier"] = verdict.tier
+                processing_time_ms = int((time.time() - start_time) * 1000)
+                response = self._cascade_response(analysis_id, verdict, processing_time_ms, cascade_summary)
+                self._record_success(response, cache_key, processing_time_ms, used_llm=False)
+                return response
+            
+            # Step 2: Semantic Analysis (embeddings tier)
             logger.debug(f"Performing semantic analysis for {analysis_id}")
-            semantic_analysis = self.change_analyzer.analyze(
+            tier_started = time.perf_counter()
+            semantic_analysis = await self._run_analyzer(
+                "analyze",
                 request.old_content, 
                 request.new_content
             )
             
-            # Step 2: Determine if we need LLM analysis
+            # Step 3: Determine if we need LLM analysis
             use_llm = self._should_use_llm(
                 semantic_analysis, 
                 request.confidence_threshold, 
-                request
+                request,
+                thresholds
             )
+            if use_llm:
+                # Semantic analysis was not conclusive; the rest counts as the LLM tier
+                tier_started = self._end_tier("embeddings", tier_started, False, tier_times)
             
             llm_analysis = None
             classification = None
             
-            # Step 3: Classification (with or without LLM)
+            # Step 4: Classification (with or without LLM)
             logger.debug(f"Performing classification for {analysis_id} (LLM: {use_llm})")
             classification, llm_analysis = await self.llm_classifier.classify(
                 request.old_content,
                 request.new_content,
                 request.form_name,
                 request.agency_name,
-                use_llm=use_llm
+                use_llm=use_llm,
+                diff=diff
             )
             
-            # Step 4: Check for cosmetic changes using semantic analyzer
+            # Step 5: Check for cosmetic changes using semantic analyzer
             if classification.is_cosmetic:
-                is_cosmetic_semantic = self.change_analyzer.is_cosmetic_change(
-                    request.old_content, request.new_content
+                is_cosmetic_semantic = await self._run_analyzer(
+                    "is_cosmetic_change", request.old_content, request.new_content
                 )
                 # Override classification if semantic analysis disagrees
                 if not is_cosmetic_semantic:
                     classification.is_cosmetic = False
                     logger.info(f"Overrode cosmetic classification based on semantic analysis for {analysis_id}")
             
-            # Step 5: Combine results
+            cascade_summary["tier"] = "llm" if use_llm else "embeddings"
+            self._end_tier(cascade_summary["tier"], tier_started, True, tier_times)
+            
+            # Step 6: Combine results
             has_meaningful_changes, confidence_breakdown = self._combine_analysis_results(
                 semantic_analysis, classification, llm_analysis
             )
             
-            # Step 6: Create processing summary
+            # Step 7: Create processing summary
             processing_time_ms = int((time.time() - start_time) * 1000)
             processing_summary = {
                 "processing_time_ms": processing_time_ms,
                 "semantic_model": self.change_analyzer.model_name,
                 "classification_method": "llm" if use_llm and llm_analysis else "rule_based",
+                "cascade": cascade_summary,
                 "cache_used": False,
                 "analysis_version": "1.0"
             }
             
             if llm_analysis and llm_analysis.tokens_used:
                 processing_summary["llm_tokens_used"] = llm_analysis.tokens_used
+            if llm_analysis and llm_analysis.prompt_tokens is not None:
+                processing_summary["llm_prompt_tokens"] = llm_analysis.prompt_tokens
+                processing_summary["llm_latency_ms"] = llm_analysis.latency_ms
             
-            # Step 7: Create response
+            # Step 8: Create response
             response = AnalysisResponse(
                 analysis_id=analysis_id,
                 timestamp=datetime.now(timezone.utc),
@@ -258,18 +443,8 @@ class AnalysisService:
                 confidence_breakdown=confidence_breakdown
             )
             
-            # Cache result if enabled
-            if self.analysis_cache and cache_key:
-                self.analysis_cache[cache_key] = response
-                logger.debug(f"Cached analysis result for {analysis_id}")
-            
-            # Update statistics
-            self.analysis_stats["total_analyses"] += 1
-            self.analysis_stats["successful_analyses"] += 1
-            self._update_avg_processing_time(processing_time_ms)
-            
-            if not use_llm or not llm_analysis or llm_analysis.model_used == "rule_based_fallback":
-                self.analysis_stats["llm_fallback_count"] += 1
+            used_llm = use_llm and llm_analysis is not None and llm_analysis.model_used != "rule_based_fallback"
+            self._record_success(response, cache_key, processing_time_ms, used_llm)
             
             logger.info(f"Analysis {analysis_id} completed successfully in {processing_time_ms}ms")
             return response
@@ -286,6 +461,23 @@ class AnalysisService:
             self.analysis_stats["failed_analyses"] += 1
             raise AnalysisProcessingError(error_msg) from e
     
+    def _record_success(self,
+                        response: AnalysisResponse,
+                        cache_key: Optional[str],
+                        processing_time_ms: int,
+                        used_llm: bool) -> None:
+        """Cache a finished analysis and update the statistics."""
+        if self.analysis_cache is not None and cache_key:
+            self.analysis_cache[cache_key] = response
+            logger.debug(f"Cached analysis result for {response.analysis_id}")
+        
+        self.analysis_stats["total_analyses"] += 1
+        self.analysis_stats["successful_analyses"] += 1
+        self._update_avg_processing_time(processing_time_ms)
+        
+        if not used_llm:
+            self.analysis_stats["llm_fallback_count"] += 1
+    
     def _update_avg_processing_time(self, new_time_ms: int) -> None:
         """Update running average of processing times."""
         current_avg = self.analysis_stats["avg_processing_time_ms"]
@@ -313,14 +505,26 @@ class AnalysisService:
         
         logger.info(f"Starting batch analysis {batch_id} with {len(batch_request.analyses)} requests")
         
-        # Process analyses in parallel
-        tasks = []
-        for i, request in enumerate(batch_request.analyses):
-            task = asyncio.create_task(
-                self.analyze_document_changes(request),
-                name=f"analysis_{batch_id}_{i}"
+        # Encode the texts of all requests in shared batches; the analyses below
+        # then find their embeddings in the cache
+        try:
+            prepared = await asyncio.to_thread(
+                self.change_analyzer.prepare_batch,
+                [(request.old_content, request.new_content) for request in batch_request.analyses]
             )
-            tasks.append(task)
+            logger.debug(f"Pre-encoded {prepared} texts for batch {batch_id}")
+        except Exception as e:
+            logger.warning(f"Could not pre-encode texts for batch {batch_id}: {e}")
+        
+        # Process analyses in parallel; their LLM classifications share requests
+        tasks = []
+        with batched_llm_requests():
+            for i, request in enumerate(batch_request.analyses):
+                task = asyncio.create_task(
+                    self.analyze_document_changes(request),
+                    name=f"analysis_{batch_id}_{i}"
+                )
+                tasks.append(task)
         
         # Wait for all tasks to complete
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -361,13 +565,19 @@ class AnalysisService:
         """Get service performance statistics."""
         return {
             **self.analysis_stats,
-            "cache_size": len(self.analysis_cache) if self.analysis_cache else 0,
+            "cache_size": len(self.analysis_cache) if self.analysis_cache is not None else 0,
+            "cache": self.analysis_cache.get_stats() if self.analysis_cache is not None else None,
+            "analysis_pool": self.analysis_pool.get_stats() if self.analysis_pool is not None else None,
+            "llm_rate_limiter": self.llm_classifier.rate_limiter.get_stats(),
+            "llm_batching": self.llm_classifier.batch_stats,
+            "llm_cache": self.llm_classifier.cache.get_stats() if self.llm_classifier.cache is not None else None,
+            "analysis_cascade": self.cascade_stats.get_stats(),
             "service_uptime_seconds": int(time.time() - getattr(self, '_start_time', time.time()))
         }
     
     def clear_cache(self) -> None:
         """Clear the analysis cache."""
-        if self.analysis_cache:
+        if self.analysis_cache is not None:
             cache_size = len(self.analysis_cache)
             self.analysis_cache.clear()
             logger.info(f"Cleared analysis cache ({cache_size} entries)")
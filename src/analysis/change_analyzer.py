@@ -8,14 +8,12 @@ document versions using sentence transformers and semantic similarity analysis.
 import re
 import time
 import logging
-import difflib
-from typing import List, Tuple, Dict, Set, Any
+from typing import List, Tuple, Dict, Set, Any, Optional
 from dataclasses import dataclass
 import numpy as np
 
 try:
     from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
     import Levenshtein
     DEPENDENCIES_AVAILABLE = True
 except ImportError as e:
@@ -23,9 +21,14 @@ except ImportError as e:
     # Note: logger is not available yet, will be set up later
 
 from .models import SemanticAnalysis
+from .embedding_cache import EmbeddingCache, get_embedding_cache, text_hash
+from ..utils.diff_engine import compute_diff
+from ..utils.html_document import parse_document
 
 logger = logging.getLogger(__name__)
 
+URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+
 
 @dataclass
 class DocumentSection:
@@ -47,20 +50,28 @@ class ChangeAnalyzer:
     - Performance optimization for real-time analysis
     """
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", similarity_threshold: float = 0.85):
+    def __init__(self,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 similarity_threshold: float = 0.85,
+                 embedding_cache: Optional[EmbeddingCache] = None):
         """
         Initialize the ChangeAnalyzer.
         
         Args:
             model_name: Sentence transformer model to use
             similarity_threshold: Threshold below which changes are considered significant
+            embedding_cache: Store of previously computed embeddings (defaults to the
+                shared on-disk cache for the model)
         """
         self.model_name = model_name
         self.similarity_threshold = similarity_threshold
         self.model = None
+        self.embedding_cache = embedding_cache
         
         if DEPENDENCIES_AVAILABLE:
             self._load_model()
+            if self.embedding_cache is None:
+                self.embedding_cache = get_embedding_cache(model_name)
         else:
             logger.warning("Dependencies not available. Using mock implementation.")
         
@@ -98,6 +109,34 @@ class ChangeAnalyzer:
             logger.error(f"Failed to load model {self.model_name}: {e}")
             raise
     
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Get embeddings for texts, encoding only those not seen before.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Array with one embedding row per text
+        """
+        if self.embedding_cache is None:
+            return np.asarray(self.model.encode(texts), dtype=np.float32)
+        
+        keys = [text_hash(text) for text in texts]
+        vectors = self.embedding_cache.get_many(keys)
+        
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            encoded = np.asarray(self.model.encode(list(missing.values())), dtype=np.float32)
+            new_vectors = dict(zip(missing.keys(), encoded))
+            vectors.update(new_vectors)
+            try:
+                self.embedding_cache.put_many(new_vectors)
+            except Exception as e:
+                logger.warning(f"Could not store embeddings in cache: {e}")
+        
+        return np.stack([vectors[key] for key in keys])
+    
     def preprocess_document(self, content: str) -> Tuple[str, List[DocumentSection]]:
         """
         Preprocess document content and extract structured sections.
@@ -188,33 +227,59 @@ class ChangeAnalyzer:
         Returns:
             Similarity score between 0 and 1
         """
+        return self.calculate_semantic_similarities([(text1, text2)])[0]
+    
+    def calculate_semantic_similarities(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Calculate semantic similarity for many text pairs at once.
+        
+        All distinct texts are encoded in a single batch and the cosine
+        similarities of all pairs are computed in one matrix operation.
+        
+        Args:
+            pairs: (text1, text2) pairs
+            
+        Returns:
+            Similarity score between 0 and 1 for each pair
+        """
+        if not pairs:
+            return []
+        
         if not DEPENDENCIES_AVAILABLE or self.model is None:
-            # Fallback to simple text comparison
-            if text1 == text2:
-                return 1.0
-            elif text1.lower() == text2.lower():
-                return 0.9
-            else:
-                # Simple similarity based on common words
-                words1 = set(text1.lower().split())
-                words2 = set(text2.lower().split())
-                if not words1 and not words2:
-                    return 1.0
-                intersection = words1.intersection(words2)
-                union = words1.union(words2)
-                return len(intersection) / len(union) if union else 0.0
+            return [self._word_overlap_similarity(text1, text2) for text1, text2 in pairs]
         
         try:
-            # Encode texts
-            embeddings = self.model.encode([text1, text2])
+            texts = list(dict.fromkeys(text for pair in pairs for text in pair))
+            row_of = {text: i for i, text in enumerate(texts)}
+            embeddings = self.encode(texts)
+            
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            normalized = embeddings / np.where(norms == 0, 1.0, norms)
             
-            # Calculate cosine similarity
-            similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
+            left = normalized[[row_of[text1] for text1, _ in pairs]]
+            right = normalized[[row_of[text2] for _, text2 in pairs]]
+            similarities = np.einsum('ij,ij->i', left, right)
             
-            return float(similarity)
+            return [float(similarity) for similarity in similarities]
         except Exception as e:
             logger.error(f"Error calculating semantic similarity: {e}")
-            return 0.0
+            return [0.0] * len(pairs)
+    
+    def _word_overlap_similarity(self, text1: str, text2: str) -> float:
+        """Fallback text comparison when no embedding model is available."""
+        if text1 == text2:
+            return 1.0
+        elif text1.lower() == text2.lower():
+            return 0.9
+        else:
+            # Simple similarity based on common words
+            words1 = set(text1.lower().split())
+            words2 = set(text2.lower().split())
+            if not words1 and not words2:
+                return 1.0
+            intersection = words1.intersection(words2)
+            union = words1.union(words2)
+            return len(intersection) / len(union) if union else 0.0
     
     def detect_significant_changes(self, old_content: str, new_content: str) -> List[str]:
         """
@@ -227,8 +292,20 @@ class ChangeAnalyzer:
         Returns:
             List of significant changes detected
         """
-        changes = []
+        comparisons = self._section_comparisons(old_content, new_content)
+        similarities = self.calculate_semantic_similarities(
+            [(old, new) for _, old, new in comparisons if old and new]
+        )
+        return self._significant_section_changes(comparisons, similarities)
+    
+    def _section_comparisons(self, old_content: str, new_content: str) -> List[Tuple[str, str, str]]:
+        """
+        Pair up the combined sections of each type in both versions.
         
+        Returns:
+            (section_type, old_combined, new_combined) for every section type
+            present in either version
+        """
         # Preprocess both documents
         old_clean, old_sections = self.preprocess_document(old_content)
         new_clean, new_sections = self.preprocess_document(new_content)
@@ -237,15 +314,24 @@ class ChangeAnalyzer:
         old_by_type = self._group_sections_by_type(old_sections)
         new_by_type = self._group_sections_by_type(new_sections)
         
-        for section_type in set(old_by_type.keys()) | set(new_by_type.keys()):
-            old_type_content = old_by_type.get(section_type, [])
-            new_type_content = new_by_type.get(section_type, [])
-            
-            section_changes = self._compare_section_type(
-                old_type_content, new_type_content, section_type
-            )
-            changes.extend(section_changes)
-        
+        return [
+            (section_type,
+             '\n'.join(old_by_type.get(section_type, [])),
+             '\n'.join(new_by_type.get(section_type, [])))
+            for section_type in sorted(set(old_by_type.keys()) | set(new_by_type.keys()))
+        ]
+    
+    def _significant_section_changes(self,
+                                     comparisons: List[Tuple[str, str, str]],
+                                     similarities: List[float]) -> List[str]:
+        """
+        Describe section changes, given the similarities of the sections present in both versions.
+        """
+        changes = []
+        scores = iter(similarities)
+        for section_type, old_combined, new_combined in comparisons:
+            similarity = next(scores) if old_combined and new_combined else None
+            changes.extend(self._compare_section_type(old_combined, new_combined, section_type, similarity))
         return changes
     
     def _group_sections_by_type(self, sections: List[DocumentSection]) -> Dict[str, List[str]]:
@@ -257,19 +343,21 @@ class ChangeAnalyzer:
             grouped[section.section_type].append(section.content)
         return grouped
     
-    def _compare_section_type(self, old_sections: List[str], new_sections: List[str], section_type: str) -> List[str]:
-        """Compare sections of the same type."""
+    def _compare_section_type(self,
+                              old_combined: str,
+                              new_combined: str,
+                              section_type: str,
+                              similarity: Optional[float] = None) -> List[str]:
+        """Compare the combined sections of one type; similarity is computed if not given."""
         changes = []
         
-        old_combined = '\n'.join(old_sections)
-        new_combined = '\n'.join(new_sections)
-        
         if not old_combined and new_combined:
             changes.append(f"New {section_type} section added: {new_combined[:100]}...")
         elif old_combined and not new_combined:
             changes.append(f"{section_type.title()} section removed: {old_combined[:100]}...")
         elif old_combined and new_combined:
-            similarity = self.calculate_semantic_similarity(old_combined, new_combined)
+            if similarity is None:
+                similarity = self.calculate_semantic_similarity(old_combined, new_combined)
             
             if similarity < self.similarity_threshold:
                 # Significant change detected
@@ -278,22 +366,41 @@ class ChangeAnalyzer:
         
         return changes
     
+    def prepare_batch(self, documents: List[Tuple[str, str]]) -> int:
+        """
+        Encode the texts of many document pairs in shared batches ahead of analysis.
+        
+        The embeddings land in the embedding cache, so the per-document
+        analyses that follow find them there instead of encoding separately.
+        
+        Args:
+            documents: (old_content, new_content) pairs
+            
+        Returns:
+            Number of distinct texts prepared
+        """
+        if not DEPENDENCIES_AVAILABLE or self.model is None or self.embedding_cache is None:
+            return 0
+        
+        texts = []
+        for old_content, new_content in documents:
+            texts += [old_content, new_content]
+            for _, old_combined, new_combined in self._section_comparisons(old_content, new_content):
+                if old_combined and new_combined:
+                    texts += [old_combined, new_combined]
+        texts = list(dict.fromkeys(texts))
+        self.encode(texts)
+        return len(texts)
+    
     def _analyze_specific_changes(self, old_text: str, new_text: str) -> str:
         """Analyze specific changes between two texts."""
-        # Use difflib to find specific differences
-        differ = difflib.unified_diff(
-            old_text.splitlines(keepends=True),
-            new_text.splitlines(keepends=True),
-            lineterm=''
-        )
-        
-        diff_lines = list(differ)
-        if len(diff_lines) <= 4:  # Only headers, no actual changes
+        diff = compute_diff(old_text, new_text)
+        if not diff.has_changes:
             return "Minor modifications detected"
         
         # Extract meaningful changes
-        additions = [line[1:] for line in diff_lines if line.startswith('+') and not line.startswith('+++')]
-        deletions = [line[1:] for line in diff_lines if line.startswith('-') and not line.startswith('---')]
+        additions = diff.added_lines
+        deletions = diff.removed_lines
         
         change_summary = []
         if additions:
@@ -380,14 +487,19 @@ class ChangeAnalyzer:
             indicators.append(f"Significant structural change: {old_lines} -> {new_lines} lines")
         
         # Check for URL/link changes
-        old_urls = set(re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', old_content))
-        new_urls = set(re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', new_content))
-        
-        if old_urls != new_urls:
+        if self._extract_urls(old_content) != self._extract_urls(new_content):
             indicators.append("URL/link changes detected")
         
         return indicators
     
+    def _extract_urls(self, content: str) -> Set[str]:
+        """Extract link targets and URLs written out in the text."""
+        # HTML pages come from the shared document cache, so the monitor's parse is reused
+        document = parse_document(content)
+        urls = {href for href in document.link_urls if URL_PATTERN.match(href)}
+        urls.update(URL_PATTERN.findall(document.text))
+        return urls
+    
     def _extract_important_keywords(self, content: str) -> Set[str]:
         """Extract important keywords from content."""
         content_lower = content.lower()
@@ -413,12 +525,15 @@ class ChangeAnalyzer:
         start_time = time.time()
         
         try:
-            # Calculate overall semantic similarity
-            similarity = self.calculate_semantic_similarity(old_content, new_content)
-            similarity_percentage = int(similarity * 100)
+            # Overall and per-section similarity, encoded in one batch
+            comparisons = self._section_comparisons(old_content, new_content)
+            similarities = self.calculate_semantic_similarities(
+                [(old_content, new_content)] + [(old, new) for _, old, new in comparisons if old and new]
+            )
+            similarity_percentage = int(similarities[0] * 100)
             
             # Detect significant changes
-            significant_differences = self.detect_significant_changes(old_content, new_content)
+            significant_differences = self._significant_section_changes(comparisons, similarities[1:])
             
             # Generate change indicators
             change_indicators = self.generate_change_indicators(old_content, new_content)
@@ -0,0 +1,211 @@
+"""
+Persistent Embedding Cache for Semantic Change Analysis
+
+Sentence embeddings are deterministic for a given model and text, and most
+sections of a form are unchanged between checks, so each text is encoded
+once and its vector kept on disk. Vectors are appended to a flat float32
+file per model and read back through a memory map; a SQLite index maps the
+SHA-256 of each text to its row. Recently used vectors are also kept in a
+small in-memory hot tier.
+
+Rows are written before they are indexed, so a reader never finds an index
+entry whose vector is incomplete, and row allocation runs inside an
+immediate transaction so several processes can share one cache.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ..utils.bounded_cache import BoundedCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_CACHE_PATH = "./data/embeddings"
+DEFAULT_HOT_CACHE_BYTES = 16 * 1024 * 1024
+_LOOKUP_BATCH = 500  # Keeps IN (...) below SQLite's variable limit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    text_hash TEXT PRIMARY KEY,
+    row INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of a text, used as its embedding key."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Float32 embeddings of one model on disk, keyed by text hash."""
+
+    def __init__(self, root: str, model_name: str, hot_cache_bytes: int = DEFAULT_HOT_CACHE_BYTES):
+        self.model_name = model_name
+        self.directory = Path(root) / re.sub(r'[^A-Za-z0-9._-]+', '_', model_name)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.directory / "vectors.f32"
+        self.vectors_path.touch(exist_ok=True)
+
+        self._conn = sqlite3.connect(
+            str(self.directory / "index.db"), timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+        self.dim: Optional[int] = row[0] if row else None
+
+        self._map: Optional[np.memmap] = None
+        self._hot = BoundedCache(max_bytes=hot_cache_bytes, sizer=lambda vector: vector.nbytes)
+        self.stats = {"hot_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def _rows(self) -> np.ndarray:
+        """Memory map of all complete rows, remapped when the file has grown."""
+        row_bytes = self.dim * 4
+        rows = os.path.getsize(self.vectors_path) // row_bytes
+        if self._map is None or self._map.shape[0] < rows:
+            self._map = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(rows, self.dim)) \
+                if rows else np.empty((0, self.dim), dtype=np.float32)
+        return self._map
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up embeddings by text hash.
+
+        Returns:
+            Vectors for the hashes that are cached; missing hashes are absent
+        """
+        found: Dict[str, np.ndarray] = {}
+        pending: List[str] = []
+        for key in dict.fromkeys(hashes):
+            vector = self._hot.get(key)
+            if vector is not None:
+                found[key] = vector
+            else:
+                pending.append(key)
+        hot_hits = len(found)
+
+        if pending and self.dim is None:
+            # Another process may have written the first vectors since we opened
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+            self.dim = row[0] if row else None
+
+        if pending and self.dim is not None:
+            with self._lock:
+                locations = []
+                for start in range(0, len(pending), _LOOKUP_BATCH):
+                    batch = pending[start:start + _LOOKUP_BATCH]
+                    locations += self._conn.execute(
+                        f"SELECT text_hash, row FROM embeddings WHERE text_hash IN ({','.join('?' * len(batch))})",
+                        batch
+                    ).fetchall()
+                if locations:
+                    rows = self._rows()
+                    for key, row in locations:
+                        if row < rows.shape[0]:
+                            vector = np.array(rows[row])  # Copy out of the map
+                            found[key] = vector
+                            self._hot.set(key, vector)
+
+        with self._lock:
+            self.stats["hot_hits"] += hot_hits
+            self.stats["disk_hits"] += len(found) - hot_hits
+            self.stats["misses"] += len(pending) - (len(found) - hot_hits)
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Store embeddings that are not cached yet."""
+        if not vectors:
+            return
+        items = {key: np.asarray(vector, dtype=np.float32).ravel() for key, vector in vectors.items()}
+        dim = len(next(iter(items.values())))
+
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                row = cursor.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+                if row is None:
+                    cursor.execute("INSERT INTO meta (key, value) VALUES ('dim', ?)", (dim,))
+                elif row[0] != dim:
+                    raise ValueError(f"Embedding size {dim} does not match cached size {row[0]} for {self.model_name}")
+                self.dim = dim
+
+                new_keys = [key for key in items if cursor.execute(
+                    "SELECT 1 FROM embeddings WHERE text_hash = ?", (key,)
+                ).fetchone() is None]
+                if new_keys:
+                    # The file length is the row counter; the write lock serializes appenders
+                    first_row = os.path.getsize(self.vectors_path) // (dim * 4)
+                    block = np.stack([items[key] for key in new_keys])
+                    with open(self.vectors_path, 'r+b') as f:
+                        f.seek(first_row * dim * 4)
+                        f.write(block.tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+                    cursor.executemany(
+                        "INSERT INTO embeddings (text_hash, row) VALUES (?, ?)",
+                        [(key, first_row + i) for i, key in enumerate(new_keys)]
+                    )
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+            self.stats["writes"] += len(new_keys)
+
+        for key, vector in items.items():
+            self._hot.set(key, vector)
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return {
+                "model_name": self.model_name,
+                "entries": entries,
+                "dim": self.dim,
+                "hot_tier": self._hot.get_stats(),
+                **self.stats
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+            self._map = None
+
+
+# One cache per model, shared by all analyzers in this process
+_global_caches: Dict[str, EmbeddingCache] = {}
+_global_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str) -> Optional[EmbeddingCache]:
+    """
+    Get the process-wide embedding cache for a model, opening it on first use.
+
+    The cache location comes from EMBEDDING_CACHE_PATH. Returns None if the
+    cache cannot be opened, in which case texts are always encoded.
+    """
+    with _global_lock:
+        if model_name not in _global_caches:
+            root = os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_EMBEDDING_CACHE_PATH)
+            try:
+                _global_caches[model_name] = EmbeddingCache(root, model_name)
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Could not open embedding cache at {root}, encoding without cache: {e}")
+                return None
+        return _global_caches[model_name]
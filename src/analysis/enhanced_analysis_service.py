@@ -15,14 +15,19 @@ from dataclasses import asdict
 import re
 from collections import defaultdict
 
-from .analysis_service import AnalysisService, AnalysisTimeoutError, AnalysisProcessingError
+from .analysis_service import (
+    AnalysisService, AnalysisTimeoutError, AnalysisProcessingError,
+    DEFAULT_CACHE_MAX_BYTES, DEFAULT_CACHE_TTL_SECONDS
+)
 from .models import (
     AnalysisRequest, AnalysisResponse, AnalysisError,
     BatchAnalysisRequest, BatchAnalysisResponse,
     ChangeClassification, SemanticAnalysis, LLMAnalysis
 )
+from .analysis_cascade import EARLY_EXIT_TIERS, CascadeThresholdConfig, CascadeThresholds, CascadeVerdict
 from .change_analyzer import ChangeAnalyzer
 from .llm_classifier import LLMClassifier
+from ..utils.diff_engine import LineDiff, compute_diff
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +50,11 @@ class EnhancedAnalysisService(AnalysisService):
                  default_confidence_threshold: int = 70,
                  max_processing_time_seconds: int = 180,
                  enable_caching: bool = True,
+                 cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 cache_ttl_seconds: Optional[float] = DEFAULT_CACHE_TTL_SECONDS,
                  false_positive_threshold: float = 0.15,
-                 semantic_similarity_threshold: float = 0.85):
+                 semantic_similarity_threshold: float = 0.85,
+                 analysis_thresholds: Optional[CascadeThresholdConfig] = None):
         """
         Initialize the EnhancedAnalysisService.
         
@@ -56,15 +64,21 @@ class EnhancedAnalysisService(AnalysisService):
             default_confidence_threshold: Default threshold for analysis confidence
             max_processing_time_seconds: Maximum time allowed for analysis
             enable_caching: Whether to enable result caching
+            cache_max_bytes: Memory budget for cached analysis results
+            cache_ttl_seconds: Age after which cached results are recomputed
             false_positive_threshold: Threshold for false positive detection
             semantic_similarity_threshold: Threshold for semantic similarity
+            analysis_thresholds: Per-agency cascade thresholds; loaded from agencies.yaml if None
         """
         super().__init__(
             semantic_model=semantic_model,
             llm_model=llm_model,
             default_confidence_threshold=default_confidence_threshold,
             max_processing_time_seconds=max_processing_time_seconds,
-            enable_caching=enable_caching
+            enable_caching=enable_caching,
+            cache_max_bytes=cache_max_bytes,
+            cache_ttl_seconds=cache_ttl_seconds,
+            analysis_thresholds=analysis_thresholds
         )
         
         self.false_positive_threshold = false_positive_threshold
@@ -125,13 +139,17 @@ class EnhancedAnalysisService(AnalysisService):
         self.analysis_history = defaultdict(list)
         self.false_positive_history = defaultdict(int)
         
-    def _detect_false_positives(self, old_content: str, new_content: str) -> Dict[str, Any]:
+    def _detect_false_positives(self,
+                                old_content: str,
+                                new_content: str,
+                                diff: Optional[LineDiff] = None) -> Dict[str, Any]:
         """
         Detect potential false positive changes.
         
         Args:
             old_content: Original content
             new_content: Updated content
+            diff: Line diff of the two versions, if already computed
             
         Returns:
             Dictionary with false positive detection results
@@ -178,7 +196,7 @@ class EnhancedAnalysisService(AnalysisService):
             reasons.append("Navigation/menu changes detected")
         
         # Check for very small content changes
-        content_change_ratio = self._calculate_content_change_ratio(old_content, new_content)
+        content_change_ratio = self._calculate_content_change_ratio(old_content, new_content, diff)
         if content_change_ratio < 0.05:  # Less than 5% change
             false_positive_score += 0.2
             detected_patterns.append("minimal_change")
@@ -192,6 +210,23 @@ class EnhancedAnalysisService(AnalysisService):
             "change_ratio": content_change_ratio
         }
     
+    def _check_rules(self,
+                     request: AnalysisRequest,
+                     thresholds: CascadeThresholds,
+                     details: Dict[str, Any],
+                     diff: LineDiff) -> Optional[CascadeVerdict]:
+        """Rules tier of the cascade: stop when false positive detection is confident enough."""
+        result = self._detect_false_positives(request.old_content, request.new_content, diff)
+        details["false_positive_score"] = result["confidence"]
+        details["false_positive_patterns"] = result["patterns"]
+        
+        min_score = thresholds.false_positive_score
+        if min_score is None:
+            min_score = self.false_positive_threshold
+        if result["confidence"] < min_score:
+            return None
+        return CascadeVerdict("rules", "false_positive", "; ".join(result["reasons"]) or "False positive detected", 95, 95)
+    
     def _normalize_content(self, content: str) -> str:
         """Normalize content for comparison by removing common false positive elements."""
         # Remove HTML tags and comments
@@ -269,24 +304,14 @@ class EnhancedAnalysisService(AnalysisService):
         
         return False
     
-    def _calculate_content_change_ratio(self, old_content: str, new_content: str) -> float:
-        """Calculate the ratio of content changes."""
-        import difflib
-        
-        old_lines = old_content.splitlines()
-        new_lines = new_content.splitlines()
-        
-        differ = difflib.unified_diff(old_lines, new_lines, lineterm='')
-        diff_lines = list(differ)
-        
-        # Count actual changes (excluding diff headers)
-        changes = [line for line in diff_lines if line.startswith('+') or line.startswith('-')]
-        total_lines = max(len(old_lines), len(new_lines))
-        
-        if total_lines == 0:
-            return 0.0
-        
-        return len(changes) / total_lines
+    def _calculate_content_change_ratio(self,
+                                        old_content: str,
+                                        new_content: str,
+                                        diff: Optional[LineDiff] = None) -> float:
+        """Calculate the ratio of changed lines to document length."""
+        if diff is None:
+            diff = compute_diff(old_content, new_content)
+        return diff.change_ratio
     
     def _detect_semantic_changes(self, old_content: str, new_content: str) -> Dict[str, Any]:
         """
@@ -708,8 +733,13 @@ class EnhancedAnalysisService(AnalysisService):
         logger.info(f"Starting enhanced analysis {analysis_id} for {request.form_name or 'unknown form'}")
         
         try:
-            # Step 1: False positive detection
-            false_positive_result = self._detect_false_positives(request.old_content, request.new_content)
+            # Step 1: Standard analysis; its cascade runs false positive detection
+            # as the rules tier and stops early when nothing meaningful changed
+            standard_result = await self.analyze_document_changes(request)
+            cascade = standard_result.processing_summary.get("cascade", {})
+            false_positive_detected = cascade.get("tier") in EARLY_EXIT_TIERS
+            # Content equal up to whitespace never reaches the rules tier
+            false_positive_score = cascade.get("false_positive_score", 1.0 if false_positive_detected else 0.0)
             
             # Step 2: Content relevance validation
             relevance_result = self._validate_content_relevance(
@@ -726,81 +756,51 @@ class EnhancedAnalysisService(AnalysisService):
                 request.new_content, request.form_name
             )
             
-            # Step 5: Semantic change detection
-            semantic_changes = self._detect_semantic_changes(request.old_content, request.new_content)
+            processing_time_ms = int((time.time() - start_time) * 1000)
             
-            # Step 4: If false positive detected, return early with minimal analysis
-            if false_positive_result["is_false_positive"]:
-                logger.info(f"False positive detected for {analysis_id}: {false_positive_result['reasons']}")
+            if false_positive_detected:
+                logger.info(f"False positive detected for {analysis_id} at the {cascade['tier']} tier")
                 
-                processing_time_ms = int((time.time() - start_time) * 1000)
+                enhanced_summary = {
+                    **standard_result.processing_summary,
+                    "processing_time_ms": processing_time_ms,
+                    "false_positive_detected": True,
+                    "false_positive_confidence": false_positive_score,
+                    "false_positive_patterns": cascade.get("false_positive_patterns", ["content_normalization"]),
+                    "content_relevance": relevance_result,
+                    "compliance_validation": compliance_validation,
+                    "structure_validation": structure_validation,
+                    "analysis_version": "2.0_enhanced"
+                }
+                enhanced_confidence = {
+                    "false_positive_score": int(false_positive_score * 100),
+                    "relevance_score": int(relevance_result["relevance_percentage"]),
+                    "overall": standard_result.confidence_breakdown.get("overall", 95)
+                }
+            else:
+                # Step 5: Semantic change detection
+                semantic_changes = self._detect_semantic_changes(request.old_content, request.new_content)
                 
-                return AnalysisResponse(
-                    analysis_id=analysis_id,
-                    timestamp=datetime.now(timezone.utc),
-                    has_meaningful_changes=False,
-                    classification=ChangeClassification(
-                        category="cosmetic_change",
-                        subcategory="false_positive",
-                        severity="low",
-                        priority_score=5,
-                        is_cosmetic=True,
-                        confidence=95
-                    ),
-                    semantic_analysis=SemanticAnalysis(
-                        similarity_score=95,
-                        significant_differences=[],
-                        change_indicators=["False positive detected"],
-                        model_name=self.change_analyzer.model_name,
-                        processing_time_ms=processing_time_ms
-                    ),
-                    llm_analysis=None,
-                    processing_summary={
-                        "processing_time_ms": processing_time_ms,
-                        "false_positive_detected": True,
-                        "false_positive_confidence": false_positive_result["confidence"],
-                        "false_positive_patterns": false_positive_result["patterns"],
-                        "content_relevance": relevance_result,
-                        "compliance_validation": compliance_validation,
-                        "structure_validation": structure_validation,
-                        "analysis_version": "2.0_enhanced"
-                    },
-                    confidence_breakdown={
-                        "false_positive_score": false_positive_result["confidence"],
-                        "relevance_score": relevance_result["relevance_percentage"],
-                        "overall": 95
-                    }
-                )
-            
-            # Step 5: Perform standard analysis if not a false positive
-            standard_result = await super().analyze_document_changes(request)
-            
-            # Step 6: Enhance the result with additional metadata
-            processing_time_ms = int((time.time() - start_time) * 1000)
-            
-            # Update processing summary
-            enhanced_summary = {
-                **standard_result.processing_summary,
-                "false_positive_detected": False,
-                "false_positive_confidence": false_positive_result["confidence"],
-                "semantic_changes": semantic_changes,
-                "content_relevance": relevance_result,
-                "compliance_validation": compliance_validation,
-                "structure_validation": structure_validation,
-                "analysis_version": "2.0_enhanced"
-            }
-            
-            # Update confidence breakdown
-            enhanced_confidence = {
-                **standard_result.confidence_breakdown,
-                "false_positive_score": false_positive_result["confidence"],
-                "relevance_score": relevance_result["relevance_percentage"],
-                "compliance_score": compliance_validation["overall_compliance_score"],
-                "structure_score": structure_validation["structure_integrity_score"],
-                "semantic_impact": self._calculate_semantic_impact_score(semantic_changes)
-            }
-            
-            # Create enhanced response
+                enhanced_summary = {
+                    **standard_result.processing_summary,
+                    "false_positive_detected": False,
+                    "false_positive_confidence": false_positive_score,
+                    "semantic_changes": semantic_changes,
+                    "content_relevance": relevance_result,
+                    "compliance_validation": compliance_validation,
+                    "structure_validation": structure_validation,
+                    "analysis_version": "2.0_enhanced"
+                }
+                enhanced_confidence = {
+                    **standard_result.confidence_breakdown,
+                    "false_positive_score": int(false_positive_score * 100),
+                    "relevance_score": int(relevance_result["relevance_percentage"]),
+                    "compliance_score": int(compliance_validation["overall_compliance_score"]),
+                    "structure_score": int(structure_validation["structure_integrity_score"]),
+                    "semantic_impact": self._calculate_semantic_impact_score(semantic_changes)
+                }
+            
+            # Step 6: Create enhanced response
             enhanced_response = AnalysisResponse(
                 analysis_id=analysis_id,
                 timestamp=standard_result.timestamp,
@@ -821,7 +821,9 @@ class EnhancedAnalysisService(AnalysisService):
         except Exception as e:
             error_msg = f"Enhanced analysis {analysis_id} failed: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            self.analysis_stats["failed_analyses"] += 1
+            # Failures inside the standard analysis are already counted
+            if not isinstance(e, (AnalysisProcessingError, AnalysisTimeoutError)):
+                self.analysis_stats["failed_analyses"] += 1
             raise AnalysisProcessingError(error_msg) from e
     
     def _calculate_semantic_impact_score(self, semantic_changes: Dict[str, Any]) -> int:
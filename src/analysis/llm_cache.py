@@ -0,0 +1,199 @@
+"""
+Persistent Cache for LLM Change Classifications
+
+States often republish the same federal update, and forms flip between known
+versions, so the same change reaches the LLM again and again. Classifications
+are stored in a local SQLite database keyed by a hash of the normalized
+changed lines, the form and agency, the model and the prompt template
+version. An identical change is answered from the cache instead of a new
+completion. Entries expire after a time-to-live, and bumping the prompt
+version retires every entry made with the old prompt.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import ChangeClassification, LLMAnalysis
+from ..utils.diff_engine import LineDiff, compute_diff
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LLM_CACHE_PATH = "./data/llm_cache.db"
+DEFAULT_LLM_CACHE_TTL_DAYS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_classifications (
+    cache_key TEXT PRIMARY KEY,
+    model_name TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    classification TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_llm_classifications_created ON llm_classifications (created_at);
+"""
+
+
+def normalized_change_lines(old_content: str,
+                            new_content: str,
+                            diff: Optional[LineDiff] = None) -> List[str]:
+    """
+    Removed and added lines of a change, ignoring whitespace and line positions.
+
+    Blank lines are dropped and blocks that only changed in whitespace are
+    skipped, so the same edit matches wherever it appears.
+    """
+    if diff is None:
+        diff = compute_diff(old_content, new_content)
+
+    def normalize(lines: List[str]) -> List[str]:
+        normalized = (re.sub(r'\s+', ' ', line).strip() for line in lines)
+        return [line for line in normalized if line]
+
+    change_lines = []
+    for removed, added in diff.changes():
+        removed, added = normalize(removed), normalize(added)
+        if removed != added:
+            change_lines += [f"-{line}" for line in removed] + [f"+{line}" for line in added]
+    return change_lines
+
+
+def classification_cache_key(change_lines: List[str],
+                             form_name: Optional[str],
+                             agency_name: Optional[str],
+                             model_name: str,
+                             prompt_version: str) -> str:
+    """Hash identifying one classification request."""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model_name, form_name or "", agency_name or ""):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    for line in change_lines:
+        digest.update(line.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class LLMClassificationCache:
+    """Classifications by change hash, shared between processes through SQLite."""
+
+    def __init__(self,
+                 path: str = DEFAULT_LLM_CACHE_PATH,
+                 ttl_seconds: Optional[float] = DEFAULT_LLM_CACHE_TTL_DAYS * 86400,
+                 busy_timeout: float = 5.0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "writes": 0}
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds is not None else float("-inf")
+
+    def get(self, key: str) -> Optional[Tuple[ChangeClassification, LLMAnalysis]]:
+        """Look up a classification; expired entries count as misses."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT classification, analysis, created_at FROM llm_classifications WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            if row[2] < self._cutoff():
+                self._conn.execute("DELETE FROM llm_classifications WHERE cache_key = ?", (key,))
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE llm_classifications SET hits = hits + 1 WHERE cache_key = ?", (key,))
+            self.stats["hits"] += 1
+
+        return ChangeClassification.model_validate_json(row[0]), LLMAnalysis.model_validate_json(row[1])
+
+    def put(self,
+            key: str,
+            classification: ChangeClassification,
+            analysis: LLMAnalysis,
+            prompt_version: str) -> None:
+        """Store a classification, replacing any older entry for the key."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_classifications "
+                "(cache_key, model_name, prompt_version, classification, analysis, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, analysis.model_used, prompt_version, classification.model_dump_json(),
+                 analysis.model_dump_json(), time.time())
+            )
+            self.stats["writes"] += 1
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired entries. Entries from older prompt versions can no
+        longer be hit and go once they expire.
+
+        Returns:
+            Number of entries deleted
+        """
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM llm_classifications WHERE created_at < ?", (self._cutoff(),)
+            ).rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_classifications").fetchone()[0]
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "entries": entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                **self.stats
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Global cache shared by every classifier in this process
+_global_cache: Optional[LLMClassificationCache] = None
+_global_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMClassificationCache]:
+    """
+    Get the process-wide LLM classification cache, opening it on first use.
+
+    The database path comes from LLM_CACHE_PATH (empty disables the cache)
+    and the time-to-live from LLM_CACHE_TTL_DAYS. Returns None if the cache
+    is disabled or cannot be opened, in which case every change is sent to
+    the LLM.
+    """
+    global _global_cache
+    path = os.getenv("LLM_CACHE_PATH", DEFAULT_LLM_CACHE_PATH)
+    if not path:
+        return None
+    with _global_lock:
+        if _global_cache is None:
+            ttl_days = float(os.getenv("LLM_CACHE_TTL_DAYS", DEFAULT_LLM_CACHE_TTL_DAYS))
+            try:
+                _global_cache = LLMClassificationCache(path, ttl_seconds=ttl_days * 86400 if ttl_days > 0 else None)
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Could not open LLM classification cache at {path}, classifying without cache: {e}")
+                return None
+        return _global_cache
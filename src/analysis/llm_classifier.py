@@ -5,10 +5,16 @@ This module provides sophisticated analysis of document changes using LLMs
 for categorization, severity scoring, and impact assessment with fallback logic.
 """
 
+import asyncio
 import json
 import time
 import logging
 import re
+import threading
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
 import os
@@ -21,9 +27,82 @@ except ImportError:
     OPENAI_AVAILABLE = False
 
 from .models import LLMAnalysis, ChangeClassification
+from .llm_cache import LLMClassificationCache, classification_cache_key, get_llm_cache, normalized_change_lines
+from .prompt_builder import DEFAULT_CONTEXT_LINES, DEFAULT_PROMPT_TOKEN_BUDGET, DiffExcerpt, build_diff_excerpt
+from ..utils.diff_engine import LineDiff, compute_diff
+from .llm_rate_limiter import LLMRateLimiter, estimate_tokens, get_llm_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the classification prompts change so cached answers to the old prompt are not reused
+PROMPT_VERSION = "2"
+
+DEFAULT_BATCH_WINDOW_SECONDS = 0.25
+DEFAULT_BATCH_MAX_ITEMS = 8
+DEFAULT_BATCH_TOKEN_BUDGET = 6000
+BATCH_MAX_OUTPUT_TOKENS = 4096
+
+_DIFF_LEGEND = ('unified diff: "-" removed, "+" added, two spaces unchanged context;\n'
+                'each "@@" line gives line numbers and the enclosing section heading')
+
+_RESPONSE_FIELDS = """1. "category": One of "form_update", "requirement_change", "logic_modification", or "cosmetic_change"
+2. "subcategory": More specific classification (e.g., "field_addition", "deadline_change", "calculation_update")
+3. "severity": One of "low", "medium", "high", or "critical"
+4. "priority_score": Integer from 0-100 indicating urgency
+5. "is_cosmetic": Boolean indicating if changes are purely formatting/cosmetic
+6. "confidence": Integer from 0-100 indicating your confidence in this analysis
+7. "reasoning": Detailed explanation of your analysis
+8. "key_changes": Array of 3-5 most important changes identified
+9. "impact_assessment": Description of potential impact on compliance/users
+10. "recommendations": Array of recommended actions"""
+
+_FOCUS = """Focus on:
+- Regulatory compliance implications
+- Impact on payroll reporting requirements
+- Changes affecting data collection or submission
+- Modifications to legal requirements or deadlines
+- Structural vs cosmetic changes"""
+
+# Set inside batched_llm_requests(); tasks started there inherit it
+_batch_window: ContextVar[Optional[float]] = ContextVar("llm_batch_window", default=None)
+
+
+@contextmanager
+def batched_llm_requests(window_seconds: float = DEFAULT_BATCH_WINDOW_SECONDS):
+    """
+    Let LLM classifications started inside the block share requests.
+
+    Each classification waits up to window_seconds for others to join its
+    request, so use this only where many changes are classified at once.
+    """
+    token = _batch_window.set(window_seconds)
+    try:
+        yield
+    finally:
+        _batch_window.reset(token)
+
+
+def _form_context(form_name: Optional[str], agency_name: Optional[str]) -> str:
+    return f"Form: {form_name}, Agency: {agency_name}" if form_name and agency_name else "Government form"
+
+
+@dataclass
+class _BatchItem:
+    """One change waiting in a batched request."""
+    item_id: str
+    excerpt: DiffExcerpt
+    form_name: Optional[str]
+    agency_name: Optional[str]
+    future: "asyncio.Future"
+
+
+@dataclass
+class _PendingBatch:
+    """Changes collected for the next batched request on one event loop."""
+    timer: asyncio.TimerHandle
+    items: List[_BatchItem] = field(default_factory=list)
+    tokens: int = 0
+
 
 class ChangeCategory(Enum):
     """Enumeration of change categories."""
@@ -56,7 +135,13 @@ class LLMClassifier:
                  model_name: str = "gpt-3.5-turbo",
                  api_key: Optional[str] = None,
                  temperature: float = 0.1,
-                 max_tokens: int = 1000):
+                 max_tokens: int = 1000,
+                 rate_limiter: Optional[LLMRateLimiter] = None,
+                 cache: Optional[LLMClassificationCache] = None,
+                 prompt_token_budget: Optional[int] = None,
+                 prompt_context_lines: int = DEFAULT_CONTEXT_LINES,
+                 batch_max_items: Optional[int] = None,
+                 batch_token_budget: Optional[int] = None):
         """
         Initialize the LLMClassifier.
         
@@ -65,17 +150,39 @@ class LLMClassifier:
             api_key: OpenAI API key (or from environment)
             temperature: Sampling temperature for responses
             max_tokens: Maximum tokens in response
+            rate_limiter: Limiter for API calls (defaults to the shared one)
+            cache: Store of earlier classifications (defaults to the shared one)
+            prompt_token_budget: Approximate tokens of diff sent per prompt (or from environment)
+            prompt_context_lines: Unchanged lines sent around each changed hunk
+            batch_max_items: Most changes packed into one batched request (or from environment)
+            batch_token_budget: Approximate diff tokens per batched request (or from environment)
         """
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.rate_limiter = rate_limiter or get_llm_rate_limiter()
+        self.cache = cache if cache is not None else get_llm_cache()
+        self.prompt_token_budget = prompt_token_budget or int(
+            os.getenv("LLM_PROMPT_TOKEN_BUDGET", DEFAULT_PROMPT_TOKEN_BUDGET)
+        )
+        self.prompt_context_lines = prompt_context_lines
+        self.batch_max_items = batch_max_items or int(os.getenv("LLM_BATCH_MAX_ITEMS", DEFAULT_BATCH_MAX_ITEMS))
+        self.batch_token_budget = batch_token_budget or int(
+            os.getenv("LLM_BATCH_TOKEN_BUDGET", DEFAULT_BATCH_TOKEN_BUDGET)
+        )
         
-        # Initialize OpenAI client
+        # Batches being collected, one per event loop, and batches in flight
+        self._pending_batches: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _PendingBatch]" = weakref.WeakKeyDictionary()
+        self._batch_tasks = set()
+        self._batch_lock = threading.RLock()
+        self.batch_stats = {"batched_requests": 0, "batched_items": 0, "unbatched_items": 0}
+        
+        # Initialize OpenAI client; the rate limiter handles retries
         self.client = None
         if openai:
             api_key = api_key or os.getenv("OPENAI_API_KEY")
             if api_key:
-                self.client = openai.OpenAI(api_key=api_key)
+                self.client = openai.AsyncOpenAI(api_key=api_key, max_retries=0)
             else:
                 logger.warning("No OpenAI API key provided. LLM analysis will use fallback methods.")
         else:
@@ -123,60 +230,231 @@ class LLMClassifier:
         }
     
     def _create_classification_prompt(self, 
-                                     old_content: str, 
-                                     new_content: str,
+                                     excerpt: DiffExcerpt,
                                      form_name: Optional[str] = None,
                                      agency_name: Optional[str] = None) -> str:
-        """Create a structured prompt for LLM classification."""
+        """Create a structured prompt for LLM classification from the changed hunks."""
         
-        context = f"Form: {form_name}, Agency: {agency_name}" if form_name and agency_name else "Government form"
+        context = _form_context(form_name, agency_name)
         
         prompt = f"""You are an expert in regulatory compliance and government forms analysis. 
 Analyze the changes between two versions of a {context} and provide a structured classification.
 
-ORIGINAL VERSION:
-{old_content[:2000]}
-
-NEW VERSION:
-{new_content[:2000]}
+CHANGES ({_DIFF_LEGEND}):
+{excerpt.text}
 
 Please analyze these changes and respond with a JSON object containing:
 
-1. "category": One of "form_update", "requirement_change", "logic_modification", or "cosmetic_change"
-2. "subcategory": More specific classification (e.g., "field_addition", "deadline_change", "calculation_update")
-3. "severity": One of "low", "medium", "high", or "critical"
-4. "priority_score": Integer from 0-100 indicating urgency
-5. "is_cosmetic": Boolean indicating if changes are purely formatting/cosmetic
-6. "confidence": Integer from 0-100 indicating your confidence in this analysis
-7. "reasoning": Detailed explanation of your analysis
-8. "key_changes": Array of 3-5 most important changes identified
-9. "impact_assessment": Description of potential impact on compliance/users
-10. "recommendations": Array of recommended actions
+{_RESPONSE_FIELDS}
 
-Focus on:
-- Regulatory compliance implications
-- Impact on payroll reporting requirements
-- Changes affecting data collection or submission
-- Modifications to legal requirements or deadlines
-- Structural vs cosmetic changes
+{_FOCUS}
 
 Respond only with valid JSON, no additional text."""
 
         return prompt
     
+    def _create_batch_prompt(self, items: List["_BatchItem"]) -> str:
+        """Create one prompt asking for a classification of each of several changes."""
+        changes = "\n\n".join(
+            f"=== CHANGE {item.item_id} ({_form_context(item.form_name, item.agency_name)}) ===\n{item.excerpt.text}"
+            for item in items
+        )
+        
+        return f"""You are an expert in regulatory compliance and government forms analysis. 
+Below are {len(items)} independent changes, each between two versions of a government form.
+Classify every change on its own; do not let one change influence another.
+
+Each change is a unified diff ({_DIFF_LEGEND}).
+
+{changes}
+
+Respond with a JSON object {{"results": [...]}} holding one object per change. Each object has
+"id" set to the change ID shown above (e.g. "{items[0].item_id}") and these fields:
+
+{_RESPONSE_FIELDS}
+
+{_FOCUS}
+
+Respond only with valid JSON, no additional text."""
+    
+    def _parse_result(self,
+                      result: Dict[str, Any],
+                      tokens_used: Optional[int],
+                      prompt_tokens: Optional[int]) -> Tuple[ChangeClassification, LLMAnalysis]:
+        """Build the classification and analysis from one JSON result."""
+        classification = ChangeClassification(
+            category=result.get("category", "form_update"),
+            subcategory=result.get("subcategory"),
+            severity=result.get("severity", "medium"),
+            priority_score=result.get("priority_score", 50),
+            is_cosmetic=result.get("is_cosmetic", False),
+            confidence=result.get("confidence", 70)
+        )
+        
+        llm_analysis = LLMAnalysis(
+            reasoning=result.get("reasoning", "LLM analysis completed"),
+            key_changes=result.get("key_changes", []),
+            impact_assessment=result.get("impact_assessment", "Impact assessment pending"),
+            recommendations=result.get("recommendations", []),
+            model_used=self.model_name,
+            tokens_used=tokens_used,
+            prompt_tokens=prompt_tokens
+        )
+        
+        return classification, llm_analysis
+    
+    async def _complete(self, prompt: str, max_tokens: int) -> Tuple[Dict[str, Any], Optional[int], int]:
+        """
+        Send a prompt and decode the JSON answer.
+        
+        Returns:
+            Tuple of (answer, total tokens used, prompt tokens)
+        """
+        messages = [
+            {"role": "system", "content": "You are an expert regulatory compliance analyst."},
+            {"role": "user", "content": prompt}
+        ]
+        response = await self.rate_limiter.call(
+            lambda: self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"}
+            ),
+            estimate_tokens(messages, max_tokens)
+        )
+        
+        result = json.loads(response.choices[0].message.content)
+        tokens_used = response.usage.total_tokens if response.usage else None
+        prompt_tokens = getattr(response.usage, "prompt_tokens", None)
+        return result, tokens_used, prompt_tokens if isinstance(prompt_tokens, int) else estimate_tokens(messages)
+    
+    async def _request_classification(self,
+                                      excerpt: DiffExcerpt,
+                                      form_name: Optional[str],
+                                      agency_name: Optional[str]) -> Tuple[ChangeClassification, LLMAnalysis]:
+        """Classify one change with its own request."""
+        prompt = self._create_classification_prompt(excerpt, form_name, agency_name)
+        result, tokens_used, prompt_tokens = await self._complete(prompt, self.max_tokens)
+        return self._parse_result(result, tokens_used, prompt_tokens)
+    
+    async def _request_batch(self, items: List["_BatchItem"]) -> Dict[str, Tuple[ChangeClassification, LLMAnalysis]]:
+        """
+        Classify several changes with one request.
+        
+        Returns:
+            Results by item ID; items the answer left out or got wrong are absent
+        """
+        prompt = self._create_batch_prompt(items)
+        max_tokens = min(self.max_tokens * len(items), BATCH_MAX_OUTPUT_TOKENS)
+        answer, tokens_used, prompt_tokens = await self._complete(prompt, max_tokens)
+        
+        # Usage is reported for the whole request; each item carries an equal share
+        tokens_share = tokens_used // len(items) if tokens_used is not None else None
+        prompt_share = prompt_tokens // len(items)
+        expected = {item.item_id for item in items}
+        results = {}
+        for result in answer.get("results", []) if isinstance(answer, dict) else []:
+            item_id = str(result.get("id", "")) if isinstance(result, dict) else ""
+            if item_id in expected and item_id not in results:
+                try:
+                    results[item_id] = self._parse_result(result, tokens_share, prompt_share)
+                except ValueError as e:
+                    logger.warning(f"Invalid batched classification for {item_id}: {e}")
+        return results
+    
+    def _enqueue_batched(self,
+                         excerpt: DiffExcerpt,
+                         form_name: Optional[str],
+                         agency_name: Optional[str],
+                         window_seconds: float) -> "asyncio.Future":
+        """Add a change to the batch being collected on this event loop."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        with self._batch_lock:
+            pending = self._pending_batches.get(loop)
+            if pending is not None and (
+                pending.tokens + excerpt.estimated_tokens > self.batch_token_budget
+            ):
+                self._flush_batch(loop)
+                pending = None
+            if pending is None:
+                pending = _PendingBatch(timer=loop.call_later(window_seconds, self._flush_batch, loop))
+                self._pending_batches[loop] = pending
+            
+            pending.items.append(_BatchItem(
+                f"c{len(pending.items) + 1}", excerpt, form_name, agency_name, future
+            ))
+            pending.tokens += excerpt.estimated_tokens
+            if len(pending.items) >= self.batch_max_items:
+                self._flush_batch(loop)
+        
+        return future
+    
+    def _flush_batch(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Send the batch collected on a loop."""
+        with self._batch_lock:
+            pending = self._pending_batches.pop(loop, None)
+        if pending is None:
+            return
+        pending.timer.cancel()
+        task = loop.create_task(self._send_batch(pending.items))
+        # Keep a reference until the batch completes
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+    
+    async def _send_batch(self, items: List["_BatchItem"]) -> None:
+        """Classify a batch and resolve each item's future; never raises."""
+        results = {}
+        if len(items) > 1:
+            try:
+                results = await self._request_batch(items)
+                self.batch_stats["batched_requests"] += 1
+                self.batch_stats["batched_items"] += len(results)
+            except Exception as e:
+                logger.warning(f"Batched LLM request for {len(items)} changes failed, sending them one by one: {e}")
+        
+        async def resolve_alone(item: _BatchItem) -> None:
+            try:
+                outcome = await self._request_classification(item.excerpt, item.form_name, item.agency_name)
+            except Exception as e:
+                if not item.future.done():
+                    item.future.set_exception(e)
+                return
+            if not item.future.done():
+                item.future.set_result(outcome)
+        
+        unresolved = []
+        for item in items:
+            if item.item_id in results:
+                if not item.future.done():
+                    item.future.set_result(results[item.item_id])
+            else:
+                unresolved.append(item)
+        if unresolved:
+            self.batch_stats["unbatched_items"] += len(unresolved)
+            await asyncio.gather(*[resolve_alone(item) for item in unresolved])
+    
     async def classify_with_llm(self, 
                                old_content: str, 
                                new_content: str,
                                form_name: Optional[str] = None,
-                               agency_name: Optional[str] = None) -> Tuple[ChangeClassification, LLMAnalysis]:
+                               agency_name: Optional[str] = None,
+                               diff: Optional[LineDiff] = None) -> Tuple[ChangeClassification, LLMAnalysis]:
         """
         Classify changes using LLM analysis.
         
+        Inside batched_llm_requests(), concurrent calls are packed into
+        shared requests.
+        
         Args:
             old_content: Original document content
             new_content: Updated document content
             form_name: Name of the form being analyzed
             agency_name: Name of the agency
+            diff: Line diff of the two versions, if already computed
             
         Returns:
             Tuple of (ChangeClassification, LLMAnalysis)
@@ -186,41 +464,45 @@ Respond only with valid JSON, no additional text."""
         
         start_time = time.time()
         
+        def elapsed_ms() -> int:
+            return int((time.time() - start_time) * 1000)
+        
+        if diff is None:
+            diff = await asyncio.to_thread(compute_diff, old_content, new_content)
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = classification_cache_key(
+                normalized_change_lines(old_content, new_content, diff),
+                form_name, agency_name, self.model_name, PROMPT_VERSION
+            )
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                classification, llm_analysis = cached
+                logger.info(f"Reusing cached LLM classification for {form_name or 'unknown form'}")
+                return classification, llm_analysis.model_copy(
+                    update={"tokens_used": 0, "prompt_tokens": 0, "latency_ms": elapsed_ms()}
+                )
+        
         try:
-            prompt = self._create_classification_prompt(old_content, new_content, form_name, agency_name)
-            
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You are an expert regulatory compliance analyst."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                response_format={"type": "json_object"}
+            excerpt = build_diff_excerpt(
+                old_content, new_content, self.prompt_context_lines, self.prompt_token_budget, diff
             )
             
-            result = json.loads(response.choices[0].message.content)
-            
-            # Create classification object
-            classification = ChangeClassification(
-                category=result.get("category", "form_update"),
-                subcategory=result.get("subcategory"),
-                severity=result.get("severity", "medium"),
-                priority_score=result.get("priority_score", 50),
-                is_cosmetic=result.get("is_cosmetic", False),
-                confidence=result.get("confidence", 70)
-            )
+            window_seconds = _batch_window.get()
+            if window_seconds is not None:
+                classification, llm_analysis = await self._enqueue_batched(
+                    excerpt, form_name, agency_name, window_seconds
+                )
+            else:
+                classification, llm_analysis = await self._request_classification(excerpt, form_name, agency_name)
+            llm_analysis = llm_analysis.model_copy(update={"latency_ms": elapsed_ms()})
             
-            # Create LLM analysis object
-            llm_analysis = LLMAnalysis(
-                reasoning=result.get("reasoning", "LLM analysis completed"),
-                key_changes=result.get("key_changes", []),
-                impact_assessment=result.get("impact_assessment", "Impact assessment pending"),
-                recommendations=result.get("recommendations", []),
-                model_used=self.model_name,
-                tokens_used=response.usage.total_tokens if response.usage else None
-            )
+            if cache_key is not None and self.validate_classification(classification):
+                try:
+                    await asyncio.to_thread(self.cache.put, cache_key, classification, llm_analysis, PROMPT_VERSION)
+                except Exception as e:
+                    logger.warning(f"Could not cache LLM classification: {e}")
             
             return classification, llm_analysis
             
@@ -228,7 +510,7 @@ Respond only with valid JSON, no additional text."""
             logger.error(f"Error in LLM classification: {e}")
             # Return fallback classification
             fallback_classification, fallback_analysis = self._fallback_classification(
-                old_content, new_content, form_name, agency_name
+                old_content, new_content, form_name, agency_name, diff
             )
             return fallback_classification, fallback_analysis
     
@@ -236,7 +518,8 @@ Respond only with valid JSON, no additional text."""
                                 old_content: str, 
                                 new_content: str,
                                 form_name: Optional[str] = None,
-                                agency_name: Optional[str] = None) -> Tuple[ChangeClassification, LLMAnalysis]:
+                                agency_name: Optional[str] = None,
+                                diff: Optional[LineDiff] = None) -> Tuple[ChangeClassification, LLMAnalysis]:
         """
         Fallback rule-based classification when LLM is unavailable.
         
@@ -245,6 +528,7 @@ Respond only with valid JSON, no additional text."""
             new_content: Updated document content
             form_name: Name of the form
             agency_name: Name of the agency
+            diff: Line diff of the two versions, if already computed
             
         Returns:
             Tuple of (ChangeClassification, LLMAnalysis)
@@ -305,7 +589,7 @@ Respond only with valid JSON, no additional text."""
         reasoning += f"Classification based on pattern matching and keyword analysis."
         
         # Detect key changes (simplified)
-        key_changes = self._detect_key_changes_fallback(old_content, new_content)
+        key_changes = self._detect_key_changes_fallback(old_content, new_content, diff)
         
         classification = ChangeClassification(
             category=primary_category.value,
@@ -327,28 +611,23 @@ Respond only with valid JSON, no additional text."""
         
         return classification, llm_analysis
     
-    def _detect_key_changes_fallback(self, old_content: str, new_content: str) -> List[str]:
-        """Detect key changes using simple diff analysis."""
-        import difflib
-        
-        old_lines = old_content.splitlines()
-        new_lines = new_content.splitlines()
-        
-        differ = difflib.unified_diff(old_lines, new_lines, lineterm='')
-        diff_lines = list(differ)
+    def _detect_key_changes_fallback(self,
+                                     old_content: str,
+                                     new_content: str,
+                                     diff: Optional[LineDiff] = None) -> List[str]:
+        """Detect key changes from the line diff."""
+        if diff is None:
+            diff = compute_diff(old_content, new_content)
         
         key_changes = []
         
         # Extract additions and deletions
-        for line in diff_lines:
-            if line.startswith('+') and not line.startswith('+++'):
-                change = f"Added: {line[1:].strip()}"
-                if len(change) > 20:  # Only significant additions
-                    key_changes.append(change[:100])
-            elif line.startswith('-') and not line.startswith('---'):
-                change = f"Removed: {line[1:].strip()}"
-                if len(change) > 20:  # Only significant deletions
-                    key_changes.append(change[:100])
+        for removed, added in diff.changes():
+            for prefix, lines in (("Removed", removed), ("Added", added)):
+                for line in lines:
+                    change = f"{prefix}: {line.strip()}"
+                    if len(change) > 20:  # Only significant changes
+                        key_changes.append(change[:100])
         
         return key_changes[:5]  # Return top 5 changes
     
@@ -386,7 +665,8 @@ Respond only with valid JSON, no additional text."""
                       new_content: str,
                       form_name: Optional[str] = None,
                       agency_name: Optional[str] = None,
-                      use_llm: bool = True) -> Tuple[ChangeClassification, Optional[LLMAnalysis]]:
+                      use_llm: bool = True,
+                      diff: Optional[LineDiff] = None) -> Tuple[ChangeClassification, Optional[LLMAnalysis]]:
         """
         Main classification method with fallback logic.
         
@@ -396,17 +676,20 @@ Respond only with valid JSON, no additional text."""
             form_name: Name of the form
             agency_name: Name of the agency
             use_llm: Whether to attempt LLM analysis
+            diff: Line diff of the two versions, if already computed
             
         Returns:
             Tuple of (ChangeClassification, Optional[LLMAnalysis])
         """
         llm_analysis = None
+        if diff is None:
+            diff = await asyncio.to_thread(compute_diff, old_content, new_content)
         
         # Try LLM analysis first if available and requested
         if use_llm and self.client:
             try:
                 classification, llm_analysis = await self.classify_with_llm(
-                    old_content, new_content, form_name, agency_name
+                    old_content, new_content, form_name, agency_name, diff
                 )
                 
                 # Validate LLM results
@@ -421,7 +704,7 @@ Respond only with valid JSON, no additional text."""
         
         # Use fallback classification
         classification, fallback_analysis = self._fallback_classification(
-            old_content, new_content, form_name, agency_name
+            old_content, new_content, form_name, agency_name, diff
         )
         
         # If we had an LLM analysis but it failed validation, keep it for reference
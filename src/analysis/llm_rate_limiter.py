@@ -0,0 +1,245 @@
+"""
+Rate Limiting for LLM API Calls
+
+OpenAI enforces per-key limits on both requests and tokens per minute, and a
+batch analysis can otherwise start as many classifications at once as it has
+documents. The limiter caps concurrent requests, meters requests and
+estimated tokens through token buckets refilled at the configured per-minute
+rates, and retries rate-limited and transient failures. A 429 response pauses
+every caller until its Retry-After has passed, so a burst does not keep
+hitting the limit.
+
+One limiter is shared by all classifiers in a process because the limits
+belong to the API key, not to a classifier.
+"""
+
+import asyncio
+import email.utils
+import inspect
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+from ..monitors.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 90000
+DEFAULT_MAX_RETRIES = 5
+
+# Rough size of an English token, used wherever a tokenizer is not worth loading
+CHARS_PER_TOKEN = 4
+
+# Responses worth retrying: rate limited, overloaded or briefly unavailable
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int = 0) -> int:
+    """
+    Estimate the tokens a chat request counts against the per-minute limit.
+
+    OpenAI reserves the prompt plus max_tokens when admitting a request; the
+    prompt is approximated at CHARS_PER_TOKEN characters per token.
+    """
+    prompt_chars = sum(len(message.get("content", "")) for message in messages)
+    return prompt_chars // CHARS_PER_TOKEN + len(messages) * 4 + max_tokens
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the server in a Retry-After(-Ms) header, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an API error is a rate limit or transient failure."""
+    if getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES:
+        return True
+    return openai is not None and isinstance(error, openai.APIConnectionError)
+
+
+class LLMRateLimiter:
+    """Concurrency cap, request and token budgets, and retries for LLM calls."""
+
+    def __init__(self,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 requests_per_minute: Optional[int] = DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: Optional[int] = DEFAULT_TOKENS_PER_MINUTE,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_backoff_seconds: float = 1.0,
+                 max_backoff_seconds: float = 60.0):
+        """
+        Args:
+            max_concurrency: Requests allowed in flight at once
+            requests_per_minute: Request budget; None or 0 disables it
+            tokens_per_minute: Token budget; None or 0 disables it
+            max_retries: Retries after a rate-limited or transient failure
+            base_backoff_seconds: First backoff when the server gives no Retry-After
+            max_backoff_seconds: Longest backoff between retries
+        """
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.request_bucket = TokenBucket.per_minute(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket.per_minute(tokens_per_minute) if tokens_per_minute else None
+
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        # Event loops cannot share an asyncio.Semaphore, so each gets its own
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0, "in_flight": 0, "tokens_used": 0}
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = asyncio.Semaphore(self.max_concurrency)
+                self._slots[loop] = slots
+            return slots
+
+    def _count(self, **changes: int) -> None:
+        with self._lock:
+            for key, change in changes.items():
+                self.stats[key] += change
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all callers for the given time."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def _wait_for_budget(self, estimated_tokens: int) -> None:
+        while True:
+            with self._lock:
+                paused = self._paused_until - time.monotonic()
+            if paused <= 0:
+                break
+            await asyncio.sleep(paused)
+        if self.request_bucket is not None:
+            await self.request_bucket.acquire(1)
+        if self.token_bucket is not None:
+            await self.token_bucket.acquire(estimated_tokens)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = retry_after_seconds(error)
+        if delay is None:
+            delay = self.base_backoff_seconds * 2 ** attempt
+            delay += random.uniform(0, delay / 2)
+        return min(delay, self.max_backoff_seconds)
+
+    async def call(self, request: Callable[[], Any], estimated_tokens: int = 0) -> Any:
+        """
+        Send an API request within the limits, retrying on rate limits.
+
+        Args:
+            request: Starts the request; may return an awaitable (async client) or the response
+            estimated_tokens: Tokens the request will count against the per-minute budget
+
+        Returns:
+            The API response
+        """
+        async with self._get_slots():
+            self._count(in_flight=1)
+            try:
+                attempt = 0
+                while True:
+                    await self._wait_for_budget(estimated_tokens)
+                    self._count(requests=1)
+                    try:
+                        response = request()
+                        if inspect.isawaitable(response):
+                            response = await response
+                        break
+                    except Exception as e:
+                        if self.token_bucket is not None:
+                            # A failed request may not have consumed its reservation
+                            self.token_bucket.adjust(estimated_tokens)
+                        if not is_retryable(e) or attempt >= self.max_retries:
+                            self._count(failures=1)
+                            raise
+                        delay = self._backoff(attempt, e)
+                        if getattr(e, "status_code", None) == 429:
+                            self._count(rate_limited=1)
+                            self.pause(delay)
+                        self._count(retries=1)
+                        logger.warning(f"LLM request failed ({e}), retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                        attempt += 1
+            finally:
+                self._count(in_flight=-1)
+
+        used = getattr(getattr(response, "usage", None), "total_tokens", None)
+        if isinstance(used, int):
+            self._count(tokens_used=used)
+            if self.token_bucket is not None:
+                self.token_bucket.adjust(estimated_tokens - used)
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["paused_seconds"] = max(0.0, round(self._paused_until - time.monotonic(), 2))
+        stats["max_concurrency"] = self.max_concurrency
+        if self.token_bucket is not None:
+            stats["tokens_available"] = int(self.token_bucket.available)
+        if self.request_bucket is not None:
+            stats["requests_available"] = int(self.request_bucket.available)
+        return stats
+
+
+_global_limiter: Optional[LLMRateLimiter] = None
+_global_lock = threading.Lock()
+
+
+def get_llm_rate_limiter() -> LLMRateLimiter:
+    """
+    Get the process-wide LLM rate limiter.
+
+    Limits come from LLM_MAX_CONCURRENCY, LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE and LLM_MAX_RETRIES.
+    """
+    global _global_limiter
+    with _global_lock:
+        if _global_limiter is None:
+            _global_limiter = LLMRateLimiter(
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+                requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE)),
+                tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE)),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+            )
+        return _global_limiter
@@ -0,0 +1,120 @@
+"""
+Stub OpenAI Server for Offline LLM Throughput Tests
+
+Serves /v1/chat/completions with a fixed classification (one per change for
+batched prompts) after a configurable delay, and enforces its own
+requests-per-minute and tokens-per-minute limits by answering 429 with
+Retry-After headers the way the real API does. A fraction of requests can
+also be rejected at random. Pointing OPENAI_BASE_URL at the stub exercises
+the rate limiter, retry and batching paths without an API key
+(see scripts/llm_stub_server.py).
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from .llm_rate_limiter import estimate_tokens
+from ..monitors.rate_limiter import TokenBucket
+
+STUB_CLASSIFICATION = {
+    "category": "form_update",
+    "subcategory": "stub_response",
+    "severity": "medium",
+    "priority_score": 50,
+    "is_cosmetic": False,
+    "confidence": 80,
+    "reasoning": "Stub classification from the local test server",
+    "key_changes": ["Stub change"],
+    "impact_assessment": "None (stub)",
+    "recommendations": ["No action (stub)"]
+}
+
+
+@dataclass
+class StubSettings:
+    """Behavior of the stub server."""
+    latency_seconds: float = 0.5
+    latency_jitter_seconds: float = 0.2
+    requests_per_minute: Optional[int] = 60
+    tokens_per_minute: Optional[int] = 40000
+    rate_limit_probability: float = 0.0
+    completion_tokens: int = 150
+
+
+def create_stub_app(settings: Optional[StubSettings] = None) -> FastAPI:
+    """Create the stub app; request and rejection counts are kept in app.state.stats."""
+    settings = settings or StubSettings()
+    request_bucket = TokenBucket.per_minute(settings.requests_per_minute) if settings.requests_per_minute else None
+    token_bucket = TokenBucket.per_minute(settings.tokens_per_minute) if settings.tokens_per_minute else None
+
+    app = FastAPI(title="LLM stub")
+    app.state.stats = {"requests": 0, "completed": 0, "rate_limited": 0}
+
+    def rate_limited(wait: float, kind: str) -> JSONResponse:
+        app.state.stats["rate_limited"] += 1
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": str(max(1, math.ceil(wait))), "retry-after-ms": str(int(wait * 1000))},
+            content={"error": {"message": f"Rate limit reached for {kind}", "type": "requests", "code": "rate_limit_exceeded"}}
+        )
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> Any:
+        body = await request.json()
+        app.state.stats["requests"] += 1
+        tokens = estimate_tokens(body.get("messages", []), body.get("max_tokens") or 0)
+
+        if random.random() < settings.rate_limit_probability:
+            return rate_limited(1.0, "requests")
+        if request_bucket is not None:
+            wait = request_bucket.try_acquire(1)
+            if wait > 0:
+                return rate_limited(wait, "requests per min")
+        if token_bucket is not None:
+            wait = token_bucket.try_acquire(tokens)
+            if wait > 0:
+                return rate_limited(wait, "tokens per min")
+
+        await asyncio.sleep(max(0.0, settings.latency_seconds + random.uniform(
+            -settings.latency_jitter_seconds, settings.latency_jitter_seconds
+        )))
+        app.state.stats["completed"] += 1
+
+        prompt_tokens = tokens - (body.get("max_tokens") or 0)
+        # Batched prompts list their changes as "=== CHANGE <id> (...) ==="
+        prompt = "".join(message.get("content", "") for message in body.get("messages", []))
+        change_ids = re.findall(r"^=== CHANGE (\S+) \(", prompt, re.MULTILINE)
+        answer = {"results": [{"id": change_id, **STUB_CLASSIFICATION} for change_id in change_ids]} \
+            if change_ids else STUB_CLASSIFICATION
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(answer)},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": settings.completion_tokens,
+                "total_tokens": prompt_tokens + settings.completion_tokens
+            }
+        }
+
+    @app.get("/stats")
+    async def stats() -> Dict[str, int]:
+        return app.state.stats
+
+    return app
@@ -17,6 +17,8 @@ class AnalysisRequest(BaseModel):
     agency_name: Optional[str] = Field(None, description="Name of the agency")
     confidence_threshold: int = Field(default=70, ge=0, le=100, description="Minimum confidence threshold for AI analysis")
     use_llm_fallback: bool = Field(default=True, description="Whether to use LLM analysis for low-confidence cases")
+    old_content_hash: Optional[str] = Field(None, description="SHA256 of old_content if already known")
+    new_content_hash: Optional[str] = Field(None, description="SHA256 of new_content if already known")
     
     @field_validator('confidence_threshold')
     @classmethod
@@ -62,6 +64,8 @@ class LLMAnalysis(BaseModel):
     recommendations: List[str] = Field(default_factory=list, description="Recommended actions")
     model_used: str = Field(..., description="LLM model used for analysis")
     tokens_used: Optional[int] = Field(None, description="Number of tokens consumed")
+    prompt_tokens: Optional[int] = Field(None, description="Tokens in the prompt sent to the model")
+    latency_ms: Optional[int] = Field(None, description="Time spent obtaining the classification")
 
 
 class AnalysisResponse(BaseModel):
@@ -0,0 +1,171 @@
+"""
+Diff Excerpts for LLM Classification Prompts
+
+Sending both versions of a document makes prompt size, latency and cost grow
+with the document rather than with the change, and long forms were cut off
+before their changes were reached. The excerpt holds only the changed hunks,
+a few unchanged lines around each one, and the nearest section heading so
+the model knows where a change sits. Hunks are added in document order until
+a token budget is spent. A hunk that does not fit is cut short, and anything
+left over is summarized in one line instead of being dropped silently. A
+line too long for its share of the budget is cut around the point where it
+changed, and the first changed line is always shown.
+"""
+
+import bisect
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .llm_rate_limiter import CHARS_PER_TOKEN
+from ..utils.diff_engine import LineDiff, compute_diff
+
+DEFAULT_CONTEXT_LINES = 3
+DEFAULT_PROMPT_TOKEN_BUDGET = 1500
+# No single line may take more than this share of the budget
+MAX_LINE_BUDGET_SHARE = 0.25
+# Smallest piece of a line worth sending
+MIN_LINE_TOKENS = 8
+
+# Numbered headings, "Section 4"/"Part II" style headings, and short all-caps lines
+_HEADER_PATTERNS = [
+    re.compile(r'^\d+(\.\d+)*\.?\s+\S'),
+    re.compile(r'^(section|part|chapter|article|schedule)\s+[\w.-]+', re.IGNORECASE),
+    re.compile(r'^[A-Z][A-Z0-9 ,&/()\'-]{2,80}:?$'),
+]
+
+
+def _tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _cut(text: str, tokens: int, focus: int = 0) -> str:
+    """Cut text to about the given number of tokens, keeping the part around focus."""
+    width = max((tokens - 1) * CHARS_PER_TOKEN - 2, 1)
+    if len(text) <= width:
+        return text
+    start = max(0, min(focus - width // 4, len(text) - width))
+    return ("…" if start else "") + text[start:start + width] + ("…" if start + width < len(text) else "")
+
+
+def is_section_header(line: str) -> bool:
+    """Whether a line looks like a section heading."""
+    line = line.strip()
+    return 0 < len(line) <= 100 and any(pattern.match(line) for pattern in _HEADER_PATTERNS)
+
+
+@dataclass
+class DiffExcerpt:
+    """Changed hunks of a document pair, rendered for a prompt."""
+    text: str
+    hunks_total: int
+    hunks_included: int
+    lines_omitted: int
+    estimated_tokens: int
+    lines_cut: int = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.hunks_included < self.hunks_total or self.lines_omitted > 0 or self.lines_cut > 0
+
+
+def build_diff_excerpt(old_content: str,
+                       new_content: str,
+                       context_lines: int = DEFAULT_CONTEXT_LINES,
+                       token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET,
+                       diff: Optional[LineDiff] = None) -> DiffExcerpt:
+    """
+    Render the changes between two documents as a budgeted unified diff.
+
+    Args:
+        old_content: Original document content
+        new_content: Updated document content
+        context_lines: Unchanged lines shown around each hunk
+        token_budget: Approximate token limit for the rendered excerpt
+        diff: Line diff of the two versions, if already computed
+
+    Returns:
+        DiffExcerpt with the text and what was left out
+    """
+    if diff is None:
+        diff = compute_diff(old_content, new_content)
+    old_lines, new_lines = diff.old_lines, diff.new_lines
+    hunks = diff.grouped_opcodes(context_lines)
+    if not hunks:
+        return DiffExcerpt("(no line-level differences)", 0, 0, 0, 0)
+
+    header_positions = [i for i, line in enumerate(new_lines) if is_section_header(line)]
+
+    def section_of(new_index: int) -> Optional[str]:
+        # Last heading at or before the hunk in the new version
+        found = bisect.bisect_right(header_positions, new_index) - 1
+        return new_lines[header_positions[found]].strip() if found >= 0 else None
+
+    line_budget = max(int(token_budget * MAX_LINE_BUDGET_SHARE), MIN_LINE_TOKENS)
+    parts: List[str] = []
+    used = 0
+    included = 0
+    lines_omitted = 0
+    lines_cut = 0
+    changes_shown = False
+    for hunk in hunks:
+        first, last = hunk[0], hunk[-1]
+        section = section_of(first[3])
+        heading = (f"@@ -{first[1] + 1},{last[2] - first[1]} +{first[3] + 1},{last[4] - first[3]} @@"
+                   + (f" {section}" if section else ""))
+        # (prefix, line, offset of the first changed character)
+        body = []
+        for tag, i1, i2, j1, j2 in hunk:
+            if tag == 'equal':
+                body += [("  ", line, 0) for line in old_lines[i1:i2]]
+                continue
+            focus = [0] * max(i2 - i1, j2 - j1)
+            if tag == 'replace':
+                for k, (old_line, new_line) in enumerate(zip(old_lines[i1:i2], new_lines[j1:j2])):
+                    focus[k] = len(os.path.commonprefix([old_line, new_line]))
+            if tag in ('replace', 'delete'):
+                body += [("- ", line, focus[k]) for k, line in enumerate(old_lines[i1:i2])]
+            if tag in ('replace', 'insert'):
+                body += [("+ ", line, focus[k]) for k, line in enumerate(new_lines[j1:j2])]
+
+        remaining = token_budget - used - _tokens(heading)
+        if remaining <= 0 and changes_shown:
+            break
+        kept = []
+        stop = len(body)
+        for index, (prefix, line, focus) in enumerate(body):
+            text = _cut(line, line_budget, focus)
+            if _tokens(prefix + text) > remaining:
+                if changes_shown:
+                    stop = index
+                    break
+                if prefix == "  ":
+                    # Context before the first change gives way to it
+                    continue
+                # The first change is always shown, cut to what is left of the budget
+                text = _cut(line, max(remaining, MIN_LINE_TOKENS), focus)
+            if text != line:
+                lines_cut += 1
+            kept.append(prefix + text)
+            remaining -= _tokens(prefix + text)
+            changes_shown = changes_shown or prefix != "  "
+        if not kept:
+            break
+
+        parts.append(heading)
+        parts += kept
+        if stop < len(body):
+            omitted = sum(1 for prefix, _, _ in body[stop:] if prefix != "  ")
+            lines_omitted += omitted
+            parts.append(f"[... {omitted} more changed lines in this section omitted]")
+        used = token_budget - remaining
+        included += 1
+        if stop < len(body):
+            break
+
+    if included < len(hunks):
+        parts.append(f"[... {len(hunks) - included} more changed sections omitted to fit the prompt budget]")
+
+    text = "\n".join(parts)
+    return DiffExcerpt(text, len(hunks), included, lines_omitted, _tokens(text), lines_cut)
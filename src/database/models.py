@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 
@@ -47,6 +47,14 @@ class Form(Base):
     last_checked = Column(DateTime, nullable=True)
     last_modified = Column(DateTime, nullable=True)
     
+    # HTTP validators from the last full response, used for conditional fetching
+    http_etag = Column(String(255), nullable=True)  # ETag header value
+    http_last_modified = Column(String(100), nullable=True)  # Raw Last-Modified header value
+    http_content_length = Column(Integer, nullable=True)  # Body size in bytes
+    
+    # Content-addressed snapshot of the last fetched content (see monitors/snapshot_store.py)
+    snapshot_hash = Column(String(64), nullable=True)
+    
     # Relationships
     agency = relationship("Agency", back_populates="forms")
     changes = relationship("FormChange", back_populates="form", cascade="all, delete-orphan")
@@ -101,12 +109,47 @@ class MonitoringRun(Base):
     response_time_ms = Column(Integer, nullable=True)
     http_status_code = Column(Integer, nullable=True)
     content_hash = Column(String(64), nullable=True)
+    content_fingerprint = Column(String(64), nullable=True)  # SHA256 of normalized main-content text
+    pdf_metadata = Column(JSON, nullable=True)  # PDF fingerprint and per-page text hashes
     
     # Relationships
     agency = relationship("Agency", back_populates="monitoring_runs")
     form = relationship("Form", back_populates="monitoring_runs")
 
 
+class FormVersion(Base):
+    """Model for one stored version of a form's content, kept as chunk lists and deltas."""
+    __tablename__ = "form_versions"
+    __table_args__ = (UniqueConstraint("form_id", "version", name="uq_form_version"),)
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    form_id = Column(Integer, ForeignKey("forms.id"), nullable=False, index=True)
+    version = Column(Integer, nullable=False)  # 1, 2, ... per form
+    content_hash = Column(String(64), nullable=False)  # SHA256 of the full content
+    captured_at = Column(DateTime, default=func.now())
+    is_keyframe = Column(Boolean, default=False)  # Full chunk list instead of a delta
+    base_version = Column(Integer, nullable=True)  # Version the delta applies to
+    chain_depth = Column(Integer, default=0)  # Deltas since the last keyframe
+    manifest = Column(JSON, nullable=False)  # Chunk hashes (keyframe) or delta operations
+    content_size = Column(Integer, nullable=True)  # Characters in the full content
+    
+    # Relationships
+    form = relationship("Form")
+
+
+class RenderModeDecision(Base):
+    """Model for remembering whether a URL needs a JavaScript-rendering browser."""
+    __tablename__ = "render_mode_decisions"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String(500), nullable=False, unique=True, index=True)
+    mode = Column(String(20), nullable=False, default="static")  # static, javascript
+    reason = Column(String(255), nullable=True)  # Signal and evidence behind the decision
+    static_text_length = Column(Integer, nullable=True)  # Visible text chars without rendering
+    rendered_text_length = Column(Integer, nullable=True)  # Visible text chars after rendering
+    decided_at = Column(DateTime, default=func.now())
+
+
 class Notification(Base):
     """Model for tracking notifications sent."""
     __tablename__ = "notifications"
@@ -220,7 +263,7 @@ class User(Base):
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # Relationships
-    user_roles = relationship("UserRole", back_populates="user", cascade="all, delete-orphan")
+    user_roles = relationship("UserRole", back_populates="user", foreign_keys="UserRole.user_id", cascade="all, delete-orphan")
     dashboard_preferences = relationship("UserDashboardPreference", back_populates="user", cascade="all, delete-orphan")
     notification_preferences = relationship("UserNotificationPreference", back_populates="user", cascade="all, delete-orphan")
 
@@ -19,13 +19,23 @@ from ..database.models import Agency, Form, FormChange, MonitoringRun
 from ..analysis import AnalysisService, AnalysisRequest
 from ..analysis.enhanced_analysis_service import EnhancedAnalysisService
 from ..analysis.change_classifier import get_change_classifier
+from ..analysis.llm_classifier import batched_llm_requests
 from ..utils.enhanced_config_manager import EnhancedConfigManager, get_enhanced_config_manager
+from ..utils.bounded_cache import BoundedCache
 from .web_scraper import WebScraper
+from .rate_limiter import create_host_rate_limiter
+from .fetch_client import SharedFetchClient, get_fetch_client
+from .content_fingerprint import create_content_fingerprinter
+from .snapshot_store import SnapshotStore, get_snapshot_store, snapshot_hash
+from .version_history import VersionHistory, get_version_history
+from .pdf_extractor import find_changed_pages, select_pages
 from .error_handler import get_error_handler, create_retry_config
 from .monitoring_statistics import get_monitoring_statistics, record_monitoring_event
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CONTENT_CACHE_MB = 128
+
 
 class AIEnhancedMonitor:
     """
@@ -43,7 +53,10 @@ class AIEnhancedMonitor:
                  confidence_threshold: int = 70,
                  enable_llm_analysis: bool = True,
                  batch_size: int = 5,
-                 config_path: Optional[str] = None):
+                 config_path: Optional[str] = None,
+                 fetch_client: Optional[SharedFetchClient] = None,
+                 snapshot_store: Optional[SnapshotStore] = None,
+                 version_history: Optional[VersionHistory] = None):
         """
         Initialize the AI-enhanced monitoring service.
         
@@ -52,10 +65,14 @@ class AIEnhancedMonitor:
             enable_llm_analysis: Whether to use LLM for detailed analysis
             batch_size: Number of forms to process in parallel
             config_path: Path to configuration file for comprehensive coverage
+            fetch_client: HTTP client for scrapers (defaults to the shared pool)
+            snapshot_store: On-disk store for previous form content (defaults to the shared store)
+            version_history: Delta-compressed history of every form version (defaults to the shared one)
         """
         self.confidence_threshold = confidence_threshold
         self.enable_llm_analysis = enable_llm_analysis
         self.batch_size = batch_size
+        self.fetch_client = fetch_client
         
         # Initialize enhanced configuration manager
         try:
@@ -93,8 +110,19 @@ class AIEnhancedMonitor:
             logger.error(f"Failed to initialize change classifier: {e}")
             self.change_classifier = None
         
-        # Content cache for storing previous versions
-        self.content_cache = {}
+        # Per-host politeness limits shared by every scraper this monitor creates
+        self.rate_limiter = create_host_rate_limiter(getattr(self.config_manager, 'config', None))
+        
+        # Content cache for storing previous versions, backed by the on-disk snapshot store;
+        # evicted entries are read back from the store
+        config = getattr(self.config_manager, 'config', None)
+        monitoring_settings = (config.get('monitoring_settings') if isinstance(config, dict) else None) or {}
+        self.content_cache = BoundedCache(
+            max_bytes=int(monitoring_settings.get('content_cache_max_mb', DEFAULT_CONTENT_CACHE_MB)) * 1024 * 1024
+        )
+        self.snapshot_store = snapshot_store or get_snapshot_store()
+        self.version_history = version_history or get_version_history(monitoring_settings)
+        self.fingerprinter = create_content_fingerprinter(getattr(self.config_manager, 'config', None))
         
         # Initialize enhanced error handling
         retry_config = create_retry_config(
@@ -167,7 +195,7 @@ class AIEnhancedMonitor:
             db.commit()
             
             try:
-                async with WebScraper() as scraper:
+                async with WebScraper(rate_limiter=self.rate_limiter, fetch_client=self.fetch_client) as scraper:
                     # Process forms in batches for optimal performance
                     active_forms = [f for f in agency.forms if f.is_active]
                     
@@ -178,7 +206,9 @@ class AIEnhancedMonitor:
                         batch = active_forms[i:i + self.batch_size]
                         batch_start_time = datetime.now(timezone.utc)
                         
-                        batch_results = await self._process_form_batch(batch, scraper, db)
+                        # Changes found in the same batch share LLM requests
+                        with batched_llm_requests():
+                            batch_results = await self._process_form_batch(batch, scraper, db)
                         
                         # Record batch performance metric
                         batch_processing_time = int((datetime.now(timezone.utc) - batch_start_time).total_seconds() * 1000)
@@ -332,22 +362,80 @@ class AIEnhancedMonitor:
         }
         
         try:
-            # Fetch current content
-            content, status_code, _ = await scraper.fetch_page_content(
-                form.form_url or form.agency.base_url
+            # Get previous content from last successful monitoring run
+            previous_content = await self._get_previous_content(form.id, db)
+            
+            # Hashes and fingerprints of the baseline are kept on the form's runs, so they survive restarts
+            last_run = self._get_last_run(form.id, db) if previous_content else None
+            previous_hash = last_run.content_hash if last_run else None
+            previous_pdf = last_run.pdf_metadata if last_run else None
+            previous_fingerprint = last_run.content_fingerprint if last_run else None
+            
+            # Conditional fetch is only safe when there is a baseline and a hash to carry forward
+            validators = scraper.get_form_validators(form) if previous_hash else None
+            
+            # Fetch current content; identical bytes come back undecoded
+            content, status_code, metadata = await scraper.fetch_page_content(
+                form.form_url or form.agency.base_url,
+                validators=validators,
+                known_hash=previous_hash,
+                known_pdf=previous_pdf
             )
             
+            if status_code == 304 or metadata.get("unchanged"):
+                # Not modified since last check - skip decoding and AI analysis
+                logger.debug(f"{form.name} not modified since last check")
+                if status_code != 304:
+                    scraper.update_form_validators(form, metadata)
+                form.last_checked = datetime.now(timezone.utc)
+                form_run = MonitoringRun(
+                    agency_id=form.agency_id,
+                    form_id=form.id,
+                    status="completed",
+                    completed_at=datetime.now(timezone.utc),
+                    content_hash=previous_hash,
+                    content_fingerprint=previous_fingerprint,
+                    http_status_code=status_code,
+                    pdf_metadata=previous_pdf
+                )
+                db.add(form_run)
+                db.commit()
+                return result
+            
             if status_code != 200:
                 result["errors"].append(f"Failed to fetch content: HTTP {status_code}")
                 return result
             
-            # Get previous content from last successful monitoring run
-            previous_content = await self._get_previous_content(form.id, db)
+            scraper.update_form_validators(form, metadata)
             
-            if previous_content:
+            pdf_metadata = metadata.get("pdf")
+            old_text, new_text = previous_content, content
+            if previous_content and pdf_metadata and isinstance(previous_pdf, dict) and previous_pdf.get("page_hashes") is not None:
+                # Only pages whose text changed go to the semantic pipeline
+                changed_pages = find_changed_pages(previous_pdf["page_hashes"], pdf_metadata["page_hashes"])
+                result["changed_pages"] = changed_pages
+                old_text = select_pages(previous_content, changed_pages)
+                new_text = select_pages(content, changed_pages)
+            
+            # PDFs are compared page by page instead
+            content_fingerprint = None
+            if not pdf_metadata:
+                content_fingerprint = self.fingerprinter.fingerprint_for_agency(content, form.agency.name)
+            
+            if previous_content and result.get("changed_pages") == []:
+                logger.debug(f"PDF text unchanged in {form.name} - skipping AI analysis")
+            elif content_fingerprint and content_fingerprint == previous_fingerprint:
+                logger.debug(f"Only dynamic content changed in {form.name} - skipping AI analysis")
+            elif previous_content:
+                # Whole documents are identified by their snapshot hashes, so the
+                # analysis cache need not hash them again
+                content_hashes = {}
+                if old_text is previous_content and isinstance(form.snapshot_hash, str):
+                    content_hashes = {"old_hash": form.snapshot_hash, "new_hash": snapshot_hash(content)}
+                
                 # Perform AI analysis to detect meaningful changes
                 ai_result = await self._perform_ai_analysis(
-                    previous_content, content, form
+                    old_text, new_text, form, **content_hashes
                 )
                 
                 if ai_result and ai_result.has_meaningful_changes:
@@ -356,7 +444,7 @@ class AIEnhancedMonitor:
                     
                     # Create detailed change record with AI metadata
                     change_record = await self._create_ai_enhanced_change_record(
-                        form, previous_content, content, ai_result, db
+                        form, old_text, new_text, ai_result, db
                     )
                     result["change_records"].append(change_record)
                     
@@ -370,7 +458,10 @@ class AIEnhancedMonitor:
             
             # Update form's last checked time and store current content
             form.last_checked = datetime.now(timezone.utc)
-            await self._store_current_content(form.id, content)
+            previous_snapshot = form.snapshot_hash
+            form.snapshot_hash = await self._store_current_content(form.id, content)
+            version_recorded = await self._record_version(form, content, db)
+            content_hash = metadata.get("content_hash") or scraper.calculate_content_hash(content)
             
             # Create monitoring run record for this form
             form_run = MonitoringRun(
@@ -378,12 +469,18 @@ class AIEnhancedMonitor:
                 form_id=form.id,
                 status="completed",
                 completed_at=datetime.now(timezone.utc),
-                content_hash=scraper.calculate_content_hash(content),
-                http_status_code=status_code
+                content_hash=content_hash,
+                content_fingerprint=content_fingerprint,
+                http_status_code=status_code,
+                pdf_metadata=pdf_metadata
             )
             db.add(form_run)
             db.commit()
             
+            # The form no longer points at the previous snapshot once committed
+            if version_recorded:
+                await self._release_snapshot(form, previous_snapshot, db)
+            
         except Exception as e:
             error_msg = f"Error analyzing form {form.name}: {str(e)}"
             result["errors"].append(error_msg)
@@ -391,6 +488,13 @@ class AIEnhancedMonitor:
         
         return result
     
+    def _get_last_run(self, form_id: int, db) -> Optional[MonitoringRun]:
+        """Get the form's most recent monitoring run that recorded its content."""
+        return db.query(MonitoringRun).filter(
+            MonitoringRun.form_id == form_id,
+            MonitoringRun.content_hash.isnot(None)
+        ).order_by(MonitoringRun.started_at.desc()).first()
+    
     async def _get_previous_content(self, form_id: int, db) -> Optional[str]:
         """
         Retrieve previous content for a form from cache or database.
@@ -407,28 +511,98 @@ class AIEnhancedMonitor:
         if cache_key in self.content_cache:
             return self.content_cache[cache_key]
         
-        # TODO: In production, retrieve from proper content storage
-        # For now, we'll return None to indicate no previous content
-        return None
+        # Fall back to the snapshot recorded for the form, e.g. after a restart
+        content = None
+        row = db.query(Form.snapshot_hash).filter(Form.id == form_id).first()
+        if row and row[0]:
+            content = await asyncio.to_thread(self.snapshot_store.get, row[0])
+            if content is None:
+                logger.warning(f"Snapshot {row[0][:12]} for form {form_id} is missing from the snapshot store")
+        
+        # Then to the latest version in the form's history
+        if content is None:
+            content = await self._rebuild_latest_version(form_id, db)
+            if content is None:
+                return None
+        
+        self.content_cache[cache_key] = content
+        return content
+    
+    async def _rebuild_latest_version(self, form_id: int, db) -> Optional[str]:
+        """Rebuild the latest recorded version of a form, or None if there is none."""
+        try:
+            latest = self.version_history.latest_version(db, form_id)
+            if latest is None:
+                return None
+            chunk_hashes = self.version_history.get_manifest(db, latest)
+            content = await asyncio.to_thread(self.version_history.assemble, chunk_hashes)
+        except Exception as e:
+            logger.warning(f"Could not rebuild the latest version of form {form_id}: {e}")
+            return None
+        
+        logger.info(f"Rebuilt previous content of form {form_id} from version {latest.version}")
+        return content
     
-    async def _store_current_content(self, form_id: int, content: str) -> None:
+    async def _store_current_content(self, form_id: int, content: str) -> str:
         """
         Store current content for future comparison.
         
         Args:
             form_id: ID of the form
             content: Content to store
+            
+        Returns:
+            Snapshot hash to record on the form
         """
         # Store in cache
         cache_key = f"form_content_{form_id}"
         self.content_cache[cache_key] = content
         
-        # TODO: In production, store in persistent storage (S3, database BLOB, etc.)
+        # Persist so the baseline survives restarts; identical content is stored once
+        return await asyncio.to_thread(self.snapshot_store.put, content)
+    
+    async def _record_version(self, form: Form, content: str, db) -> bool:
+        """
+        Add the content to the form's version history.
+        
+        History problems are logged and never fail the monitoring run.
+        
+        Returns:
+            Whether the content is kept in the history; the caller commits
+        """
+        try:
+            chunk_hashes = await asyncio.to_thread(self.version_history.store_chunks, content)
+            self.version_history.record_version(db, form.id, content, chunk_hashes)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not record version history for {form.name}: {e}")
+            return False
+    
+    async def _release_snapshot(self, form: Form, previous_snapshot: Optional[str], db) -> None:
+        """
+        Delete the form's previous snapshot once the new one is committed.
+        
+        The previous content is kept in the version history, so its full
+        snapshot is no longer needed unless another form still points at it.
+        """
+        if not isinstance(previous_snapshot, str) or previous_snapshot == form.snapshot_hash:
+            return
+        try:
+            shared = db.query(Form.id).filter(
+                Form.snapshot_hash == previous_snapshot,
+                Form.id != form.id
+            ).first()
+            if not shared:
+                await asyncio.to_thread(self.snapshot_store.delete, previous_snapshot)
+        except Exception as e:
+            logger.warning(f"Could not delete previous snapshot of {form.name}: {e}")
     
     async def _perform_ai_analysis(self, 
                                   old_content: str, 
                                   new_content: str, 
-                                  form: Form) -> Optional[Any]:
+                                  form: Form,
+                                  old_hash: Optional[str] = None,
+                                  new_hash: Optional[str] = None) -> Optional[Any]:
         """
         Perform enhanced AI analysis on content changes with false positive reduction.
         
@@ -436,6 +610,8 @@ class AIEnhancedMonitor:
             old_content: Previous content
             new_content: Current content
             form: Form object
+            old_hash: SHA256 of old_content if already known
+            new_hash: SHA256 of new_content if already known
             
         Returns:
             Enhanced AI analysis result or None if analysis fails
@@ -451,7 +627,9 @@ class AIEnhancedMonitor:
                 form_name=form.name,
                 agency_name=form.agency.name,
                 confidence_threshold=self.confidence_threshold,
-                use_llm_fallback=self.enable_llm_analysis
+                use_llm_fallback=self.enable_llm_analysis,
+                old_content_hash=old_hash,
+                new_content_hash=new_hash
             )
             
             # Perform analysis with timing
@@ -637,6 +815,10 @@ class AIEnhancedMonitor:
                 "analysis_id": ai_result.analysis_id,
                 "model_used": ai_result.processing_summary.get("semantic_model", "unknown"),
                 "processing_time_ms": ai_result.processing_summary.get("processing_time_ms", 0),
+                "llm_tokens_used": ai_result.processing_summary.get("llm_tokens_used"),
+                "llm_prompt_tokens": ai_result.processing_summary.get("llm_prompt_tokens"),
+                "llm_latency_ms": ai_result.processing_summary.get("llm_latency_ms"),
+                "cascade_tier": ai_result.processing_summary.get("cascade", {}).get("tier"),
                 "confidence_breakdown": ai_result.confidence_breakdown,
                 "classification_method": classification_result.get("classification_method", "ai_only") if classification_result else "ai_only",
                 "enhanced_classification": classification_result is not None
@@ -683,6 +865,9 @@ class AIEnhancedMonitor:
             "enhanced_analysis_available": hasattr(self.analysis_service, 'analyze_document_changes_enhanced') if self.analysis_service else False,
             "change_classifier_available": self.change_classifier is not None,
             "cache_size": len(self.content_cache),
+            "content_cache": self.content_cache.get_stats(),
+            "snapshot_store": self.snapshot_store.get_stats(),
+            "version_history": self.version_history.get_stats(),
             "configuration": {
                 "confidence_threshold": self.confidence_threshold,
                 "llm_analysis_enabled": self.enable_llm_analysis,
@@ -725,6 +910,12 @@ class AIEnhancedMonitor:
         except Exception as e:
             health["error_handling"] = {"status": "error", "error": str(e)}
         
+        # Shared connection pool metrics
+        try:
+            health["connection_pool"] = get_fetch_client().get_pool_metrics()
+        except Exception as e:
+            health["connection_pool"] = {"status": "error", "error": str(e)}
+        
         # Monitoring statistics summary
         try:
             stats_summary = await self.monitoring_stats.get_comprehensive_statistics()
@@ -800,7 +991,7 @@ class AIEnhancedMonitor:
             # Process batches with enhanced error handling
             total_processing_time = 0
             
-            async with WebScraper() as scraper:
+            async with WebScraper(rate_limiter=self.rate_limiter, fetch_client=self.fetch_client) as scraper:
                 for batch in batches:
                     batch_start = datetime.now(timezone.utc)
                     
@@ -930,74 +1121,72 @@ class AIEnhancedMonitor:
         
         forms = batch.get("forms", [])
         
-        # Process forms in parallel (limited by batch size)
-        semaphore = asyncio.Semaphore(self.batch_size)
-        
+        # All forms in the batch run at once; the scraper's host rate limiter
+        # decides how many requests each host sees concurrently
         async def process_form(form_data):
-            async with semaphore:
-                try:
-                    # Extract agency and form information
-                    agency_key = form_data.get("agency_key")
-                    agency_type = form_data.get("agency_type")
-                    form_name = form_data.get("name")
+            try:
+                # Extract agency and form information
+                agency_key = form_data.get("agency_key")
+                agency_type = form_data.get("agency_type")
+                form_name = form_data.get("name")
+                
+                # Find corresponding agency in database
+                with get_db() as db:
+                    agency = db.query(Agency).filter(
+                        Agency.name.ilike(f"%{agency_key}%")
+                    ).first()
                     
-                    # Find corresponding agency in database
-                    with get_db() as db:
-                        agency = db.query(Agency).filter(
-                            Agency.name.ilike(f"%{agency_key}%")
-                        ).first()
-                        
-                        if not agency:
-                            logger.warning(f"Agency not found in database: {agency_key}")
-                            return {
-                                "agency_key": agency_key,
-                                "form_name": form_name,
-                                "status": "failed",
-                                "error": "Agency not found in database"
-                            }
-                        
-                        # Find form
-                        form = db.query(Form).filter(
-                            Form.agency_id == agency.id,
-                            Form.name == form_name
-                        ).first()
-                        
-                        if not form:
-                            logger.warning(f"Form not found: {form_name} for agency {agency_key}")
-                            return {
-                                "agency_key": agency_key,
-                                "form_name": form_name,
-                                "status": "failed",
-                                "error": "Form not found in database"
-                            }
-                        
-                        # Monitor the form
-                        form_result = await self._analyze_form_changes(form, scraper, db)
-                        
-                        batch_results["forms_processed"] += 1
-                        if form_result.get("changes_detected", 0) > 0:
-                            batch_results["changes_detected"] += form_result["changes_detected"]
-                        if form_result.get("ai_analysis_performed"):
-                            batch_results["ai_analyses_performed"] += 1
-                        
+                    if not agency:
+                        logger.warning(f"Agency not found in database: {agency_key}")
                         return {
                             "agency_key": agency_key,
-                            "agency_type": agency_type,
                             "form_name": form_name,
-                            "status": "success",
-                            "result": form_result
+                            "status": "failed",
+                            "error": "Agency not found in database"
                         }
-                        
-                except Exception as e:
-                    logger.error(f"Error processing form {form_data.get('name', 'unknown')}: {e}")
-                    batch_results["forms_failed"] += 1
+                    
+                    # Find form
+                    form = db.query(Form).filter(
+                        Form.agency_id == agency.id,
+                        Form.name == form_name
+                    ).first()
+                    
+                    if not form:
+                        logger.warning(f"Form not found: {form_name} for agency {agency_key}")
+                        return {
+                            "agency_key": agency_key,
+                            "form_name": form_name,
+                            "status": "failed",
+                            "error": "Form not found in database"
+                        }
+                    
+                    # Monitor the form
+                    form_result = await self._analyze_form_changes(form, scraper, db)
+                    
+                    batch_results["forms_processed"] += 1
+                    if form_result.get("changes_detected", 0) > 0:
+                        batch_results["changes_detected"] += form_result["changes_detected"]
+                    if form_result.get("ai_analysis_performed"):
+                        batch_results["ai_analyses_performed"] += 1
+                    
                     return {
-                        "agency_key": form_data.get("agency_key", "unknown"),
-                        "form_name": form_data.get("name", "unknown"),
-                        "status": "failed",
-                        "error": str(e)
+                        "agency_key": agency_key,
+                        "agency_type": agency_type,
+                        "form_name": form_name,
+                        "status": "success",
+                        "result": form_result
                     }
-        
+                    
+            except Exception as e:
+                logger.error(f"Error processing form {form_data.get('name', 'unknown')}: {e}")
+                batch_results["forms_failed"] += 1
+                return {
+                    "agency_key": form_data.get("agency_key", "unknown"),
+                    "form_name": form_data.get("name", "unknown"),
+                    "status": "failed",
+                    "error": str(e)
+                }
+    
         # Process all forms in the batch
         tasks = [process_form(form) for form in forms]
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,196 @@
+"""
+End-to-End Monitoring Benchmark
+
+Runs AgencyMonitor or AIEnhancedMonitor against a recorded fetch archive
+(see fetch_recorder) and reports throughput, per-form latency percentiles
+and peak memory, so scheduler and scraper changes can be compared before
+they are deployed.
+
+The benchmark writes to the same state a real monitor does: monitoring runs
+go to whatever database get_db() is bound to, and AIEnhancedMonitor also
+writes snapshots and version history (SNAPSHOT_STORE_PATH), host error
+state and circuit breakers (ERROR_STATE_DB) and LLM classifications
+(LLM_CACHE_PATH). Point all of these at throwaway locations before the
+monitor is created, or replayed responses will trip real circuit breakers
+and overwrite real baselines; scripts/benchmark_monitoring.py uses an
+in-memory database and a scratch directory for the rest.
+"""
+
+import logging
+import math
+import resource
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict, field
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+from ..database.connection import get_db
+from ..database.models import Agency
+from .fetch_recorder import FetchArchive, ReplayFetchClient, RecordingFetchClient
+from .render_mode import RenderModeSelector
+from .web_scraper import AgencyMonitor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BenchmarkResult:
+    """Metrics for one pass over all forms."""
+    monitor: str
+    iteration: int
+    forms: int
+    duration_seconds: float
+    forms_per_second: float
+    p50_latency_ms: float
+    p95_latency_ms: float
+    peak_python_memory_mb: float  # tracemalloc peak during the pass
+    max_rss_mb: float  # Process high-water mark so far
+    replay_stats: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _ReplayRenderModeSelector(RenderModeSelector):
+    """Replays only cover HTTP fetches, so never probe pages with Chrome."""
+
+    def needs_probe(self, decision) -> bool:
+        return False
+
+    def should_render(self, decision) -> bool:
+        return False
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100.0 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _timed(func: Callable, latencies: List[float]) -> Callable:
+    """Wrap a per-form coroutine so each call's wall time is recorded."""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            latencies.append((time.perf_counter() - start) * 1000)
+    return wrapper
+
+
+def create_monitor(monitor_type: str, fetch_client):
+    """Create the monitor under test wired to the given fetch client."""
+    if monitor_type == "agency":
+        monitor = AgencyMonitor(fetch_client=fetch_client)
+        monitor.render_selector = _ReplayRenderModeSelector(monitor.render_selector.config)
+        return monitor, "_monitor_form"
+
+    if monitor_type == "ai":
+        from .ai_enhanced_monitor import AIEnhancedMonitor
+        monitor = AIEnhancedMonitor(fetch_client=fetch_client)
+        return monitor, "_analyze_form_changes"
+
+    raise ValueError(f"Unknown monitor type: {monitor_type}")
+
+
+async def _run_pass(monitor_type: str, monitor) -> None:
+    if monitor_type == "agency":
+        await monitor.monitor_all_agencies()
+        return
+
+    with get_db() as db:
+        agency_ids = [agency_id for (agency_id,) in db.query(Agency.id).filter(Agency.is_active == True).all()]
+    for agency_id in agency_ids:
+        await monitor.monitor_agency_with_ai(agency_id)
+
+
+async def run_benchmark(archive_path: str, monitor_type: str = "agency", iterations: int = 2,
+                        latency_scale: float = 1.0) -> List[BenchmarkResult]:
+    """
+    Benchmark a monitor against a recorded archive.
+
+    The first iteration establishes baselines; later iterations measure the
+    steady state where most pages are unchanged.
+
+    Args:
+        archive_path: Directory written by record_fetches
+        monitor_type: 'agency' for AgencyMonitor, 'ai' for AIEnhancedMonitor
+        iterations: Number of passes over all forms
+        latency_scale: Multiplier applied to recorded latencies (0 disables waits)
+
+    Returns:
+        One BenchmarkResult per iteration
+    """
+    archive = FetchArchive(archive_path)
+    if not len(archive):
+        raise ValueError(f"No recorded responses found in {archive_path}")
+
+    fetch_client = ReplayFetchClient(archive, latency_scale)
+    monitor, form_method = create_monitor(monitor_type, fetch_client)
+    latencies: List[float] = []
+    setattr(monitor, form_method, _timed(getattr(monitor, form_method), latencies))
+
+    results = []
+    for iteration in range(1, iterations + 1):
+        latencies.clear()
+        before = dict(fetch_client.session.stats)
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            await _run_pass(monitor_type, monitor)
+            duration = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        result = BenchmarkResult(
+            monitor=monitor_type,
+            iteration=iteration,
+            forms=len(latencies),
+            duration_seconds=round(duration, 3),
+            forms_per_second=round(len(latencies) / duration, 2) if duration > 0 else 0.0,
+            p50_latency_ms=round(percentile(latencies, 50), 1),
+            p95_latency_ms=round(percentile(latencies, 95), 1),
+            peak_python_memory_mb=round(peak / (1024 * 1024), 2),
+            max_rss_mb=round(_max_rss_mb(), 1),
+            replay_stats={key: value - before.get(key, 0) for key, value in fetch_client.session.stats.items()}
+        )
+        logger.info(f"Benchmark pass {iteration}: {result.forms} forms, "
+                    f"{result.forms_per_second} forms/s, p95 {result.p95_latency_ms} ms")
+        results.append(result)
+
+    return results
+
+
+async def record_fetches(archive_path: str, monitor_type: str = "agency") -> FetchArchive:
+    """
+    Run one monitoring pass against the live sites and record every response.
+
+    Args:
+        archive_path: Directory to write the archive to
+        monitor_type: Monitor whose fetches should be recorded
+
+    Returns:
+        The written archive
+    """
+    archive = FetchArchive(archive_path)
+    fetch_client = RecordingFetchClient(archive)
+    monitor, _ = create_monitor(monitor_type, fetch_client)
+    try:
+        await _run_pass(monitor_type, monitor)
+    finally:
+        await fetch_client.close()
+    logger.info(f"Recorded {len(archive)} responses to {archive_path}")
+    return archive
@@ -0,0 +1,108 @@
+"""
+Normalized Content Fingerprints for Government Website Monitoring
+
+The raw content hash changes whenever a page embeds a rotating CSRF token,
+session ID, timestamp or analytics snippet, even though nothing a reader
+cares about has changed. The fingerprint is a hash over the page's main
+content text only: scripts, styles, navigation and other page chrome are
+removed, known dynamic values are masked, and an agency can narrow the
+content further with a CSS selector (content_selector in agencies.yaml).
+
+Change records and AI analysis are only triggered when the fingerprint
+changes; the raw hash is still used to skip decoding identical bytes.
+"""
+
+import hashlib
+import logging
+import re
+from typing import Any, Dict, Optional
+
+from ..utils.config_loader import get_content_selectors, load_agency_config
+from ..utils.html_document import parse_document, text_without
+
+logger = logging.getLogger(__name__)
+
+# Elements that never carry form content
+STRIPPED_TAGS = frozenset({'script', 'style', 'noscript', 'template', 'iframe', 'svg', 'nav', 'header', 'footer', 'aside'})
+
+# Values that change between requests without the page changing
+DYNAMIC_PATTERNS = [
+    # Session identifiers in rewritten URLs or visible text
+    re.compile(r'\b(?:jsessionid|phpsessid|aspsessionid\w*|sid|session_?id)=[\w.-]+', re.IGNORECASE),
+    # Long hex or base64-like tokens (CSRF tokens, nonces, cache busters)
+    re.compile(r'\b[0-9a-f]{24,}\b', re.IGNORECASE),
+    re.compile(r'\b[A-Za-z0-9+/_-]{32,}={0,2}'),
+    # Clock times and ISO timestamps
+    re.compile(r'\b\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?\b'),
+    re.compile(r'\b\d{1,2}:\d{2}(?::\d{2})?\s*(?:[AP]\.?M\.?)?(?:\s*[A-Z]{2,4})?\b', re.IGNORECASE),
+    # Visit counters and render timings
+    re.compile(r'\b(?:page (?:generated|rendered|loaded) in|visitors?:?|hits:?)\s*[\d.,]+\s*\w*', re.IGNORECASE),
+]
+
+
+class ContentFingerprinter:
+    """Computes change-detection fingerprints over normalized main-content text."""
+
+    def __init__(self, selectors: Optional[Dict[str, str]] = None):
+        self.selectors = selectors or {}  # agency name -> CSS selector for the main content
+
+    def get_selector(self, agency_name: Optional[str]) -> Optional[str]:
+        return self.selectors.get(agency_name) if agency_name else None
+
+    def normalize(self, html: str, selector: Optional[str] = None) -> str:
+        """
+        Reduce a page to the text that matters for change detection.
+
+        Works on the shared parsed document, so a page that is also compared
+        or scanned for links is parsed only once.
+
+        Args:
+            html: Page content
+            selector: CSS selector for the main content; the whole page is used
+                if it is missing or matches nothing
+
+        Returns:
+            Whitespace-collapsed text with dynamic values masked
+        """
+        document = parse_document(html)
+        if document.root is None:
+            return ''
+
+        roots = [document.root]
+        if selector:
+            try:
+                roots = document.select(selector) or roots
+            except ValueError as e:
+                logger.warning(f"Invalid content selector {selector!r}: {e}")
+
+        text = ' '.join(text_without(root, STRIPPED_TAGS) for root in roots)
+        for pattern in DYNAMIC_PATTERNS:
+            text = pattern.sub('#', text)
+        return text
+
+    def fingerprint(self, html: str, selector: Optional[str] = None) -> str:
+        """Calculate the SHA256 fingerprint of the normalized content."""
+        return hashlib.sha256(self.normalize(html, selector).encode('utf-8')).hexdigest()
+
+    def fingerprint_for_agency(self, html: str, agency_name: Optional[str]) -> str:
+        """Calculate the fingerprint using the agency's configured content selector."""
+        return self.fingerprint(html, self.get_selector(agency_name))
+
+
+def create_content_fingerprinter(config: Optional[Dict[str, Any]] = None) -> ContentFingerprinter:
+    """
+    Create a fingerprinter with per-agency content selectors.
+
+    Args:
+        config: Agency configuration dictionary. Loaded from agencies.yaml if None.
+
+    Returns:
+        Configured ContentFingerprinter
+    """
+    try:
+        if config is None:
+            config = load_agency_config()
+        return ContentFingerprinter(get_content_selectors(config))
+    except Exception as e:
+        logger.warning(f"Could not load content selectors, fingerprinting whole pages: {e}")
+        return ContentFingerprinter()
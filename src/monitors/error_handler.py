@@ -7,18 +7,22 @@ rate limiting, and other reliability issues.
 """
 
 import asyncio
+import inspect
 import logging
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple, Any, Callable, TypeVar, Union
+from typing import Dict, List, Optional, Tuple, Any, Callable, Awaitable, TypeVar, Union
 from dataclasses import dataclass, field, asdict
 from enum import Enum
+from urllib.parse import urlparse
 import aiohttp
 from aiohttp import ClientTimeout, ClientError
 from selenium.common.exceptions import TimeoutException, WebDriverException
 import requests
 from requests.exceptions import RequestException
 
+from .error_state_store import ErrorStateStore, get_error_state_store
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
@@ -110,15 +114,24 @@ class CircuitBreakerState:
 
 
 class CircuitBreaker:
-    """Circuit breaker implementation for preventing cascading failures."""
+    """
+    Circuit breaker implementation for preventing cascading failures.
+    
+    With a store the state is shared with every other process using the same
+    store; otherwise it is kept in this instance.
+    """
     
-    def __init__(self, config: RetryConfig):
+    def __init__(self, config: RetryConfig, store: Optional[ErrorStateStore] = None):
         self.config = config
+        self.store = store
         self.states: Dict[str, CircuitBreakerState] = {}
         self._lock = asyncio.Lock()
     
     async def is_open(self, key: str) -> bool:
         """Check if circuit breaker is open for the given key."""
+        if self.store is not None:
+            return await asyncio.to_thread(self.store.check_circuit, key)
+        
         async with self._lock:
             state = self.states.get(key, CircuitBreakerState())
             
@@ -134,6 +147,10 @@ class CircuitBreaker:
     
     async def on_success(self, key: str) -> None:
         """Record a successful operation."""
+        if self.store is not None:
+            await asyncio.to_thread(self.store.record_circuit_success, key)
+            return
+        
         async with self._lock:
             if key not in self.states:
                 self.states[key] = CircuitBreakerState()
@@ -146,6 +163,15 @@ class CircuitBreaker:
     
     async def on_failure(self, key: str) -> None:
         """Record a failed operation."""
+        if self.store is not None:
+            state = CircuitBreakerState(**await asyncio.to_thread(
+                self.store.record_circuit_failure, key,
+                self.config.circuit_breaker_threshold, self.config.circuit_breaker_timeout
+            ))
+            if state.state == "open" and state.failure_count == self.config.circuit_breaker_threshold:
+                logger.warning(f"Circuit breaker opened for {key} after {state.failure_count} failures")
+            return
+        
         async with self._lock:
             if key not in self.states:
                 self.states[key] = CircuitBreakerState()
@@ -163,13 +189,47 @@ class CircuitBreaker:
     
     async def get_state(self, key: str) -> CircuitBreakerState:
         """Get current circuit breaker state."""
+        if self.store is not None:
+            return CircuitBreakerState(**await asyncio.to_thread(self.store.get_circuit, key))
+        
         async with self._lock:
             return self.states.get(key, CircuitBreakerState())
+    
+    async def get_all_states(self) -> Dict[str, CircuitBreakerState]:
+        """Get the state of every known circuit."""
+        if self.store is not None:
+            circuits = await asyncio.to_thread(self.store.all_circuits)
+            return {key: CircuitBreakerState(**state) for key, state in circuits.items()}
+        
+        async with self._lock:
+            return dict(self.states)
+    
+    @staticmethod
+    def key_for(url: str, operation_name: str) -> str:
+        """Circuit key for a request; one circuit covers every URL on a host."""
+        return f"{urlparse(url).hostname or url}:{operation_name}"
 
 
 class ErrorClassifier:
     """Classifies errors and determines appropriate handling strategies."""
     
+    # Errors saying the host itself is unavailable. Only these count toward
+    # its circuit breaker; a missing page or an oversized document says
+    # nothing about the rest of the host.
+    AVAILABILITY_ERRORS = frozenset({
+        ErrorType.CONNECTION_TIMEOUT,
+        ErrorType.DNS_RESOLUTION_FAILED,
+        ErrorType.CONNECTION_REFUSED,
+        ErrorType.NETWORK_UNREACHABLE,
+        ErrorType.HTTP_500,
+        ErrorType.HTTP_502,
+        ErrorType.HTTP_503,
+        ErrorType.HTTP_504,
+        ErrorType.HTTP_429,
+        ErrorType.MAINTENANCE_MODE,
+        ErrorType.SELENIUM_TIMEOUT,
+    })
+    
     @staticmethod
     def classify_error(error: Exception, context: ErrorContext) -> Tuple[ErrorType, ErrorSeverity]:
         """Classify an error and determine its severity."""
@@ -229,7 +289,7 @@ class ErrorClassifier:
             return False
         
         # Never retry certain error types
-        if error_type in [ErrorType.HTTP_404, ErrorType.CONTENT_CHANGED]:
+        if error_type in [ErrorType.HTTP_404, ErrorType.CONTENT_CHANGED, ErrorType.CONTENT_TOO_LARGE]:
             return False
         
         # Retry based on severity
@@ -241,14 +301,19 @@ class ErrorClassifier:
             return attempt < max_attempts - 1
         else:  # CRITICAL
             return attempt < max_attempts // 2
+    
+    @classmethod
+    def counts_toward_circuit(cls, error_type: Optional[ErrorType]) -> bool:
+        """Whether an error should count toward opening its host's circuit breaker."""
+        return error_type in cls.AVAILABILITY_ERRORS
 
 
 class RetryHandler:
     """Handles retry logic with exponential backoff and jitter."""
     
-    def __init__(self, config: RetryConfig):
+    def __init__(self, config: RetryConfig, store: Optional[ErrorStateStore] = None):
         self.config = config
-        self.circuit_breaker = CircuitBreaker(config)
+        self.circuit_breaker = CircuitBreaker(config, store)
     
     def calculate_delay(self, attempt: int, error_severity: ErrorSeverity) -> float:
         """Calculate delay for retry with exponential backoff and jitter."""
@@ -278,7 +343,7 @@ class RetryHandler:
         """Execute an operation with retry logic."""
         
         # Check circuit breaker
-        circuit_key = f"{context.url}:{operation_name}"
+        circuit_key = CircuitBreaker.key_for(context.url, operation_name)
         if await self.circuit_breaker.is_open(circuit_key):
             raise Exception(f"Circuit breaker is open for {circuit_key}")
         
@@ -324,8 +389,9 @@ class RetryHandler:
                 
                 await asyncio.sleep(delay)
         
-        # Record failure in circuit breaker
-        await self.circuit_breaker.on_failure(circuit_key)
+        # Record failure in circuit breaker if the host itself looks unavailable
+        if ErrorClassifier.counts_toward_circuit(context.error_type):
+            await self.circuit_breaker.on_failure(circuit_key)
         
         # Log final failure
         logger.error(f"Operation {operation_name} failed after {self.config.max_retries + 1} attempts "
@@ -337,9 +403,10 @@ class RetryHandler:
 class GovernmentWebsiteErrorHandler:
     """Specialized error handler for government website monitoring."""
     
-    def __init__(self, config: Optional[RetryConfig] = None):
+    def __init__(self, config: Optional[RetryConfig] = None, store: Optional[ErrorStateStore] = None):
         self.config = config or RetryConfig()
-        self.retry_handler = RetryHandler(self.config)
+        self.store = store
+        self.retry_handler = RetryHandler(self.config, store)
         self.error_stats: Dict[str, Dict[str, int]] = {}
         self._stats_lock = asyncio.Lock()
     
@@ -348,17 +415,33 @@ class GovernmentWebsiteErrorHandler:
         session: aiohttp.ClientSession,
         url: str,
         method: str = "GET",
+        body_reader: Optional[Callable[[aiohttp.ClientResponse], Awaitable[Any]]] = None,
         **kwargs
     ) -> Tuple[aiohttp.ClientResponse, ErrorContext]:
-        """Handle HTTP requests with comprehensive error handling."""
+        """
+        Handle HTTP requests with comprehensive error handling.
+        
+        Args:
+            session: aiohttp session to issue the request on
+            url: URL to request
+            method: HTTP method
+            body_reader: Optional coroutine that consumes the response body while
+                the connection is still open (e.g. to stream it). Its result is
+                stored in context.metadata["body"]. Without it the whole body is
+                buffered with response.read().
+        """
         
         context = ErrorContext(url=url)
+        timeout_seconds = kwargs.pop('timeout', 30)
         
         async def make_request():
-            timeout = ClientTimeout(total=kwargs.get('timeout', 30) * self.config.timeout_multiplier)
+            timeout = ClientTimeout(total=timeout_seconds * self.config.timeout_multiplier)
             async with session.request(method, url, timeout=timeout, **kwargs) as response:
-                # Read content to ensure connection is complete
-                await response.read()
+                if body_reader is not None:
+                    context.metadata["body"] = await body_reader(response)
+                else:
+                    # Read content to ensure connection is complete
+                    await response.read()
                 context.status_code = response.status
                 return response
         
@@ -379,12 +462,20 @@ class GovernmentWebsiteErrorHandler:
         operation: Callable[[], Any],
         url: str
     ) -> Tuple[Any, ErrorContext]:
-        """Handle Selenium operations with error handling."""
+        """
+        Handle Selenium operations with error handling.
+        
+        The operation may return an awaitable (e.g. a call dispatched to the
+        WebDriver thread pool), which is awaited on each attempt.
+        """
         
         context = ErrorContext(url=url)
         
         async def execute_selenium():
-            return operation()
+            result = operation()
+            if inspect.isawaitable(result):
+                result = await result
+            return result
         
         try:
             result, context = await self.retry_handler.execute_with_retry(
@@ -399,6 +490,10 @@ class GovernmentWebsiteErrorHandler:
     
     async def _record_success(self, url: str) -> None:
         """Record successful operation."""
+        if self.store is not None:
+            await asyncio.to_thread(self.store.record_success, url)
+            return
+        
         async with self._stats_lock:
             if url not in self.error_stats:
                 self.error_stats[url] = {"success": 0, "errors": {}}
@@ -406,6 +501,10 @@ class GovernmentWebsiteErrorHandler:
     
     async def _record_error(self, url: str, error: str) -> None:
         """Record error occurrence."""
+        if self.store is not None:
+            await asyncio.to_thread(self.store.record_error, url, error)
+            return
+        
         async with self._stats_lock:
             if url not in self.error_stats:
                 self.error_stats[url] = {"success": 0, "errors": {}}
@@ -414,18 +513,34 @@ class GovernmentWebsiteErrorHandler:
             self.error_stats[url]["errors"][error] += 1
     
     async def get_error_stats(self) -> Dict[str, Any]:
-        """Get error statistics."""
-        async with self._stats_lock:
-            return {
-                "total_urls": len(self.error_stats),
-                "url_stats": self.error_stats.copy(),
-                "circuit_breaker_states": {
-                    key: asdict(state) for key, state in self.retry_handler.circuit_breaker.states.items()
-                }
-            }
+        """Get error statistics, per URL and aggregated per host."""
+        if self.store is not None:
+            url_stats = await asyncio.to_thread(self.store.url_stats)
+            host_stats = await asyncio.to_thread(self.store.host_stats)
+        else:
+            async with self._stats_lock:
+                url_stats = {url: {"success": stats["success"], "errors": dict(stats["errors"])}
+                             for url, stats in self.error_stats.items()}
+            host_stats = {}
+            for url, stats in url_stats.items():
+                host = (urlparse(url).hostname or url).lower()
+                totals = host_stats.setdefault(host, {"urls": 0, "success": 0, "errors": 0})
+                totals["urls"] += 1
+                totals["success"] += stats["success"]
+                totals["errors"] += sum(stats["errors"].values())
+        
+        circuit_states = await self.retry_handler.circuit_breaker.get_all_states()
+        return {
+            "total_urls": len(url_stats),
+            "url_stats": url_stats,
+            "host_stats": host_stats,
+            "circuit_breaker_states": {key: asdict(state) for key, state in circuit_states.items()}
+        }
     
     async def reset_stats(self) -> None:
         """Reset error statistics."""
+        if self.store is not None:
+            await asyncio.to_thread(self.store.clear)
         async with self._stats_lock:
             self.error_stats.clear()
         self.retry_handler.circuit_breaker.states.clear()
@@ -436,10 +551,10 @@ _global_error_handler: Optional[GovernmentWebsiteErrorHandler] = None
 
 
 def get_error_handler(config: Optional[RetryConfig] = None) -> GovernmentWebsiteErrorHandler:
-    """Get or create global error handler instance."""
+    """Get or create global error handler instance, backed by the shared error state store."""
     global _global_error_handler
     if _global_error_handler is None:
-        _global_error_handler = GovernmentWebsiteErrorHandler(config)
+        _global_error_handler = GovernmentWebsiteErrorHandler(config, get_error_state_store())
     return _global_error_handler
 
 
@@ -0,0 +1,250 @@
+"""
+Shared Error State Store for Government Website Monitoring
+
+Circuit breaker state and request error counters live in a local SQLite
+database in WAL mode, so every process that monitors websites (the
+monitoring scheduler, the enhanced scheduler, API-triggered runs) sees the
+same state. When one worker opens the circuit for a host, all others stop
+sending requests to it until the cool-down ends instead of rediscovering the
+outage by burning their own retries.
+
+Read-modify-write updates run inside BEGIN IMMEDIATE transactions, so
+concurrent processes never lose a failure count or a state transition.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ERROR_STATE_PATH = "./data/monitor_state.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS circuit_breakers (
+    key TEXT PRIMARY KEY,
+    failure_count INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'closed',
+    last_failure_time REAL,
+    next_attempt_time REAL
+);
+CREATE TABLE IF NOT EXISTS request_stats (
+    url TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    success_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_request_stats_host ON request_stats (host);
+CREATE TABLE IF NOT EXISTS request_errors (
+    url TEXT NOT NULL,
+    error TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (url, error)
+);
+"""
+
+
+def _to_datetime(timestamp: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp is not None else None
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or url).lower()
+
+
+class ErrorStateStore:
+    """Circuit breaker state and error counters shared between processes."""
+
+    def __init__(self, path: str = DEFAULT_ERROR_STATE_PATH, busy_timeout: float = 5.0):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        # Autocommit mode; multi-statement updates open their own transactions
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def _transaction(self, operation):
+        """Run operation(cursor) in an immediate transaction holding the write lock."""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(cursor)
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+            return result
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # Circuit breakers
+
+    @staticmethod
+    def _circuit_row(row) -> Dict[str, Any]:
+        if row is None:
+            return {"failure_count": 0, "last_failure_time": None, "state": "closed", "next_attempt_time": None}
+        return {
+            "failure_count": row[0],
+            "last_failure_time": _to_datetime(row[2]),
+            "state": row[1],
+            "next_attempt_time": _to_datetime(row[3])
+        }
+
+    def get_circuit(self, key: str) -> Dict[str, Any]:
+        """Get the circuit state for a key; unknown keys are closed."""
+        rows = self._query(
+            "SELECT failure_count, state, last_failure_time, next_attempt_time FROM circuit_breakers WHERE key = ?",
+            (key,)
+        )
+        return self._circuit_row(rows[0] if rows else None)
+
+    def check_circuit(self, key: str) -> bool:
+        """
+        Check whether requests for a key must be blocked.
+
+        An open circuit whose cool-down has ended moves to half-open and lets
+        the request through.
+        """
+        def check(cursor) -> bool:
+            row = cursor.execute(
+                "SELECT state, next_attempt_time FROM circuit_breakers WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[0] != "open":
+                return False
+            if row[1] is not None and time.time() >= row[1]:
+                cursor.execute(
+                    "UPDATE circuit_breakers SET state = 'half-open', next_attempt_time = NULL WHERE key = ?",
+                    (key,)
+                )
+                return False
+            return True
+
+        return self._transaction(check)
+
+    def record_circuit_success(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO circuit_breakers (key, failure_count, state) VALUES (?, 0, 'closed') "
+                "ON CONFLICT(key) DO UPDATE SET failure_count = 0, state = 'closed', "
+                "last_failure_time = NULL, next_attempt_time = NULL",
+                (key,)
+            )
+
+    def record_circuit_failure(self, key: str, threshold: int, timeout_seconds: float) -> Dict[str, Any]:
+        """Count a failure and open the circuit once the threshold is reached."""
+        def record(cursor) -> Dict[str, Any]:
+            now = time.time()
+            cursor.execute(
+                "INSERT INTO circuit_breakers (key, failure_count, state, last_failure_time) "
+                "VALUES (?, 1, 'closed', ?) "
+                "ON CONFLICT(key) DO UPDATE SET failure_count = failure_count + 1, last_failure_time = excluded.last_failure_time",
+                (key, now)
+            )
+            cursor.execute(
+                "UPDATE circuit_breakers SET state = 'open', next_attempt_time = ? "
+                "WHERE key = ? AND failure_count >= ?",
+                (now + timeout_seconds, key, threshold)
+            )
+            return self._circuit_row(cursor.execute(
+                "SELECT failure_count, state, last_failure_time, next_attempt_time FROM circuit_breakers WHERE key = ?",
+                (key,)
+            ).fetchone())
+
+        return self._transaction(record)
+
+    def all_circuits(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._query("SELECT key, failure_count, state, last_failure_time, next_attempt_time FROM circuit_breakers")
+        return {row[0]: self._circuit_row(row[1:]) for row in rows}
+
+    # Request statistics
+
+    def record_success(self, url: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO request_stats (url, host, success_count) VALUES (?, ?, 1) "
+                "ON CONFLICT(url) DO UPDATE SET success_count = success_count + 1",
+                (url, _host(url))
+            )
+
+    def record_error(self, url: str, error: str) -> None:
+        def record(cursor) -> None:
+            cursor.execute(
+                "INSERT INTO request_stats (url, host, success_count) VALUES (?, ?, 0) ON CONFLICT(url) DO NOTHING",
+                (url, _host(url))
+            )
+            cursor.execute(
+                "INSERT INTO request_errors (url, error, count) VALUES (?, ?, 1) "
+                "ON CONFLICT(url, error) DO UPDATE SET count = count + 1",
+                (url, error)
+            )
+
+        self._transaction(record)
+
+    def url_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Success count and error counts by message, per URL."""
+        stats = {url: {"success": success, "errors": {}}
+                 for url, success in self._query("SELECT url, success_count FROM request_stats")}
+        for url, error, count in self._query("SELECT url, error, count FROM request_errors"):
+            stats.setdefault(url, {"success": 0, "errors": {}})["errors"][error] = count
+        return stats
+
+    def host_stats(self) -> Dict[str, Dict[str, int]]:
+        """Request outcomes aggregated per host."""
+        rows = self._query(
+            "SELECT s.host, COUNT(*), SUM(s.success_count), COALESCE(SUM(e.errors), 0) "
+            "FROM request_stats s "
+            "LEFT JOIN (SELECT url, SUM(count) AS errors FROM request_errors GROUP BY url) e ON e.url = s.url "
+            "GROUP BY s.host"
+        )
+        return {host: {"urls": urls, "success": success, "errors": errors} for host, urls, success, errors in rows}
+
+    def clear(self) -> None:
+        """Forget all circuit states and statistics."""
+        def clear(cursor) -> None:
+            for table in ("circuit_breakers", "request_stats", "request_errors"):
+                cursor.execute(f"DELETE FROM {table}")
+
+        self._transaction(clear)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Global store shared by every error handler in this process
+_global_store: Optional[ErrorStateStore] = None
+_global_lock = threading.Lock()
+
+
+def get_error_state_store() -> Optional[ErrorStateStore]:
+    """
+    Get the process-wide error state store, opening it on first use.
+
+    The database path comes from ERROR_STATE_DB. Returns None if the store
+    cannot be opened, in which case error handlers keep state in memory.
+    """
+    global _global_store
+    with _global_lock:
+        if _global_store is None:
+            path = os.getenv("ERROR_STATE_DB", DEFAULT_ERROR_STATE_PATH)
+            try:
+                _global_store = ErrorStateStore(path)
+                logger.info(f"Using shared error state store at {path}")
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Could not open error state store at {path}, keeping state per process: {e}")
+                return None
+        return _global_store
@@ -0,0 +1,216 @@
+"""
+Shared HTTP Fetch Client for Government Website Monitoring
+
+This module provides a process-wide aiohttp session with a tuned connection
+pool, so keep-alive connections, TLS sessions and the DNS cache survive
+across monitoring runs instead of being rebuilt for every WebScraper.
+
+aiohttp sessions are bound to the event loop that created them, so one
+session is kept per running loop. Scheduler jobs are executed on a single
+long-lived monitoring loop (see run_monitoring_coroutine) so they all share
+the same pool.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+import aiohttp
+
+from ..utils.config_loader import get_monitoring_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+DEFAULT_USER_AGENT = "PayrollMonitor/1.0 (Government Forms Monitoring)"
+
+
+@dataclass
+class ConnectionPoolConfig:
+    """Connection pool settings for the shared fetch client."""
+    limit: int = 100  # Total simultaneous connections
+    limit_per_host: int = 10  # Simultaneous connections per host
+    ttl_dns_cache: int = 300  # Seconds to cache DNS lookups
+    keepalive_timeout: float = 30.0  # Seconds to keep idle connections open
+    total_timeout: float = 120.0  # Session-wide request timeout ceiling
+
+
+class SharedFetchClient:
+    """Process-wide aiohttp session and connection pool."""
+
+    def __init__(self, config: Optional[ConnectionPoolConfig] = None, user_agent: Optional[str] = None):
+        self.config = config or ConnectionPoolConfig()
+        self.user_agent = user_agent or DEFAULT_USER_AGENT
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self.stats = {
+            "sessions_created": 0,
+            "session_reuses": 0
+        }
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.config.limit,
+            limit_per_host=self.config.limit_per_host,
+            ttl_dns_cache=self.config.ttl_dns_cache,
+            use_dns_cache=True,
+            keepalive_timeout=self.config.keepalive_timeout,
+            enable_cleanup_closed=True
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.total_timeout),
+            headers={"User-Agent": self.user_agent}
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the pooled session for the running event loop, creating it on first use.
+
+        Returns:
+            Shared aiohttp session. Callers must not close it.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._prune_closed_loops()
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                session = self._create_session()
+                self._sessions[loop] = session
+                self.stats["sessions_created"] += 1
+                logger.debug("Created shared aiohttp session for monitoring loop")
+            else:
+                self.stats["session_reuses"] += 1
+            return session
+
+    def _prune_closed_loops(self) -> None:
+        for loop in [loop for loop in self._sessions.keys() if loop.is_closed()]:
+            del self._sessions[loop]
+
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """Get connection pool metrics across all live sessions."""
+        acquired = 0
+        idle = 0
+        hosts = set()
+
+        with self._lock:
+            self._prune_closed_loops()
+            sessions = [session for session in self._sessions.values() if not session.closed]
+
+        for session in sessions:
+            connector = session.connector
+            # aiohttp does not expose pool occupancy publicly
+            acquired += len(getattr(connector, "_acquired", ()))
+            for key, connections in getattr(connector, "_conns", {}).items():
+                idle += len(connections)
+                hosts.add(getattr(key, "host", str(key)))
+
+        return {
+            "active_sessions": len(sessions),
+            "acquired_connections": acquired,
+            "idle_connections": idle,
+            "pooled_hosts": len(hosts),
+            "pool_config": asdict(self.config),
+            **self.stats
+        }
+
+    async def close(self) -> None:
+        """Close the session owned by the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.pop(loop, None)
+        if session and not session.closed:
+            await session.close()
+
+
+# Global fetch client and long-lived monitoring loop
+_global_fetch_client: Optional[SharedFetchClient] = None
+_monitoring_loop: Optional[asyncio.AbstractEventLoop] = None
+_monitoring_thread: Optional[threading.Thread] = None
+_global_lock = threading.Lock()
+
+
+def get_fetch_client() -> SharedFetchClient:
+    """Get or create the global fetch client, configured from monitoring settings."""
+    global _global_fetch_client
+    with _global_lock:
+        if _global_fetch_client is None:
+            try:
+                settings = get_monitoring_settings()
+            except Exception as e:
+                logger.warning(f"Could not load monitoring settings for fetch client, using defaults: {e}")
+                settings = {}
+
+            defaults = ConnectionPoolConfig()
+            config = ConnectionPoolConfig(
+                limit=int(settings.get('pool_max_connections', defaults.limit)),
+                limit_per_host=int(settings.get('pool_max_connections_per_host', defaults.limit_per_host)),
+                ttl_dns_cache=int(settings.get('dns_cache_ttl_seconds', defaults.ttl_dns_cache)),
+                keepalive_timeout=float(settings.get('keepalive_timeout_seconds', defaults.keepalive_timeout))
+            )
+            _global_fetch_client = SharedFetchClient(config, settings.get('user_agent'))
+        return _global_fetch_client
+
+
+def get_monitoring_loop() -> asyncio.AbstractEventLoop:
+    """Get the long-lived event loop used for scheduled monitoring, starting it if needed."""
+    global _monitoring_loop, _monitoring_thread
+    with _global_lock:
+        if _monitoring_loop is None or _monitoring_loop.is_closed():
+            _monitoring_loop = asyncio.new_event_loop()
+            _monitoring_thread = threading.Thread(
+                target=_monitoring_loop.run_forever,
+                name="monitoring-event-loop",
+                daemon=True
+            )
+            _monitoring_thread.start()
+            logger.info("Started shared monitoring event loop")
+        return _monitoring_loop
+
+
+def run_monitoring_coroutine(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    Run a coroutine on the shared monitoring loop and wait for its result.
+
+    Use this from synchronous scheduler jobs instead of creating a fresh event
+    loop, so the pooled session and its connections are reused between jobs.
+
+    Args:
+        coro: Coroutine to run
+        timeout: Maximum seconds to wait for the result
+
+    Returns:
+        The coroutine's result
+    """
+    loop = get_monitoring_loop()
+    future: Future = asyncio.run_coroutine_threadsafe(coro, loop)
+    return future.result(timeout)
+
+
+def close_fetch_client(timeout: float = 10.0) -> None:
+    """Close the pooled session on the monitoring loop and stop the loop."""
+    global _monitoring_loop, _monitoring_thread
+    with _global_lock:
+        loop, thread = _monitoring_loop, _monitoring_thread
+        _monitoring_loop, _monitoring_thread = None, None
+
+    if loop is None or loop.is_closed():
+        return
+
+    try:
+        asyncio.run_coroutine_threadsafe(get_fetch_client().close(), loop).result(timeout)
+    except Exception as e:
+        logger.error(f"Error closing shared fetch client: {e}")
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        if thread:
+            thread.join(timeout)
+        loop.close()
+        logger.info("Shared monitoring event loop stopped")
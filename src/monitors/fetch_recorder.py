@@ -0,0 +1,262 @@
+"""
+Record/Replay Fetch Harness for Government Website Monitoring
+
+Captures the HTTP responses WebScraper receives (status, headers, body and
+latency) into a local archive, and serves them back later with their
+original latency so monitoring throughput can be measured without touching
+live agency websites.
+
+Both sides plug in as a SharedFetchClient, so the full scraper pipeline
+(error handling, rate limiting, streaming hash, PDF extraction, dedup) runs
+unchanged on top of them.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from multidict import CIMultiDict
+
+from .fetch_client import SharedFetchClient
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+BODIES_DIR = "bodies"
+
+
+@dataclass
+class RecordedResponse:
+    """One captured HTTP response; the body is stored separately by hash."""
+    url: str
+    method: str
+    status: int
+    headers: Dict[str, str]
+    body_sha256: str
+    latency_seconds: float
+    final_url: str
+    recorded_at: str
+
+
+class FetchArchive:
+    """Directory of recorded responses keyed by URL, with bodies stored once per hash."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.responses: Dict[str, RecordedResponse] = {}
+        if (self.path / INDEX_FILE).exists():
+            self.load()
+
+    def load(self) -> None:
+        with open(self.path / INDEX_FILE, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        self.responses = {entry["url"]: RecordedResponse(**entry) for entry in entries}
+        logger.info(f"Loaded {len(self.responses)} recorded responses from {self.path}")
+
+    def save(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / INDEX_FILE, 'w', encoding='utf-8') as f:
+            json.dump([asdict(response) for response in self.responses.values()], f, indent=2)
+
+    def add(self, url: str, method: str, status: int, headers: Dict[str, str], body: bytes,
+            latency_seconds: float, final_url: Optional[str] = None) -> RecordedResponse:
+        """Store a response, replacing any earlier recording of the same URL."""
+        body_sha256 = hashlib.sha256(body).hexdigest()
+        body_path = self.path / BODIES_DIR / body_sha256
+        if not body_path.exists():
+            body_path.parent.mkdir(parents=True, exist_ok=True)
+            body_path.write_bytes(body)
+
+        response = RecordedResponse(
+            url=url,
+            method=method,
+            status=status,
+            headers=headers,
+            body_sha256=body_sha256,
+            latency_seconds=latency_seconds,
+            final_url=final_url or url,
+            recorded_at=datetime.now(timezone.utc).isoformat()
+        )
+        self.responses[url] = response
+        return response
+
+    def get(self, url: str) -> Optional[RecordedResponse]:
+        return self.responses.get(url)
+
+    def read_body(self, response: RecordedResponse) -> bytes:
+        return (self.path / BODIES_DIR / response.body_sha256).read_bytes()
+
+    def __len__(self) -> int:
+        return len(self.responses)
+
+
+class _TeeStream:
+    """Response stream wrapper that keeps a copy of every chunk read."""
+
+    def __init__(self, stream, sink: List[bytes]):
+        self._stream = stream
+        self._sink = sink
+
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        async for chunk in self._stream.iter_chunked(size):
+            self._sink.append(chunk)
+            yield chunk
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+class _RecordingResponse:
+    """Live response wrapper that captures the body as the scraper consumes it."""
+
+    def __init__(self, response):
+        self._response = response
+        self.chunks: List[bytes] = []
+        self.content = _TeeStream(response.content, self.chunks)
+
+    async def read(self) -> bytes:
+        body = await self._response.read()
+        self.chunks[:] = [body]
+        return body
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._response, name)
+
+
+class RecordingSession:
+    """aiohttp session stand-in that forwards requests and records the responses."""
+
+    def __init__(self, session, archive: FetchArchive):
+        self._session = session
+        self.archive = archive
+        self.closed = False
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator[_RecordingResponse]:
+        start = time.monotonic()
+        async with self._session.request(method, url, **kwargs) as response:
+            recorded = _RecordingResponse(response)
+            yield recorded
+            # A 304 has no body to replay, keep the full recording instead
+            if response.status != 304:
+                self.archive.add(url, method, response.status, dict(response.headers),
+                                 b"".join(recorded.chunks), time.monotonic() - start, str(response.url))
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+
+class _ReplayStream:
+    def __init__(self, body: bytes):
+        self._body = body
+
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        for start in range(0, len(self._body), size):
+            yield self._body[start:start + size]
+
+
+class ReplayResponse:
+    """Recorded response presented with the aiohttp.ClientResponse attributes the scraper uses."""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, url: str):
+        self.status = status
+        self.headers = CIMultiDict(headers)
+        self.url = url
+        self._body = body
+        self.content = _ReplayStream(body)
+
+    @property
+    def content_length(self) -> Optional[int]:
+        return len(self._body) if self.status != 304 else None
+
+    @property
+    def charset(self) -> Optional[str]:
+        content_type = self.headers.get("content-type", "")
+        for part in content_type.split(";")[1:]:
+            key, _, value = part.strip().partition("=")
+            if key.lower() == "charset":
+                return value.strip('"') or None
+        return None
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        return self._body.decode(self.charset or "utf-8", errors="replace")
+
+
+class ReplaySession:
+    """aiohttp session stand-in that serves responses from an archive."""
+
+    def __init__(self, archive: FetchArchive, latency_scale: float = 1.0):
+        self.archive = archive
+        self.latency_scale = latency_scale
+        self.closed = False
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      **kwargs) -> AsyncIterator[ReplayResponse]:
+        recorded = self.archive.get(url)
+        if recorded is None:
+            self.stats["misses"] += 1
+            yield ReplayResponse(404, {}, b"", url)
+            return
+
+        self.stats["hits"] += 1
+        await asyncio.sleep(recorded.latency_seconds * self.latency_scale)
+
+        if self._is_not_modified(recorded, headers or {}):
+            self.stats["not_modified"] += 1
+            yield ReplayResponse(304, recorded.headers, b"", recorded.final_url)
+            return
+
+        yield ReplayResponse(recorded.status, recorded.headers, self.archive.read_body(recorded),
+                             recorded.final_url)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    @staticmethod
+    def _is_not_modified(recorded: RecordedResponse, headers: Dict[str, str]) -> bool:
+        recorded_headers = CIMultiDict(recorded.headers)
+        request_headers = CIMultiDict(headers)
+        etag = recorded_headers.get("etag")
+        if etag and request_headers.get("if-none-match") == etag:
+            return True
+        last_modified = recorded_headers.get("last-modified")
+        return bool(last_modified and request_headers.get("if-modified-since") == last_modified)
+
+
+class RecordingFetchClient(SharedFetchClient):
+    """Fetch client that records every response it receives into an archive."""
+
+    def __init__(self, archive: FetchArchive, inner: Optional[SharedFetchClient] = None):
+        super().__init__()
+        self.archive = archive
+        self.inner = inner or SharedFetchClient()
+
+    async def get_session(self) -> RecordingSession:
+        return RecordingSession(await self.inner.get_session(), self.archive)
+
+    async def close(self) -> None:
+        self.archive.save()
+        await self.inner.close()
+
+
+class ReplayFetchClient(SharedFetchClient):
+    """Fetch client that serves recorded responses with their original latency."""
+
+    def __init__(self, archive: FetchArchive, latency_scale: float = 1.0):
+        super().__init__()
+        self.session = ReplaySession(archive, latency_scale)
+
+    async def get_session(self) -> ReplaySession:
+        return self.session
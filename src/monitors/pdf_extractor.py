@@ -0,0 +1,184 @@
+"""
+PDF Form Extraction for Government Website Monitoring
+
+Many monitored forms (WH-347, A1-131, ...) are published as PDFs rather than
+HTML pages. This module treats them as binary documents: a cheap fingerprint
+(file size, trailer /ID, ModDate) is read first, and only when it differs
+from the previous check is text extracted, one page at a time, with a hash
+per page so changes can be pinned to the pages that actually moved.
+
+Extracted page texts are joined with form feeds (the pdftotext convention),
+so the joined text can be stored like any other page content and split back
+into pages later.
+"""
+
+import hashlib
+import io
+import logging
+import re
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from pypdf import PdfReader
+    PDF_SUPPORT_AVAILABLE = True
+except ImportError:
+    PDF_SUPPORT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PAGE_SEPARATOR = "\f"
+PDF_MAGIC = b"%PDF-"
+
+
+@dataclass
+class PdfFingerprint:
+    """Cheap identity of a PDF taken without extracting any text."""
+    size: int
+    document_id: Optional[str] = None  # First element of the trailer /ID array
+    mod_date: Optional[str] = None  # /ModDate from the document info dictionary
+
+    def matches(self, previous: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check whether a stored fingerprint identifies the same document.
+
+        Size alone is not trusted; at least one of /ID or ModDate must be
+        present and all present fields must agree.
+        """
+        if not previous:
+            return False
+        if not (self.document_id or self.mod_date):
+            return False
+        return (self.size == previous.get("size")
+                and self.document_id == previous.get("document_id")
+                and self.mod_date == previous.get("mod_date"))
+
+
+@dataclass
+class PdfDocument:
+    """Page-level text and hashes extracted from a PDF."""
+    fingerprint: PdfFingerprint
+    page_texts: List[str] = field(default_factory=list)
+    page_hashes: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return PAGE_SEPARATOR.join(self.page_texts)
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """Serialize the fingerprint and page hashes for storage on a monitoring run."""
+        return {
+            "fingerprint": asdict(self.fingerprint),
+            "page_count": len(self.page_hashes),
+            "page_hashes": list(self.page_hashes)
+        }
+
+
+def is_pdf(data: bytes, content_type: str = "") -> bool:
+    """Detect a PDF from its content type or magic bytes."""
+    if "application/pdf" in (content_type or "").lower():
+        return True
+    # The header may be preceded by a little junk, which readers tolerate
+    return PDF_MAGIC in data[:1024]
+
+
+def hash_page(text: str) -> str:
+    """Hash page text with whitespace normalized so reflowed spacing is ignored."""
+    normalized = re.sub(r"\s+", " ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def split_pages(text: str) -> List[str]:
+    """Split joined PDF text back into per-page texts."""
+    return text.split(PAGE_SEPARATOR) if text else []
+
+
+def open_pdf(data: bytes) -> Tuple["PdfReader", PdfFingerprint]:
+    """
+    Open a PDF and read its fingerprint. Pages are not parsed yet.
+
+    Args:
+        data: Raw PDF bytes
+
+    Returns:
+        Tuple of (reader, fingerprint)
+    """
+    if not PDF_SUPPORT_AVAILABLE:
+        raise RuntimeError("pypdf is not installed")
+
+    reader = PdfReader(io.BytesIO(data))
+
+    document_id = None
+    trailer_id = reader.trailer.get("/ID")
+    if trailer_id:
+        first = trailer_id[0]
+        raw = getattr(first, "original_bytes", None)
+        document_id = raw.hex() if raw is not None else str(first)
+
+    mod_date = None
+    info = reader.metadata
+    if info is not None and info.get("/ModDate"):
+        mod_date = str(info.get("/ModDate"))
+
+    return reader, PdfFingerprint(size=len(data), document_id=document_id, mod_date=mod_date)
+
+
+def iter_pdf_pages(reader: "PdfReader") -> Iterator[Tuple[int, str, str]]:
+    """
+    Extract text one page at a time.
+
+    Yields:
+        Tuples of (page_number, text, page_hash), page numbers starting at 1
+    """
+    for index, page in enumerate(reader.pages):
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            logger.warning(f"Could not extract text from PDF page {index + 1}: {e}")
+            text = ""
+        # Form feeds inside a page would break splitting on PAGE_SEPARATOR
+        text = text.replace(PAGE_SEPARATOR, "\n")
+        yield index + 1, text, hash_page(text)
+
+
+def extract_pdf(data: bytes, previous: Optional[Dict[str, Any]] = None) -> Optional[PdfDocument]:
+    """
+    Extract page texts and hashes unless the fingerprint matches the previous check.
+
+    Args:
+        data: Raw PDF bytes
+        previous: Stored PDF metadata (see PdfDocument.to_metadata) from the last run
+
+    Returns:
+        PdfDocument, or None if the fingerprint shows the document is unchanged
+    """
+    reader, fingerprint = open_pdf(data)
+    if fingerprint.matches((previous or {}).get("fingerprint")):
+        return None
+
+    document = PdfDocument(fingerprint=fingerprint)
+    for _, text, page_hash in iter_pdf_pages(reader):
+        document.page_texts.append(text)
+        document.page_hashes.append(page_hash)
+    return document
+
+
+def find_changed_pages(old_hashes: List[str], new_hashes: List[str]) -> List[int]:
+    """
+    Compare page hashes position by position.
+
+    Returns:
+        1-based numbers of pages that changed, were added or were removed
+    """
+    page_count = max(len(old_hashes), len(new_hashes))
+    return [
+        number + 1 for number in range(page_count)
+        if number >= len(old_hashes) or number >= len(new_hashes)
+        or old_hashes[number] != new_hashes[number]
+    ]
+
+
+def select_pages(text: str, page_numbers: List[int]) -> str:
+    """Join the text of the given 1-based pages, skipping pages that do not exist."""
+    pages = split_pages(text)
+    return "\n".join(pages[number - 1] for number in page_numbers if 0 < number <= len(pages))
@@ -0,0 +1,226 @@
+"""
+Per-Host Concurrency and Rate Limiting for Government Website Monitoring
+
+This module keeps the monitor polite towards individual agency hosts while
+allowing many different hosts to be fetched in parallel. Each host gets its
+own in-flight request cap and token-bucket request rate, configurable per
+agency in agencies.yaml.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Any, AsyncIterator
+from urllib.parse import urlparse
+
+from ..utils.config_loader import load_agency_config, get_host_rate_limits
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HostLimitConfig:
+    """Concurrency and rate settings for a single host."""
+    max_concurrent: int = 2
+    requests_per_second: float = 1.0  # 0 or less disables rate limiting
+    burst: int = 2
+
+
+class TokenBucket:
+    """
+    Token bucket that paces work to a fixed average rate.
+
+    Each acquisition may cost any number of tokens, e.g. one per request or
+    the estimated size of an API call. The bucket is thread-safe and can be
+    shared by callers on different event loops.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Tokens added per second; 0 or less disables the bucket
+            capacity: Largest burst allowed
+        """
+        self.rate = rate
+        self.capacity = float(max(capacity, 1))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        # Event loops cannot share an asyncio.Lock, so each gets its own queue of waiters
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def per_minute(cls, per_minute: float, capacity: Optional[float] = None) -> "TokenBucket":
+        """Bucket refilled at a per-minute rate, holding one minute's worth by default."""
+        return cls(per_minute / 60.0, capacity if capacity is not None else per_minute)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _queue(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            queue = self._queues.get(loop)
+            if queue is None:
+                queue = asyncio.Lock()
+                self._queues[loop] = queue
+            return queue
+
+    def try_acquire(self, amount: float = 1.0) -> float:
+        """
+        Take tokens if enough are available.
+
+        Costs above the capacity are charged as a full bucket.
+
+        Returns:
+            0 if the tokens were taken, otherwise seconds until they will be
+        """
+        if self.rate <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        Wait until tokens are available and consume them.
+
+        Returns:
+            Seconds spent waiting for the tokens
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        # Waiters queue on the lock so tokens are handed out in arrival order
+        async with self._queue():
+            while True:
+                delay = self.try_acquire(amount)
+                if delay <= 0:
+                    return waited
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def adjust(self, amount: float) -> None:
+        """Return unused tokens, or take more (possibly going into debt) when usage exceeded the estimate."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+
+class HostRateLimiter:
+    """Host-keyed concurrency limiter with token-bucket politeness."""
+
+    def __init__(self,
+                 default_config: Optional[HostLimitConfig] = None,
+                 host_configs: Optional[Dict[str, HostLimitConfig]] = None):
+        self.default_config = default_config or HostLimitConfig()
+        self.host_configs: Dict[str, HostLimitConfig] = {
+            host.lower(): config for host, config in (host_configs or {}).items()
+        }
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        """Extract the normalized host key for a URL."""
+        return (urlparse(url).hostname or url).lower()
+
+    def get_host_config(self, host: str) -> HostLimitConfig:
+        """Get the limit configuration that applies to a host."""
+        return self.host_configs.get(host.lower(), self.default_config)
+
+    def configure_host(self, host: str, config: HostLimitConfig) -> None:
+        """Set or replace the limits for a host."""
+        host = host.lower()
+        self.host_configs[host] = config
+        # Drop existing primitives so the new limits take effect on next use
+        self._semaphores.pop(host, None)
+        self._buckets.pop(host, None)
+
+    def _get_primitives(self, host: str):
+        if host not in self._semaphores:
+            config = self.get_host_config(host)
+            self._semaphores[host] = asyncio.Semaphore(max(config.max_concurrent, 1))
+            self._buckets[host] = TokenBucket(config.requests_per_second, config.burst)
+            self._stats[host] = {
+                "requests": 0,
+                "in_flight": 0,
+                "peak_in_flight": 0,
+                "total_wait_seconds": 0.0
+            }
+        return self._semaphores[host], self._buckets[host]
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        """
+        Hold a concurrency slot and a rate token for the URL's host.
+
+        Args:
+            url: URL about to be requested
+        """
+        host = self.get_host(url)
+        semaphore, bucket = self._get_primitives(host)
+        stats = self._stats[host]
+
+        wait_start = time.monotonic()
+        async with semaphore:
+            await bucket.acquire()
+            stats["total_wait_seconds"] += time.monotonic() - wait_start
+            stats["requests"] += 1
+            stats["in_flight"] += 1
+            stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+            try:
+                yield
+            finally:
+                stats["in_flight"] -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-host limiter statistics."""
+        return {
+            "default_limits": asdict(self.default_config),
+            "hosts": {
+                host: {**stats, "limits": asdict(self.get_host_config(host))}
+                for host, stats in self._stats.items()
+            }
+        }
+
+
+def create_host_rate_limiter(config: Optional[Dict[str, Any]] = None) -> HostRateLimiter:
+    """
+    Create a host rate limiter from the agency configuration.
+
+    Args:
+        config: Agency configuration dictionary. Loaded from agencies.yaml if None.
+
+    Returns:
+        HostRateLimiter with default and per-host limits applied
+    """
+    try:
+        if config is None:
+            config = load_agency_config()
+        limits = get_host_rate_limits(config)
+    except Exception as e:
+        logger.warning(f"Could not load host rate limits, using defaults: {e}")
+        return HostRateLimiter()
+
+    default_config = HostLimitConfig(**limits["default"])
+    host_configs = {host: HostLimitConfig(**settings) for host, settings in limits["hosts"].items()}
+    return HostRateLimiter(default_config, host_configs)
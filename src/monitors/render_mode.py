@@ -0,0 +1,152 @@
+"""
+Render Mode Selection for Government Website Monitoring
+
+Decides per URL whether a page must be rendered in headless Chrome or can be
+monitored with a plain HTTP fetch. Pages are always fetched statically first;
+only when the static HTML shows signs of depending on JavaScript (almost no
+visible text, a "please enable JavaScript" notice, an empty client-side app
+root) is the page rendered once to measure how much content rendering adds.
+The outcome is stored in the database so Chrome is only launched for pages
+where it demonstrably changes the content.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from ..database.models import RenderModeDecision
+from ..utils.html_document import parse_document
+
+logger = logging.getLogger(__name__)
+
+STATIC = "static"
+JAVASCRIPT = "javascript"
+
+# Empty mount points left for a client-side framework to fill in
+APP_ROOT_PATTERN = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt)["\'][^>]*>\s*</div>'
+    r'|\bng-app\b|\bng-version=|\bdata-reactroot\b',
+    re.IGNORECASE
+)
+NOSCRIPT_PATTERN = re.compile(r'<noscript[^>]*>(.*?)</noscript>', re.IGNORECASE | re.DOTALL)
+
+
+@dataclass
+class RenderModeConfig:
+    """Thresholds for detecting JavaScript-dependent pages."""
+    min_text_chars: int = 200  # Less visible text than this counts as an empty body
+    render_delta_threshold: float = 0.2  # Share of text that must come from rendering
+    recheck_days: int = 30  # Re-probe decisions older than this
+
+
+def visible_text(html: str) -> str:
+    """Extract the text a reader would see, without scripts, styles or noscript blocks."""
+    return parse_document(html).text
+
+
+class RenderModeSelector:
+    """Chooses and remembers static vs. JavaScript rendering per URL."""
+
+    def __init__(self, config: Optional[RenderModeConfig] = None):
+        self.config = config or RenderModeConfig()
+
+    def get_decision(self, db, url: str) -> Optional[RenderModeDecision]:
+        """Get the stored decision for a URL, if any."""
+        return db.query(RenderModeDecision).filter(RenderModeDecision.url == url).first()
+
+    def is_stale(self, decision: RenderModeDecision) -> bool:
+        decided_at = decision.decided_at
+        if decided_at is None:
+            return True
+        if decided_at.tzinfo is None:
+            decided_at = decided_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - decided_at > timedelta(days=self.config.recheck_days)
+
+    def should_render(self, decision: Optional[RenderModeDecision]) -> bool:
+        """Whether to fetch with Selenium. Stale decisions fall back to a static fetch and re-probe."""
+        return decision is not None and decision.mode == JAVASCRIPT and not self.is_stale(decision)
+
+    def needs_probe(self, decision: Optional[RenderModeDecision]) -> bool:
+        """Whether a static fetch should be checked for JavaScript dependence."""
+        return decision is None or self.is_stale(decision)
+
+    def detect_js_signals(self, html: str) -> Optional[str]:
+        """
+        Look for signs that static HTML is incomplete without JavaScript.
+
+        Returns:
+            Description of the first signal found, or None
+        """
+        for notice in NOSCRIPT_PATTERN.findall(html):
+            if 'javascript' in notice.lower():
+                return "noscript javascript notice"
+
+        if APP_ROOT_PATTERN.search(html):
+            return "client-side app root"
+
+        if len(visible_text(html)) < self.config.min_text_chars:
+            return "empty body"
+
+        return None
+
+    def decide(self, static_html: str, rendered_html: str, signal: str) -> Tuple[str, str, int, int]:
+        """
+        Compare static and rendered content.
+
+        Returns:
+            Tuple of (mode, reason, static_text_length, rendered_text_length)
+        """
+        static_length = len(visible_text(static_html))
+        rendered_length = len(visible_text(rendered_html))
+        delta = (rendered_length - static_length) / max(rendered_length, 1)
+
+        if delta >= self.config.render_delta_threshold:
+            return JAVASCRIPT, f"{signal}; rendering added {delta:.0%} of text", static_length, rendered_length
+        return STATIC, f"{signal}; rendering did not add content", static_length, rendered_length
+
+    def record(self, db, url: str, mode: str, reason: str,
+               static_text_length: Optional[int] = None,
+               rendered_text_length: Optional[int] = None) -> RenderModeDecision:
+        """
+        Store or update the decision for a URL.
+
+        A new decision is flushed straight away: forms sharing a URL may be
+        probed on one session without autoflush, and would otherwise each
+        add a row for it.
+        """
+        decision = self.get_decision(db, url)
+        if decision is None:
+            decision = RenderModeDecision(url=url)
+            db.add(decision)
+            db.flush()
+
+        if decision.mode != mode:
+            logger.info(f"Render mode for {url}: {mode} ({reason})")
+
+        decision.mode = mode
+        decision.reason = reason[:255]
+        decision.static_text_length = static_text_length
+        decision.rendered_text_length = rendered_text_length
+        decision.decided_at = datetime.now(timezone.utc)
+        return decision
+
+
+def create_render_mode_selector(settings: Optional[Dict[str, Any]] = None) -> RenderModeSelector:
+    """
+    Create a render mode selector from monitoring settings.
+
+    Args:
+        settings: Monitoring settings dictionary
+
+    Returns:
+        Configured RenderModeSelector
+    """
+    settings = settings or {}
+    defaults = RenderModeConfig()
+    return RenderModeSelector(RenderModeConfig(
+        min_text_chars=int(settings.get('render_mode_min_text_chars', defaults.min_text_chars)),
+        render_delta_threshold=float(settings.get('render_mode_delta_threshold', defaults.render_delta_threshold)),
+        recheck_days=int(settings.get('render_mode_recheck_days', defaults.recheck_days))
+    ))
@@ -0,0 +1,174 @@
+"""
+Content-Addressed Snapshot Store for Monitored Form Content
+
+Keeps the last fetched content of every form on disk so change analysis has
+a baseline after a restart. Snapshots are zlib-compressed blobs named by the
+SHA-256 of their text, so identical content shared by several forms (or
+unchanged between runs) is stored once. Which snapshot is current for a form
+is recorded in the database (Form.snapshot_hash).
+
+Reads go through a small LRU of decompressed snapshots bounded by total
+size, so the store never holds the whole corpus in memory.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = "./data/snapshots"
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024  # Decompressed snapshots kept in memory
+COMPRESSION_LEVEL = 6
+
+
+def snapshot_hash(content: str) -> str:
+    """SHA-256 of the snapshot text, used as its address."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class SnapshotStore:
+    """Compressed snapshots on disk addressed by content hash."""
+
+    def __init__(self, root: str = DEFAULT_SNAPSHOT_PATH, max_cache_bytes: int = DEFAULT_CACHE_BYTES):
+        self.root = Path(root)
+        self.max_cache_bytes = max_cache_bytes
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"writes": 0, "dedup_writes": 0, "cache_hits": 0, "disk_reads": 0, "missing": 0}
+
+    def _path(self, content_hash: str) -> Path:
+        # Two-level fan-out keeps directories small
+        return self.root / content_hash[:2] / content_hash
+
+    def put(self, content: str) -> str:
+        """
+        Store a snapshot unless identical content is already stored.
+
+        Returns:
+            Content hash to look the snapshot up by
+        """
+        content_hash = snapshot_hash(content)
+        path = self._path(content_hash)
+
+        try:
+            # Reuse counts as a fresh write for garbage collection grace periods
+            os.utime(path)
+            with self._lock:
+                self.stats["dedup_writes"] += 1
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = zlib.compress(content.encode('utf-8'), COMPRESSION_LEVEL)
+            # Write then rename so readers never see a partial blob
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            with self._lock:
+                self.stats["writes"] += 1
+
+        self._remember(content_hash, content)
+        return content_hash
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """Get a snapshot by hash, or None if it is not stored."""
+        with self._lock:
+            content = self._cache.get(content_hash)
+            if content is not None:
+                self._cache.move_to_end(content_hash)
+                self.stats["cache_hits"] += 1
+                return content
+
+        try:
+            data = self._path(content_hash).read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self.stats["missing"] += 1
+            return None
+
+        content = zlib.decompress(data).decode('utf-8')
+        with self._lock:
+            self.stats["disk_reads"] += 1
+        self._remember(content_hash, content)
+        return content
+
+    def contains(self, content_hash: str) -> bool:
+        return self._path(content_hash).exists()
+
+    def modified_at(self, content_hash: str) -> Optional[float]:
+        """When a snapshot was last written or reused, as a timestamp, or None if it is not stored."""
+        try:
+            return self._path(content_hash).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def delete(self, content_hash: str) -> bool:
+        """Remove a snapshot. Returns whether it existed."""
+        with self._lock:
+            content = self._cache.pop(content_hash, None)
+            if content is not None:
+                self._cache_bytes -= len(content)
+        try:
+            self._path(content_hash).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def iter_hashes(self) -> Iterator[str]:
+        """Hashes of all stored snapshots."""
+        if not self.root.exists():
+            return
+        for directory in self.root.iterdir():
+            if directory.is_dir() and len(directory.name) == 2:
+                for path in directory.iterdir():
+                    if not path.name.startswith("."):
+                        yield path.name
+
+    def _remember(self, content_hash: str, content: str) -> None:
+        size = len(content)
+        if size > self.max_cache_bytes:
+            return
+
+        with self._lock:
+            if content_hash in self._cache:
+                self._cache.move_to_end(content_hash)
+                return
+            self._cache[content_hash] = content
+            self._cache_bytes += size
+            while self._cache_bytes > self.max_cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "root": str(self.root),
+                "cached_snapshots": len(self._cache),
+                "cached_bytes": self._cache_bytes,
+                **self.stats
+            }
+
+
+# Global snapshot store
+_global_store: Optional[SnapshotStore] = None
+_global_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Get the process-wide snapshot store; its location comes from SNAPSHOT_STORE_PATH."""
+    global _global_store
+    with _global_lock:
+        if _global_store is None:
+            _global_store = SnapshotStore(os.getenv("SNAPSHOT_STORE_PATH", DEFAULT_SNAPSHOT_PATH))
+        return _global_store
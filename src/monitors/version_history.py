@@ -0,0 +1,428 @@
+"""
+Delta-Compressed Version History for Monitored Forms
+
+Every distinct version of a form's content is kept for auditing without
+storing full copies. Content is split into chunks at content-defined
+boundaries (a rolling decision over line hashes, so an insertion only
+changes the chunks around it), and chunks are stored once in a
+content-addressed SnapshotStore. A version is recorded in the database
+(FormVersion) either as a keyframe listing all its chunk hashes or as a
+delta against the previous version: ranges of chunks copied from the base
+plus the hashes of new chunks.
+
+A keyframe is written every keyframe_interval versions, so rebuilding any
+version applies at most keyframe_interval - 1 deltas. The retention policy
+keeps recent versions as they are and thins older ones to one per
+sparse_interval_days, stored as keyframes; chunks no longer referenced by
+any version are then garbage-collected. Chunks are stored before their
+version is committed, so collection skips chunks written or reused within
+a grace period.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from ..database.models import FormVersion
+from ..utils.diff_engine import diff_opcodes
+from .snapshot_store import DEFAULT_SNAPSHOT_PATH, SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+# Chunking parameters, in characters
+CHUNK_MIN_SIZE = 1024
+CHUNK_MAX_SIZE = 16384
+CHUNK_BOUNDARY_MASK = 0xF  # A line ends a chunk with probability 1/16 once past the minimum size
+
+DEFAULT_KEYFRAME_INTERVAL = 10
+DEFAULT_GC_GRACE_HOURS = 24
+
+
+def chunk_content(content: str,
+                  min_size: int = CHUNK_MIN_SIZE,
+                  max_size: int = CHUNK_MAX_SIZE,
+                  boundary_mask: int = CHUNK_BOUNDARY_MASK) -> List[str]:
+    """
+    Split content into chunks at content-defined boundaries.
+
+    Boundaries fall after lines whose hash matches the mask, so they move
+    with the content when text is inserted or removed earlier in the page.
+    Joining the chunks gives back the content exactly.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+
+    def flush() -> None:
+        nonlocal size
+        if current:
+            chunks.append(''.join(current))
+            current.clear()
+            size = 0
+
+    for line in content.splitlines(keepends=True):
+        # Minified pages can be one huge line; cut it into fixed pieces
+        while len(line) > max_size:
+            flush()
+            chunks.append(line[:max_size])
+            line = line[max_size:]
+
+        current.append(line)
+        size += len(line)
+        if size >= max_size or (size >= min_size and zlib.crc32(line.encode('utf-8')) & boundary_mask == 0):
+            flush()
+
+    flush()
+    return chunks
+
+
+def make_delta(base: List[str], target: List[str]) -> List[Any]:
+    """
+    Describe target as operations on base.
+
+    Each operation is either [start, count], copying base[start:start + count],
+    or a chunk hash to insert.
+    """
+    operations: List[Any] = []
+    opcodes, _ = diff_opcodes(base, target)
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            operations.append([i1, i2 - i1])
+        elif tag in ('replace', 'insert'):
+            operations.extend(target[j1:j2])
+    return operations
+
+
+def apply_delta(base: List[str], operations: List[Any]) -> List[str]:
+    """Rebuild a chunk list from its base and delta operations."""
+    target: List[str] = []
+    for operation in operations:
+        if isinstance(operation, list):
+            start, count = operation
+            target.extend(base[start:start + count])
+        else:
+            target.append(operation)
+    return target
+
+
+@dataclass
+class RetentionPolicy:
+    """How long versions are kept in full and how sparse older history becomes."""
+    keep_all_days: int = 90
+    sparse_interval_days: int = 30
+
+
+class VersionHistory:
+    """Per-form version chains over a shared content-addressed chunk store."""
+
+    def __init__(self,
+                 chunk_store: SnapshotStore,
+                 keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+                 gc_grace_seconds: float = DEFAULT_GC_GRACE_HOURS * 3600):
+        self.chunk_store = chunk_store
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.gc_grace_seconds = max(0.0, gc_grace_seconds)
+        self._lock = threading.Lock()
+        self.stats = {"versions_recorded": 0, "keyframes": 0, "deltas": 0, "unchanged": 0, "chunks_collected": 0}
+
+    def store_chunks(self, content: str) -> List[str]:
+        """
+        Chunk content and store chunks that are not stored yet.
+
+        Chunks that are already stored are marked as reused, which protects
+        them from garbage collection until the version is committed. Does
+        blocking file I/O; async callers run it in a thread.
+
+        Returns:
+            Chunk hashes in content order
+        """
+        return [self.chunk_store.put(chunk) for chunk in chunk_content(content)]
+
+    def record_version(self,
+                       db,
+                       form_id: int,
+                       content: str,
+                       chunk_hashes: List[str],
+                       captured_at: Optional[datetime] = None) -> Optional[FormVersion]:
+        """
+        Add a version to a form's history unless it equals the latest one.
+
+        Args:
+            db: Database session; the caller commits
+            form_id: ID of the form
+            content: Full content of the version
+            chunk_hashes: Result of store_chunks for the content
+            captured_at: When the content was fetched (defaults to now)
+
+        Returns:
+            The new FormVersion, or None if the content is unchanged
+        """
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        latest = self.latest_version(db, form_id)
+        if latest is not None and latest.content_hash == content_hash:
+            with self._lock:
+                self.stats["unchanged"] += 1
+            return None
+
+        record = FormVersion(
+            form_id=form_id,
+            version=latest.version + 1 if latest else 1,
+            content_hash=content_hash,
+            captured_at=captured_at or datetime.now(timezone.utc),
+            content_size=len(content)
+        )
+
+        delta = None
+        if latest is not None and (latest.chain_depth or 0) + 1 < self.keyframe_interval:
+            delta = make_delta(self.get_manifest(db, latest), chunk_hashes)
+            # A delta that copies almost nothing is no smaller than a keyframe
+            if len(delta) >= len(chunk_hashes):
+                delta = None
+
+        if delta is None:
+            record.is_keyframe = True
+            record.chain_depth = 0
+            record.manifest = list(chunk_hashes)
+        else:
+            record.is_keyframe = False
+            record.base_version = latest.version
+            record.chain_depth = (latest.chain_depth or 0) + 1
+            record.manifest = delta
+
+        db.add(record)
+        with self._lock:
+            self.stats["versions_recorded"] += 1
+            self.stats["keyframes" if record.is_keyframe else "deltas"] += 1
+        return record
+
+    def latest_version(self, db, form_id: int) -> Optional[FormVersion]:
+        return db.query(FormVersion).filter(
+            FormVersion.form_id == form_id
+        ).order_by(FormVersion.version.desc()).first()
+
+    def list_versions(self, db, form_id: int) -> List[FormVersion]:
+        return db.query(FormVersion).filter(
+            FormVersion.form_id == form_id
+        ).order_by(FormVersion.version).all()
+
+    def get_manifest(self, db, record: FormVersion) -> List[str]:
+        """Chunk hashes of a version, following its delta chain back to a keyframe."""
+        chain = [record]
+        while not chain[-1].is_keyframe:
+            base = db.query(FormVersion).filter(
+                FormVersion.form_id == record.form_id,
+                FormVersion.version == chain[-1].base_version
+            ).first()
+            if base is None:
+                raise ValueError(f"Version {chain[-1].base_version} of form {record.form_id} is missing")
+            chain.append(base)
+
+        manifest = list(chain[-1].manifest)
+        for delta in reversed(chain[:-1]):
+            manifest = apply_delta(manifest, delta.manifest)
+        return manifest
+
+    def get_content(self, db, form_id: int, version: int) -> Optional[str]:
+        """
+        Rebuild the content of a version.
+
+        Returns:
+            The content, or None if the version does not exist
+        """
+        record = db.query(FormVersion).filter(
+            FormVersion.form_id == form_id,
+            FormVersion.version == version
+        ).first()
+        if record is None:
+            return None
+
+        return self.assemble(self.get_manifest(db, record))
+
+    def assemble(self, chunk_hashes: List[str]) -> str:
+        """
+        Join stored chunks into content.
+
+        Does blocking file I/O; async callers run it in a thread.
+
+        Raises:
+            ValueError: If a chunk is missing from the store
+        """
+        parts = []
+        for chunk_hash in chunk_hashes:
+            chunk = self.chunk_store.get(chunk_hash)
+            if chunk is None:
+                raise ValueError(f"Chunk {chunk_hash[:12]} is missing from the chunk store")
+            parts.append(chunk)
+        return ''.join(parts)
+
+    def compact(self, db, form_id: int, policy: RetentionPolicy, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Apply the retention policy to one form's history.
+
+        Versions older than keep_all_days are thinned to the first one in
+        each sparse_interval_days window and become keyframes, so no
+        surviving version depends on a removed one. The latest version is
+        always kept. Chunks are left for collect_garbage.
+
+        Returns:
+            Counts of removed and kept versions
+        """
+        versions = self.list_versions(db, form_id)
+        if not versions:
+            return {"removed": 0, "kept": 0}
+
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=policy.keep_all_days)
+        window = timedelta(days=max(1, policy.sparse_interval_days)).total_seconds()
+
+        keep = []
+        seen_windows: Set[int] = set()
+        for record in versions:
+            captured_at = _as_utc(record.captured_at)
+            if record is versions[-1] or captured_at >= cutoff:
+                keep.append(record)
+                continue
+            bucket = int(captured_at.timestamp() // window)
+            if bucket not in seen_windows:
+                seen_windows.add(bucket)
+                keep.append(record)
+
+        kept_versions = {record.version for record in keep}
+        removed = [record for record in versions if record.version not in kept_versions]
+        if not removed:
+            return {"removed": 0, "kept": len(keep)}
+
+        # Old versions become keyframes, as do deltas whose base is going away.
+        # Resolve their chunk lists before any chain is rewritten.
+        rewrite = {
+            record.version: self.get_manifest(db, record)
+            for record in keep
+            if _as_utc(record.captured_at) < cutoff
+            or (not record.is_keyframe and record.base_version not in kept_versions)
+        }
+        for record in removed:
+            db.delete(record)
+
+        by_version = {record.version: record for record in keep}
+        for record in keep:
+            if record.version in rewrite:
+                record.is_keyframe = True
+                record.base_version = None
+                record.chain_depth = 0
+                record.manifest = rewrite[record.version]
+            elif not record.is_keyframe:
+                record.chain_depth = (by_version[record.base_version].chain_depth or 0) + 1
+
+        return {"removed": len(removed), "kept": len(keep)}
+
+    def compact_all(self, db, policy: RetentionPolicy, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Apply the retention policy to every form with recorded versions."""
+        totals = {"forms": 0, "removed": 0, "kept": 0}
+        form_ids = [row[0] for row in db.query(FormVersion.form_id).distinct().all()]
+        for form_id in form_ids:
+            result = self.compact(db, form_id, policy, now)
+            totals["forms"] += 1
+            totals["removed"] += result["removed"]
+            totals["kept"] += result["kept"]
+        return totals
+
+    def collect_garbage(self, db, now: Optional[float] = None) -> int:
+        """
+        Delete stored chunks no version refers to.
+
+        Run after compaction has been committed. Chunks written or reused
+        within gc_grace_seconds are kept, since a recording stores its
+        chunks before its version is committed; this lets collection run
+        while monitoring records new versions.
+
+        Args:
+            db: Database session
+            now: Current time as a timestamp (defaults to now)
+
+        Returns:
+            Number of chunks deleted
+        """
+        referenced: Set[str] = set()
+        for record in db.query(FormVersion).all():
+            if record.is_keyframe:
+                referenced.update(record.manifest)
+            else:
+                referenced.update(op for op in record.manifest if isinstance(op, str))
+
+        grace_cutoff = (now if now is not None else time.time()) - self.gc_grace_seconds
+        deleted = 0
+        for chunk_hash in list(self.chunk_store.iter_hashes()):
+            if chunk_hash in referenced:
+                continue
+            modified_at = self.chunk_store.modified_at(chunk_hash)
+            if modified_at is None or modified_at > grace_cutoff:
+                continue
+            if self.chunk_store.delete(chunk_hash):
+                deleted += 1
+
+        with self._lock:
+            self.stats["chunks_collected"] += deleted
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"keyframe_interval": self.keyframe_interval, "gc_grace_seconds": self.gc_grace_seconds, **self.stats}
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def create_version_history(settings: Optional[Dict[str, Any]] = None,
+                           chunk_store: Optional[SnapshotStore] = None) -> VersionHistory:
+    """
+    Create a version history from monitoring settings.
+
+    Args:
+        settings: monitoring_settings from agencies.yaml
+        chunk_store: Store for chunk bodies (defaults to a "chunks" directory
+            next to the snapshots)
+
+    Returns:
+        Configured VersionHistory
+    """
+    settings = settings or {}
+    if chunk_store is None:
+        root = os.getenv("SNAPSHOT_STORE_PATH", DEFAULT_SNAPSHOT_PATH)
+        chunk_store = SnapshotStore(os.path.join(root, "chunks"))
+    return VersionHistory(
+        chunk_store,
+        keyframe_interval=int(settings.get("version_keyframe_interval", DEFAULT_KEYFRAME_INTERVAL)),
+        gc_grace_seconds=float(settings.get("version_gc_grace_hours", DEFAULT_GC_GRACE_HOURS)) * 3600
+    )
+
+
+def create_retention_policy(settings: Optional[Dict[str, Any]] = None) -> RetentionPolicy:
+    """Create the version retention policy from monitoring settings."""
+    settings = settings or {}
+    defaults = RetentionPolicy()
+    return RetentionPolicy(
+        keep_all_days=int(settings.get("version_retention_full_days", defaults.keep_all_days)),
+        sparse_interval_days=int(settings.get("version_retention_sparse_interval_days", defaults.sparse_interval_days))
+    )
+
+
+# Global version history
+_global_history: Optional[VersionHistory] = None
+_global_lock = threading.Lock()
+
+
+def get_version_history(settings: Optional[Dict[str, Any]] = None) -> VersionHistory:
+    """Get the process-wide version history; settings apply on first use only."""
+    global _global_history
+    with _global_lock:
+        if _global_history is None:
+            _global_history = create_version_history(settings)
+        return _global_history
@@ -2,109 +2,91 @@ import asyncio
 import hashlib
 import logging
 import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple, Any
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Any, Union
 from urllib.parse import urljoin, urlparse
 from contextlib import asynccontextmanager
 import aiohttp
 import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
-from ..database.connection import get_db
+from ..database.connection import SessionLocal, get_db
 from ..database.models import Agency, Form, FormChange, MonitoringRun
 from ..utils.config_loader import load_agency_config, get_monitoring_settings
+from ..utils.html_document import DocumentLink, parse_document
 from .error_handler import get_error_handler, create_retry_config, ErrorContext
+from .rate_limiter import HostRateLimiter, create_host_rate_limiter
+from .fetch_client import SharedFetchClient, get_fetch_client
+from .webdriver_pool import WebDriverPool, create_webdriver_pool
+from .content_fingerprint import create_content_fingerprinter
+from .render_mode import JAVASCRIPT, STATIC, create_render_mode_selector
+from .pdf_extractor import PDF_SUPPORT_AVAILABLE, is_pdf, extract_pdf, find_changed_pages
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_CONTENT_BYTES = 20 * 1024 * 1024  # Largest response body kept in memory
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read and hashed per chunk
 
-class WebDriverPool:
-    """Pool for managing WebDriver instances."""
-    
-    def __init__(self, max_drivers: int = 3):
-        self.max_drivers = max_drivers
-        self.drivers: List[webdriver.Chrome] = []
-        self.available_drivers: List[webdriver.Chrome] = []
-        self._lock = asyncio.Lock()
-    
-    async def get_driver(self) -> Optional[webdriver.Chrome]:
-        """Get an available WebDriver instance."""
-        async with self._lock:
-            if self.available_drivers:
-                return self.available_drivers.pop()
-            
-            if len(self.drivers) < self.max_drivers:
-                driver = self._create_driver()
-                if driver:
-                    self.drivers.append(driver)
-                    return driver
-            
-            return None
+# Link patterns that point at forms and supporting documents, as (label, test)
+FORM_LINK_SELECTORS: List[Tuple[str, Callable[[DocumentLink], bool]]] = [
+    ('a[href*=".pdf"]', lambda link: '.pdf' in link.href),
+    ('a[href*="form"]', lambda link: 'form' in link.href),
+    ('a[href*="report"]', lambda link: 'report' in link.href),
+    ('a[href*="payroll"]', lambda link: 'payroll' in link.href),
+    ('a[href*="prevailing"]', lambda link: 'prevailing' in link.href),
+    ('a[href*="wage"]', lambda link: 'wage' in link.href),
+    ('a[download]', lambda link: link.download is not None)
+]
+
+
+class ContentTooLargeError(Exception):
+    """Raised when a response body exceeds the configured size cap."""
+
+
+@dataclass
+class FetchedBody:
+    """Raw response body, hashed incrementally while it was downloaded."""
+    data: bytes
+    content_hash: str
+    encoding: Optional[str] = None  # Charset declared by the server, if any
     
-    async def return_driver(self, driver: webdriver.Chrome) -> None:
-        """Return a WebDriver instance to the pool."""
-        async with self._lock:
-            if driver in self.drivers and driver not in self.available_drivers:
-                self.available_drivers.append(driver)
+    @property
+    def size(self) -> int:
+        return len(self.data)
     
-    def _create_driver(self) -> Optional[webdriver.Chrome]:
-        """Create a new WebDriver instance."""
+    def text(self) -> str:
+        """Decode the body using the declared charset, falling back to UTF-8."""
         try:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--disable-extensions")
-            chrome_options.add_argument("--disable-plugins")
-            chrome_options.add_argument("--disable-images")
-            chrome_options.add_argument("--disable-javascript")  # Only if not needed
-            chrome_options.add_argument("--user-agent=PayrollMonitor/1.0 (Government Forms Monitoring)")
-            
-            # Use webdriver-manager to handle driver installation
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            driver.set_page_load_timeout(30)
-            driver.implicitly_wait(10)
-            
-            logger.debug("Created new WebDriver instance")
-            return driver
-            
-        except Exception as e:
-            logger.error(f"Failed to create WebDriver: {e}")
-            return None
-    
-    async def cleanup(self) -> None:
-        """Clean up all WebDriver instances."""
-        async with self._lock:
-            for driver in self.drivers:
-                try:
-                    driver.quit()
-                except Exception as e:
-                    logger.error(f"Error closing WebDriver: {e}")
-            
-            self.drivers.clear()
-            self.available_drivers.clear()
-            logger.info("WebDriver pool cleaned up")
+            return self.data.decode(self.encoding or "utf-8", errors="replace")
+        except LookupError:
+            return self.data.decode("utf-8", errors="replace")
 
 
 class WebScraper:
     """Core web scraping class for monitoring government websites."""
     
-    def __init__(self, user_agent: Optional[str] = None, timeout: int = 30, max_retries: int = 3):
+    def __init__(self, user_agent: Optional[str] = None, timeout: int = 30, max_retries: int = 3,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 fetch_client: Optional[SharedFetchClient] = None,
+                 max_content_bytes: int = DEFAULT_MAX_CONTENT_BYTES,
+                 driver_pool: Optional[WebDriverPool] = None):
         self.user_agent = user_agent or "PayrollMonitor/1.0 (Government Forms Monitoring)"
         self.timeout = timeout
         self.max_retries = max_retries
+        self.max_content_bytes = max_content_bytes
         self.session: Optional[aiohttp.ClientSession] = None
-        self.driver_pool = WebDriverPool()
+        self.driver_pool = driver_pool or WebDriverPool()
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.fetch_client = fetch_client or get_fetch_client()
+        
+        # Fetches made during this scraper's run, keyed by URL and baseline, so
+        # forms sharing a page share one request
+        self._fetches: Dict[Tuple, asyncio.Future] = {}
+        self.fetch_stats = {"fetches": 0, "deduplicated": 0}
         
         # Initialize enhanced error handling
         retry_config = create_retry_config(
@@ -118,37 +100,111 @@ class WebScraper:
         
     async def __aenter__(self):
         """Async context manager entry."""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.timeout),
-            headers={"User-Agent": self.user_agent}
-        )
+        # Borrow the process-wide pooled session so connections outlive this scraper
+        self.session = await self.fetch_client.get_session()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self.session:
-            await self.session.close()
+        # The shared session is owned by the fetch client and stays open
+        self.session = None
+        for fetch in self._fetches.values():
+            fetch.cancel()
+        self._fetches.clear()
         await self.driver_pool.cleanup()
     
     async def get_error_statistics(self) -> Dict[str, Any]:
         """Get error handling statistics."""
         return await self.error_handler.get_error_stats()
     
+    def get_connection_pool_metrics(self) -> Dict[str, Any]:
+        """Get metrics for the shared HTTP connection pool."""
+        return self.fetch_client.get_pool_metrics()
+    
     async def reset_error_statistics(self) -> None:
         """Reset error handling statistics."""
         await self.error_handler.reset_stats()
     
-    async def fetch_page_content(self, url: str, use_selenium: bool = False) -> Tuple[str, int, Dict[str, Any]]:
+    def get_rate_limit_statistics(self) -> Dict[str, Any]:
+        """Get per-host concurrency and rate limiting statistics."""
+        return self.rate_limiter.get_stats()
+    
+    def get_fetch_statistics(self) -> Dict[str, Any]:
+        """Get counts of network fetches and fetches served by a shared in-flight request."""
+        return dict(self.fetch_stats)
+    
+    async def fetch_page_content(self, url: str, use_selenium: bool = False,
+                                 validators: Optional[Dict[str, Any]] = None,
+                                 known_hash: Optional[str] = None,
+                                 known_pdf: Optional[Dict[str, Any]] = None) -> Tuple[str, int, Dict[str, Any]]:
         """
         Fetch page content using either aiohttp or Selenium with enhanced error handling.
         
+        aiohttp bodies are streamed and hashed chunk by chunk as raw bytes; the
+        hash is returned in metadata["content_hash"]. PDF bodies are returned as
+        page texts joined with form feeds, with the PDF fingerprint and per-page
+        hashes in metadata["pdf"].
+        
+        Within one scraper run, concurrent or repeated requests for the same URL
+        with the same baseline (validators, known hash and PDF fingerprint) share
+        a single fetch; later callers get metadata["shared_fetch"] set.
+        
         Args:
             url: URL to fetch
             use_selenium: Whether to use Selenium for JavaScript-heavy sites
+            validators: Stored HTTP validators (etag, last_modified) from the last
+                full response. When given, the request is made conditional and an
+                unchanged page comes back as status 304 with empty content.
+                Ignored for Selenium fetches.
+            known_hash: Content hash from the last run. If the downloaded bytes
+                hash to the same value the body is not decoded, and the page
+                comes back with empty content and metadata["unchanged"] set.
+            known_pdf: metadata["pdf"] from the last run. If the PDF fingerprint
+                (size, /ID, ModDate) still matches, text extraction is skipped
+                and the page is reported unchanged.
             
         Returns:
             Tuple of (content, status_code, metadata)
         """
+        key = self._fetch_key(url, use_selenium, validators, known_hash, known_pdf)
+        fetch = self._fetches.get(key)
+        if fetch is None:
+            self.fetch_stats["fetches"] += 1
+            fetch = asyncio.ensure_future(
+                self._fetch_page_content(url, use_selenium, validators, known_hash, known_pdf)
+            )
+            self._fetches[key] = fetch
+            shared = False
+        else:
+            self.fetch_stats["deduplicated"] += 1
+            shared = True
+        
+        # Shielded so one cancelled caller does not cancel the fetch for the others
+        content, status_code, metadata = await asyncio.shield(fetch)
+        metadata = dict(metadata)
+        if shared:
+            metadata["shared_fetch"] = True
+        return content, status_code, metadata
+    
+    @staticmethod
+    def _fetch_key(url: str, use_selenium: bool, validators: Optional[Dict[str, Any]],
+                   known_hash: Optional[str], known_pdf: Optional[Dict[str, Any]]) -> Tuple:
+        validators = validators or {}
+        fingerprint = (known_pdf or {}).get("fingerprint") or {}
+        return (
+            url,
+            use_selenium,
+            validators.get("etag"),
+            validators.get("last_modified"),
+            known_hash,
+            tuple(sorted((str(k), str(v)) for k, v in fingerprint.items()))
+        )
+    
+    async def _fetch_page_content(self, url: str, use_selenium: bool,
+                                  validators: Optional[Dict[str, Any]],
+                                  known_hash: Optional[str],
+                                  known_pdf: Optional[Dict[str, Any]]) -> Tuple[str, int, Dict[str, Any]]:
+        """Perform a single network fetch for fetch_page_content."""
         metadata = {
             "url": url,
             "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -158,10 +214,13 @@ class WebScraper:
         }
         
         try:
-            if use_selenium:
-                return await self._fetch_with_selenium_enhanced(url, metadata)
-            else:
-                return await self._fetch_with_aiohttp_enhanced(url, metadata)
+            # Never exceed the host's in-flight cap or request rate
+            async with self.rate_limiter.limit(url):
+                if use_selenium:
+                    return await self._fetch_with_selenium_enhanced(url, metadata)
+                else:
+                    return await self._fetch_with_aiohttp_enhanced(url, metadata, validators,
+                                                                  known_hash, known_pdf)
                 
         except Exception as e:
             metadata["error"] = str(e)
@@ -192,22 +251,77 @@ class WebScraper:
             metadata["error"] = str(e)
             return "", 0, metadata
     
-    async def _fetch_with_aiohttp_enhanced(self, url: str, metadata: Dict[str, Any]) -> Tuple[str, int, Dict[str, Any]]:
+    async def _read_body(self, response: aiohttp.ClientResponse) -> Optional[FetchedBody]:
+        """
+        Stream a response body, hashing each chunk as it arrives.
+        
+        Raises:
+            ContentTooLargeError: If the body exceeds max_content_bytes
+        """
+        if response.status == 304:
+            return None
+        
+        declared_length = response.content_length
+        if declared_length is not None and declared_length > self.max_content_bytes:
+            raise ContentTooLargeError(
+                f"Content too large: {declared_length} bytes exceeds limit of {self.max_content_bytes}"
+            )
+        
+        digest = hashlib.sha256()
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            if size > self.max_content_bytes:
+                raise ContentTooLargeError(
+                    f"Content too large: body exceeds limit of {self.max_content_bytes} bytes"
+                )
+            digest.update(chunk)
+            chunks.append(chunk)
+        
+        return FetchedBody(b"".join(chunks), digest.hexdigest(), response.charset)
+    
+    async def _fetch_with_aiohttp_enhanced(self, url: str, metadata: Dict[str, Any],
+                                           validators: Optional[Dict[str, Any]] = None,
+                                           known_hash: Optional[str] = None,
+                                           known_pdf: Optional[Dict[str, Any]] = None) -> Tuple[str, int, Dict[str, Any]]:
         """Fetch content using aiohttp with enhanced error handling."""
         if not self.session:
             raise RuntimeError("aiohttp session not initialized")
         
         try:
+            request_kwargs = {
+                "timeout": self.timeout,
+                "headers": {"User-Agent": self.user_agent, **self.build_conditional_headers(validators)},
+                "body_reader": self._read_body
+            }
+            
             # Use enhanced error handler for HTTP requests
             response, error_context = await self.error_handler.handle_http_request(
-                self.session, url, timeout=self.timeout
+                self.session, url, **request_kwargs
             )
             
-            content = await response.text()
+            if response.status == 304:
+                # Page unchanged since the stored validators were issued
+                metadata.update({
+                    "status_code": 304,
+                    "not_modified": True,
+                    "etag": response.headers.get("etag", "") or (validators or {}).get("etag", ""),
+                    "last_modified": (response.headers.get("last-modified", "")
+                                      or (validators or {}).get("last_modified", "")),
+                    "content_length": (validators or {}).get("content_length"),
+                    "final_url": str(response.url),
+                    "response_time": error_context.response_time
+                })
+                return "", 304, metadata
+            
+            body: FetchedBody = error_context.metadata.pop("body")
             metadata.update({
                 "status_code": response.status,
                 "content_type": response.headers.get("content-type", ""),
-                "content_length": len(content),
+                "content_length": body.size,
+                "content_hash": body.content_hash,
+                "etag": response.headers.get("etag", ""),
                 "last_modified": response.headers.get("last-modified", ""),
                 "final_url": str(response.url),
                 "response_time": error_context.response_time,
@@ -218,13 +332,54 @@ class WebScraper:
                     "error_message": error_context.error_message
                 }
             })
-            return content, response.status, metadata
+            
+            if known_hash and body.content_hash == known_hash:
+                # Same bytes as last run - no need to decode or parse
+                metadata["unchanged"] = True
+                return "", response.status, metadata
+            
+            if is_pdf(body.data, metadata["content_type"]):
+                return await self._extract_pdf_content(url, body, response.status, metadata, known_pdf)
+            
+            return body.text(), response.status, metadata
             
         except Exception as e:
             metadata["error"] = str(e)
             metadata["error_handling_failed"] = True
             return "", 0, metadata
     
+    async def _extract_pdf_content(self, url: str, body: FetchedBody, status_code: int,
+                                   metadata: Dict[str, Any],
+                                   known_pdf: Optional[Dict[str, Any]] = None) -> Tuple[str, int, Dict[str, Any]]:
+        """Extract page texts from a PDF body, skipping extraction when its fingerprint is unchanged."""
+        if not PDF_SUPPORT_AVAILABLE:
+            logger.warning(f"pypdf not installed - treating PDF at {url} as text")
+            return body.text(), status_code, metadata
+        
+        try:
+            # Parsing is CPU-bound, keep it off the event loop
+            document = await asyncio.to_thread(extract_pdf, body.data, known_pdf)
+        except Exception as e:
+            logger.warning(f"Could not parse PDF at {url}, treating it as text: {e}")
+            metadata["pdf_error"] = str(e)
+            return body.text(), status_code, metadata
+        
+        if document is None:
+            # Same size, /ID and ModDate as last run
+            metadata.update({"unchanged": True, "pdf": known_pdf})
+            return "", status_code, metadata
+        
+        metadata["pdf"] = document.to_metadata()
+        return document.text, status_code, metadata
+    
+    def _load_page(self, driver, url: str) -> Tuple[str, str]:
+        """Load a page and wait for its body. Blocking - run via driver_pool.run."""
+        driver.get(url)
+        WebDriverWait(driver, self.timeout).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+        return driver.page_source, driver.current_url
+    
     async def _fetch_with_selenium(self, url: str, metadata: Dict[str, Any]) -> Tuple[str, int, Dict[str, Any]]:
         """Fetch content using Selenium for JavaScript-heavy sites (legacy method)."""
         driver = await self.driver_pool.get_driver()
@@ -233,18 +388,13 @@ class WebScraper:
             return "", 0, metadata
         
         try:
-            driver.get(url)
-            
-            # Wait for page to load
-            WebDriverWait(driver, self.timeout).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            content = driver.page_source
+            # WebDriver calls block, so they run on the pool's threads
+            content, current_url = await self.driver_pool.run(self._load_page, driver, url)
+            self.driver_pool.record_page_load(driver)
             metadata.update({
                 "status_code": 200,
                 "content_length": len(content),
-                "current_url": driver.current_url
+                "current_url": current_url
             })
             
             return content, 200, metadata
@@ -266,22 +416,19 @@ class WebScraper:
             return "", 0, metadata
         
         try:
-            # Use enhanced error handler for Selenium operations
+            # Use enhanced error handler for Selenium operations, off the event loop
             def selenium_operation():
-                driver.get(url)
-                WebDriverWait(driver, self.timeout).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-                return driver.page_source
+                return self.driver_pool.run(self._load_page, driver, url)
             
-            content, error_context = await self.error_handler.handle_selenium_operation(
+            (content, current_url), error_context = await self.error_handler.handle_selenium_operation(
                 driver, selenium_operation, url
             )
+            self.driver_pool.record_page_load(driver)
             
             metadata.update({
                 "status_code": 200,
                 "content_length": len(content),
-                "current_url": driver.current_url,
+                "current_url": current_url,
                 "response_time": error_context.response_time,
                 "error_context": {
                     "attempt_number": error_context.attempt_number,
@@ -300,41 +447,64 @@ class WebScraper:
         finally:
             await self.driver_pool.return_driver(driver)
     
-    def extract_form_links(self, content: str, base_url: str) -> List[Dict[str, Any]]:
+    def extract_form_links(self, content: str, base_url: str,
+                           content_hash: Optional[str] = None) -> List[Dict[str, Any]]:
         """Extract form/document links from page content."""
-        soup = BeautifulSoup(content, 'html.parser')
+        document = parse_document(content, content_hash)
         form_links = []
         
-        # Common selectors for form links
-        selectors = [
-            'a[href*=".pdf"]',
-            'a[href*="form"]',
-            'a[href*="report"]',
-            'a[href*="payroll"]',
-            'a[href*="prevailing"]',
-            'a[href*="wage"]',
-            'a[download]'
-        ]
-        
-        for selector in selectors:
-            links = soup.select(selector)
-            for link in links:
-                href = link.get('href')
-                if href:
-                    absolute_url = urljoin(base_url, href)
+        # A link is listed once for every selector it matches, in selector order
+        for selector, matches in FORM_LINK_SELECTORS:
+            for link in document.links:
+                if matches(link):
                     form_links.append({
-                        'url': absolute_url,
-                        'text': link.get_text(strip=True),
-                        'title': link.get('title', ''),
-                        'download': link.get('download', ''),
+                        'url': urljoin(base_url, link.href),
+                        'text': link.text,
+                        'title': link.title,
+                        'download': link.download or '',
                         'selector': selector
                     })
         
         return form_links
     
-    def calculate_content_hash(self, content: str) -> str:
+    @staticmethod
+    def build_conditional_headers(validators: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from stored validators."""
+        headers = {}
+        if not validators:
+            return headers
+        
+        etag = validators.get("etag")
+        if isinstance(etag, str) and etag:
+            headers["If-None-Match"] = etag
+        
+        last_modified = validators.get("last_modified")
+        if isinstance(last_modified, str) and last_modified:
+            headers["If-Modified-Since"] = last_modified
+        
+        return headers
+    
+    @staticmethod
+    def get_form_validators(form: Form) -> Dict[str, Any]:
+        """Get the HTTP validators stored on a form from its last full fetch."""
+        return {
+            "etag": form.http_etag,
+            "last_modified": form.http_last_modified,
+            "content_length": form.http_content_length
+        }
+    
+    @staticmethod
+    def update_form_validators(form: Form, metadata: Dict[str, Any]) -> None:
+        """Store the HTTP validators from a fetch result on the form."""
+        form.http_etag = metadata.get("etag") or None
+        form.http_last_modified = metadata.get("last_modified") or None
+        form.http_content_length = metadata.get("content_length")
+    
+    def calculate_content_hash(self, content: Union[str, bytes]) -> str:
         """Calculate SHA256 hash of content for change detection."""
-        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return hashlib.sha256(content).hexdigest()
     
     def detect_changes(self, old_content: str, new_content: str) -> List[Dict[str, Any]]:
         """Detect changes between old and new content."""
@@ -345,12 +515,12 @@ class WebScraper:
         
         if old_hash != new_hash:
             # Basic change detection - in production, you'd want more sophisticated diff
-            old_soup = BeautifulSoup(old_content, 'html.parser')
-            new_soup = BeautifulSoup(new_content, 'html.parser')
+            old_document = parse_document(old_content, old_hash)
+            new_document = parse_document(new_content, new_hash)
             
             # Check for new forms
-            old_links = self.extract_form_links(old_content, "")
-            new_links = self.extract_form_links(new_content, "")
+            old_links = self.extract_form_links(old_content, "", old_hash)
+            new_links = self.extract_form_links(new_content, "", new_hash)
             
             old_urls = {link['url'] for link in old_links}
             new_urls = {link['url'] for link in new_links}
@@ -373,10 +543,7 @@ class WebScraper:
                 })
             
             # Check for content changes
-            old_text = old_soup.get_text()
-            new_text = new_soup.get_text()
-            
-            if old_text != new_text:
+            if old_document.text != new_document.text:
                 changes.append({
                     'type': 'content_change',
                     'description': "Page content has been modified",
@@ -390,9 +557,13 @@ class WebScraper:
 class AgencyMonitor:
     """High-level monitor for government agencies."""
     
-    def __init__(self):
+    def __init__(self, fetch_client: Optional[SharedFetchClient] = None):
         self.scraper: Optional[WebScraper] = None
+        self.fetch_client = fetch_client
         self.monitoring_settings = get_monitoring_settings()
+        self.rate_limiter = create_host_rate_limiter()
+        self.render_selector = create_render_mode_selector(self.monitoring_settings)
+        self.fingerprinter = create_content_fingerprinter()
         
     async def monitor_agency(self, agency_id: int) -> List[Dict[str, Any]]:
         """Monitor a specific agency for changes."""
@@ -415,23 +586,13 @@ class AgencyMonitor:
             db.commit()
             
             try:
-                async with WebScraper(
-                    timeout=self.monitoring_settings.get('timeout_seconds', 30),
-                    max_retries=self.monitoring_settings.get('retry_attempts', 3)
-                ) as scraper:
+                async with self._create_scraper() as scraper:
                     self.scraper = scraper
                     
-                    # Monitor each form for this agency
-                    for form in agency.forms:
-                        if not form.is_active:
-                            continue
-                            
-                        form_changes = await self._monitor_form(form, db)
+                    # Monitor all active forms for this agency concurrently
+                    active_forms = [form for form in agency.forms if form.is_active]
+                    async for form, form_changes in self._iter_form_results(active_forms, db):
                         changes_detected.extend(form_changes)
-                        
-                        # Update form's last checked time
-                        form.last_checked = datetime.now(timezone.utc)
-                        db.commit()
                 
                 # Update monitoring run
                 run.completed_at = datetime.now(timezone.utc)
@@ -441,46 +602,178 @@ class AgencyMonitor:
                 
             except Exception as e:
                 logger.error(f"Error monitoring agency {agency.name}: {e}")
+                db.rollback()
                 run.status = "failed"
                 run.error_message = str(e)
                 db.commit()
         
         return changes_detected
     
+    def _create_scraper(self) -> WebScraper:
+        """Create a scraper configured from the monitoring settings."""
+        return WebScraper(
+            timeout=self.monitoring_settings.get('timeout_seconds', 30),
+            max_retries=self.monitoring_settings.get('retry_attempts', 3),
+            rate_limiter=self.rate_limiter,
+            max_content_bytes=int(self.monitoring_settings.get('max_content_bytes', DEFAULT_MAX_CONTENT_BYTES)),
+            driver_pool=create_webdriver_pool(self.monitoring_settings),
+            fetch_client=self.fetch_client
+        )
+    
+    async def _iter_form_results(self, forms: List[Form], db) -> AsyncIterator[Tuple[Form, List[Dict[str, Any]]]]:
+        """
+        Monitor forms with bounded concurrency, yielding results as they complete.
+        
+        All forms are scheduled at once; the number in flight is capped by the
+        max_concurrent_forms setting, and per-host politeness is enforced by the
+        scraper's rate limiter. Each form's runs and changes are written through
+        a session of its own and committed as soon as the form finishes, so a
+        form whose results cannot be saved is rolled back alone and reported
+        without changes. The form's last checked time is then committed on db.
+        
+        Args:
+            forms: Forms to monitor
+            db: Database session the forms were loaded from
+            
+        Yields:
+            Tuples of (form, detected changes) in completion order
+        """
+        max_concurrent = int(self.monitoring_settings.get('max_concurrent_forms', 25))
+        semaphore = asyncio.Semaphore(max(max_concurrent, 1))
+        
+        async def run_form(form: Form) -> Tuple[Form, List[Dict[str, Any]]]:
+            async with semaphore:
+                form_db = self._open_form_session(db)
+                try:
+                    changes = await self._monitor_form(form, form_db)
+                    form_db.commit()
+                    return form, changes
+                except Exception as e:
+                    logger.error(f"Error saving results for form {form.name}: {e}")
+                    form_db.rollback()
+                    return form, []
+                finally:
+                    form_db.close()
+        
+        tasks = [asyncio.create_task(run_form(form), name=f"monitor_form_{form.id}") for form in forms]
+        try:
+            for next_completed in asyncio.as_completed(tasks):
+                form, form_changes = await next_completed
+                form.last_checked = datetime.now(timezone.utc)
+                try:
+                    db.commit()
+                except Exception as e:
+                    logger.error(f"Error updating last checked time for form {form.name}: {e}")
+                    db.rollback()
+                yield form, form_changes
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    @staticmethod
+    def _open_form_session(db):
+        """Open a session for one form's results on the same database as db."""
+        return SessionLocal(bind=db.get_bind())
+    
     async def _monitor_form(self, form: Form, db) -> List[Dict[str, Any]]:
         """Monitor a specific form for changes."""
         changes = []
         
         try:
-            # Determine if we need Selenium based on form characteristics
-            use_selenium = self._should_use_selenium(form)
+            url = form.form_url or form.agency.base_url
+            
+            # Only render in Chrome where a previous probe showed it changes the content
+            render_decision = self.render_selector.get_decision(db, url)
+            use_selenium = self.render_selector.should_render(render_decision)
+            
+            # Get the last monitoring run for this form
+            last_run = db.query(MonitoringRun).filter(
+                MonitoringRun.form_id == form.id
+            ).order_by(MonitoringRun.started_at.desc()).first()
+            
+            # Only send validators when there is a baseline hash to fall back on
+            validators = None
+            if last_run and last_run.content_hash:
+                validators = self.scraper.get_form_validators(form)
             
-            # Fetch current content
+            # Fetch current content; bytes matching the last hash are never decoded
             content, status_code, metadata = await self.scraper.fetch_page_content(
-                form.form_url or form.agency.base_url,
-                use_selenium=use_selenium
+                url,
+                use_selenium=use_selenium,
+                validators=validators,
+                known_hash=last_run.content_hash if last_run else None,
+                known_pdf=last_run.pdf_metadata if last_run else None
             )
             
+            if status_code == 304:
+                # Not modified - skip hashing and change detection entirely
+                logger.debug(f"{form.name} not modified since last check")
+                form_run = MonitoringRun(
+                    agency_id=form.agency_id,
+                    form_id=form.id,
+                    status="completed",
+                    completed_at=datetime.now(timezone.utc),
+                    content_hash=last_run.content_hash if last_run else None,
+                    content_fingerprint=last_run.content_fingerprint if last_run else None,
+                    http_status_code=status_code,
+                    response_time_ms=int(metadata.get('response_time_ms', 0)),
+                    pdf_metadata=last_run.pdf_metadata if last_run else None
+                )
+                db.add(form_run)
+                return changes
+            
             if status_code != 200:
                 logger.warning(f"Failed to fetch {form.name}: HTTP {status_code}")
                 return changes
             
-            # Calculate content hash
-            content_hash = self.scraper.calculate_content_hash(content)
-            
-            # Get the last monitoring run for this form
-            last_run = db.query(MonitoringRun).filter(
-                MonitoringRun.form_id == form.id
-            ).order_by(MonitoringRun.started_at.desc()).first()
+            pdf_metadata = metadata.get('pdf')
+            switched_to_rendering = False
+            if (not use_selenium and not pdf_metadata and not metadata.get('unchanged')
+                    and self.render_selector.needs_probe(render_decision)):
+                content, switched_to_rendering = await self._probe_render_mode(url, content, db)
             
-            if last_run and last_run.content_hash:
-                # Compare with previous content
-                if last_run.content_hash != content_hash:
+            # Reuse the hash computed while streaming and remember validators for the next check
+            if switched_to_rendering:
+                content_hash = self.scraper.calculate_content_hash(content)
+            else:
+                content_hash = metadata.get('content_hash') or self.scraper.calculate_content_hash(content)
+            if not use_selenium:
+                self.scraper.update_form_validators(form, metadata)
+            
+            # PDFs are compared page by page instead
+            content_fingerprint = None
+            if metadata.get('unchanged'):
+                content_fingerprint = last_run.content_fingerprint
+            elif not pdf_metadata:
+                content_fingerprint = self.fingerprinter.fingerprint_for_agency(content, form.agency.name)
+            
+            if switched_to_rendering:
+                # Rendered content is not comparable with the static baseline
+                logger.info(f"{form.name} now monitored with rendering - resetting baseline")
+            elif last_run and last_run.content_hash and not metadata.get('unchanged'):
+                # Compare with previous content, page by page for PDFs
+                changed_pages = None
+                previous_pdf = last_run.pdf_metadata
+                if pdf_metadata and isinstance(previous_pdf, dict) and previous_pdf.get('page_hashes') is not None:
+                    changed_pages = find_changed_pages(previous_pdf['page_hashes'], pdf_metadata['page_hashes'])
+                    content_changed = bool(changed_pages)
+                else:
+                    content_changed = last_run.content_hash != content_hash
+                    if content_changed and content_fingerprint and last_run.content_fingerprint == content_fingerprint:
+                        # Only tokens, timestamps or page chrome changed
+                        logger.debug(f"{form.name} raw content changed but fingerprint did not")
+                        content_changed = False
+                
+                if content_changed:
                     # Content has changed - create change record
+                    description = "Form content has been modified"
+                    if changed_pages:
+                        description += f" (pages {', '.join(str(page) for page in changed_pages)})"
                     change = FormChange(
                         form_id=form.id,
                         change_type="content",
-                        change_description="Form content has been modified",
+                        change_description=description,
                         new_value=content_hash,
                         old_value=last_run.content_hash,
                         change_hash=content_hash,
@@ -491,8 +784,9 @@ class AgencyMonitor:
                         'form_id': form.id,
                         'form_name': form.name,
                         'change_type': 'content',
-                        'description': 'Form content has been modified',
-                        'severity': change.severity
+                        'description': description,
+                        'severity': change.severity,
+                        'changed_pages': changed_pages
                     })
             
             # Create new monitoring run for this form
@@ -502,8 +796,10 @@ class AgencyMonitor:
                 status="completed",
                 completed_at=datetime.now(timezone.utc),
                 content_hash=content_hash,
+                content_fingerprint=content_fingerprint,
                 http_status_code=status_code,
-                response_time_ms=int(metadata.get('response_time_ms', 0))
+                response_time_ms=int(metadata.get('response_time_ms', 0)),
+                pdf_metadata=pdf_metadata
             )
             db.add(form_run)
             
@@ -523,18 +819,31 @@ class AgencyMonitor:
         
         return changes
     
-    def _should_use_selenium(self, form: Form) -> bool:
-        """Determine if Selenium should be used for this form."""
-        # Use Selenium for forms that likely have JavaScript
-        selenium_indicators = [
-            'portal', 'dynamic', 'javascript', 'spa', 'react', 'angular'
-        ]
+    async def _probe_render_mode(self, url: str, content: str, db) -> Tuple[str, bool]:
+        """
+        Check a static fetch for JavaScript dependence and remember the outcome.
+        
+        Chrome is only launched when the static HTML shows a JavaScript signal.
         
-        form_url = form.form_url or form.agency.base_url
-        form_name = form.name.lower()
+        Returns:
+            Tuple of (content to monitor, whether it is the rendered content)
+        """
+        signal = self.render_selector.detect_js_signals(content)
+        if not signal:
+            self.render_selector.record(db, url, STATIC, "no javascript signals")
+            return content, False
         
-        return any(indicator in form_url.lower() or indicator in form_name 
-                  for indicator in selenium_indicators)
+        rendered, status_code, _ = await self.scraper.fetch_page_content(url, use_selenium=True)
+        if status_code != 200 or not rendered:
+            # Undecided - try again on the next check
+            logger.warning(f"Could not render {url} to check for JavaScript dependence")
+            return content, False
+        
+        mode, reason, static_length, rendered_length = self.render_selector.decide(content, rendered, signal)
+        self.render_selector.record(db, url, mode, reason, static_length, rendered_length)
+        if mode == JAVASCRIPT:
+            return rendered, True
+        return content, False
     
     def _determine_severity(self, form: Form, new_hash: str, old_hash: str) -> str:
         """Determine the severity of a change."""
@@ -547,20 +856,66 @@ class AgencyMonitor:
             return 'low'
     
     async def monitor_all_agencies(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Monitor all active agencies."""
+        """
+        Monitor all active agencies.
+        
+        Every active form across all agencies is scheduled at once, so a full
+        sweep takes roughly as long as the slowest host rather than the sum of
+        every request. Each agency's monitoring run is completed as soon as its
+        last form finishes.
+        """
         results = {}
         
         with get_db() as db:
             agencies = db.query(Agency).filter(Agency.is_active == True).all()
             
+            runs = {}
+            pending_forms = {}
+            forms = []
             for agency in agencies:
-                try:
-                    changes = await self.monitor_agency(agency.id)
-                    results[agency.name] = changes
-                    logger.info(f"Completed monitoring {agency.name}: {len(changes)} changes detected")
-                except Exception as e:
-                    logger.error(f"Failed to monitor {agency.name}: {e}")
-                    results[agency.name] = []
+                results[agency.name] = []
+                runs[agency.id] = MonitoringRun(agency_id=agency.id, status="running")
+                db.add(runs[agency.id])
+                
+                active_forms = [form for form in agency.forms if form.is_active]
+                pending_forms[agency.id] = len(active_forms)
+                forms.extend(active_forms)
+            db.commit()
+            
+            def complete_run(agency: Agency) -> None:
+                run = runs[agency.id]
+                run.completed_at = datetime.now(timezone.utc)
+                run.status = "completed"
+                run.changes_detected = len(results[agency.name])
+                db.commit()
+                logger.info(f"Completed monitoring {agency.name}: {len(results[agency.name])} changes detected")
+            
+            # Agencies without active forms are complete immediately
+            for agency in agencies:
+                if pending_forms[agency.id] == 0:
+                    complete_run(agency)
+            
+            try:
+                async with self._create_scraper() as scraper:
+                    self.scraper = scraper
+                    
+                    async for form, form_changes in self._iter_form_results(forms, db):
+                        agency = form.agency
+                        results[agency.name].extend(form_changes)
+                        pending_forms[agency.id] -= 1
+                        if pending_forms[agency.id] == 0:
+                            complete_run(agency)
+                    
+                    logger.info(f"Monitoring sweep fetch statistics: {scraper.get_fetch_statistics()}")
+                            
+            except Exception as e:
+                logger.error(f"Failed to complete monitoring sweep: {e}")
+                db.rollback()
+                for run in runs.values():
+                    if run.status == "running":
+                        run.status = "failed"
+                        run.error_message = str(e)
+                db.commit()
         
         return results
 
@@ -0,0 +1,317 @@
+"""
+Selenium WebDriver Pool for JavaScript-Heavy Government Websites
+
+Headless Chrome instances are expensive to start and every WebDriver call
+blocks, so this pool:
+
+- queues callers until a driver is free (with a timeout) instead of failing
+  when all drivers are busy,
+- runs every blocking WebDriver call on a dedicated thread pool so the
+  monitoring event loop keeps serving other fetches,
+- recycles drivers after a number of page loads or once the browser grows
+  past a memory threshold, and
+- resolves the chromedriver binary once per process instead of on every
+  driver start.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, TypeVar
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_driver_path: Optional[str] = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_chromedriver_path(configured_path: Optional[str] = None) -> str:
+    """
+    Resolve the chromedriver binary once per process.
+
+    Args:
+        configured_path: Explicit path to use instead of webdriver-manager.
+            CHROMEDRIVER_PATH is used when not given.
+
+    Returns:
+        Filesystem path to the chromedriver binary
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            path = configured_path or os.getenv('CHROMEDRIVER_PATH')
+            if not path:
+                # Network lookup and download, so only ever done once
+                path = ChromeDriverManager().install()
+            _driver_path = path
+            logger.info(f"Using chromedriver at {_driver_path}")
+        return _driver_path
+
+
+@dataclass
+class WebDriverPoolConfig:
+    """Settings for the Selenium driver pool."""
+    max_drivers: int = 3
+    acquire_timeout: float = 60.0  # Seconds to wait for a free driver
+    max_pages_per_driver: int = 50  # Recycle after this many page loads, 0 disables
+    max_memory_mb: int = 1024  # Recycle when the browser uses more than this, 0 disables
+    page_load_timeout: int = 30
+    user_agent: str = "PayrollMonitor/1.0 (Government Forms Monitoring)"
+    driver_path: Optional[str] = None
+
+
+class PooledDriver:
+    """A WebDriver together with its usage counters."""
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.pages_loaded = 0
+
+
+class WebDriverPool:
+    """Pool for managing WebDriver instances."""
+
+    def __init__(self, max_drivers: int = 3, config: Optional[WebDriverPoolConfig] = None):
+        self.config = config or WebDriverPoolConfig(max_drivers=max_drivers)
+        self.max_drivers = self.config.max_drivers
+        self.drivers: List[webdriver.Chrome] = []
+        self.available_drivers: List[webdriver.Chrome] = []
+        self._pooled: Dict[int, PooledDriver] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = asyncio.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {
+            "drivers_created": 0,
+            "drivers_recycled": 0,
+            "acquire_timeouts": 0,
+            "total_wait_seconds": 0.0
+        }
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # One thread per driver so a slow page never starves the others
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_drivers,
+                thread_name_prefix="webdriver"
+            )
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_drivers)
+        return self._slots
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking WebDriver call on the pool's thread pool.
+
+        Args:
+            func: Blocking callable
+            *args: Arguments for the callable
+
+        Returns:
+            The callable's result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args))
+
+    async def get_driver(self, timeout: Optional[float] = None) -> Optional[webdriver.Chrome]:
+        """
+        Get a WebDriver instance, waiting for one to be returned if all are busy.
+
+        Args:
+            timeout: Seconds to wait for a free driver. Defaults to the pool's
+                acquire_timeout.
+
+        Returns:
+            WebDriver instance, or None if none became free in time or one
+            could not be started
+        """
+        timeout = self.config.acquire_timeout if timeout is None else timeout
+        slots = self._get_slots()
+        loop = asyncio.get_running_loop()
+        wait_start = loop.time()
+
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.stats["acquire_timeouts"] += 1
+            logger.warning(f"No WebDriver became available within {timeout}s")
+            return None
+        self.stats["total_wait_seconds"] += loop.time() - wait_start
+
+        async with self._lock:
+            if self.available_drivers:
+                return self.available_drivers.pop()
+
+        driver = await self.run(self._create_driver)
+        if driver is None:
+            slots.release()
+            return None
+
+        async with self._lock:
+            self.drivers.append(driver)
+            self._pooled[id(driver)] = PooledDriver(driver)
+            self.stats["drivers_created"] += 1
+        return driver
+
+    async def return_driver(self, driver: webdriver.Chrome) -> None:
+        """Return a WebDriver instance to the pool, recycling it if it is worn out."""
+        async with self._lock:
+            if driver not in self.drivers or driver in self.available_drivers:
+                return
+            pooled = self._pooled.get(id(driver))
+            recycle = pooled is not None and self._should_recycle(pooled)
+            if recycle:
+                self.drivers.remove(driver)
+                self._pooled.pop(id(driver), None)
+            else:
+                self.available_drivers.append(driver)
+
+        if recycle:
+            self.stats["drivers_recycled"] += 1
+            await self.run(self._quit_driver, driver)
+        self._get_slots().release()
+
+    @asynccontextmanager
+    async def driver(self, timeout: Optional[float] = None) -> AsyncIterator[Optional[webdriver.Chrome]]:
+        """Borrow a driver for the duration of the block."""
+        driver = await self.get_driver(timeout)
+        try:
+            yield driver
+        finally:
+            if driver is not None:
+                await self.return_driver(driver)
+
+    def record_page_load(self, driver: webdriver.Chrome) -> None:
+        """Count a page load against a driver's recycling budget."""
+        pooled = self._pooled.get(id(driver))
+        if pooled is not None:
+            pooled.pages_loaded += 1
+
+    def _should_recycle(self, pooled: PooledDriver) -> bool:
+        max_pages = self.config.max_pages_per_driver
+        if max_pages and pooled.pages_loaded >= max_pages:
+            logger.debug(f"Recycling WebDriver after {pooled.pages_loaded} pages")
+            return True
+
+        if self.config.max_memory_mb:
+            memory_mb = self._get_driver_memory_mb(pooled.driver)
+            if memory_mb is not None and memory_mb > self.config.max_memory_mb:
+                logger.debug(f"Recycling WebDriver using {memory_mb:.0f} MB")
+                return True
+
+        return False
+
+    @staticmethod
+    def _get_driver_memory_mb(driver: webdriver.Chrome) -> Optional[float]:
+        """Resident memory of the chromedriver process and its browser children."""
+        if not PSUTIL_AVAILABLE:
+            return None
+        try:
+            process = psutil.Process(driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except Exception:
+            return None
+
+    def _create_driver(self) -> Optional[webdriver.Chrome]:
+        """Create a new WebDriver instance."""
+        try:
+            chrome_options = Options()
+            chrome_options.add_argument("--headless")
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--disable-dev-shm-usage")
+            chrome_options.add_argument("--disable-gpu")
+            chrome_options.add_argument("--disable-extensions")
+            chrome_options.add_argument("--disable-plugins")
+            chrome_options.add_argument("--disable-images")
+            chrome_options.add_argument(f"--user-agent={self.config.user_agent}")
+
+            service = Service(resolve_chromedriver_path(self.config.driver_path))
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+            driver.set_page_load_timeout(self.config.page_load_timeout)
+            driver.implicitly_wait(10)
+
+            logger.debug("Created new WebDriver instance")
+            return driver
+
+        except Exception as e:
+            logger.error(f"Failed to create WebDriver: {e}")
+            return None
+
+    @staticmethod
+    def _quit_driver(driver: webdriver.Chrome) -> None:
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.error(f"Error closing WebDriver: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool usage statistics."""
+        return {
+            "max_drivers": self.max_drivers,
+            "drivers": len(self.drivers),
+            "available_drivers": len(self.available_drivers),
+            **self.stats
+        }
+
+    async def cleanup(self) -> None:
+        """Clean up all WebDriver instances."""
+        async with self._lock:
+            drivers = list(self.drivers)
+            self.drivers.clear()
+            self.available_drivers.clear()
+            self._pooled.clear()
+            # Callers still waiting get fresh slots once the pool is reused
+            self._slots = None
+
+        if drivers:
+            await self.run(lambda: [self._quit_driver(driver) for driver in drivers])
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        logger.info("WebDriver pool cleaned up")
+
+
+def create_webdriver_pool(settings: Optional[Dict[str, Any]] = None) -> WebDriverPool:
+    """
+    Create a WebDriver pool from monitoring settings.
+
+    Args:
+        settings: Monitoring settings dictionary
+
+    Returns:
+        Configured WebDriverPool
+    """
+    settings = settings or {}
+    defaults = WebDriverPoolConfig()
+    config = WebDriverPoolConfig(
+        max_drivers=int(settings.get('selenium_max_drivers', defaults.max_drivers)),
+        acquire_timeout=float(settings.get('selenium_acquire_timeout_seconds', defaults.acquire_timeout)),
+        max_pages_per_driver=int(settings.get('selenium_max_pages_per_driver', defaults.max_pages_per_driver)),
+        max_memory_mb=int(settings.get('selenium_max_memory_mb', defaults.max_memory_mb)),
+        page_load_timeout=int(settings.get('timeout_seconds', defaults.page_load_timeout)),
+        user_agent=settings.get('user_agent', defaults.user_agent),
+        driver_path=settings.get('chromedriver_path')
+    )
+    return WebDriverPool(config=config)
@@ -5,7 +5,6 @@ This module extends the existing monitoring scheduler with AI-enhanced capabilit
 and improved frequency management for daily/weekly monitoring based on form requirements.
 """
 
-import asyncio
 import logging
 import schedule
 import time
@@ -17,6 +16,7 @@ import threading
 from ..database.connection import get_db
 from ..database.models import Agency, Form, MonitoringRun, FormChange
 from ..monitors.ai_enhanced_monitor import AIEnhancedMonitor, monitor_agency_with_ai
+from ..monitors.fetch_client import run_monitoring_coroutine
 from ..notifications.notifier import NotificationManager
 from ..utils.config_loader import get_monitoring_settings
 
@@ -197,16 +197,11 @@ class EnhancedMonitoringScheduler:
         start_time = time.time()
         
         try:
-            # Run the async AI monitoring function
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            result = loop.run_until_complete(
+            # Run on the shared monitoring loop so pooled connections are reused between jobs
+            result = run_monitoring_coroutine(
                 self._ai_monitor_single_form(agency_id, form_id, frequency)
             )
             
-            loop.close()
-            
             # Update statistics
             processing_time = int((time.time() - start_time) * 1000)
             self._update_stats(True, processing_time, result)
@@ -533,10 +528,7 @@ class EnhancedMonitoringScheduler:
         # Add AI service health if available
         if self.ai_monitor.analysis_service:
             try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                ai_health = loop.run_until_complete(self.ai_monitor.get_service_health())
-                loop.close()
+                ai_health = run_monitoring_coroutine(self.ai_monitor.get_service_health())
                 status["ai_service_health"] = ai_health
             except Exception as e:
                 status["ai_service_health"] = {"error": str(e)}
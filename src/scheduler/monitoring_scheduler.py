@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import schedule
 import time
@@ -10,6 +9,9 @@ import threading
 from src.database.connection import get_db
 from src.database.models import Agency, Form, MonitoringRun, FormChange, Notification
 from src.monitors.web_scraper import AgencyMonitor
+from src.analysis.llm_cache import get_llm_cache
+from src.monitors.version_history import create_retention_policy, get_version_history
+from src.monitors.fetch_client import get_fetch_client, run_monitoring_coroutine
 from src.notifications.notifier import NotificationManager
 from src.utils.config_loader import get_monitoring_settings
 
@@ -126,16 +128,11 @@ class MonitoringScheduler:
     def _monitor_form_wrapper(self, agency_id: int, form_id: int):
         """Wrapper to run async monitoring in the scheduler."""
         try:
-            # Run the async monitoring function
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            result = loop.run_until_complete(
+            # Run on the shared monitoring loop so pooled connections are reused between jobs
+            result = run_monitoring_coroutine(
                 self._monitor_single_form(agency_id, form_id)
             )
             
-            loop.close()
-            
             logger.info(f"Scheduled monitoring completed for agency {agency_id}, form {form_id}")
             return result
             
@@ -155,7 +152,9 @@ class MonitoringScheduler:
             logger.info(f"Monitoring {agency.name} - {form.name}")
             
             # Monitor the specific form
-            changes = await self.monitor._monitor_form(form, db)
+            async with self.monitor._create_scraper() as scraper:
+                self.monitor.scraper = scraper
+                changes = await self.monitor._monitor_form(form, db)
             
             # Send notifications for any changes detected
             if changes:
@@ -308,8 +307,27 @@ class MonitoringScheduler:
                     
                     logger.info(f"Cleaned up {old_notifications} old notifications")
                 
+                # Thin out old form versions into sparser keyframes
+                history = get_version_history(self.monitoring_settings)
+                compacted = history.compact_all(db, create_retention_policy(self.monitoring_settings))
+                if compacted["removed"] > 0:
+                    logger.info(f"Compacted version history: removed {compacted['removed']} versions "
+                                f"across {compacted['forms']} forms")
+                
                 db.commit()
                 
+            # Chunks are only unreferenced once the compaction is committed
+            with get_db() as db:
+                collected = history.collect_garbage(db)
+                if collected > 0:
+                    logger.info(f"Removed {collected} unreferenced version history chunks")
+            
+            llm_cache = get_llm_cache()
+            if llm_cache is not None:
+                purged = llm_cache.purge_expired()
+                if purged > 0:
+                    logger.info(f"Removed {purged} expired LLM classifications")
+                
         except Exception as e:
             logger.error(f"Error during data cleanup: {e}")
     
@@ -351,6 +369,7 @@ class MonitoringScheduler:
         return {
             'running': self.running,
             'scheduled_jobs': len(schedule.jobs),
+            'connection_pool': get_fetch_client().get_pool_metrics(),
             'next_run': schedule.next_run() if schedule.jobs else None,
             'job_details': [
                 {
@@ -0,0 +1,152 @@
+"""
+Memory-Bounded LRU Cache
+
+Dictionary-style cache for long-running services that must not grow without
+limit. Entries are evicted least-recently-used first once the approximate
+size of all cached values exceeds a byte budget (or an entry limit), and
+optionally expire after a time-to-live. Hit, miss, eviction and expiry
+counters are kept for health reporting.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+def approximate_size(value: Any) -> int:
+    """
+    Rough memory footprint of a cached value in bytes.
+
+    Strings and bytes are measured exactly; pydantic models by the length of
+    their JSON form, which tracks the size of the text they hold.
+    """
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if hasattr(value, "model_dump_json"):
+        return len(value.model_dump_json())
+    return sys.getsizeof(value)
+
+
+class BoundedCache:
+    """Thread-safe LRU cache bounded by total value size, entry count and age."""
+
+    def __init__(self,
+                 max_bytes: int,
+                 max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None,
+                 sizer: Callable[[Any], int] = approximate_size):
+        """
+        Args:
+            max_bytes: Budget for the approximate size of all values
+            max_entries: Optional cap on the number of entries
+            ttl_seconds: Entries older than this are treated as missing
+            sizer: Function estimating the size of a value in bytes
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sizer = sizer
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()  # key -> (value, size, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it recently used; expired entries count as misses."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.stats["misses"] += 1
+                return default
+            if self._expired(entry[2]):
+                self._remove(key)
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries to stay within budget."""
+        size = self.sizer(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                # Would evict everything else and still not fit
+                self.stats["evictions"] += 1
+                return
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while self._bytes > self.max_bytes or (
+                self.max_entries is not None and len(self._entries) > self.max_entries
+            ):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats["evictions"] += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries[key][0]
+            self._remove(key)
+            return value
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        if self.pop(key, _MISSING) is _MISSING:
+            raise KeyError(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Membership test; does not count as a hit or refresh recency."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry[2])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                **self.stats
+            }
@@ -3,6 +3,7 @@ import yaml
 import logging
 from typing import Dict, List, Optional, Any
 from pathlib import Path
+from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,20 @@ OPTIONAL_ENV_VARS = {
     'DB_POOL_TIMEOUT': '30',
     'DB_POOL_RECYCLE': '3600',
     'DB_ECHO': 'false',
+    'ERROR_STATE_DB': './data/monitor_state.db',
+    'SNAPSHOT_STORE_PATH': './data/snapshots',
+    'EMBEDDING_CACHE_PATH': './data/embeddings',
+    'ANALYSIS_WORKERS': '2',
+    'ANALYSIS_QUEUE_DEPTH': '16',
+    'LLM_MAX_CONCURRENCY': '4',
+    'LLM_REQUESTS_PER_MINUTE': '500',
+    'LLM_TOKENS_PER_MINUTE': '90000',
+    'LLM_MAX_RETRIES': '5',
+    'LLM_CACHE_PATH': './data/llm_cache.db',
+    'LLM_CACHE_TTL_DAYS': '30',
+    'LLM_PROMPT_TOKEN_BUDGET': '1500',
+    'LLM_BATCH_MAX_ITEMS': '8',
+    'LLM_BATCH_TOKEN_BUDGET': '6000',
     'LOG_LEVEL': 'INFO',
     'MONITORING_TIMEOUT': '30',
     'RETRY_ATTEMPTS': '3'
@@ -194,6 +209,104 @@ def get_monitoring_settings(config: Optional[Dict] = None) -> Dict[str, Any]:
     return {**default_settings, **config_settings}
 
 
+def get_host_rate_limits(config: Optional[Dict] = None) -> Dict[str, Any]:
+    """
+    Get per-host concurrency and request rate limits.
+    
+    Defaults come from monitoring_settings (host_max_concurrent,
+    host_requests_per_second, host_burst). An agency may override them with a
+    rate_limit block, which applies to every host referenced by the agency's
+    base URL, prevailing wage URL and form URLs.
+    
+    Args:
+        config: Configuration dictionary (optional)
+        
+    Returns:
+        Dictionary with 'default' limits and a 'hosts' mapping of host to limits
+    """
+    if config is None:
+        config = load_agency_config()
+    
+    monitoring_settings = get_monitoring_settings(config)
+    default_limits = {
+        'max_concurrent': int(monitoring_settings.get('host_max_concurrent', 2)),
+        'requests_per_second': float(monitoring_settings.get('host_requests_per_second', 1.0)),
+        'burst': int(monitoring_settings.get('host_burst', 2))
+    }
+    
+    host_limits = {}
+    agencies = {**get_federal_agencies(config), **get_state_agencies(config)}
+    for agency_data in agencies.values():
+        rate_limit = agency_data.get('rate_limit')
+        if not rate_limit:
+            continue
+        
+        limits = {key: type(default)(rate_limit.get(key, default)) for key, default in default_limits.items()}
+        urls = [agency_data.get('base_url'), agency_data.get('prevailing_wage_url')]
+        for form in agency_data.get('forms', []):
+            urls.extend(form.get(key) for key in ('url', 'form_url', 'instructions_url'))
+        
+        for url in urls:
+            host = urlparse(url).hostname if url else None
+            if host:
+                host_limits[host.lower()] = limits
+    
+    return {'default': default_limits, 'hosts': host_limits}
+
+
+def get_analysis_thresholds(config: Optional[Dict] = None) -> Dict[str, Any]:
+    """
+    Get the thresholds at which each tier of the change analysis cascade stops.
+
+    Defaults come from the analysis_thresholds block in monitoring_settings.
+    An agency may override any of them with its own analysis_thresholds block.
+
+    Args:
+        config: Configuration dictionary (optional)
+
+    Returns:
+        Dictionary with 'default' thresholds and an 'agencies' mapping of
+        agency name to thresholds
+    """
+    if config is None:
+        config = load_agency_config()
+
+    default_thresholds = dict(get_monitoring_settings(config).get('analysis_thresholds') or {})
+
+    agency_thresholds = {}
+    agencies = {**get_federal_agencies(config), **get_state_agencies(config)}
+    for agency_data in agencies.values():
+        overrides = agency_data.get('analysis_thresholds')
+        if agency_data.get('name') and overrides:
+            agency_thresholds[agency_data['name']] = {**default_thresholds, **overrides}
+
+    return {'default': default_thresholds, 'agencies': agency_thresholds}
+
+
+def get_content_selectors(config: Optional[Dict] = None) -> Dict[str, str]:
+    """
+    Get the CSS selectors that locate each agency's main page content.
+
+    An agency may set content_selector to limit change detection to part of
+    its pages (for example "main" or "#content").
+
+    Args:
+        config: Configuration dictionary (optional)
+
+    Returns:
+        Dictionary mapping agency name to CSS selector
+    """
+    if config is None:
+        config = load_agency_config()
+
+    agencies = {**get_federal_agencies(config), **get_state_agencies(config)}
+    return {
+        agency_data['name']: agency_data['content_selector']
+        for agency_data in agencies.values()
+        if agency_data.get('name') and agency_data.get('content_selector')
+    }
+
+
 def get_notification_settings(config: Optional[Dict] = None) -> Dict[str, Any]:
     """
     Get notification configuration settings.
@@ -305,6 +418,9 @@ def validate_config(config: Dict[str, Any]) -> List[str]:
             if field not in agency_data:
                 errors.append(f"Federal agency '{agency_key}' missing required field: {field}")
         
+        if 'rate_limit' in agency_data and not isinstance(agency_data['rate_limit'], dict):
+            errors.append(f"Federal agency '{agency_key}' rate_limit must be a dictionary")
+        
         # Validate forms if present
         forms = agency_data.get('forms', [])
         if not isinstance(forms, list):
@@ -328,6 +444,9 @@ def validate_config(config: Dict[str, Any]) -> List[str]:
             if field not in state_data:
                 errors.append(f"State agency '{state_key}' missing required field: {field}")
         
+        if 'rate_limit' in state_data and not isinstance(state_data['rate_limit'], dict):
+            errors.append(f"State agency '{state_key}' rate_limit must be a dictionary")
+        
         # Validate forms if present
         forms = state_data.get('forms', [])
         if not isinstance(forms, list):
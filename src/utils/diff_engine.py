@@ -0,0 +1,267 @@
+"""
+Line Diff Engine
+
+difflib's SequenceMatcher looks for the longest matching block at every level
+of its recursion, which goes quadratic on long documents full of repeated
+lines (table rows, blank lines, boilerplate), and every consumer used to diff
+the same pair again. This engine compares sequences of hashable items -
+usually lines interned to integers - the way patience diff does:
+
+1. Common leading and trailing items are matched directly.
+2. Items that occur exactly once on both sides are matched in the longest
+   order-preserving run, which splits the rest into small gaps.
+3. Gaps without such anchors are diffed with Myers' O(ND) algorithm. A gap
+   needing more than max_edit_distance edits is reported as replaced
+   outright instead, so the cost stays bounded.
+
+The result uses difflib's opcode format, and a LineDiff is computed once per
+document pair and handed to every consumer.
+"""
+
+import bisect
+from collections import Counter
+from dataclasses import dataclass
+from typing import Hashable, Iterator, List, Sequence, Tuple
+
+DEFAULT_MAX_EDIT_DISTANCE = 1000
+
+Opcode = Tuple[str, int, int, int, int]
+
+
+def _unique_anchors(a: Sequence[Hashable], alo: int, ahi: int,
+                    b: Sequence[Hashable], blo: int, bhi: int) -> List[Tuple[int, int]]:
+    """Longest increasing run of items unique to both ranges, as (i, j) pairs."""
+    counts_a = Counter(a[alo:ahi])
+    counts_b = Counter(b[blo:bhi])
+    position_in_b = {b[j]: j for j in range(blo, bhi) if counts_b[b[j]] == 1}
+    candidates = [
+        (i, position_in_b[a[i]]) for i in range(alo, ahi)
+        if counts_a[a[i]] == 1 and a[i] in position_in_b
+    ]
+    if not candidates:
+        return []
+
+    # Patience sorting: tails[k] is the candidate ending the best run of length k + 1
+    tails: List[int] = []
+    tail_js: List[int] = []
+    previous = [-1] * len(candidates)
+    for index, (_, j) in enumerate(candidates):
+        k = bisect.bisect_left(tail_js, j)
+        if k > 0:
+            previous[index] = tails[k - 1]
+        if k == len(tails):
+            tails.append(index)
+            tail_js.append(j)
+        else:
+            tails[k] = index
+            tail_js[k] = j
+
+    anchors = []
+    index = tails[-1]
+    while index >= 0:
+        anchors.append(candidates[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _myers(a: Sequence[Hashable], alo: int, ahi: int,
+           b: Sequence[Hashable], blo: int, bhi: int,
+           max_edit_distance: int, matches: List[Tuple[int, int]]) -> bool:
+    """
+    Add the matched (i, j) pairs of a shortest edit script to matches.
+
+    Returns:
+        False, adding nothing, if the ranges need more than max_edit_distance edits
+    """
+    n, m = ahi - alo, bhi - blo
+    limit = min(max_edit_distance, n + m)
+    offset = limit + 1
+    v = [0] * (2 * limit + 3)
+    # trace[d] holds v[-d - 1 .. d + 1] as it was before step d
+    trace: List[List[int]] = []
+
+    for d in range(limit + 1):
+        trace.append(v[offset - d - 1:offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                _backtrack(trace, d, n, m, alo, blo, matches)
+                return True
+    return False
+
+
+def _backtrack(trace: List[List[int]], steps: int, n: int, m: int,
+               alo: int, blo: int, matches: List[Tuple[int, int]]) -> None:
+    x, y = n, m
+    for d in range(steps, 0, -1):
+        before = trace[d]
+        k = x - y
+        if k == -d or (k != d and before[k - 1 + d + 1] < before[k + 1 + d + 1]):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        previous_x = before[previous_k + d + 1]
+        previous_y = previous_x - previous_k
+        while x > previous_x and y > previous_y:
+            x -= 1
+            y -= 1
+            matches.append((alo + x, blo + y))
+        x, y = previous_x, previous_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        matches.append((alo + x, blo + y))
+
+
+def _change_tag(removed: int, added: int) -> str:
+    return 'replace' if removed and added else ('delete' if removed else 'insert')
+
+
+def diff_opcodes(a: Sequence[Hashable],
+                 b: Sequence[Hashable],
+                 max_edit_distance: int = DEFAULT_MAX_EDIT_DISTANCE) -> Tuple[List[Opcode], bool]:
+    """
+    Describe how to turn sequence a into sequence b.
+
+    Args:
+        a: Original items
+        b: Updated items
+        max_edit_distance: Most edits Myers' algorithm may spend on one gap
+
+    Returns:
+        difflib-style opcodes, and whether any gap hit the edit limit
+    """
+    matches: List[Tuple[int, int]] = []
+    cutoff_reached = False
+    ranges = [(0, len(a), 0, len(b))]
+    while ranges:
+        alo, ahi, blo, bhi = ranges.pop()
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            matches.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            matches.append((ahi, bhi))
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+        if anchors:
+            i_start, j_start = alo, blo
+            for i, j in anchors:
+                ranges.append((i_start, i, j_start, j))
+                matches.append((i, j))
+                i_start, j_start = i + 1, j + 1
+            ranges.append((i_start, ahi, j_start, bhi))
+        elif not _myers(a, alo, ahi, b, blo, bhi, max_edit_distance, matches):
+            cutoff_reached = True
+
+    matches.sort()
+    opcodes: List[Opcode] = []
+    i = j = 0
+    run_start = None
+    for mi, mj in matches:
+        if run_start is not None and (mi, mj) != (i, j):
+            opcodes.append(('equal', run_start[0], i, run_start[1], j))
+            run_start = None
+        if mi > i or mj > j:
+            opcodes.append((_change_tag(mi - i, mj - j), i, mi, j, mj))
+        if run_start is None:
+            run_start = (mi, mj)
+        i, j = mi + 1, mj + 1
+    if run_start is not None:
+        opcodes.append(('equal', run_start[0], i, run_start[1], j))
+    if i < len(a) or j < len(b):
+        opcodes.append((_change_tag(len(a) - i, len(b) - j), i, len(a), j, len(b)))
+    return opcodes, cutoff_reached
+
+
+@dataclass
+class LineDiff:
+    """Line-level differences between two documents; trailing whitespace is ignored."""
+    old_lines: List[str]
+    new_lines: List[str]
+    opcodes: List[Opcode]
+    cutoff_reached: bool = False
+
+    @property
+    def has_changes(self) -> bool:
+        return any(tag != 'equal' for tag, *_ in self.opcodes)
+
+    def changes(self) -> Iterator[Tuple[List[str], List[str]]]:
+        """(removed lines, added lines) of each changed block, in document order."""
+        for tag, i1, i2, j1, j2 in self.opcodes:
+            if tag != 'equal':
+                yield self.old_lines[i1:i2], self.new_lines[j1:j2]
+
+    @property
+    def removed_lines(self) -> List[str]:
+        return [line for removed, _ in self.changes() for line in removed]
+
+    @property
+    def added_lines(self) -> List[str]:
+        return [line for _, added in self.changes() for line in added]
+
+    @property
+    def changed_line_count(self) -> int:
+        return sum(i2 - i1 + j2 - j1 for tag, i1, i2, j1, j2 in self.opcodes if tag != 'equal')
+
+    @property
+    def change_ratio(self) -> float:
+        """Changed lines (removed plus added) relative to the longer document."""
+        total_lines = max(len(self.old_lines), len(self.new_lines))
+        return self.changed_line_count / total_lines if total_lines else 0.0
+
+    def grouped_opcodes(self, context_lines: int = 3) -> List[List[Opcode]]:
+        """Changed blocks with up to context_lines unchanged lines around them, as difflib groups them."""
+        codes = list(self.opcodes) or [('equal', 0, 1, 0, 1)]
+        if codes[0][0] == 'equal':
+            tag, i1, i2, j1, j2 = codes[0]
+            codes[0] = tag, max(i1, i2 - context_lines), i2, max(j1, j2 - context_lines), j2
+        if codes[-1][0] == 'equal':
+            tag, i1, i2, j1, j2 = codes[-1]
+            codes[-1] = tag, i1, min(i2, i1 + context_lines), j1, min(j2, j1 + context_lines)
+
+        span = context_lines + context_lines
+        groups = []
+        group: List[Opcode] = []
+        for tag, i1, i2, j1, j2 in codes:
+            # Split a long unchanged stretch between two groups
+            if tag == 'equal' and i2 - i1 > span:
+                group.append((tag, i1, min(i2, i1 + context_lines), j1, min(j2, j1 + context_lines)))
+                groups.append(group)
+                group = []
+                i1, j1 = max(i1, i2 - context_lines), max(j1, j2 - context_lines)
+            group.append((tag, i1, i2, j1, j2))
+        if group and not (len(group) == 1 and group[0][0] == 'equal'):
+            groups.append(group)
+        return groups
+
+
+def compute_diff(old_content: str,
+                 new_content: str,
+                 max_edit_distance: int = DEFAULT_MAX_EDIT_DISTANCE) -> LineDiff:
+    """
+    Diff two documents line by line.
+
+    Lines are compared without trailing whitespace and interned to integers,
+    so each comparison is a single integer check.
+    """
+    old_lines = [line.rstrip() for line in old_content.splitlines()]
+    new_lines = [line.rstrip() for line in new_content.splitlines()]
+    ids: dict = {}
+    old_ids = [ids.setdefault(line, len(ids)) for line in old_lines]
+    new_ids = [ids.setdefault(line, len(ids)) for line in new_lines]
+    opcodes, cutoff_reached = diff_opcodes(old_ids, new_ids, max_edit_distance)
+    return LineDiff(old_lines, new_lines, opcodes, cutoff_reached)
@@ -0,0 +1,230 @@
+"""
+Parsed HTML Document Model
+
+Parses a page once with lxml and collects everything the monitoring and
+analysis code needs from it in a single walk over the tree: visible text,
+links and the heading outline. The tree itself is kept for consumers that
+need a different view of the page, such as the content fingerprint.
+Parsed documents are cached by content hash, so the same page version is
+never parsed twice whether it is compared, fingerprinted, scanned for form
+links or handed to the analysis layer. The cache is bounded by the
+estimated memory of the documents, trees included, as well as by count.
+"""
+
+import hashlib
+import logging
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+import lxml.html
+from cssselect import SelectorError
+from lxml import etree
+
+from .bounded_cache import BoundedCache
+
+logger = logging.getLogger(__name__)
+
+# Elements whose text a reader never sees
+HIDDEN_TAGS = {'script', 'style', 'noscript', 'template'}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+DEFAULT_CACHE_SIZE = 256  # Parsed documents kept in memory
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024  # Estimated memory of the cached documents
+# An lxml tree takes several times the memory of the markup it was parsed from
+TREE_BYTES_PER_SOURCE_BYTE = 5
+
+_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+
+@dataclass
+class DocumentLink:
+    """An anchor element as found in the page."""
+    href: str
+    text: str
+    title: str = ''
+    download: Optional[str] = None  # Value of the download attribute, None if absent
+
+
+@dataclass
+class ParsedDocument:
+    """Links, visible text and heading outline of one page version."""
+    content_hash: str
+    text: str = ''
+    links: List[DocumentLink] = field(default_factory=list)
+    headings: List[Tuple[str, str]] = field(default_factory=list)  # (tag, text) in document order
+    root: Optional[Any] = field(default=None, repr=False, compare=False)  # lxml tree, None if unparseable
+    source_size: int = field(default=0, repr=False, compare=False)  # Length of the parsed markup
+
+    @property
+    def link_urls(self) -> List[str]:
+        return [link.href for link in self.links]
+
+    def select(self, selector: str) -> List[Any]:
+        """
+        Elements matching a CSS selector.
+
+        Raises:
+            ValueError: If the selector is invalid
+        """
+        if self.root is None:
+            return []
+        try:
+            return self.root.cssselect(selector)
+        except SelectorError as e:
+            raise ValueError(str(e)) from e
+
+
+def _element_text(element) -> str:
+    return ' '.join(' '.join(element.itertext()).split())
+
+
+def text_without(element, excluded_tags: Collection[str]) -> str:
+    """
+    Whitespace-collapsed text of an element, leaving out the given elements.
+
+    Text following an excluded element still counts, as it belongs to the
+    surrounding element.
+    """
+    parts = []
+    excluded_depth = 0
+    for event, node in etree.iterwalk(element, events=('start', 'end', 'comment', 'pi')):
+        tag = node.tag if isinstance(node.tag, str) else None
+
+        if event == 'start':
+            if tag in excluded_tags:
+                excluded_depth += 1
+            elif tag and excluded_depth == 0 and node.text:
+                parts.append(node.text)
+            continue
+
+        if tag in excluded_tags:
+            excluded_depth -= 1
+        # The element's own tail lies outside it
+        if excluded_depth == 0 and node.tail and node is not element:
+            parts.append(node.tail)
+
+    return ' '.join(' '.join(parts).split())
+
+
+def _parse(content: str, content_hash: str) -> ParsedDocument:
+    document = ParsedDocument(content_hash=content_hash)
+    if not content or not content.strip():
+        return document
+
+    try:
+        root = lxml.html.document_fromstring(content.encode('utf-8', errors='replace'), parser=_PARSER)
+    except (etree.ParserError, ValueError) as e:
+        logger.debug(f"Could not parse document {content_hash[:12]}: {e}")
+        return document
+    document.root = root
+    document.source_size = len(content)
+
+    text_parts = []
+    hidden_depth = 0
+    for event, element in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+        tag = element.tag if isinstance(element.tag, str) else None  # Comments and processing instructions
+
+        if event in ('comment', 'pi'):
+            # Only reported once; the text after them still belongs to the parent
+            if hidden_depth == 0 and element.tail:
+                text_parts.append(element.tail)
+            continue
+
+        if event == 'start':
+            if tag in HIDDEN_TAGS:
+                hidden_depth += 1
+            elif tag and hidden_depth == 0 and element.text:
+                text_parts.append(element.text)
+            continue
+
+        if tag in HIDDEN_TAGS:
+            hidden_depth -= 1
+        elif tag == 'a':
+            href = element.get('href')
+            if href:
+                document.links.append(DocumentLink(
+                    href=href,
+                    text=''.join(part.strip() for part in element.itertext()),
+                    title=element.get('title', ''),
+                    download=element.get('download')
+                ))
+        elif tag in HEADING_TAGS:
+            document.headings.append((tag, _element_text(element)))
+
+        # An element's tail belongs to its parent
+        if hidden_depth == 0 and element.tail:
+            text_parts.append(element.tail)
+
+    document.text = ' '.join(' '.join(text_parts).split())
+    return document
+
+
+def approximate_document_size(document: ParsedDocument) -> int:
+    """Rough memory footprint of a parsed document and its tree in bytes."""
+    return (document.source_size * TREE_BYTES_PER_SOURCE_BYTE
+            + sys.getsizeof(document.text)
+            + sum(len(link.href) + len(link.text) for link in document.links))
+
+
+class DocumentCache:
+    """Thread-safe LRU cache of parsed documents keyed by content hash."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._documents = BoundedCache(max_bytes=max_bytes, max_entries=max_entries, sizer=approximate_document_size)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, content: str, content_hash: Optional[str] = None) -> ParsedDocument:
+        """
+        Get the parsed document for some content, parsing it on first use.
+
+        Args:
+            content: HTML or plain text
+            content_hash: SHA256 of the UTF-8 content if already known
+
+        Returns:
+            Parsed document. Callers must treat it as read-only.
+        """
+        if content_hash is None:
+            content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+        document = self._documents.get(content_hash)
+        with self._lock:
+            self.stats["hits" if document is not None else "misses"] += 1
+        if document is not None:
+            return document
+
+        # Documents too large for the budget are parsed but not kept
+        document = _parse(content, content_hash)
+        self._documents.set(content_hash, document)
+        return document
+
+    def clear(self) -> None:
+        self._documents.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._documents),
+                "max_entries": self.max_entries,
+                "size_bytes": self._documents.size_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self._documents.stats["evictions"],
+                **self.stats
+            }
+
+
+_document_cache = DocumentCache()
+
+
+def parse_document(content: str, content_hash: Optional[str] = None) -> ParsedDocument:
+    """Get the parsed document for some content from the shared cache."""
+    return _document_cache.get(content, content_hash)
+
+
+def get_document_cache() -> DocumentCache:
+    return _document_cache
@@ -1,5 +1,6 @@
 import os
 import sys
+import tempfile
 import pytest
 from unittest.mock import patch, MagicMock
 from sqlalchemy import create_engine
@@ -14,6 +15,11 @@ if project_root not in sys.path:
 # Set test environment variables before any imports
 os.environ["SKIP_DB_INIT"] = "true"
 os.environ["USE_TEST_DB"] = "true"
+os.environ["ERROR_STATE_DB"] = ":memory:"
+os.environ["SNAPSHOT_STORE_PATH"] = tempfile.mkdtemp(prefix="snapshots-")
+os.environ["EMBEDDING_CACHE_PATH"] = tempfile.mkdtemp(prefix="embeddings-")
+os.environ["ANALYSIS_WORKERS"] = "0"
+os.environ["LLM_CACHE_PATH"] = ""
 
 # Import after setting environment variables
 try:
@@ -16,13 +16,19 @@ from datetime import datetime, timezone
 from typing import Dict, Any
 
 from src.monitors.ai_enhanced_monitor import AIEnhancedMonitor, monitor_agency_with_ai
-from src.database.models import Agency, Form, FormChange, MonitoringRun
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Agency, Base, Form, FormChange, MonitoringRun
 from src.analysis import AnalysisService, AnalysisRequest, AnalysisResponse
 from src.analysis.enhanced_analysis_service import EnhancedAnalysisService
 from src.analysis.change_classifier import ChangeClassifier
 from src.utils.enhanced_config_manager import EnhancedConfigManager
 from src.monitors.error_handler import GovernmentWebsiteErrorHandler
 from src.monitors.monitoring_statistics import MonitoringStatistics
+from src.monitors.snapshot_store import SnapshotStore
+from src.monitors.version_history import VersionHistory
+from src.utils.bounded_cache import BoundedCache
 
 
 class TestAIEnhancedMonitor:
@@ -215,7 +221,7 @@ class TestAIEnhancedMonitor:
             assert monitor.config_manager == mock_enhanced_config_manager
             assert monitor.error_handler == mock_error_handler
             assert monitor.monitoring_stats == mock_monitoring_statistics
-            assert isinstance(monitor.content_cache, dict)
+            assert isinstance(monitor.content_cache, BoundedCache)
     
     def test_monitor_initialization_fallback_to_standard_analysis(self, mock_analysis_service):
         """Test monitor initialization when enhanced analysis service fails."""
@@ -388,6 +394,103 @@ class TestAIEnhancedMonitor:
             # Verify content was stored
             monitor._store_current_content.assert_called_once_with(sample_form.id, "<html>New content</html>")
     
+    @pytest.mark.asyncio
+    async def test_previous_content_survives_restart(self, monitor, tmp_path):
+        """Test that stored content is found through the form's snapshot hash after the cache is lost."""
+        monitor.snapshot_store = SnapshotStore(str(tmp_path / "snapshots"))
+        snapshot = await monitor._store_current_content(1, "<html>Baseline</html>")
+        
+        monitor.content_cache.clear()
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = (snapshot,)
+        
+        assert await monitor._get_previous_content(1, db) == "<html>Baseline</html>"
+        
+        db.query.return_value.filter.return_value.first.return_value = (None,)
+        monitor.version_history = Mock(**{"latest_version.return_value": None})
+        assert await monitor._get_previous_content(2, db) is None
+    
+    @pytest.mark.asyncio
+    async def test_previous_content_rebuilt_from_history(self, monitor, tmp_path):
+        """Test that the latest recorded version is the baseline when no snapshot is available."""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        monitor.version_history = VersionHistory(SnapshotStore(str(tmp_path / "chunks")))
+        content = "<html>Recorded version</html>"
+        monitor.version_history.record_version(db, 1, content, monitor.version_history.store_chunks(content))
+        db.commit()
+        monitor.content_cache.clear()
+        
+        assert await monitor._get_previous_content(1, db) == content
+        assert await monitor._get_previous_content(2, db) is None
+    
+    @pytest.mark.asyncio
+    async def test_fingerprint_from_last_run_survives_restart(self, monitor, sample_form, mock_web_scraper, tmp_path):
+        """Test that a fresh monitor skips AI analysis for dynamic-only changes using the last run's fingerprint."""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        new_content = "<html><body><p>Submit weekly.</p><p>Generated 2026-10-16</p></body></html>"
+        db.add(MonitoringRun(
+            agency_id=1, form_id=sample_form.id, status="completed", content_hash="last_hash",
+            content_fingerprint=monitor.fingerprinter.fingerprint_for_agency(new_content, sample_form.agency.name)
+        ))
+        db.commit()
+        monitor.snapshot_store = SnapshotStore(str(tmp_path / "snapshots"))
+        monitor.version_history = VersionHistory(SnapshotStore(str(tmp_path / "chunks")))
+        monitor._get_previous_content = AsyncMock(
+            return_value="<html><body><p>Submit weekly.</p><p>Generated 2026-10-15</p></body></html>"
+        )
+        monitor._perform_ai_analysis = AsyncMock()
+        mock_web_scraper.fetch_page_content.return_value = (new_content, 200, {})
+        
+        result = await monitor._analyze_form_changes(sample_form, mock_web_scraper, db)
+        
+        assert result["errors"] == []
+        assert mock_web_scraper.fetch_page_content.call_args.kwargs["known_hash"] == "last_hash"
+        monitor._perform_ai_analysis.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_not_modified_reuses_last_run_hash(self, monitor, sample_form, mock_web_scraper):
+        """Test that a 304 after a restart records the last run's hash without hashing the baseline."""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        db.add(MonitoringRun(agency_id=1, form_id=sample_form.id, status="completed", content_hash="last_hash"))
+        db.commit()
+        monitor._get_previous_content = AsyncMock(return_value="<html>Baseline</html>")
+        mock_web_scraper.get_form_validators = Mock(return_value={"etag": '"v1"'})
+        mock_web_scraper.fetch_page_content.return_value = ("", 304, {})
+        
+        await monitor._analyze_form_changes(sample_form, mock_web_scraper, db)
+        
+        mock_web_scraper.calculate_content_hash.assert_not_called()
+        latest = db.query(MonitoringRun).order_by(MonitoringRun.id.desc()).first()
+        assert (latest.http_status_code, latest.content_hash) == (304, "last_hash")
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("commit_fails", [False, True])
+    async def test_previous_snapshot_deleted_only_after_commit(self, monitor, sample_form, mock_web_scraper,
+                                                               tmp_path, commit_fails):
+        """Test that the previous snapshot outlives a failed commit of the new one."""
+        monitor.snapshot_store = SnapshotStore(str(tmp_path / "snapshots"))
+        previous_snapshot = monitor.snapshot_store.put("<html>Old content</html>")
+        sample_form.snapshot_hash = previous_snapshot
+        monitor._get_previous_content = AsyncMock(return_value="<html>Old content</html>")
+        monitor._perform_ai_analysis = AsyncMock(return_value=None)
+        monitor._record_version = AsyncMock(return_value=True)
+        mock_web_scraper.fetch_page_content.return_value = ("<html>New content</html>", 200, {})
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = None
+        if commit_fails:
+            db.commit.side_effect = Exception("database is locked")
+        
+        result = await monitor._analyze_form_changes(sample_form, mock_web_scraper, db)
+        
+        assert bool(result["errors"]) is commit_fails
+        assert monitor.snapshot_store.contains(previous_snapshot) is commit_fails
+    
     @pytest.mark.asyncio
     async def test_analyze_form_changes_http_error(self, monitor, sample_form, mock_web_scraper):
         """Test form analysis when HTTP request fails."""
@@ -762,6 +865,31 @@ class TestAIEnhancedMonitor:
         success_rate = monitor._calculate_success_rate(error_stats)
         
         assert success_rate == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_comprehensive_batch_not_capped_by_batch_size(self, monitor):
+        """Test that a batch fans out fully and leaves per-host limits to the rate limiter."""
+        in_flight = {"current": 0, "peak": 0}
+        
+        async def fake_analyze(form, scraper, db):
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            await asyncio.sleep(0.01)
+            in_flight["current"] -= 1
+            return {"changes_detected": 0}
+        
+        monitor._analyze_form_changes = fake_analyze
+        batch = {
+            "batch_id": "weekly_1",
+            "forms": [{"agency_key": f"agency{i}", "agency_type": "state", "name": f"Form {i}"} for i in range(6)]
+        }
+        
+        with patch('src.monitors.ai_enhanced_monitor.get_db'):
+            result = await monitor._process_comprehensive_batch(batch, Mock())
+        
+        assert monitor.batch_size == 3
+        assert in_flight["peak"] == 6
+        assert result["forms_processed"] == 6
 
 
 class TestMonitorAgencyWithAI:
@@ -219,16 +219,16 @@ class TestChangeAnalyzer:
             assert hasattr(section, 'line_start')
             assert hasattr(section, 'line_end')
     
-    @patch('src.analysis.change_analyzer.cosine_similarity')
-    def test_semantic_similarity_calculation(self, mock_cosine, analyzer):
+    def test_semantic_similarity_calculation(self, analyzer):
         """Test semantic similarity calculation."""
-        mock_cosine.return_value = [[0.85]]
+        analyzer.embedding_cache = None
+        analyzer.model.encode.return_value = [[1.0, 0.0], [0.85, (1 - 0.85 ** 2) ** 0.5]]
         
         similarity = analyzer.calculate_semantic_similarity("text1", "text2")
         
         assert isinstance(similarity, float)
         assert 0 <= similarity <= 1
-        assert similarity == 0.85
+        assert similarity == pytest.approx(0.85, abs=1e-6)
     
     def test_cosmetic_change_detection(self, analyzer, sample_content):
         """Test cosmetic change detection."""
@@ -289,6 +289,32 @@ class TestChangeAnalyzer:
         assert result.processing_time_ms > 0
 
 
+@pytest.mark.skipif(not ANALYSIS_SERVICES_AVAILABLE, reason="Analysis services not available")
+class TestEmbeddingBatches:
+    """Test batched encoding with a stand-in embedding model."""
+    
+    @pytest.fixture
+    def analyzer(self):
+        """ChangeAnalyzer with a mock model, whether or not sentence-transformers is installed."""
+        with patch('src.analysis.change_analyzer.DEPENDENCIES_AVAILABLE', False):
+            analyzer = ChangeAnalyzer()
+        analyzer.model = Mock()
+        analyzer.embedding_cache = None
+        with patch('src.analysis.change_analyzer.DEPENDENCIES_AVAILABLE', True):
+            yield analyzer
+    
+    def test_similarities_encoded_in_one_batch(self, analyzer):
+        """Test that all pairs are encoded with a single model call."""
+        analyzer.model.encode.side_effect = lambda texts: [[float(len(text)), 1.0] for text in texts]
+        
+        similarities = analyzer.calculate_semantic_similarities([("a", "bb"), ("bb", "ccc"), ("a", "a")])
+        
+        assert analyzer.model.encode.call_count == 1
+        assert analyzer.model.encode.call_args[0][0] == ["a", "bb", "ccc"]
+        assert similarities[2] == pytest.approx(1.0)
+        assert similarities[0] < 1.0
+
+
 @pytest.mark.skipif(not ANALYSIS_SERVICES_AVAILABLE, reason="Analysis services not available")
 class TestLLMClassifier:
     """Test cases for the LLMClassifier class."""
@@ -562,6 +588,31 @@ class TestAnalysisService:
             
             assert stats_after["cache_size"] == 0
 
+    @pytest.mark.asyncio
+    async def test_repeated_request_served_from_cache(self, service, analysis_request):
+        """Test that an identical request reuses the cached result under a new ID."""
+        first = await service.analyze_document_changes(analysis_request)
+        second = await service.analyze_document_changes(analysis_request)
+
+        assert service.change_analyzer.analyze.call_count == 1
+        assert service.analysis_stats["cache_hits"] == 1
+        assert second.analysis_id != first.analysis_id
+        assert second.classification == first.classification
+        assert service.get_service_stats()["cache"]["entries"] == 1
+
+    def test_cache_key_uses_precomputed_hashes(self, service):
+        """Test that known content hashes replace hashing the documents."""
+        request = AnalysisRequest(
+            old_content="old", new_content="new",
+            old_content_hash="a" * 64, new_content_hash="b" * 64
+        )
+        same_hashes = request.model_copy(update={"old_content": "other"})
+
+        assert service._calculate_cache_key("old", "new", request) == \
+            service._calculate_cache_key("other", "new", same_hashes)
+        assert service._calculate_cache_key("old", "new", request) != \
+            service._calculate_cache_key("old", "new")
+
 
 @pytest.mark.skipif(not ANALYSIS_SERVICES_AVAILABLE, reason="Analysis services not available")
 @pytest.mark.integration
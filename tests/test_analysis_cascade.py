@@ -0,0 +1,211 @@
+"""
+Unit tests for the tiered analysis cascade.
+"""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.analysis.analysis_cascade import (
+    CascadeStats, CascadeThresholdConfig, CascadeThresholds,
+    hash_verdict, lexical_similarity, lexical_verdict, load_cascade_thresholds
+)
+from src.analysis.analysis_service import AnalysisService
+from src.analysis.enhanced_analysis_service import EnhancedAnalysisService
+from src.analysis.models import AnalysisRequest, ChangeClassification, SemanticAnalysis
+
+FORM_TEXT = " ".join(
+    f"Contractors submit the weekly payroll statement for project week {i} to the contracting agency."
+    for i in range(60)
+)
+
+
+def make_service(service_class=AnalysisService, similarity=90, **kwargs):
+    """Service with a mocked semantic analyzer and classifier."""
+    with patch('src.analysis.analysis_service.ChangeAnalyzer') as analyzer_class, \
+         patch('src.analysis.analysis_service.LLMClassifier') as classifier_class:
+        analyzer = Mock()
+        analyzer.model_name = "test-model"
+        analyzer.analyze.return_value = SemanticAnalysis(
+            similarity_score=similarity,
+            significant_differences=["Deadline changed"],
+            change_indicators=[],
+            model_name="test-model",
+            processing_time_ms=5
+        )
+        analyzer_class.return_value = analyzer
+        classifier = Mock()
+        classifier.classify = AsyncMock(return_value=(
+            ChangeClassification(category="requirement_change", severity="high",
+                                 priority_score=80, is_cosmetic=False, confidence=85),
+            None
+        ))
+        classifier_class.return_value = classifier
+        return service_class(enable_caching=False, analysis_thresholds=CascadeThresholdConfig(), **kwargs)
+
+
+class TestCheapTiers:
+    """Test the hash and lexical tiers."""
+
+    def test_hash_tier(self):
+        """Test that identical and whitespace-only changes stop at the hash tier."""
+        assert hash_verdict(AnalysisRequest(old_content="A form", new_content="A form")).reason == "identical_content"
+        assert hash_verdict(AnalysisRequest(old_content="A  form\n", new_content="a form")).reason == "normalized_identical"
+        assert hash_verdict(AnalysisRequest(old_content="A form", new_content="A new form")) is None
+
+    def test_lexical_tier_allows_minor_wording(self):
+        """Test that dropping an article or punctuation in a long form ends the analysis."""
+        request = AnalysisRequest(old_content=FORM_TEXT,
+                                  new_content=FORM_TEXT.replace("to the contracting agency.", "to contracting agency", 1))
+        details = {}
+
+        verdict = lexical_verdict(request, CascadeThresholds(), details)
+
+        assert verdict is not None and verdict.reason == "lexically_equivalent"
+        assert 0.995 <= details["lexical_similarity"] < 1
+
+    @pytest.mark.parametrize("old, new", [
+        ("project week 7 to", "project week 8 to"),
+        ("to the contracting agency. Contractors submit", "to the contracting agency. Contractors must submit"),
+        ("submit the weekly payroll", "submit the biweekly payroll"),
+        ("Contractors submit", "Employers submit"),
+        ("payroll statement", "uncertified payroll statement"),
+    ])
+    def test_lexical_tier_keeps_substantive_words(self, old, new):
+        """Test that a single changed figure, obligation, party or frequency is never treated as minor."""
+        request = AnalysisRequest(old_content=FORM_TEXT, new_content=FORM_TEXT.replace(old, new, 1))
+
+        assert lexical_verdict(request, CascadeThresholds(), {}) is None
+
+    def test_reordering_counts_as_change(self):
+        """Test that swapping words lowers similarity even though the words are the same."""
+        similarity, _ = lexical_similarity("employer pays the employee", "employee pays the employer")
+
+        assert similarity < 1
+
+
+class TestThresholds:
+    """Test per-agency threshold configuration."""
+
+    def test_agency_overrides_defaults(self):
+        """Test that an agency block overrides only the thresholds it sets."""
+        config = {
+            "federal": {"dol": {"name": "Department of Labor", "analysis_thresholds": {"lexical_similarity": 0.999}}},
+            "states": {"ca": {"name": "California DIR"}},
+            "monitoring_settings": {"analysis_thresholds": {"lexical_similarity": 0.99, "llm_similarity_high": 70}}
+        }
+
+        thresholds = load_cascade_thresholds(config)
+
+        assert thresholds.for_agency("department of labor") == CascadeThresholds(
+            lexical_similarity=0.999, llm_similarity_high=70)
+        assert thresholds.for_agency("California DIR") == CascadeThresholds(
+            lexical_similarity=0.99, llm_similarity_high=70)
+        assert thresholds.for_agency(None) == thresholds.default
+
+    def test_agency_threshold_changes_llm_decision(self):
+        """Test that the embedding tier's LLM range comes from the agency thresholds."""
+        service = make_service()
+        semantic = SemanticAnalysis(similarity_score=85, model_name="test-model", processing_time_ms=5)
+        request = AnalysisRequest(old_content="a", new_content="b")
+
+        assert not service._should_use_llm(semantic, 70, request, CascadeThresholds())
+        assert service._should_use_llm(semantic, 70, request, CascadeThresholds(llm_similarity_high=90))
+
+
+class TestServiceCascade:
+    """Test how far analyses travel through the service's cascade."""
+
+    @pytest.mark.asyncio
+    async def test_identical_content_skips_semantic_analysis(self):
+        """Test that the hash tier answers without embeddings or the LLM."""
+        service = make_service()
+
+        result = await service.analyze_document_changes(AnalysisRequest(old_content=FORM_TEXT, new_content=FORM_TEXT))
+
+        assert result.has_meaningful_changes is False
+        assert result.processing_summary["cascade"]["tier"] == "hash"
+        service.change_analyzer.analyze.assert_not_called()
+        service.llm_classifier.classify.assert_not_called()
+        tiers = service.get_service_stats()["analysis_cascade"]["tiers"]
+        assert tiers["hash"]["hits"] == 1 and tiers["lexical"]["runs"] == 0
+
+    @pytest.mark.asyncio
+    async def test_confident_semantic_analysis_skips_llm(self):
+        """Test that a clear semantic result is classified without the LLM."""
+        service = make_service(similarity=90)
+
+        result = await service.analyze_document_changes(
+            AnalysisRequest(old_content=FORM_TEXT, new_content="Payroll statements are now due monthly.")
+        )
+
+        assert result.processing_summary["cascade"]["tier"] == "embeddings"
+        assert service.llm_classifier.classify.call_args.kwargs["use_llm"] is False
+
+    @pytest.mark.asyncio
+    async def test_uncertain_change_reaches_llm(self):
+        """Test that an uncertain semantic result goes on to the LLM tier."""
+        service = make_service(similarity=60)
+
+        result = await service.analyze_document_changes(
+            AnalysisRequest(old_content=FORM_TEXT, new_content="Payroll statements are now due monthly.")
+        )
+
+        cascade = result.processing_summary["cascade"]
+        assert cascade["tier"] == "llm"
+        assert set(cascade["tier_times_ms"]) == {"hash", "rules", "lexical", "embeddings", "llm"}
+        assert service.llm_classifier.classify.call_args.kwargs["use_llm"] is True
+        stats = service.get_service_stats()["analysis_cascade"]
+        assert stats["analyses"] == 1
+        assert stats["tiers"]["embeddings"] == {**stats["tiers"]["embeddings"], "runs": 1, "hits": 0}
+        assert stats["tiers"]["llm"]["hit_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_enhanced_rules_tier_stops_false_positives(self):
+        """Test that false positive detection ends the enhanced analysis before embeddings."""
+        service = make_service(EnhancedAnalysisService)
+        old_content = "Submit the payroll statement weekly. Page updated 2024-01-05."
+        new_content = "Submit the payroll statement weekly. Page updated 2024-02-09."
+
+        result = await service.analyze_document_changes_enhanced(
+            AnalysisRequest(old_content=old_content, new_content=new_content, form_name="WH-347")
+        )
+
+        assert result.has_meaningful_changes is False
+        assert result.classification.subcategory == "false_positive"
+        assert result.processing_summary["false_positive_detected"] is True
+        assert result.processing_summary["cascade"]["tier"] == "rules"
+        service.change_analyzer.analyze.assert_not_called()
+        assert service.false_positive_history["WH-347"] == 1
+
+    @pytest.mark.asyncio
+    async def test_enhanced_meaningful_change_passes_rules_tier(self):
+        """Test that a real change goes past the rules tier and keeps the enhanced scores."""
+        service = make_service(EnhancedAnalysisService)
+
+        result = await service.analyze_document_changes_enhanced(
+            AnalysisRequest(old_content=FORM_TEXT, new_content="Payroll statements are now due monthly.")
+        )
+
+        assert result.processing_summary["false_positive_detected"] is False
+        assert result.processing_summary["cascade"]["tier"] == "embeddings"
+        assert "compliance_score" in result.confidence_breakdown
+        service.change_analyzer.analyze.assert_called_once()
+
+
+class TestCascadeStats:
+    """Test tier statistics."""
+
+    def test_rates_and_times(self):
+        """Test hit rates, reach and average times per tier."""
+        stats = CascadeStats()
+        stats.record("hash", 0.001, True)
+        stats.record("hash", 0.001, False)
+        stats.record("rules", 0.004, False)
+
+        result = stats.get_stats()
+
+        assert result["analyses"] == 2
+        assert result["tiers"]["hash"]["hit_rate"] == 0.5
+        assert result["tiers"]["rules"]["reached_percentage"] == 50.0
+        assert result["tiers"]["rules"]["avg_time_ms"] == 4.0
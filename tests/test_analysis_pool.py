@@ -0,0 +1,193 @@
+"""
+Unit tests for the analysis process pool.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.analysis import analysis_pool
+from src.analysis.analysis_pool import AnalysisPool, get_analysis_pool
+
+
+@pytest.fixture
+def pool():
+    """Pool whose workers are threads sharing a mock analyzer."""
+    pool = AnalysisPool(max_workers=1, queue_depth=1)
+    pool._executor = ThreadPoolExecutor(max_workers=4)
+    with patch.object(analysis_pool, "_worker_analyzer", Mock()) as analyzer:
+        yield pool, analyzer
+    pool.shutdown()
+
+
+class TestAnalysisPool:
+    """Test dispatching analysis to workers."""
+
+    @pytest.mark.asyncio
+    async def test_runs_method_in_worker(self, pool):
+        """Test that the worker's analyzer is called and its result returned."""
+        pool, analyzer = pool
+        analyzer.is_cosmetic_change.return_value = True
+
+        result = await pool.run("is_cosmetic_change", "old", "new")
+
+        assert result is True
+        analyzer.is_cosmetic_change.assert_called_once_with("old", "new")
+        assert pool.get_stats()["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_method_rejected(self, pool):
+        """Test that only analysis methods can be dispatched."""
+        pool, _ = pool
+
+        with pytest.raises(ValueError):
+            await pool.run("__init__")
+
+    @pytest.mark.asyncio
+    async def test_worker_errors_propagate(self, pool):
+        """Test that exceptions raised in a worker reach the caller."""
+        pool, analyzer = pool
+        analyzer.analyze.side_effect = RuntimeError("model failed")
+
+        with pytest.raises(RuntimeError):
+            await pool.run("analyze", "old", "new")
+        assert pool.get_stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_limits_submissions(self, pool):
+        """Test that callers beyond workers plus queue depth wait without submitting."""
+        pool, analyzer = pool
+        release = threading.Event()
+        analyzer.analyze.side_effect = lambda old, new: release.wait(5)
+
+        tasks = [asyncio.create_task(pool.run("analyze", "old", "new")) for _ in range(3)]
+        await asyncio.sleep(0.1)
+        stats = pool.get_stats()
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert stats["in_flight"] == 2
+        assert stats["waiting"] == 1
+        assert pool.get_stats()["completed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_abandoned_analysis_replaces_workers(self, pool):
+        """Test that timing out a running analysis terminates the busy workers."""
+        pool, analyzer = pool
+        release = threading.Event()
+        analyzer.analyze.side_effect = lambda old, new: release.wait(5)
+        executor = pool._executor
+        worker = Mock()
+        executor._processes = {1: worker}
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pool.run("analyze", "old", "new"), timeout=0.1)
+        release.set()
+
+        worker.terminate.assert_called_once()
+        assert pool._executor is None
+        assert pool.get_stats()["pool_restarts"] == 1
+        assert pool.get_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_queued_analyses_retried_after_restart(self, pool):
+        """Test that analyses queued behind an abandoned one run on the new pool."""
+        pool, analyzer = pool
+        pool.queue_depth = 4
+        pool._executor.shutdown()
+        pool._executor = ThreadPoolExecutor(max_workers=1)
+        release = threading.Event()
+        analyzer.analyze.side_effect = lambda old, new: release.wait(5) if old == "long" else new
+
+        with patch.object(analysis_pool, "ProcessPoolExecutor",
+                          lambda max_workers, **kwargs: ThreadPoolExecutor(max_workers=max_workers)):
+            abandoned = asyncio.create_task(asyncio.wait_for(pool.run("analyze", "long", ""), timeout=0.2))
+            await asyncio.sleep(0.05)
+            queued = [asyncio.create_task(pool.run("analyze", "short", str(i))) for i in range(3)]
+            with pytest.raises(asyncio.TimeoutError):
+                await abandoned
+            results = await asyncio.gather(*queued, return_exceptions=True)
+            release.set()
+
+        assert results == ["0", "1", "2"]
+        assert pool.get_stats()["pool_restarts"] == 1
+        assert pool.get_stats()["completed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_abandoned_queued_analysis_keeps_workers(self, pool):
+        """Test that giving up on an analysis no worker has started leaves the pool running."""
+        pool, analyzer = pool
+        pool._executor.shutdown()
+        pool._executor = executor = ThreadPoolExecutor(max_workers=1)
+        release = threading.Event()
+        analyzer.analyze.side_effect = lambda old, new: release.wait(5)
+
+        running = asyncio.create_task(pool.run("analyze", "old", "new"))
+        await asyncio.sleep(0.1)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pool.run("analyze", "old", "new"), timeout=0.1)
+        release.set()
+        await running
+
+        assert pool._executor is executor
+        assert pool.get_stats()["pool_restarts"] == 0
+        assert analyzer.analyze.call_count == 1
+
+
+class TestGetAnalysisPool:
+    """Test pool configuration from the environment."""
+
+    def test_disabled_with_zero_workers(self, monkeypatch):
+        """Test that no pool is created when ANALYSIS_WORKERS is 0."""
+        monkeypatch.setenv("ANALYSIS_WORKERS", "0")
+
+        assert get_analysis_pool("model") is None
+
+    def test_shared_per_model(self, monkeypatch):
+        """Test that services using the same model share one pool."""
+        monkeypatch.setenv("ANALYSIS_WORKERS", "3")
+        monkeypatch.setenv("ANALYSIS_QUEUE_DEPTH", "5")
+        monkeypatch.setattr(analysis_pool, "_global_pools", {})
+
+        pool = get_analysis_pool("model")
+
+        assert pool is get_analysis_pool("model")
+        assert pool is not get_analysis_pool("other-model")
+        assert pool.max_workers == 3
+        assert pool.queue_depth == 5
+        assert not pool.get_stats()["started"]
+
+
+class TestServiceDispatch:
+    """Test that the analysis service awaits the pool."""
+
+    @pytest.mark.asyncio
+    async def test_service_uses_pool(self):
+        """Test that semantic analysis runs through the pool when configured."""
+        from src.analysis.analysis_service import AnalysisService
+
+        with patch('src.analysis.analysis_service.ChangeAnalyzer'), \
+             patch('src.analysis.analysis_service.LLMClassifier'):
+            service = AnalysisService()
+        service.analysis_pool = Mock()
+        service.analysis_pool.run = AsyncMock(return_value="result")
+
+        assert await service._run_analyzer("analyze", "old", "new") == "result"
+        service.analysis_pool.run.assert_awaited_once_with("analyze", "old", "new")
+        service.change_analyzer.analyze.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_service_falls_back_to_thread(self):
+        """Test that analysis runs in a thread when no pool is configured."""
+        from src.analysis.analysis_service import AnalysisService
+
+        with patch('src.analysis.analysis_service.ChangeAnalyzer'), \
+             patch('src.analysis.analysis_service.LLMClassifier'):
+            service = AnalysisService()
+        service.analysis_pool = None
+        service.change_analyzer.analyze.return_value = "result"
+
+        assert await service._run_analyzer("analyze", "old", "new") == "result"
@@ -0,0 +1,84 @@
+"""
+Unit tests for the memory-bounded LRU cache.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.bounded_cache import BoundedCache
+
+
+class TestBoundedCache:
+    """Test eviction, expiry and statistics."""
+
+    def test_evicts_least_recently_used_over_budget(self):
+        """Test that the byte budget evicts the least recently used entry."""
+        cache = BoundedCache(max_bytes=300, sizer=len)
+        cache["a"] = "x" * 100
+        cache["b"] = "y" * 100
+        cache["c"] = "z" * 100
+        assert cache.get("a") is not None  # a is now most recently used
+
+        cache["d"] = "w" * 100
+
+        assert "b" not in cache
+        assert "a" in cache and "c" in cache and "d" in cache
+        assert cache.size_bytes == 300
+        assert cache.stats["evictions"] == 1
+
+    def test_entry_limit(self):
+        """Test that max_entries caps the entry count."""
+        cache = BoundedCache(max_bytes=10_000, max_entries=2, sizer=len)
+        for key in "abc":
+            cache[key] = key
+
+        assert len(cache) == 2
+        assert "a" not in cache
+
+    def test_oversized_value_not_cached(self):
+        """Test that a value larger than the budget does not flush the cache."""
+        cache = BoundedCache(max_bytes=100, sizer=len)
+        cache["small"] = "x" * 10
+        cache["huge"] = "y" * 1000
+
+        assert "huge" not in cache
+        assert cache["small"] == "x" * 10
+
+    def test_ttl_expiry(self):
+        """Test that entries older than the TTL are misses."""
+        cache = BoundedCache(max_bytes=1000, ttl_seconds=60, sizer=len)
+        with patch("src.utils.bounded_cache.time.monotonic", return_value=1000.0):
+            cache["form"] = "content"
+        with patch("src.utils.bounded_cache.time.monotonic", return_value=1030.0):
+            assert cache.get("form") == "content"
+        with patch("src.utils.bounded_cache.time.monotonic", return_value=1061.0):
+            assert cache.get("form") is None
+
+        assert len(cache) == 0
+        assert cache.stats["expirations"] == 1
+
+    def test_stats(self):
+        """Test hit, miss and size reporting."""
+        cache = BoundedCache(max_bytes=1000, sizer=len)
+        cache["a"] = "abc"
+        cache.get("a")
+        cache.get("missing")
+        with pytest.raises(KeyError):
+            cache["missing"]
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["size_bytes"] == 3
+        assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+    def test_replacing_value_updates_size(self):
+        """Test that overwriting a key accounts for the new size only."""
+        cache = BoundedCache(max_bytes=1000, sizer=len)
+        cache["a"] = "x" * 100
+        cache["a"] = "x" * 10
+        del cache["a"]
+
+        assert cache.size_bytes == 0
+        assert len(cache) == 0
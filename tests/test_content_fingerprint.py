@@ -0,0 +1,90 @@
+"""
+Unit tests for normalized content fingerprints.
+"""
+
+from src.monitors.content_fingerprint import ContentFingerprinter, create_content_fingerprinter
+from src.utils.html_document import get_document_cache, parse_document
+
+
+PAGE = """
+<html>
+<head><script>var nonce = "{nonce}";</script><style>body {{ color: red; }}</style></head>
+<body>
+  <nav><a href="/">Home</a> | Last visit {time}</nav>
+  <main>
+    <h1>Certified Payroll Report</h1>
+    <p>Submit form {form} weekly.</p>
+    <a href="/forms?jsessionid={session}">Download</a>
+  </main>
+  <footer>Page generated in {timing} seconds at {time}</footer>
+</body>
+</html>
+"""
+
+
+def render(form="WH-347", nonce="a" * 40, session="ABC123", time="10:15:02 AM", timing="0.42"):
+    return PAGE.format(form=form, nonce=nonce, session=session, time=time, timing=timing)
+
+
+class TestContentFingerprinter:
+    """Test normalization and fingerprinting."""
+
+    def test_dynamic_content_ignored(self):
+        """Test that scripts, chrome, tokens and timestamps do not change the fingerprint."""
+        fingerprinter = ContentFingerprinter()
+        first = fingerprinter.fingerprint(render())
+        second = fingerprinter.fingerprint(render(nonce="b" * 40, session="XYZ789", time="4:01 PM", timing="1.7"))
+
+        assert first == second
+
+    def test_content_change_detected(self):
+        """Test that a change in the main content changes the fingerprint."""
+        fingerprinter = ContentFingerprinter()
+
+        assert fingerprinter.fingerprint(render()) != fingerprinter.fingerprint(render(form="WH-348"))
+
+    def test_dynamic_values_masked_in_text(self):
+        """Test that masked values leave the surrounding text intact."""
+        text = ContentFingerprinter().normalize(
+            "<p>Updated 2026-10-16T08:30:00Z, token 0123456789abcdef0123456789abcdef</p>"
+        )
+
+        assert text == "Updated #, token #"
+
+    def test_agency_selector_limits_content(self):
+        """Test that the agency's selector narrows what is fingerprinted."""
+        fingerprinter = ContentFingerprinter({"Test Agency": "#forms"})
+        page = '<div id="news">{news}</div><div id="forms">WH-347</div>'
+
+        assert (fingerprinter.fingerprint_for_agency(page.format(news="Storm closure"), "Test Agency")
+                == fingerprinter.fingerprint_for_agency(page.format(news="Holiday hours"), "Test Agency"))
+        assert (fingerprinter.fingerprint_for_agency(page.format(news="Storm closure"), "Other Agency")
+                != fingerprinter.fingerprint_for_agency(page.format(news="Holiday hours"), "Other Agency"))
+
+    def test_unmatched_selector_uses_whole_page(self):
+        """Test that a selector matching nothing falls back to the whole page."""
+        fingerprinter = ContentFingerprinter()
+
+        assert fingerprinter.normalize("<p>WH-347</p>", "#missing") == "WH-347"
+
+    def test_uses_shared_parsed_document(self):
+        """Test that fingerprinting a page that was already parsed does not parse it again."""
+        page = render(form="WH-349")
+        parse_document(page)
+        misses = get_document_cache().get_stats()["misses"]
+
+        text = ContentFingerprinter().normalize(page, "main")
+
+        assert get_document_cache().get_stats()["misses"] == misses
+        assert text == "Certified Payroll Report Submit form WH-349 weekly. Download"
+
+    def test_selectors_loaded_from_config(self):
+        """Test that content_selector is read per agency."""
+        config = {
+            "federal": {"dol": {"name": "U.S. Department of Labor", "content_selector": "main"}},
+            "states": {"alabama": {"name": "Alabama Department of Labor"}}
+        }
+
+        fingerprinter = create_content_fingerprinter(config)
+
+        assert fingerprinter.selectors == {"U.S. Department of Labor": "main"}
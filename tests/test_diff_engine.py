@@ -0,0 +1,102 @@
+"""
+Unit tests for the shared line diff engine.
+"""
+
+import difflib
+import random
+import time
+
+import pytest
+
+from src.utils.diff_engine import compute_diff, diff_opcodes
+
+
+def apply_opcodes(a, b, opcodes):
+    """Rebuild b from a using the opcodes, checking they cover both sequences."""
+    result = []
+    i = j = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j)
+        if tag == 'equal':
+            assert a[i1:i2] == b[j1:j2]
+            result += a[i1:i2]
+        else:
+            result += b[j1:j2]
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+    return result
+
+
+class TestDiffOpcodes:
+    """Test opcode generation."""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_opcodes_rebuild_target(self, seed):
+        """Test that random edits of repetitive sequences are described completely."""
+        rng = random.Random(seed)
+        a = [rng.randint(0, 5) for _ in range(rng.randint(0, 80))]
+        b = list(a)
+        for _ in range(rng.randint(0, 10)):
+            position = rng.randint(0, len(b))
+            b[position:position + rng.randint(0, 3)] = [rng.randint(0, 7) for _ in range(rng.randint(0, 3))]
+
+        opcodes, cutoff_reached = diff_opcodes(a, b)
+
+        assert apply_opcodes(a, b, opcodes) == b
+        assert not cutoff_reached
+
+    def test_matches_difflib_on_unique_lines(self):
+        """Test that documents without repeated lines diff exactly as difflib does."""
+        old = "\n".join(f"Line {i}" for i in range(100))
+        new = old.replace("Line 10\n", "").replace("Line 50", "Line fifty").replace("Line 90", "Line 90\nLine 90b")
+
+        diff = compute_diff(old, new)
+        matcher = difflib.SequenceMatcher(None, old.splitlines(), new.splitlines(), autojunk=False)
+
+        assert diff.opcodes == matcher.get_opcodes()
+        assert diff.grouped_opcodes(2) == list(matcher.get_grouped_opcodes(2))
+
+    def test_edit_limit_reports_replacement(self):
+        """Test that a gap needing too many edits is reported as replaced."""
+        a = [1, 2] * 20
+        b = [2, 1] * 20 + [3]
+
+        opcodes, cutoff_reached = diff_opcodes(a, b, max_edit_distance=2)
+
+        assert cutoff_reached
+        assert apply_opcodes(a, b, opcodes) == b
+        assert any(tag == 'replace' for tag, *_ in opcodes)
+
+    def test_repetitive_document_is_fast(self):
+        """Test that long documents full of repeated rows diff quickly."""
+        rows = ["| 0.00 | 0.00 | 0.00 |", "", "Employer certification"] * 3000
+        changed = list(rows)
+        changed[4500] = "| 1.00 | 0.00 | 0.00 |"
+
+        start = time.monotonic()
+        diff = compute_diff("\n".join(rows), "\n".join(changed))
+
+        assert time.monotonic() - start < 2
+        assert diff.removed_lines == ["| 0.00 | 0.00 | 0.00 |"]
+        assert diff.added_lines == ["| 1.00 | 0.00 | 0.00 |"]
+
+
+class TestLineDiff:
+    """Test the LineDiff views used by the analysis consumers."""
+
+    def test_change_views(self):
+        """Test changed blocks, counts and ratio."""
+        diff = compute_diff("a\nb  \nc\nd", "a\nb\nC\nd\ne")
+
+        assert diff.has_changes
+        assert list(diff.changes()) == [(["c"], ["C"]), ([], ["e"])]
+        assert diff.changed_line_count == 3
+        assert diff.change_ratio == 3 / 5
+
+    def test_identical_documents(self):
+        """Test that unchanged documents have no changes or groups."""
+        diff = compute_diff("same\ntext", "same\ntext")
+
+        assert not diff.has_changes
+        assert diff.change_ratio == 0.0
+        assert diff.grouped_opcodes() == []
@@ -0,0 +1,99 @@
+"""
+Unit tests for the persistent embedding cache.
+"""
+
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.analysis.change_analyzer import ChangeAnalyzer
+from src.analysis.embedding_cache import EmbeddingCache, text_hash
+
+
+def fake_encode(texts):
+    """Deterministic 4-dimensional embeddings derived from text length."""
+    return np.array([[len(text), 1.0, 0.5, 0.25] for text in texts], dtype=np.float32)
+
+
+class TestEmbeddingCache:
+    """Test storing and reading embeddings."""
+
+    def test_round_trip_from_disk(self, tmp_path):
+        """Test that vectors written by one cache are read back by a fresh one."""
+        vectors = {text_hash("a"): np.arange(4, dtype=np.float32), text_hash("b"): np.ones(4, dtype=np.float32)}
+        EmbeddingCache(str(tmp_path), "test/model").put_many(vectors)
+
+        reader = EmbeddingCache(str(tmp_path), "test/model")
+        found = reader.get_many([text_hash("a"), text_hash("b"), text_hash("c")])
+
+        assert set(found) == {text_hash("a"), text_hash("b")}
+        np.testing.assert_array_equal(found[text_hash("a")], np.arange(4, dtype=np.float32))
+        assert reader.stats["disk_hits"] == 2
+        assert reader.stats["misses"] == 1
+        assert (tmp_path / "test_model" / "vectors.f32").stat().st_size == 2 * 4 * 4
+
+    def test_hot_tier(self, tmp_path):
+        """Test that recently used vectors are served from memory."""
+        cache = EmbeddingCache(str(tmp_path), "model")
+        cache.put_many({"k": np.zeros(4)})
+
+        cache.get_many(["k"])
+
+        assert cache.stats["hot_hits"] == 1
+        assert cache.stats["disk_hits"] == 0
+
+    def test_existing_vectors_not_rewritten(self, tmp_path):
+        """Test that storing a known hash again does not grow the file."""
+        cache = EmbeddingCache(str(tmp_path), "model")
+        cache.put_many({"k": np.zeros(4)})
+        cache.put_many({"k": np.zeros(4), "j": np.ones(4)})
+
+        assert cache.stats["writes"] == 2
+        assert cache.get_stats()["entries"] == 2
+
+    def test_dimension_mismatch_rejected(self, tmp_path):
+        """Test that vectors of another size cannot be mixed into a model's cache."""
+        cache = EmbeddingCache(str(tmp_path), "model")
+        cache.put_many({"k": np.zeros(4)})
+
+        with pytest.raises(ValueError):
+            cache.put_many({"j": np.zeros(8)})
+
+
+class TestChangeAnalyzerEncoding:
+    """Test that the analyzer only encodes unseen text."""
+
+    def test_only_new_text_encoded(self, tmp_path):
+        """Test that a recheck encodes only the changed text."""
+        with patch.object(ChangeAnalyzer, '_load_model'):
+            analyzer = ChangeAnalyzer(embedding_cache=EmbeddingCache(str(tmp_path), "model"))
+        analyzer.model = Mock()
+        analyzer.model.encode.side_effect = fake_encode
+
+        first = analyzer.encode(["old section", "new section"])
+        second = analyzer.encode(["new section", "newer section text"])
+
+        assert analyzer.model.encode.call_args_list[1][0][0] == ["newer section text"]
+        np.testing.assert_array_equal(first[1], second[0])
+        assert second.shape == (2, 4)
+
+    def test_batch_preparation_shares_encode_calls(self, tmp_path):
+        """Test that texts of several documents are encoded together before analysis."""
+        with patch.object(ChangeAnalyzer, '_load_model'):
+            analyzer = ChangeAnalyzer(embedding_cache=EmbeddingCache(str(tmp_path), "model"))
+        analyzer.model = Mock()
+        analyzer.model.encode.side_effect = fake_encode
+        documents = [
+            ("1. WAGES\nRate is $15.00\nEmployees must sign", "1. WAGES\nRate is $15.50\nEmployees must sign"),
+            ("Name: ____\nSubmit weekly", "Name: ____\nSubmit monthly")
+        ]
+
+        with patch('src.analysis.change_analyzer.DEPENDENCIES_AVAILABLE', True):
+            prepared = analyzer.prepare_batch(documents)
+            analyzer.model.encode.reset_mock()
+            for old, new in documents:
+                analyzer.analyze(old, new)
+
+        assert prepared > 4
+        analyzer.model.encode.assert_not_called()
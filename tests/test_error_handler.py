@@ -426,7 +426,42 @@ class TestRetryHandler:
             )
         
         # Check that circuit breaker was triggered
-        circuit_key = f"{context.url}:test_operation"
+        circuit_key = CircuitBreaker.key_for(context.url, "test_operation")
+        assert await retry_handler.circuit_breaker.is_open(circuit_key)
+
+
+    @pytest.mark.asyncio
+    async def test_content_errors_do_not_open_circuit(self):
+        """Test that oversized documents never open the circuit for their host."""
+        retry_handler = RetryHandler(RetryConfig(max_retries=2, base_delay=0.1, circuit_breaker_threshold=2))
+        
+        async def oversized_operation():
+            raise Exception("Content too large: body exceeds limit of 1024 bytes")
+        
+        for form in range(3):
+            context = ErrorContext(url=f"https://state.example.gov/forms/{form}.pdf")
+            with pytest.raises(Exception, match="Content too large"):
+                await retry_handler.execute_with_retry(oversized_operation, context, "http_get")
+            assert context.error_type == ErrorType.CONTENT_TOO_LARGE
+        
+        circuit_key = CircuitBreaker.key_for("https://state.example.gov/", "http_get")
+        assert not await retry_handler.circuit_breaker.is_open(circuit_key)
+        assert (await retry_handler.circuit_breaker.get_state(circuit_key)).failure_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_availability_errors_open_circuit(self):
+        """Test that timeouts across a host's pages open its circuit."""
+        retry_handler = RetryHandler(RetryConfig(max_retries=0, circuit_breaker_threshold=2))
+        
+        async def timing_out_operation():
+            raise asyncio.TimeoutError()
+        
+        for form in range(2):
+            context = ErrorContext(url=f"https://state.example.gov/forms/{form}.pdf")
+            with pytest.raises(asyncio.TimeoutError):
+                await retry_handler.execute_with_retry(timing_out_operation, context, "http_get")
+        
+        circuit_key = CircuitBreaker.key_for("https://state.example.gov/", "http_get")
         assert await retry_handler.circuit_breaker.is_open(circuit_key)
 
 
@@ -577,7 +612,7 @@ class TestIntegrationScenarios:
             )
         
         # Next attempt should be blocked by circuit breaker
-        circuit_key = f"{context.url}:test_operation"
+        circuit_key = CircuitBreaker.key_for(context.url, "test_operation")
         assert await retry_handler.circuit_breaker.is_open(circuit_key)
     
     @pytest.mark.asyncio
@@ -0,0 +1,98 @@
+"""
+Unit tests for the shared error state store.
+"""
+
+import time
+
+import aiohttp
+import pytest
+
+from src.monitors.error_handler import (
+    CircuitBreaker,
+    ErrorContext,
+    GovernmentWebsiteErrorHandler,
+    RetryConfig
+)
+from src.monitors.error_state_store import ErrorStateStore
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "state" / "monitor_state.db")
+
+
+class TestErrorStateStore:
+    """Test circuit state and counters in SQLite."""
+
+    def test_circuit_opens_and_cools_down(self, store_path):
+        """Test that a circuit opened by one connection blocks another until the cool-down ends."""
+        writer = ErrorStateStore(store_path)
+        reader = ErrorStateStore(store_path)
+
+        for _ in range(3):
+            state = writer.record_circuit_failure("agency.gov:http_request", threshold=3, timeout_seconds=0.1)
+
+        assert state["state"] == "open"
+        assert reader.check_circuit("agency.gov:http_request")
+
+        time.sleep(0.15)
+        assert not reader.check_circuit("agency.gov:http_request")
+        assert writer.get_circuit("agency.gov:http_request")["state"] == "half-open"
+
+        reader.record_circuit_success("agency.gov:http_request")
+        assert writer.get_circuit("agency.gov:http_request")["failure_count"] == 0
+
+    def test_statistics_per_url_and_host(self, store_path):
+        """Test that counters from several connections add up."""
+        first = ErrorStateStore(store_path)
+        second = ErrorStateStore(store_path)
+
+        first.record_success("https://agency.gov/a")
+        second.record_success("https://agency.gov/a")
+        second.record_error("https://agency.gov/b", "Timeout")
+        first.record_error("https://agency.gov/b", "Timeout")
+
+        assert first.url_stats() == {
+            "https://agency.gov/a": {"success": 2, "errors": {}},
+            "https://agency.gov/b": {"success": 0, "errors": {"Timeout": 2}}
+        }
+        assert second.host_stats() == {"agency.gov": {"urls": 2, "success": 2, "errors": 2}}
+
+        first.clear()
+        assert second.url_stats() == {}
+        assert second.all_circuits() == {}
+
+
+class TestSharedErrorHandler:
+    """Test error handlers in different workers sharing one store."""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_seen_by_other_handler(self, store_path):
+        """Test that failures in one handler stop another from hitting the host."""
+        config = RetryConfig(max_retries=0, circuit_breaker_threshold=1)
+        first = GovernmentWebsiteErrorHandler(config, ErrorStateStore(store_path))
+        second = GovernmentWebsiteErrorHandler(config, ErrorStateStore(store_path))
+
+        async def failing_operation():
+            raise aiohttp.ClientConnectionError("Connection refused")
+
+        with pytest.raises(Exception, match="Connection refused"):
+            await first.retry_handler.execute_with_retry(
+                failing_operation, ErrorContext(url="https://agency.gov/form-a"), "http_request"
+            )
+
+        # A different page on the same host is blocked as well
+        with pytest.raises(Exception, match="Circuit breaker is open"):
+            await second.retry_handler.execute_with_retry(
+                failing_operation, ErrorContext(url="https://agency.gov/form-b"), "http_request"
+            )
+
+        stats = await second.get_error_stats()
+        assert stats["circuit_breaker_states"]["agency.gov:http_request"]["state"] == "open"
+
+    def test_circuit_key_per_host(self):
+        """Test that circuit keys ignore the path."""
+        assert (CircuitBreaker.key_for("https://agency.gov/a", "http_request")
+                == CircuitBreaker.key_for("https://agency.gov/b?x=1", "http_request")
+                == "agency.gov:http_request")
+
@@ -0,0 +1,77 @@
+"""
+Unit tests for the shared HTTP fetch client and monitoring loop.
+"""
+
+import asyncio
+
+import pytest
+
+from src.monitors.fetch_client import (
+    ConnectionPoolConfig,
+    SharedFetchClient,
+    get_monitoring_loop,
+    run_monitoring_coroutine
+)
+from src.monitors.web_scraper import WebScraper
+
+
+class TestSharedFetchClient:
+    """Test session pooling across scrapers and event loops."""
+
+    @pytest.mark.asyncio
+    async def test_session_reused_across_scrapers(self):
+        """Test that scrapers borrow the same pooled session and leave it open."""
+        client = SharedFetchClient(ConnectionPoolConfig(limit=20, limit_per_host=4))
+
+        async with WebScraper(fetch_client=client) as first:
+            first_session = first.session
+        async with WebScraper(fetch_client=client) as second:
+            second_session = second.session
+
+        assert first_session is second_session
+        assert not first_session.closed
+        assert first_session.connector.limit == 20
+        assert first_session.connector.limit_per_host == 4
+
+        metrics = client.get_pool_metrics()
+        assert metrics["sessions_created"] == 1
+        assert metrics["session_reuses"] == 1
+        assert metrics["active_sessions"] == 1
+        assert metrics["pool_config"]["limit"] == 20
+
+        await client.close()
+        assert first_session.closed
+
+    def test_separate_session_per_loop(self):
+        """Test that each event loop gets its own session and closed loops are pruned."""
+        client = SharedFetchClient()
+
+        async def get_and_close():
+            session = await client.get_session()
+            await client.close()
+            return session
+
+        first = asyncio.run(get_and_close())
+        second = asyncio.run(get_and_close())
+
+        assert first is not second
+        assert client.stats["sessions_created"] == 2
+        assert client.get_pool_metrics()["active_sessions"] == 0
+
+
+class TestMonitoringLoop:
+    """Test the long-lived loop used by scheduler jobs."""
+
+    def test_jobs_share_one_loop(self):
+        """Test that consecutive jobs run on the same loop and share a session."""
+        client = SharedFetchClient()
+
+        async def job():
+            return asyncio.get_running_loop(), await client.get_session()
+
+        first_loop, first_session = run_monitoring_coroutine(job(), timeout=5)
+        second_loop, second_session = run_monitoring_coroutine(job(), timeout=5)
+
+        assert first_loop is second_loop is get_monitoring_loop()
+        assert first_session is second_session
+        run_monitoring_coroutine(client.close(), timeout=5)
@@ -0,0 +1,110 @@
+"""
+Unit tests for the record/replay fetch harness and benchmark helpers.
+"""
+
+import pytest
+
+from src.monitors.benchmark import percentile
+from src.monitors.fetch_recorder import (
+    FetchArchive,
+    RecordingFetchClient,
+    ReplayFetchClient
+)
+from src.monitors.web_scraper import WebScraper
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Create an archive with one recorded HTML page."""
+    archive = FetchArchive(str(tmp_path / "replay"))
+    archive.add(
+        "https://example.gov/form", "GET", 200,
+        {"Content-Type": "text/html; charset=utf-8", "ETag": '"v1"'},
+        b"<html>form</html>", 0.0
+    )
+    return archive
+
+
+class TestFetchArchive:
+    """Test archive persistence."""
+
+    def test_round_trip(self, archive):
+        """Test that saved recordings and bodies load back unchanged."""
+        archive.add("https://example.gov/copy", "GET", 200, {}, b"<html>form</html>", 0.25)
+        archive.save()
+
+        loaded = FetchArchive(str(archive.path))
+        recorded = loaded.get("https://example.gov/copy")
+        assert len(loaded) == 2
+        assert recorded.latency_seconds == 0.25
+        assert loaded.read_body(recorded) == b"<html>form</html>"
+        # Identical bodies are stored once
+        assert len(list((archive.path / "bodies").iterdir())) == 1
+
+
+class TestReplayFetchClient:
+    """Test serving recorded responses through the scraper."""
+
+    @pytest.mark.asyncio
+    async def test_scraper_fetches_from_replay(self, archive):
+        """Test that the full aiohttp fetch path runs against a replay."""
+        client = ReplayFetchClient(archive, latency_scale=0)
+
+        async with WebScraper(fetch_client=client) as scraper:
+            content, status, metadata = await scraper.fetch_page_content("https://example.gov/form")
+
+        assert status == 200
+        assert content == "<html>form</html>"
+        assert metadata["etag"] == '"v1"'
+        assert client.session.stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_replay_honours_validators(self, archive):
+        """Test that a matching If-None-Match is answered with 304."""
+        client = ReplayFetchClient(archive, latency_scale=0)
+
+        async with WebScraper(fetch_client=client) as scraper:
+            _, status, metadata = await scraper.fetch_page_content(
+                "https://example.gov/form", validators={"etag": '"v1"'}
+            )
+
+        assert status == 304
+        assert metadata["not_modified"] is True
+        assert client.session.stats["not_modified"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unrecorded_url_is_404(self, archive):
+        """Test that URLs missing from the archive are reported as misses."""
+        client = ReplayFetchClient(archive, latency_scale=0)
+        session = await client.get_session()
+
+        async with session.get("https://example.gov/missing") as response:
+            assert response.status == 404
+        assert session.stats["misses"] == 1
+
+
+class TestRecordingFetchClient:
+    """Test capturing responses as the scraper streams them."""
+
+    @pytest.mark.asyncio
+    async def test_records_streamed_body(self, archive, tmp_path):
+        """Test that a recorded fetch can be replayed from the new archive."""
+        target = FetchArchive(str(tmp_path / "recorded"))
+        client = RecordingFetchClient(target, inner=ReplayFetchClient(archive, latency_scale=0))
+
+        async with WebScraper(fetch_client=client) as scraper:
+            await scraper.fetch_page_content("https://example.gov/form")
+        await client.close()
+
+        loaded = FetchArchive(str(target.path))
+        recorded = loaded.get("https://example.gov/form")
+        assert recorded.status == 200
+        assert loaded.read_body(recorded) == b"<html>form</html>"
+
+
+def test_percentile():
+    """Test nearest-rank percentiles."""
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([], 95) == 0.0
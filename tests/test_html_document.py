@@ -0,0 +1,108 @@
+"""
+Unit tests for the parsed HTML document model.
+"""
+
+from src.monitors.web_scraper import WebScraper
+from src.utils.html_document import DocumentCache, parse_document
+
+
+PAGE = """
+<html>
+<head><title>Forms</title><script>var x = "hidden";</script></head>
+<body>
+  <h1>Certified Payroll</h1>
+  <p>Download <a href="/files/wh347.pdf" title="WH-347">WH-347 <b>form</b></a> here.</p>
+  <!-- comment text --> after comment
+  <a href="https://example.gov/wages" download>Wage table</a>
+  <a name="anchor-only">No href</a>
+  <noscript>Enable JavaScript</noscript>
+</body>
+</html>
+"""
+
+
+class TestParsedDocument:
+    """Test the single-walk parse."""
+
+    def test_visible_text(self):
+        """Test that scripts, noscript blocks and comments are left out of the text."""
+        document = parse_document(PAGE)
+
+        assert document.text == ("Forms Certified Payroll Download WH-347 form here. "
+                                 "after comment Wage table No href")
+
+    def test_links_and_headings(self):
+        """Test that anchors with an href and headings are collected in order."""
+        document = parse_document(PAGE)
+
+        assert document.link_urls == ["/files/wh347.pdf", "https://example.gov/wages"]
+        assert document.links[0].text == "WH-347form"
+        assert document.links[0].title == "WH-347"
+        assert document.links[0].download is None
+        assert document.links[1].download == ""
+        assert document.headings == [("h1", "Certified Payroll")]
+
+    def test_empty_content(self):
+        """Test that empty content parses to an empty document."""
+        document = parse_document("   ")
+
+        assert document.text == ""
+        assert document.links == []
+
+    def test_cache_reuses_parse(self):
+        """Test that the same content is parsed once and old entries are evicted."""
+        cache = DocumentCache(max_entries=2)
+
+        first = cache.get("<p>one</p>")
+        assert cache.get("<p>one</p>") is first
+        cache.get("<p>two</p>")
+        cache.get("<p>three</p>")
+
+        assert cache.get_stats()["entries"] == 2
+        assert cache.get("<p>one</p>") is not first
+        assert cache.stats == {"hits": 1, "misses": 4}
+
+    def test_cache_bounded_by_document_memory(self):
+        """Test that large documents and their trees are evicted by size, not only by count."""
+        page = "<p>" + "Certified payroll reporting. " * 200 + "</p>"
+        cache = DocumentCache(max_bytes=len(page) * 12)
+
+        first = cache.get(page)
+        cache.get(page.replace("payroll", "wage"))
+        cache.get(page.replace("payroll", "fringe"))
+
+        assert cache.get_stats()["entries"] == 2
+        assert cache.get_stats()["size_bytes"] <= cache.max_bytes
+        assert cache.get(page) is not first
+
+    def test_oversized_document_not_cached(self):
+        """Test that a document larger than the whole budget is parsed but not kept."""
+        cache = DocumentCache(max_bytes=1024)
+        page = "<p>" + "x" * 1000 + "</p>"
+
+        assert cache.get(page).text == "x" * 1000
+        assert cache.get_stats()["entries"] == 0
+
+
+class TestScraperDocumentReuse:
+    """Test link extraction and change detection on the document model."""
+
+    def test_extract_form_links_per_selector(self):
+        """Test that links are reported once per matching selector, resolved against the base URL."""
+        links = WebScraper().extract_form_links(PAGE, "https://example.gov/forms/")
+
+        assert [(link['selector'], link['url']) for link in links] == [
+            ('a[href*=".pdf"]', "https://example.gov/files/wh347.pdf"),
+            ('a[href*="wage"]', "https://example.gov/wages"),
+            ('a[download]', "https://example.gov/wages")
+        ]
+        assert links[0]['title'] == "WH-347"
+
+    def test_detect_changes(self):
+        """Test that added links and text changes are reported."""
+        new_page = PAGE.replace("here.", 'here. <a href="/payroll/new-form.pdf">New</a>')
+
+        changes = WebScraper().detect_changes(PAGE, new_page)
+
+        assert [change['type'] for change in changes] == ['new_forms', 'content_change']
+        assert changes[0]['details'] == ["/payroll/new-form.pdf"]
@@ -0,0 +1,105 @@
+"""
+Unit tests for batching several LLM classifications into one request.
+"""
+
+import asyncio
+import json
+import re
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.analysis.llm_classifier import LLMClassifier, batched_llm_requests
+from src.analysis.llm_rate_limiter import LLMRateLimiter
+
+
+def completion(answer, total_tokens=900, prompt_tokens=600):
+    response = Mock()
+    response.choices = [Mock()]
+    response.choices[0].message.content = json.dumps(answer)
+    response.usage.total_tokens = total_tokens
+    response.usage.prompt_tokens = prompt_tokens
+    return response
+
+
+def fake_api(skip_ids=()):
+    """Answer batched prompts per change ID and single prompts directly; priority is the form number."""
+    async def create(**kwargs):
+        prompt = kwargs["messages"][1]["content"]
+        changes = re.findall(r"=== CHANGE (c\d+) \(Form: F(\d+),", prompt)
+        if not changes:
+            number = int(re.search(r"Form: F(\d+),", prompt).group(1))
+            return completion({"category": "form_update", "priority_score": number, "confidence": 90})
+        return completion({"results": [
+            {"id": item_id, "category": "requirement_change", "priority_score": int(number), "confidence": 90}
+            for item_id, number in changes if item_id not in skip_ids
+        ]})
+    return AsyncMock(side_effect=create)
+
+
+@pytest.fixture
+def classifier():
+    with patch('src.analysis.llm_classifier.openai'):
+        classifier = LLMClassifier(rate_limiter=LLMRateLimiter(requests_per_minute=None, tokens_per_minute=None),
+                                   batch_max_items=8)
+    classifier.cache = None
+    classifier.client = Mock()
+    return classifier
+
+
+async def classify_many(classifier, count):
+    return await asyncio.gather(*[
+        classifier.classify_with_llm(f"Due April {i}", f"Due May {i}", f"F{i}", "DOL")
+        for i in range(1, count + 1)
+    ])
+
+
+class TestBatchedRequests:
+    """Test packing and fanning out batched classifications."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_changes_share_one_request(self, classifier):
+        """Test that changes classified together go out in one request and come back to their callers."""
+        classifier.client.chat.completions.create = fake_api()
+
+        with batched_llm_requests(window_seconds=0.05):
+            results = await classify_many(classifier, 3)
+
+        assert classifier.client.chat.completions.create.await_count == 1
+        assert [classification.priority_score for classification, _ in results] == [1, 2, 3]
+        assert all(analysis.tokens_used == 300 for _, analysis in results)
+        assert classifier.batch_stats["batched_items"] == 3
+
+    @pytest.mark.asyncio
+    async def test_missing_items_requested_alone(self, classifier):
+        """Test that changes left out of the batched answer are classified individually."""
+        classifier.client.chat.completions.create = fake_api(skip_ids={"c2"})
+
+        with batched_llm_requests(window_seconds=0.05):
+            results = await classify_many(classifier, 3)
+
+        assert classifier.client.chat.completions.create.await_count == 2
+        assert [classification.priority_score for classification, _ in results] == [1, 2, 3]
+        assert results[1][0].category == "form_update"
+        assert classifier.batch_stats["unbatched_items"] == 1
+
+    @pytest.mark.asyncio
+    async def test_batches_split_at_item_limit(self, classifier):
+        """Test that a full batch is sent without waiting and the rest starts a new one."""
+        classifier.batch_max_items = 2
+        classifier.client.chat.completions.create = fake_api()
+
+        with batched_llm_requests(window_seconds=0.05):
+            results = await classify_many(classifier, 4)
+
+        assert classifier.client.chat.completions.create.await_count == 2
+        assert [classification.priority_score for classification, _ in results] == [1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_unbatched_outside_context(self, classifier):
+        """Test that classifications outside batched_llm_requests get their own requests."""
+        classifier.client.chat.completions.create = fake_api()
+
+        await classify_many(classifier, 3)
+
+        assert classifier.client.chat.completions.create.await_count == 3
@@ -0,0 +1,104 @@
+"""
+Unit tests for the persistent LLM classification cache.
+"""
+
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.analysis.llm_cache import LLMClassificationCache, classification_cache_key, normalized_change_lines
+from src.analysis.llm_classifier import LLMClassifier
+from src.analysis.llm_rate_limiter import LLMRateLimiter
+from src.analysis.models import ChangeClassification, LLMAnalysis
+
+
+def classification():
+    return ChangeClassification(category="requirement_change", severity="high", priority_score=80,
+                                is_cosmetic=False, confidence=90)
+
+
+def analysis():
+    return LLMAnalysis(reasoning="Deadline moved", impact_assessment="High", model_used="gpt-test", tokens_used=500)
+
+
+class TestCacheKey:
+    """Test change normalization and keys."""
+
+    def test_whitespace_and_position_ignored(self):
+        """Test that the same edit gives the same lines regardless of spacing and surrounding text."""
+        first = normalized_change_lines("Intro\nDue  April 15\n", "Intro\nDue May 1\n")
+        second = normalized_change_lines("Other header\nMore text\n  Due April 15", "Other header\nMore text\nDue   May 1")
+
+        assert first == second == ["-Due April 15", "+Due May 1"]
+
+    def test_context_changes_key(self):
+        """Test that form, agency, model and prompt version are part of the key."""
+        lines = ["+Due May 1"]
+        base = classification_cache_key(lines, "WH-347", "DOL", "gpt-test", "1")
+
+        assert base == classification_cache_key(lines, "WH-347", "DOL", "gpt-test", "1")
+        assert base != classification_cache_key(lines, "WH-348", "DOL", "gpt-test", "1")
+        assert base != classification_cache_key(lines, "WH-347", "DOL", "gpt-other", "1")
+        assert base != classification_cache_key(lines, "WH-347", "DOL", "gpt-test", "2")
+
+
+class TestLLMClassificationCache:
+    """Test storing and expiring classifications."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that a stored classification is read back by another cache on the same file."""
+        path = str(tmp_path / "llm.db")
+        LLMClassificationCache(path).put("key", classification(), analysis(), "1")
+
+        cached = LLMClassificationCache(path).get("key")
+
+        assert cached == (classification(), analysis())
+
+    def test_expired_entries_missed(self):
+        """Test that entries older than the TTL are not returned."""
+        cache = LLMClassificationCache(":memory:", ttl_seconds=60)
+        with patch('src.analysis.llm_cache.time.time', return_value=1000.0):
+            cache.put("key", classification(), analysis(), "1")
+        with patch('src.analysis.llm_cache.time.time', return_value=1100.0):
+            assert cache.get("key") is None
+        assert cache.stats["expired"] == 1
+
+    def test_purge_expired(self):
+        """Test that purging removes only expired entries."""
+        cache = LLMClassificationCache(":memory:", ttl_seconds=60)
+        with patch('src.analysis.llm_cache.time.time', return_value=1000.0):
+            cache.put("old", classification(), analysis(), "1")
+        with patch('src.analysis.llm_cache.time.time', return_value=1100.0):
+            cache.put("new", classification(), analysis(), "1")
+            assert cache.purge_expired() == 1
+        assert cache.get_stats()["entries"] == 1
+
+
+class TestClassifierCaching:
+    """Test that the classifier reuses cached classifications."""
+
+    @pytest.mark.asyncio
+    async def test_identical_change_not_sent_twice(self):
+        """Test that a repeated change is answered from the cache with no tokens spent."""
+        limiter = LLMRateLimiter(requests_per_minute=None, tokens_per_minute=None)
+        with patch('src.analysis.llm_classifier.openai'):
+            classifier = LLMClassifier(model_name="gpt-test", rate_limiter=limiter,
+                                       cache=LLMClassificationCache(":memory:"))
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = json.dumps({
+            "category": "requirement_change", "severity": "high", "priority_score": 80,
+            "is_cosmetic": False, "confidence": 90, "reasoning": "Deadline moved"
+        })
+        response.usage.total_tokens = 500
+        classifier.client = Mock()
+        classifier.client.chat.completions.create = AsyncMock(return_value=response)
+
+        first = await classifier.classify_with_llm("Due April 15", "Due May 1", "WH-347", "DOL")
+        second = await classifier.classify_with_llm("Due  April 15", "Due May 1", "WH-347", "DOL")
+
+        assert classifier.client.chat.completions.create.await_count == 1
+        assert second[0] == first[0]
+        assert first[1].tokens_used == 500
+        assert second[1].tokens_used == 0
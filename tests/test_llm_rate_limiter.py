@@ -0,0 +1,191 @@
+"""
+Unit tests for LLM rate limiting and the stub OpenAI server.
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.analysis.llm_rate_limiter import LLMRateLimiter, retry_after_seconds
+from src.monitors.rate_limiter import TokenBucket
+from src.analysis.llm_stub import StubSettings, create_stub_app
+
+
+class APIError(Exception):
+    """Stand-in for an OpenAI status error."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = Mock(headers=headers or {})
+
+
+def response(tokens=100):
+    return Mock(usage=Mock(total_tokens=tokens))
+
+
+class TestTokenBucket:
+    """Test token bucket accounting."""
+
+    def test_burst_then_wait(self):
+        """Test that a full bucket allows a burst and then reports the refill time."""
+        bucket = TokenBucket.per_minute(60)
+
+        assert bucket.try_acquire(60) == 0
+        assert bucket.try_acquire(6) == pytest.approx(6.0, abs=0.1)
+
+    def test_adjust_refunds_and_charges(self):
+        """Test that unused tokens are returned and overruns go into debt."""
+        bucket = TokenBucket.per_minute(60000)
+        bucket.try_acquire(1000)
+
+        bucket.adjust(400)
+        assert bucket.available == pytest.approx(59400, abs=5)
+        bucket.adjust(-60000)
+        assert bucket.try_acquire(1) > 0
+
+
+class TestRetryAfter:
+    """Test reading server-requested delays."""
+
+    def test_milliseconds_preferred(self):
+        """Test that retry-after-ms is used when present."""
+        assert retry_after_seconds(APIError(429, {"retry-after-ms": "250", "retry-after": "1"})) == 0.25
+
+    def test_seconds(self):
+        """Test that retry-after in seconds is parsed."""
+        assert retry_after_seconds(APIError(429, {"retry-after": "3"})) == 3.0
+
+    def test_missing(self):
+        """Test that errors without the header give no delay."""
+        assert retry_after_seconds(ValueError("boom")) is None
+
+
+class TestLLMRateLimiter:
+    """Test concurrency, budgets and retries."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_capped(self):
+        """Test that no more than max_concurrency requests run at once."""
+        limiter = LLMRateLimiter(max_concurrency=2, requests_per_minute=None, tokens_per_minute=None)
+        running = []
+        peak = []
+
+        async def request():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.02)
+            running.pop()
+            return response()
+
+        await asyncio.gather(*[limiter.call(request) for _ in range(6)])
+
+        assert max(peak) == 2
+        assert limiter.get_stats()["requests"] == 6
+
+    @pytest.mark.asyncio
+    async def test_retries_after_rate_limit(self):
+        """Test that a 429 is retried after its Retry-After and pauses other callers."""
+        limiter = LLMRateLimiter(requests_per_minute=None, tokens_per_minute=None)
+        outcomes = [APIError(429, {"retry-after-ms": "10"}), response()]
+
+        def request():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        result = await limiter.call(request)
+
+        assert result.usage.total_tokens == 100
+        stats = limiter.get_stats()
+        assert stats["retries"] == 1
+        assert stats["rate_limited"] == 1
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_errors_raise(self):
+        """Test that client errors are not retried."""
+        limiter = LLMRateLimiter(requests_per_minute=None, tokens_per_minute=None)
+        request = Mock(side_effect=APIError(400))
+
+        with pytest.raises(APIError):
+            await limiter.call(request)
+        assert request.call_count == 1
+        assert limiter.get_stats()["failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        """Test that persistent rate limiting eventually raises."""
+        limiter = LLMRateLimiter(requests_per_minute=None, tokens_per_minute=None, max_retries=2)
+        request = Mock(side_effect=APIError(429, {"retry-after-ms": "1"}))
+
+        with pytest.raises(APIError):
+            await limiter.call(request)
+        assert request.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_token_estimate_reconciled(self):
+        """Test that the token budget is charged actual usage, not the estimate."""
+        limiter = LLMRateLimiter(requests_per_minute=None, tokens_per_minute=60000)
+
+        await limiter.call(lambda: response(tokens=200), estimated_tokens=1000)
+
+        assert limiter.token_bucket.available == pytest.approx(59800, abs=5)
+        assert limiter.get_stats()["tokens_used"] == 200
+
+
+class TestStubServer:
+    """Test the stub OpenAI server."""
+
+    def chat(self, client):
+        return client.post("/v1/chat/completions", json={
+            "model": "stub", "max_tokens": 100,
+            "messages": [{"role": "user", "content": "x" * 400}]
+        })
+
+    def test_returns_completion(self):
+        """Test that the stub answers in the chat completion format."""
+        client = TestClient(create_stub_app(StubSettings(latency_seconds=0, latency_jitter_seconds=0)))
+
+        body = self.chat(client).json()
+
+        assert body["choices"][0]["message"]["content"].startswith("{")
+        assert body["usage"]["total_tokens"] > 0
+
+    def test_rate_limits_with_retry_after(self):
+        """Test that requests beyond the per-minute limit get 429 with Retry-After."""
+        client = TestClient(create_stub_app(StubSettings(
+            latency_seconds=0, latency_jitter_seconds=0, requests_per_minute=2, tokens_per_minute=None
+        )))
+
+        statuses = [self.chat(client).status_code for _ in range(3)]
+
+        assert statuses == [200, 200, 429]
+        limited = self.chat(client)
+        assert float(limited.headers["retry-after"]) >= 1
+        assert client.get("/stats").json()["rate_limited"] == 2
+
+    @pytest.mark.asyncio
+    async def test_limiter_recovers_from_stub_rate_limits(self):
+        """Test that the limiter retries through stub 429s until every request succeeds."""
+        app = create_stub_app(StubSettings(
+            latency_seconds=0, latency_jitter_seconds=0, requests_per_minute=None,
+            tokens_per_minute=None, rate_limit_probability=0.3
+        ))
+        limiter = LLMRateLimiter(requests_per_minute=None, tokens_per_minute=None, max_retries=20,
+                                 max_backoff_seconds=0.01)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stub") as client:
+            async def request():
+                reply = await client.post("/v1/chat/completions", json={"messages": []})
+                if reply.status_code != 200:
+                    raise APIError(reply.status_code, reply.headers)
+                return reply
+
+            replies = await asyncio.gather(*[limiter.call(request) for _ in range(10)])
+
+        assert all(reply.status_code == 200 for reply in replies)
+        assert app.state.stats["completed"] == 10
@@ -0,0 +1,172 @@
+"""
+Unit tests for PDF fingerprinting and page-level text extraction.
+"""
+
+import io
+
+import pytest
+from unittest.mock import Mock, AsyncMock, MagicMock
+
+from src.monitors.pdf_extractor import (
+    PAGE_SEPARATOR,
+    PdfFingerprint,
+    is_pdf,
+    hash_page,
+    open_pdf,
+    extract_pdf,
+    find_changed_pages,
+    select_pages
+)
+from src.monitors.web_scraper import WebScraper, AgencyMonitor, FetchedBody
+
+canvas = pytest.importorskip("reportlab.pdfgen.canvas")
+
+
+def make_pdf(pages):
+    """Render one line of text per page into a PDF."""
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for text in pages:
+        pdf.drawString(72, 720, text)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+class TestPdfExtraction:
+    """Test fingerprinting and per-page extraction."""
+
+    def test_is_pdf(self):
+        """Test detection by content type and magic bytes."""
+        assert is_pdf(b"", "application/pdf; charset=binary")
+        assert is_pdf(b"%PDF-1.4\n...", "application/octet-stream")
+        assert not is_pdf(b"<html></html>", "text/html")
+
+    def test_fingerprint_read_without_pages(self):
+        """Test that size, /ID and ModDate are read from the trailer and info."""
+        data = make_pdf(["Certified Payroll"])
+        _, fingerprint = open_pdf(data)
+
+        assert fingerprint.size == len(data)
+        assert fingerprint.document_id
+        assert fingerprint.mod_date
+
+    def test_extract_pages(self):
+        """Test that each page gets its own text and hash."""
+        document = extract_pdf(make_pdf(["Page one text", "Page two text"]))
+
+        assert len(document.page_texts) == 2
+        assert "Page one text" in document.page_texts[0]
+        assert document.page_hashes == [hash_page(text) for text in document.page_texts]
+        assert document.text.count(PAGE_SEPARATOR) == 1
+        assert document.to_metadata()["page_count"] == 2
+
+    def test_matching_fingerprint_skips_extraction(self):
+        """Test that an unchanged fingerprint short-circuits text extraction."""
+        data = make_pdf(["Page one text"])
+        previous = extract_pdf(data).to_metadata()
+
+        assert extract_pdf(data, previous) is None
+
+    def test_fingerprint_requires_identity(self):
+        """Test that size alone never counts as a match."""
+        assert not PdfFingerprint(size=10).matches({"size": 10, "document_id": None, "mod_date": None})
+
+    def test_find_changed_pages(self):
+        """Test page-level comparison including added and removed pages."""
+        assert find_changed_pages(["a", "b", "c"], ["a", "x", "c"]) == [2]
+        assert find_changed_pages(["a"], ["a", "b"]) == [2]
+        assert find_changed_pages(["a", "b"], ["a"]) == [2]
+        assert find_changed_pages(["a"], ["a"]) == []
+
+    def test_hash_ignores_whitespace_reflow(self):
+        """Test that reflowed whitespace does not change the page hash."""
+        assert hash_page("Total  wages\n paid") == hash_page("Total wages paid")
+
+    def test_select_pages(self):
+        """Test selecting pages out of joined text."""
+        text = PAGE_SEPARATOR.join(["one", "two", "three"])
+        assert select_pages(text, [1, 3, 7]) == "one\nthree"
+
+
+class TestPdfFetching:
+    """Test the scraper and monitor PDF paths."""
+
+    @pytest.mark.asyncio
+    async def test_scraper_returns_page_text(self):
+        """Test that PDF bodies are returned as page text with page hashes."""
+        scraper = WebScraper()
+        data = make_pdf(["Page one text", "Page two text"])
+        body = FetchedBody(data, "hash")
+
+        content, status, metadata = await scraper._extract_pdf_content(
+            "https://example.gov/wh347.pdf", body, 200, {}
+        )
+
+        assert status == 200
+        assert content.split(PAGE_SEPARATOR)[1].strip() == "Page two text"
+        assert metadata["pdf"]["page_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_scraper_reports_unchanged_fingerprint(self):
+        """Test that a matching fingerprint reports the page unchanged."""
+        scraper = WebScraper()
+        data = make_pdf(["Page one text"])
+        known_pdf = extract_pdf(data).to_metadata()
+
+        content, _, metadata = await scraper._extract_pdf_content(
+            "https://example.gov/wh347.pdf", FetchedBody(data, "hash"), 200, {}, known_pdf
+        )
+
+        assert content == ""
+        assert metadata["unchanged"] is True
+        assert metadata["pdf"] == known_pdf
+
+    @pytest.mark.asyncio
+    async def test_monitor_pins_change_to_pages(self):
+        """Test that the agency monitor records which pages changed."""
+        monitor = AgencyMonitor.__new__(AgencyMonitor)
+        monitor.monitoring_settings = {}
+        monitor.render_selector = Mock(**{"should_render.return_value": False, "needs_probe.return_value": False})
+        monitor.scraper = Mock()
+        monitor.scraper.get_form_validators = WebScraper.get_form_validators
+
+        form = Mock(id=1, agency_id=1, form_url="https://example.gov/wh347.pdf", http_etag=None)
+        form.name = "WH-347"
+        last_run = Mock(content_hash="old", pdf_metadata={"page_hashes": ["a", "b", "c"]})
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.first.return_value = last_run
+        new_pdf = {"page_hashes": ["a", "x", "c"], "page_count": 3}
+        monitor.scraper.fetch_page_content = AsyncMock(
+            return_value=("text", 200, {"content_hash": "new", "pdf": new_pdf})
+        )
+
+        changes = await monitor._monitor_form(form, db)
+
+        assert len(changes) == 1
+        assert changes[0]["changed_pages"] == [2]
+        assert "(pages 2)" in changes[0]["description"]
+        assert db.add.call_args[0][0].pdf_metadata == new_pdf
+
+    @pytest.mark.asyncio
+    async def test_monitor_ignores_pdf_with_same_page_text(self):
+        """Test that byte-level churn without text changes records no change."""
+        monitor = AgencyMonitor.__new__(AgencyMonitor)
+        monitor.monitoring_settings = {}
+        monitor.render_selector = Mock(**{"should_render.return_value": False, "needs_probe.return_value": False})
+        monitor.scraper = Mock()
+        monitor.scraper.get_form_validators = WebScraper.get_form_validators
+
+        form = Mock(id=1, agency_id=1, form_url="https://example.gov/wh347.pdf", http_etag=None)
+        form.name = "WH-347"
+        last_run = Mock(content_hash="old", pdf_metadata={"page_hashes": ["a", "b"]})
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.first.return_value = last_run
+        monitor.scraper.fetch_page_content = AsyncMock(
+            return_value=("text", 200, {"content_hash": "new", "pdf": {"page_hashes": ["a", "b"]}})
+        )
+
+        changes = await monitor._monitor_form(form, db)
+
+        assert changes == []
+        assert db.add.call_args[0][0].content_hash == "new"
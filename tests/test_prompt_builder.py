@@ -0,0 +1,118 @@
+"""
+Unit tests for diff-based LLM prompts.
+"""
+
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.analysis.llm_classifier import LLMClassifier
+from src.analysis.llm_rate_limiter import LLMRateLimiter
+from src.analysis.prompt_builder import build_diff_excerpt, is_section_header
+
+
+def long_form(deadline="April 15", sections=50):
+    """Form text with many sections and one deadline in section 40."""
+    lines = []
+    for number in range(1, sections + 1):
+        lines.append(f"{number}. SECTION {number}")
+        lines += [f"Employers report item {number}.{line} on the quarterly return." for line in range(10)]
+        if number == 40:
+            lines.append(f"Returns are due {deadline}.")
+    return "\n".join(lines)
+
+
+class TestDiffExcerpt:
+    """Test building budgeted diff excerpts."""
+
+    def test_only_changed_hunk_with_context_and_section(self):
+        """Test that the excerpt holds the change, its context and its section heading."""
+        excerpt = build_diff_excerpt(long_form(), long_form("May 1"), context_lines=2)
+
+        assert excerpt.hunks_total == excerpt.hunks_included == 1
+        assert "- Returns are due April 15." in excerpt.text
+        assert "+ Returns are due May 1." in excerpt.text
+        assert "40. SECTION 40" in excerpt.text.splitlines()[0]
+        assert "item 1.0" not in excerpt.text
+        assert not excerpt.truncated
+
+    def test_size_follows_change_not_document(self):
+        """Test that a longer document with the same change gives the same size excerpt."""
+        short = build_diff_excerpt(long_form(sections=45), long_form("May 1", sections=45))
+        long = build_diff_excerpt(long_form(sections=400), long_form("May 1", sections=400))
+
+        assert long.estimated_tokens == short.estimated_tokens
+
+    def test_budget_truncates_gracefully(self):
+        """Test that changes beyond the budget are summarized instead of sent."""
+        old = "\n".join(f"Line {i} old text that is fairly long" for i in range(300))
+        new = "\n".join(f"Line {i} new text that is fairly long" for i in range(300))
+
+        excerpt = build_diff_excerpt(old, new, token_budget=200)
+
+        assert excerpt.truncated
+        assert excerpt.estimated_tokens <= 230
+        assert "more changed lines in this section omitted" in excerpt.text
+
+    def test_long_line_cut_around_change(self):
+        """Test that a changed line longer than the budget is cut around the edit, not dropped."""
+        words = [f"word{i}" for i in range(3000)]
+        old = "Header\n" + " ".join(words) + "\nFooter"
+        words[2000] = "revised"
+        new = "Header\n" + " ".join(words) + "\nFooter"
+
+        excerpt = build_diff_excerpt(old, new)
+
+        assert excerpt.truncated
+        assert excerpt.lines_cut == 2
+        assert excerpt.estimated_tokens <= 1500
+        assert "word2000" in excerpt.text
+        assert "revised" in excerpt.text
+        assert "…" in excerpt.text
+
+    def test_first_change_shown_with_tiny_budget(self):
+        """Test that the first changed line is sent even when context fills the budget."""
+        old = "\n".join(["Intro " * 40, "Returns are due April 15.", "Outro"])
+        new = old.replace("April 15", "May 1")
+
+        excerpt = build_diff_excerpt(old, new, token_budget=20)
+
+        assert "- Returns are due April 15." in excerpt.text
+
+    def test_no_differences(self):
+        """Test that identical documents give an empty excerpt."""
+        assert build_diff_excerpt("same", "same").hunks_total == 0
+
+    def test_section_headers(self):
+        """Test heading detection."""
+        assert is_section_header("3. Wage Reporting")
+        assert is_section_header("Part II - Employee Information")
+        assert is_section_header("CERTIFICATION:")
+        assert not is_section_header("Employers must report wages.")
+
+
+class TestPromptMetrics:
+    """Test that prompt size and latency are reported."""
+
+    @pytest.mark.asyncio
+    async def test_prompt_tokens_and_latency_recorded(self):
+        """Test that the classification records prompt tokens and latency from the API response."""
+        with patch('src.analysis.llm_classifier.openai'):
+            classifier = LLMClassifier(rate_limiter=LLMRateLimiter(requests_per_minute=None, tokens_per_minute=None))
+        classifier.cache = None
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = json.dumps({"category": "requirement_change", "confidence": 90})
+        response.usage.total_tokens = 400
+        response.usage.prompt_tokens = 320
+        classifier.client = Mock()
+        classifier.client.chat.completions.create = AsyncMock(return_value=response)
+
+        _, analysis = await classifier.classify_with_llm(long_form(), long_form("May 1"), "WH-347", "DOL")
+
+        prompt = classifier.client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        assert "+ Returns are due May 1." in prompt
+        assert "item 1.0" not in prompt
+        assert analysis.prompt_tokens == 320
+        assert analysis.latency_ms is not None
@@ -0,0 +1,130 @@
+"""
+Unit tests for per-host concurrency and rate limiting.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.monitors.rate_limiter import (
+    HostLimitConfig,
+    TokenBucket,
+    HostRateLimiter,
+    create_host_rate_limiter
+)
+from src.utils.config_loader import get_host_rate_limits
+
+
+class TestTokenBucket:
+    """Test token bucket pacing."""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_immediate(self):
+        """Test that requests within the burst do not wait."""
+        bucket = TokenBucket(rate=1.0, capacity=3)
+        waits = [await bucket.acquire() for _ in range(3)]
+        assert waits == [0.0, 0.0, 0.0]
+
+    @pytest.mark.asyncio
+    async def test_rate_enforced_after_burst(self):
+        """Test that requests beyond the burst are paced to the rate."""
+        bucket = TokenBucket(rate=20.0, capacity=1)
+        await bucket.acquire()
+        start = time.monotonic()
+        await bucket.acquire()
+        assert time.monotonic() - start >= 0.04
+
+    @pytest.mark.asyncio
+    async def test_variable_cost(self):
+        """Test that an acquisition can cost several tokens and waits for all of them."""
+        bucket = TokenBucket(rate=100.0, capacity=10)
+        assert await bucket.acquire(10) == 0.0
+        start = time.monotonic()
+        await bucket.acquire(5)
+        assert time.monotonic() - start >= 0.04
+
+    def test_shared_across_event_loops(self):
+        """Test that callers on different event loops draw from one bucket."""
+        bucket = TokenBucket(rate=1.0, capacity=4)
+        threads = [threading.Thread(target=asyncio.run, args=(bucket.acquire(2),)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert bucket.available < 1
+
+    @pytest.mark.asyncio
+    async def test_zero_rate_is_unlimited(self):
+        """Test that a non-positive rate disables pacing."""
+        bucket = TokenBucket(rate=0, capacity=1)
+        for _ in range(10):
+            assert await bucket.acquire() == 0.0
+
+
+class TestHostRateLimiter:
+    """Test host-keyed concurrency limits."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_capped_per_host(self):
+        """Test that one host never exceeds its in-flight cap while others proceed."""
+        limiter = HostRateLimiter(
+            default_config=HostLimitConfig(max_concurrent=4, requests_per_second=0),
+            host_configs={"www.dol.gov": HostLimitConfig(max_concurrent=2, requests_per_second=0)}
+        )
+
+        async def fetch(url):
+            async with limiter.limit(url):
+                await asyncio.sleep(0.01)
+
+        urls = [f"https://www.dol.gov/page{i}" for i in range(6)]
+        urls += [f"https://labor.alaska.gov/page{i}" for i in range(6)]
+        await asyncio.gather(*(fetch(url) for url in urls))
+
+        stats = limiter.get_stats()["hosts"]
+        assert stats["www.dol.gov"]["requests"] == 6
+        assert stats["www.dol.gov"]["peak_in_flight"] == 2
+        assert stats["labor.alaska.gov"]["peak_in_flight"] == 4
+        assert stats["www.dol.gov"]["in_flight"] == 0
+
+    def test_host_key_normalized(self):
+        """Test that host keys ignore case, scheme and path."""
+        assert HostRateLimiter.get_host("HTTPS://WWW.DOL.GOV/a/b?c=1") == "www.dol.gov"
+
+
+class TestHostRateLimitConfig:
+    """Test loading host limits from agency configuration."""
+
+    @pytest.fixture
+    def config(self):
+        return {
+            "federal": {
+                "department_of_labor": {
+                    "name": "U.S. Department of Labor",
+                    "base_url": "https://www.dol.gov",
+                    "rate_limit": {"max_concurrent": 1, "requests_per_second": 0.5},
+                    "forms": [{"name": "WH-347", "form_url": "https://files.dol.gov/wh347.pdf"}]
+                }
+            },
+            "states": {
+                "alaska": {"name": "Alaska", "abbreviation": "AK", "base_url": "https://labor.alaska.gov"}
+            },
+            "monitoring_settings": {"host_max_concurrent": 3, "host_burst": 4}
+        }
+
+    def test_get_host_rate_limits(self, config):
+        """Test that agency overrides apply to all of the agency's hosts."""
+        limits = get_host_rate_limits(config)
+
+        assert limits["default"] == {"max_concurrent": 3, "requests_per_second": 1.0, "burst": 4}
+        assert limits["hosts"]["www.dol.gov"] == {"max_concurrent": 1, "requests_per_second": 0.5, "burst": 4}
+        assert "files.dol.gov" in limits["hosts"]
+        assert "labor.alaska.gov" not in limits["hosts"]
+
+    def test_create_host_rate_limiter(self, config):
+        """Test building a limiter from configuration."""
+        limiter = create_host_rate_limiter(config)
+
+        assert limiter.get_host_config("www.dol.gov").max_concurrent == 1
+        assert limiter.get_host_config("labor.alaska.gov").max_concurrent == 3
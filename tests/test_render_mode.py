@@ -0,0 +1,160 @@
+"""
+Unit tests for learned render mode selection.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from unittest.mock import Mock, AsyncMock, MagicMock
+
+from src.database.models import Base, RenderModeDecision
+from src.monitors.render_mode import (
+    RenderModeSelector,
+    RenderModeConfig,
+    JAVASCRIPT,
+    STATIC,
+    create_render_mode_selector
+)
+from src.monitors.content_fingerprint import ContentFingerprinter
+from src.monitors.web_scraper import AgencyMonitor, WebScraper
+
+STATIC_PAGE = "<html><body><h1>Certified Payroll</h1><p>" + "Submit weekly payroll reports. " * 20 + "</p></body></html>"
+SPA_SHELL = '<html><body><noscript>Please enable JavaScript to use this site.</noscript><div id="root"></div></body></html>'
+RENDERED_SPA = "<html><body><div id='root'><p>" + "Prevailing wage forms and instructions. " * 20 + "</p></div></body></html>"
+
+
+@pytest.fixture
+def db():
+    """In-memory database session, without autoflush like the application's sessions."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def selector():
+    return RenderModeSelector(RenderModeConfig(min_text_chars=100, render_delta_threshold=0.2, recheck_days=30))
+
+
+class TestRenderModeSelector:
+    """Test JavaScript detection and decision storage."""
+
+    def test_static_page_has_no_signals(self, selector):
+        """Test that a content-rich page is not flagged."""
+        assert selector.detect_js_signals(STATIC_PAGE) is None
+
+    def test_js_signals(self, selector):
+        """Test noscript notices, app roots and empty bodies."""
+        assert selector.detect_js_signals(SPA_SHELL) == "noscript javascript notice"
+        assert selector.detect_js_signals('<div id="app"></div>' + STATIC_PAGE) == "client-side app root"
+        assert selector.detect_js_signals("<html><body><script>load()</script></body></html>") == "empty body"
+
+    def test_decide_by_content_delta(self, selector):
+        """Test that rendering must add content to justify Chrome."""
+        mode, reason, static_length, rendered_length = selector.decide(SPA_SHELL, RENDERED_SPA, "empty body")
+        assert mode == JAVASCRIPT
+        assert rendered_length > static_length
+        assert "empty body" in reason
+
+        mode, _, _, _ = selector.decide(SPA_SHELL, SPA_SHELL, "noscript javascript notice")
+        assert mode == STATIC
+
+    def test_decision_persisted(self, selector, db):
+        """Test storing, updating and reading back a decision."""
+        url = "https://example.gov/portal"
+        assert selector.needs_probe(selector.get_decision(db, url))
+
+        selector.record(db, url, JAVASCRIPT, "empty body", 0, 500)
+        db.commit()
+        decision = selector.get_decision(db, url)
+        assert selector.should_render(decision)
+        assert not selector.needs_probe(decision)
+
+        selector.record(db, url, STATIC, "no javascript signals")
+        db.commit()
+        assert db.query(RenderModeDecision).count() == 1
+        assert not selector.should_render(selector.get_decision(db, url))
+
+    def test_stale_decision_reprobed(self, selector, db):
+        """Test that old decisions fall back to a static fetch and a new probe."""
+        decision = selector.record(db, "https://example.gov/portal", JAVASCRIPT, "empty body")
+        decision.decided_at = datetime.now(timezone.utc) - timedelta(days=31)
+        db.commit()
+
+        decision = selector.get_decision(db, "https://example.gov/portal")
+        assert not selector.should_render(decision)
+        assert selector.needs_probe(decision)
+
+    def test_create_from_settings(self):
+        """Test building the selector from monitoring settings."""
+        selector = create_render_mode_selector({"render_mode_min_text_chars": 50})
+        assert selector.config.min_text_chars == 50
+
+
+class TestAgencyMonitorRenderProbe:
+    """Test that the monitor only renders where it changes the content."""
+
+    @pytest.fixture
+    def monitor(self, selector):
+        monitor = AgencyMonitor.__new__(AgencyMonitor)
+        monitor.monitoring_settings = {}
+        monitor.render_selector = selector
+        monitor.fingerprinter = ContentFingerprinter()
+        monitor.scraper = Mock()
+        monitor.scraper.get_form_validators = WebScraper.get_form_validators
+        monitor.scraper.calculate_content_hash = Mock(side_effect=lambda content: f"hash:{len(content)}")
+        return monitor
+
+    @pytest.fixture
+    def form(self):
+        form = Mock(id=1, agency_id=1, form_url="https://example.gov/portal", http_etag=None)
+        form.name = "Portal Form"
+        return form
+
+    @pytest.mark.asyncio
+    async def test_static_page_never_launches_chrome(self, monitor, form, db):
+        """Test that a page without JavaScript signals is remembered as static."""
+        monitor.scraper.fetch_page_content = AsyncMock(return_value=(STATIC_PAGE, 200, {}))
+
+        await monitor._monitor_form(form, db)
+
+        assert monitor.scraper.fetch_page_content.call_count == 1
+        assert monitor.scraper.fetch_page_content.call_args.kwargs["use_selenium"] is False
+        assert monitor.render_selector.get_decision(db, form.form_url).mode == STATIC
+
+    @pytest.mark.asyncio
+    async def test_forms_sharing_a_url_store_one_decision(self, monitor, form, db):
+        """Test that concurrent forms on one URL probe into a single stored decision."""
+        monitor.scraper.fetch_page_content = AsyncMock(return_value=(STATIC_PAGE, 200, {}))
+        other_form = Mock(id=2, agency_id=1, form_url=form.form_url, http_etag=None)
+        other_form.name = "Other Portal Form"
+
+        results = [result async for result in monitor._iter_form_results([form, other_form], db)]
+
+        assert len(results) == 2
+        assert db.query(RenderModeDecision).filter(RenderModeDecision.url == form.form_url).count() == 1
+        assert monitor.render_selector.get_decision(db, form.form_url).mode == STATIC
+
+    @pytest.mark.asyncio
+    async def test_js_page_switches_to_rendering(self, monitor, form, db):
+        """Test that a page whose content comes from JavaScript is rendered from then on."""
+        monitor.scraper.fetch_page_content = AsyncMock(side_effect=[
+            (SPA_SHELL, 200, {}),
+            (RENDERED_SPA, 200, {}),
+            (RENDERED_SPA, 200, {})
+        ])
+
+        changes = await monitor._monitor_form(form, db)
+        db.commit()
+
+        assert changes == []
+        assert monitor.scraper.fetch_page_content.call_args_list[1].kwargs["use_selenium"] is True
+        assert monitor.render_selector.get_decision(db, form.form_url).mode == JAVASCRIPT
+
+        await monitor._monitor_form(form, db)
+        assert monitor.scraper.fetch_page_content.call_args_list[2].kwargs["use_selenium"] is True
+        assert monitor.scraper.fetch_page_content.call_count == 3
@@ -0,0 +1,64 @@
+"""
+Unit tests for the content-addressed snapshot store.
+"""
+
+import zlib
+
+from src.monitors.snapshot_store import SnapshotStore, snapshot_hash
+
+
+class TestSnapshotStore:
+    """Test storing and reading compressed snapshots."""
+
+    def test_round_trip_from_disk(self, tmp_path):
+        """Test that a snapshot written by one store is readable by a fresh one."""
+        content = "<html>Certified payroll form</html>" * 100
+        content_hash = SnapshotStore(str(tmp_path)).put(content)
+
+        reader = SnapshotStore(str(tmp_path))
+        assert content_hash == snapshot_hash(content)
+        assert reader.get(content_hash) == content
+        assert reader.stats["disk_reads"] == 1
+
+        blob = (tmp_path / content_hash[:2] / content_hash).read_bytes()
+        assert len(blob) < len(content)
+        assert zlib.decompress(blob).decode("utf-8") == content
+
+    def test_identical_content_stored_once(self, tmp_path):
+        """Test that forms sharing content share one blob."""
+        store = SnapshotStore(str(tmp_path))
+
+        first = store.put("<html>Shared landing page</html>")
+        second = store.put("<html>Shared landing page</html>")
+
+        assert first == second
+        assert store.stats["writes"] == 1
+        assert store.stats["dedup_writes"] == 1
+        assert len(list((tmp_path / first[:2]).iterdir())) == 1
+
+    def test_missing_snapshot(self, tmp_path):
+        """Test that unknown hashes return None."""
+        store = SnapshotStore(str(tmp_path))
+
+        assert store.get("0" * 64) is None
+        assert store.stats["missing"] == 1
+
+    def test_cache_bounded(self, tmp_path):
+        """Test that the in-memory cache evicts old snapshots beyond its size limit."""
+        store = SnapshotStore(str(tmp_path), max_cache_bytes=100)
+        hashes = [store.put(str(i) * 40) for i in range(5)]
+
+        assert store.get_stats()["cached_bytes"] <= 100
+        # Evicted snapshots are read back from disk
+        assert store.get(hashes[0]) == "0" * 40
+        assert store.stats["disk_reads"] == 1
+
+    def test_delete(self, tmp_path):
+        """Test that deleted snapshots are gone from disk and cache."""
+        store = SnapshotStore(str(tmp_path))
+        content_hash = store.put("<html>Superseded form</html>")
+
+        assert list(store.iter_hashes()) == [content_hash]
+        assert store.delete(content_hash) is True
+        assert store.get(content_hash) is None
+        assert store.delete(content_hash) is False
@@ -0,0 +1,163 @@
+"""
+Unit tests for delta-compressed form version history.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, FormVersion
+from src.monitors.snapshot_store import SnapshotStore
+from src.monitors.version_history import (
+    RetentionPolicy,
+    VersionHistory,
+    apply_delta,
+    chunk_content,
+    make_delta
+)
+
+
+def make_page(revision: int, sections: int = 400) -> str:
+    """A long form page where only one section changes per revision."""
+    lines = [f"<p>Section {i}: instructions for certified payroll reporting, item {i}.</p>\n" for i in range(sections)]
+    lines[revision % sections] = f"<p>Section {revision % sections}: revised in revision {revision}.</p>\n"
+    return "<html><body>\n" + "".join(lines) + "</body></html>\n"
+
+
+@pytest.fixture
+def db():
+    """In-memory database session."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def history(tmp_path):
+    return VersionHistory(SnapshotStore(str(tmp_path / "chunks"), max_cache_bytes=0), keyframe_interval=4,
+                          gc_grace_seconds=0)
+
+
+def record(history, db, form_id, content, captured_at=None):
+    version = history.record_version(db, form_id, content, history.store_chunks(content), captured_at)
+    db.commit()
+    return version
+
+
+class TestChunking:
+    """Test content-defined chunking and chunk deltas."""
+
+    def test_chunks_join_to_content(self):
+        """Test that chunking is lossless, including very long lines."""
+        content = make_page(3) + "x" * 40000 + "\r\ntrailing"
+        chunks = chunk_content(content, min_size=256)
+
+        assert "".join(chunks) == content
+        assert max(len(chunk) for chunk in chunks) <= 16384
+
+    def test_insertion_keeps_later_chunks(self):
+        """Test that boundaries move with the content after an insertion."""
+        content = make_page(0)
+        shifted = "<p>New notice at the top of the page.</p>\n" + content
+
+        before = chunk_content(content, min_size=256)
+        after = chunk_content(shifted, min_size=256)
+
+        assert len(set(before) & set(after)) >= len(before) - 2
+
+    def test_delta_round_trip(self):
+        """Test that applying a delta rebuilds the target chunk list."""
+        base = ["a", "b", "c", "d"]
+        target = ["a", "x", "c", "d", "e"]
+
+        assert apply_delta(base, make_delta(base, target)) == target
+
+
+class TestVersionHistory:
+    """Test recording and rebuilding form versions."""
+
+    def test_every_version_reconstructable(self, history, db):
+        """Test that all versions round-trip through delta chains and keyframes."""
+        pages = [make_page(revision) for revision in range(10)]
+        for page in pages:
+            record(history, db, 1, page)
+
+        versions = history.list_versions(db, 1)
+        assert [v.version for v in versions] == list(range(1, 11))
+        assert [v.is_keyframe for v in versions][:5] == [True, False, False, False, True]
+        assert max(v.chain_depth for v in versions) < 4
+        for revision, page in enumerate(pages):
+            assert history.get_content(db, 1, revision + 1) == page
+
+    def test_unchanged_content_not_recorded(self, history, db):
+        """Test that refetching identical content adds no version."""
+        assert record(history, db, 1, make_page(1)) is not None
+        assert record(history, db, 1, make_page(1)) is None
+        assert history.stats["unchanged"] == 1
+
+    def test_deltas_store_only_changed_chunks(self, history, db):
+        """Test that a small edit adds few chunks to the store."""
+        record(history, db, 1, make_page(0))
+        stored = len(list(history.chunk_store.iter_hashes()))
+        record(history, db, 1, make_page(1))
+
+        assert len(list(history.chunk_store.iter_hashes())) - stored <= 3
+        assert history.latest_version(db, 1).is_keyframe is False
+
+    def test_compaction_thins_old_versions(self, history, db):
+        """Test that old versions become sparse keyframes and unused chunks are collected."""
+        now = datetime(2026, 10, 16, tzinfo=timezone.utc)
+        pages = {}
+        for week in range(30):
+            captured_at = now - timedelta(weeks=29 - week)
+            version = record(history, db, 1, make_page(week), captured_at)
+            pages[version.version] = make_page(week)
+
+        result = history.compact(db, 1, RetentionPolicy(keep_all_days=56, sparse_interval_days=28), now=now)
+        db.commit()
+        collected = history.collect_garbage(db)
+
+        remaining = history.list_versions(db, 1)
+        assert result["removed"] > 0
+        assert len(remaining) == result["kept"] < 30
+        assert collected > 0
+        cutoff = now - timedelta(days=56)
+        for version in remaining:
+            if version.captured_at.replace(tzinfo=timezone.utc) < cutoff:
+                assert version.is_keyframe
+            assert history.get_content(db, 1, version.version) == pages[version.version]
+
+    def test_garbage_collection_spares_recent_chunks(self, history, db):
+        """Test that chunks of an uncommitted recording, or reused by one, survive collection."""
+        history.gc_grace_seconds = 3600
+        orphaned = make_page(1, sections=40)
+        orphan_hashes = history.store_chunks(orphaned)
+        for chunk_hash in orphan_hashes:
+            os.utime(history.chunk_store._path(chunk_hash), (0, 0))
+
+        assert history.collect_garbage(db) == len(set(orphan_hashes))
+
+        # Stored but not yet committed
+        pending = history.store_chunks(make_page(2, sections=40))
+        assert history.collect_garbage(db) == 0
+
+        # An old orphan reused by a new recording
+        history.store_chunks(orphaned)
+        assert history.collect_garbage(db) == 0
+        assert history.collect_garbage(db, now=time.time() + 7200) == len(set(pending) | set(orphan_hashes))
+
+    def test_compaction_keeps_recent_history(self, history, db):
+        """Test that versions inside the full-history window are untouched."""
+        for revision in range(5):
+            record(history, db, 1, make_page(revision))
+
+        result = history.compact(db, 1, RetentionPolicy())
+
+        assert result == {"removed": 0, "kept": 5}
+        assert db.query(FormVersion).count() == 5
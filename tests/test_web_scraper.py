@@ -0,0 +1,468 @@
+"""
+Unit tests for the core web scraper and agency monitor.
+
+Covers conditional fetching with stored HTTP validators, streamed byte-level
+hashing, the monitor's handling of unchanged responses and concurrent form
+fan-out.
+"""
+
+import asyncio
+import hashlib
+
+import pytest
+from unittest.mock import Mock, AsyncMock, MagicMock, patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import Base, MonitoringRun
+
+from src.monitors.web_scraper import (
+    WebScraper, AgencyMonitor, FetchedBody, ContentTooLargeError, STREAM_CHUNK_SIZE
+)
+from src.monitors.content_fingerprint import ContentFingerprinter
+from src.monitors.error_handler import ErrorContext, ErrorClassifier, ErrorType
+
+
+def make_response(status=200, body=b"<html>content</html>", headers=None, content_length=None, charset=None):
+    """Build a fake aiohttp response as returned by the error handler."""
+    response = Mock()
+    response.status = status
+    response.headers = headers or {}
+    response.url = "https://example.gov/form"
+    response.content_length = content_length
+    response.charset = charset
+    response.read = AsyncMock(return_value=body)
+    response.text = AsyncMock(return_value=body.decode("utf-8"))
+
+    async def iter_chunked(size):
+        for start in range(0, len(body), size):
+            yield body[start:start + size]
+
+    response.content.iter_chunked = iter_chunked
+    return response
+
+
+def handle_request_with(response):
+    """Fake handle_http_request that runs the body reader like the real one."""
+    async def handle_http_request(session, url, body_reader=None, **kwargs):
+        context = ErrorContext(url=url)
+        if body_reader is not None:
+            context.metadata["body"] = await body_reader(response)
+        return response, context
+    return AsyncMock(side_effect=handle_http_request)
+
+
+@pytest.fixture
+def scraper():
+    """Create a scraper with a stubbed session and error handler."""
+    scraper = WebScraper()
+    scraper.session = Mock()
+    scraper.error_handler = Mock()
+    return scraper
+
+
+class TestConditionalFetching:
+    """Test conditional requests driven by stored validators."""
+
+    def test_build_conditional_headers(self):
+        """Test that validators map onto conditional request headers."""
+        headers = WebScraper.build_conditional_headers({
+            "etag": '"abc123"',
+            "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT",
+            "content_length": 42
+        })
+
+        assert headers == {
+            "If-None-Match": '"abc123"',
+            "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"
+        }
+
+    def test_build_conditional_headers_empty(self):
+        """Test that missing validators produce no headers."""
+        assert WebScraper.build_conditional_headers(None) == {}
+        assert WebScraper.build_conditional_headers({"etag": None, "last_modified": ""}) == {}
+
+    def test_form_validators_round_trip(self):
+        """Test storing validators from fetch metadata onto a form."""
+        form = Mock()
+        WebScraper.update_form_validators(form, {
+            "etag": '"v1"',
+            "last_modified": "",
+            "content_length": 128
+        })
+
+        assert form.http_etag == '"v1"'
+        assert form.http_last_modified is None
+        assert form.http_content_length == 128
+        assert WebScraper.get_form_validators(form) == {
+            "etag": '"v1"',
+            "last_modified": None,
+            "content_length": 128
+        }
+
+    @pytest.mark.asyncio
+    async def test_fetch_sends_conditional_headers(self, scraper):
+        """Test that validators are sent and response validators are captured."""
+        response = make_response(headers={"etag": '"v2"', "last-modified": "Thu, 02 Jan 2025 00:00:00 GMT"})
+        scraper.error_handler.handle_http_request = handle_request_with(response)
+
+        content, status, metadata = await scraper.fetch_page_content(
+            "https://example.gov/form", validators={"etag": '"v1"'}
+        )
+
+        _, kwargs = scraper.error_handler.handle_http_request.call_args
+        assert kwargs["headers"]["If-None-Match"] == '"v1"'
+        assert "If-Modified-Since" not in kwargs["headers"]
+        assert status == 200
+        assert content == "<html>content</html>"
+        assert metadata["etag"] == '"v2"'
+        assert metadata["last_modified"] == "Thu, 02 Jan 2025 00:00:00 GMT"
+        assert metadata["content_length"] == len(b"<html>content</html>")
+
+    @pytest.mark.asyncio
+    async def test_fetch_not_modified(self, scraper):
+        """Test that a 304 response returns no content and skips the body."""
+        response = make_response(status=304)
+        scraper.error_handler.handle_http_request = handle_request_with(response)
+
+        content, status, metadata = await scraper.fetch_page_content(
+            "https://example.gov/form", validators={"etag": '"v1"', "content_length": 20}
+        )
+
+        assert status == 304
+        assert content == ""
+        assert metadata["not_modified"] is True
+        assert metadata["etag"] == '"v1"'
+        response.text.assert_not_called()
+
+
+class TestStreamedFetching:
+    """Test chunked download, byte-level hashing and the size cap."""
+
+    @pytest.mark.asyncio
+    async def test_body_hashed_while_streaming(self, scraper):
+        """Test that the hash covers the raw bytes and matches the text hash for UTF-8."""
+        body = "<html>café</html>".encode("utf-8") * 10000
+        response = make_response(body=body)
+        scraper.error_handler.handle_http_request = handle_request_with(response)
+
+        content, status, metadata = await scraper.fetch_page_content("https://example.gov/form")
+
+        assert status == 200
+        assert content == body.decode("utf-8")
+        assert metadata["content_hash"] == hashlib.sha256(body).hexdigest()
+        assert metadata["content_hash"] == scraper.calculate_content_hash(content)
+        assert metadata["content_length"] == len(body)
+        response.read.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_known_hash_skips_decoding(self, scraper):
+        """Test that bytes matching the last run's hash are not decoded."""
+        body = b"<html>same</html>"
+        response = make_response(body=body)
+        scraper.error_handler.handle_http_request = handle_request_with(response)
+
+        content, status, metadata = await scraper.fetch_page_content(
+            "https://example.gov/form", known_hash=hashlib.sha256(body).hexdigest()
+        )
+
+        assert status == 200
+        assert content == ""
+        assert metadata["unchanged"] is True
+
+    @pytest.mark.asyncio
+    async def test_declared_length_over_cap_rejected(self, scraper):
+        """Test that an oversized Content-Length fails before reading the body."""
+        scraper.max_content_bytes = 10
+        response = make_response(content_length=11)
+
+        with pytest.raises(ContentTooLargeError):
+            await scraper._read_body(response)
+
+    @pytest.mark.asyncio
+    async def test_streamed_body_over_cap_rejected(self, scraper):
+        """Test that bodies without a declared length are capped while streaming."""
+        scraper.max_content_bytes = 100
+        response = make_response(body=b"x" * (STREAM_CHUNK_SIZE + 1))
+        scraper.error_handler.handle_http_request = handle_request_with(response)
+
+        content, status, metadata = await scraper.fetch_page_content("https://example.gov/form")
+
+        assert content == ""
+        assert "Content too large" in metadata["error"]
+
+    def test_fetched_body_decodes_declared_charset(self):
+        """Test decoding with the server's charset and falling back on unknown ones."""
+        assert FetchedBody("é".encode("latin-1"), "h", "iso-8859-1").text() == "é"
+        assert FetchedBody(b"ok", "h", "not-a-charset").text() == "ok"
+
+    def test_content_too_large_not_retried(self):
+        """Test that the size cap is treated as a permanent failure."""
+        error_type, severity = ErrorClassifier.classify_error(
+            ContentTooLargeError("Content too large: 11 bytes"), ErrorContext(url="https://example.gov")
+        )
+        assert error_type == ErrorType.CONTENT_TOO_LARGE
+        assert not ErrorClassifier.should_retry(error_type, severity, 0, 3)
+
+
+class TestFetchDeduplication:
+    """Test that forms sharing a URL share one fetch per run."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_fetches_share_request(self, scraper):
+        """Test that simultaneous requests for one URL make a single network fetch."""
+        response = make_response()
+        scraper.error_handler.handle_http_request = handle_request_with(response)
+
+        results = await asyncio.gather(*(
+            scraper.fetch_page_content("https://example.gov/forms", known_hash="h1") for _ in range(3)
+        ))
+
+        assert scraper.error_handler.handle_http_request.call_count == 1
+        assert {content for content, _, _ in results} == {"<html>content</html>"}
+        assert [metadata.get("shared_fetch", False) for _, _, metadata in results] == [False, True, True]
+        assert scraper.get_fetch_statistics() == {"fetches": 1, "deduplicated": 2}
+
+    @pytest.mark.asyncio
+    async def test_different_baselines_fetch_separately(self, scraper):
+        """Test that a different known hash or URL is never served from another fetch."""
+        response = make_response()
+        scraper.error_handler.handle_http_request = handle_request_with(response)
+
+        await scraper.fetch_page_content("https://example.gov/forms", known_hash="h1")
+        await scraper.fetch_page_content("https://example.gov/forms", known_hash="h2")
+        await scraper.fetch_page_content("https://example.gov/other", known_hash="h1")
+
+        assert scraper.error_handler.handle_http_request.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_forms_on_one_page_get_own_records(self):
+        """Test that forms sharing the agency page get one fetch but separate runs and changes."""
+        monitor = AgencyMonitor.__new__(AgencyMonitor)
+        monitor.monitoring_settings = {}
+        monitor.render_selector = Mock(**{"should_render.return_value": False, "needs_probe.return_value": False})
+        monitor.fingerprinter = ContentFingerprinter()
+        monitor.scraper = WebScraper()
+        monitor.scraper._fetch_page_content = AsyncMock(
+            return_value=("<html>new</html>", 200, {"content_hash": "new_hash"})
+        )
+
+        agency = Mock(base_url="https://labor.example.gov", agency_type="state")
+        forms = []
+        for form_id in (1, 2):
+            form = Mock(id=form_id, agency_id=1, form_url=None, agency=agency, http_etag=None, http_last_modified=None)
+            form.name = f"Form {form_id}"
+            forms.append(form)
+
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.first.return_value = Mock(
+            content_hash="old_hash", pdf_metadata=None
+        )
+
+        changes = await asyncio.gather(*(monitor._monitor_form(form, db) for form in forms))
+
+        monitor.scraper._fetch_page_content.assert_awaited_once()
+        assert [change[0]["form_id"] for change in changes] == [1, 2]
+        runs = [call.args[0] for call in db.add.call_args_list if hasattr(call.args[0], "http_status_code")]
+        assert [(run.form_id, run.content_hash) for run in runs] == [(1, "new_hash"), (2, "new_hash")]
+
+
+class TestAgencyMonitorConditionalFetch:
+    """Test that the agency monitor short-circuits unchanged forms."""
+
+    @pytest.fixture
+    def monitor(self):
+        monitor = AgencyMonitor.__new__(AgencyMonitor)
+        monitor.monitoring_settings = {}
+        monitor.render_selector = Mock(**{"should_render.return_value": False, "needs_probe.return_value": False})
+        monitor.fingerprinter = ContentFingerprinter()
+        monitor.scraper = Mock()
+        monitor.scraper.get_form_validators = WebScraper.get_form_validators
+        monitor.scraper.calculate_content_hash = Mock(return_value="new_hash")
+        return monitor
+
+    @pytest.fixture
+    def form(self):
+        form = Mock()
+        form.id = 1
+        form.agency_id = 1
+        form.name = "WH-347"
+        form.form_url = "https://example.gov/wh347.pdf"
+        form.http_etag = '"v1"'
+        form.http_last_modified = None
+        form.http_content_length = 100
+        return form
+
+    @pytest.mark.asyncio
+    async def test_not_modified_skips_hashing(self, monitor, form):
+        """Test that a 304 reuses the previous hash without rehashing."""
+        last_run = Mock(content_hash="old_hash")
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.first.return_value = last_run
+        monitor.scraper.fetch_page_content = AsyncMock(return_value=("", 304, {"not_modified": True}))
+
+        changes = await monitor._monitor_form(form, db)
+
+        assert changes == []
+        _, kwargs = monitor.scraper.fetch_page_content.call_args
+        assert kwargs["validators"]["etag"] == '"v1"'
+        monitor.scraper.calculate_content_hash.assert_not_called()
+        form_run = db.add.call_args[0][0]
+        assert form_run.content_hash == "old_hash"
+        assert form_run.http_status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_no_validators_without_baseline(self, monitor, form):
+        """Test that the first check fetches unconditionally."""
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.first.return_value = None
+        monitor.scraper.fetch_page_content = AsyncMock(
+            return_value=("<html></html>", 200, {"etag": '"v2"', "content_length": 13})
+        )
+
+        await monitor._monitor_form(form, db)
+
+        _, kwargs = monitor.scraper.fetch_page_content.call_args
+        assert kwargs["validators"] is None
+        monitor.scraper.update_form_validators.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_streamed_hash_reused(self, monitor, form):
+        """Test that the last hash is passed down and the streamed hash is stored."""
+        last_run = Mock(content_hash="old_hash")
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.first.return_value = last_run
+        monitor.scraper.fetch_page_content = AsyncMock(
+            return_value=("", 200, {"content_hash": "old_hash", "unchanged": True})
+        )
+
+        changes = await monitor._monitor_form(form, db)
+
+        assert changes == []
+        _, kwargs = monitor.scraper.fetch_page_content.call_args
+        assert kwargs["known_hash"] == "old_hash"
+        monitor.scraper.calculate_content_hash.assert_not_called()
+        assert db.add.call_args[0][0].content_hash == "old_hash"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_fingerprint_suppresses_change(self, monitor, form):
+        """Test that a new raw hash without a new fingerprint creates no change record."""
+        page = '<html><body><main>Form v1</main><input name="csrf" value="{}"></body></html>'
+        fingerprint = monitor.fingerprinter.fingerprint(page.format("a1"))
+        last_run = Mock(content_hash="old_hash", content_fingerprint=fingerprint, pdf_metadata=None)
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.first.return_value = last_run
+        monitor.scraper.fetch_page_content = AsyncMock(
+            return_value=(page.format("b2"), 200, {"content_hash": "new_hash"})
+        )
+
+        changes = await monitor._monitor_form(form, db)
+
+        assert changes == []
+        form_run = db.add.call_args[0][0]
+        assert form_run.content_hash == "new_hash"
+        assert form_run.content_fingerprint == fingerprint
+
+
+class TestAgencyMonitorFanOut:
+    """Test the concurrent fan-out across agencies and forms."""
+
+    def make_agency(self, agency_id, form_count):
+        agency = Mock()
+        agency.id = agency_id
+        agency.name = f"Agency {agency_id}"
+        agency.forms = []
+        for i in range(form_count):
+            form = Mock()
+            form.id = agency_id * 100 + i
+            form.name = f"Form {form.id}"
+            form.is_active = True
+            form.agency = agency
+            agency.forms.append(form)
+        return agency
+
+    @pytest.mark.asyncio
+    async def test_monitor_all_agencies_runs_forms_concurrently(self):
+        """Test that all forms across agencies are in flight together."""
+        agencies = [self.make_agency(1, 3), self.make_agency(2, 2), self.make_agency(3, 0)]
+        db = MagicMock()
+        db.query.return_value.filter.return_value.all.return_value = agencies
+
+        monitor = AgencyMonitor.__new__(AgencyMonitor)
+        monitor.monitoring_settings = {"max_concurrent_forms": 10}
+        monitor.rate_limiter = None
+        monitor.fetch_client = None
+
+        in_flight = {"current": 0, "peak": 0}
+
+        async def fake_monitor_form(form, session):
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            await asyncio.sleep(0.01)
+            in_flight["current"] -= 1
+            return [{"form_id": form.id, "description": "changed"}]
+
+        monitor._monitor_form = fake_monitor_form
+        scraper = Mock()
+        scraper.__aenter__ = AsyncMock(return_value=scraper)
+        scraper.__aexit__ = AsyncMock(return_value=None)
+        added_runs = []
+        db.add.side_effect = added_runs.append
+
+        with patch('src.monitors.web_scraper.get_db') as mock_get_db, \
+             patch('src.monitors.web_scraper.WebScraper', return_value=scraper):
+            mock_get_db.return_value.__enter__.return_value = db
+            results = await monitor.monitor_all_agencies()
+
+        assert in_flight["peak"] == 5
+        assert len(results["Agency 1"]) == 3
+        assert len(results["Agency 2"]) == 2
+        assert results["Agency 3"] == []
+        assert [run.status for run in added_runs] == ["completed"] * 3
+        assert [run.changes_detected for run in added_runs] == [3, 2, 0]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded_by_setting(self):
+        """Test that max_concurrent_forms caps the number of forms in flight."""
+        agency = self.make_agency(1, 6)
+        monitor = AgencyMonitor.__new__(AgencyMonitor)
+        monitor.monitoring_settings = {"max_concurrent_forms": 2}
+
+        in_flight = {"current": 0, "peak": 0}
+
+        async def fake_monitor_form(form, session):
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            await asyncio.sleep(0.01)
+            in_flight["current"] -= 1
+            return []
+
+        monitor._monitor_form = fake_monitor_form
+        completed = [form async for form, _ in monitor._iter_form_results(agency.forms, MagicMock())]
+
+        assert len(completed) == 6
+        assert in_flight["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_commit_rolled_back_per_form(self):
+        """Test that a form whose results cannot be saved does not lose the others' results."""
+        agency = self.make_agency(1, 3)
+        monitor = AgencyMonitor.__new__(AgencyMonitor)
+        monitor.monitoring_settings = {"max_concurrent_forms": 3}
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+
+        async def fake_monitor_form(form, session):
+            # The second form's run is missing its agency and cannot be saved
+            session.add(MonitoringRun(agency_id=None if form.id == 101 else 1, form_id=form.id))
+            await asyncio.sleep(0.01 * (form.id - 99))
+            return [{"form_id": form.id, "description": "changed"}]
+
+        monitor._monitor_form = fake_monitor_form
+        results = [result async for result in monitor._iter_form_results(agency.forms, db)]
+
+        assert {form.id: len(changes) for form, changes in results} == {100: 1, 101: 0, 102: 1}
+        assert sorted(run.form_id for run in db.query(MonitoringRun)) == [100, 102]
+        db.close()
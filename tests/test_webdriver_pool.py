@@ -0,0 +1,117 @@
+"""
+Unit tests for the Selenium WebDriver pool.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import Mock, patch
+
+from src.monitors import webdriver_pool
+from src.monitors.webdriver_pool import (
+    WebDriverPool,
+    WebDriverPoolConfig,
+    create_webdriver_pool,
+    resolve_chromedriver_path
+)
+
+
+@pytest.fixture
+def pool():
+    """Create a pool whose drivers are mocks."""
+    pool = WebDriverPool(config=WebDriverPoolConfig(max_drivers=2, acquire_timeout=1.0,
+                                                    max_pages_per_driver=2, max_memory_mb=0))
+    pool._create_driver = Mock(side_effect=lambda: Mock())
+    return pool
+
+
+class TestWebDriverPool:
+    """Test waiting, recycling and threading behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_waiters_queue_until_driver_returned(self, pool):
+        """Test that a caller waits for a busy driver instead of failing."""
+        first = await pool.get_driver()
+        second = await pool.get_driver()
+
+        waiter = asyncio.create_task(pool.get_driver())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await pool.return_driver(first)
+        assert await asyncio.wait_for(waiter, 1.0) is first
+        assert second is not first
+        assert pool._create_driver.call_count == 2
+
+        await pool.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_acquire_times_out(self, pool):
+        """Test that waiting gives up after the timeout."""
+        await pool.get_driver()
+        await pool.get_driver()
+
+        assert await pool.get_driver(timeout=0.01) is None
+        assert pool.stats["acquire_timeouts"] == 1
+
+        await pool.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_driver_recycled_after_page_budget(self, pool):
+        """Test that a driver is quit and replaced after max_pages_per_driver loads."""
+        driver = await pool.get_driver()
+        pool.record_page_load(driver)
+        pool.record_page_load(driver)
+        await pool.return_driver(driver)
+
+        driver.quit.assert_called_once()
+        assert pool.stats["drivers_recycled"] == 1
+        assert await pool.get_driver() is not driver
+
+        await pool.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_driver_recycled_over_memory_threshold(self, pool):
+        """Test that a driver is recycled when the browser uses too much memory."""
+        pool.config.max_memory_mb = 100
+        driver = await pool.get_driver()
+
+        with patch.object(WebDriverPool, '_get_driver_memory_mb', return_value=500.0):
+            await pool.return_driver(driver)
+
+        driver.quit.assert_called_once()
+
+        await pool.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_calls_run_off_event_loop(self, pool):
+        """Test that blocking calls execute on the pool's threads."""
+        thread_name = await pool.run(lambda: threading.current_thread().name)
+
+        assert thread_name.startswith("webdriver")
+
+        await pool.cleanup()
+
+    def test_create_from_settings(self):
+        """Test building the pool from monitoring settings."""
+        pool = create_webdriver_pool({"selenium_max_drivers": 5, "selenium_max_pages_per_driver": 10})
+
+        assert pool.max_drivers == 5
+        assert pool.config.max_pages_per_driver == 10
+
+
+class TestDriverBinaryResolution:
+    """Test that the chromedriver binary is resolved only once."""
+
+    def test_resolved_once(self, monkeypatch):
+        """Test that webdriver-manager is only consulted on first use."""
+        monkeypatch.setattr(webdriver_pool, "_driver_path", None)
+        monkeypatch.delenv("CHROMEDRIVER_PATH", raising=False)
+
+        with patch.object(webdriver_pool, "ChromeDriverManager") as manager:
+            manager.return_value.install.return_value = "/opt/chromedriver"
+            assert resolve_chromedriver_path() == "/opt/chromedriver"
+            assert resolve_chromedriver_path() == "/opt/chromedriver"
+
+        manager.return_value.install.assert_called_once()